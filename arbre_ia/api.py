@@ -1,15 +1,48 @@
-from fastapi import FastAPI, HTTPException
+import json
+from contextlib import asynccontextmanager
+
+from fastapi import FastAPI, Header, HTTPException, Request, WebSocket, WebSocketDisconnect
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import PlainTextResponse
-from pydantic import BaseModel
+from fastapi.responses import PlainTextResponse, Response, StreamingResponse
+from pydantic import BaseModel, ValidationError
+from starlette.concurrency import iterate_in_threadpool, run_in_threadpool
 from typing import Optional, List
 
-from .headache_assistants.dialogue import handle_user_message, get_session_info
+from .headache_assistants.dialogue import (
+    handle_user_message,
+    stream_user_message,
+    get_session_info,
+    session_needs_history,
+    get_parse_cache_stats,
+    get_emergency_stats,
+    get_follow_up_stats,
+    get_message_coalescing_stats,
+    wait_for_emergency_audit,
+    export_session,
+    import_session,
+    get_nlu_registry,
+)
+from .headache_assistants.core.exceptions import SessionNotFoundError, ValidationError as ClinicalValidationError
 from .headache_assistants.models import ChatMessage
-from .headache_assistants.prescription import _format_prescription
+from .headache_assistants.nlu_hybrid import resolve_enhancement_details, resolve_special_pattern
+from .headache_assistants.prescription import (
+    PrescriptionCache,
+    _format_prescription,
+    etag_matches,
+    prescription_etag,
+)
+from .headache_assistants.rules_registry import get_rules_registry, start_rules_watch, stop_rules_watch
 
 
-app = FastAPI(title="API Arbre IA – Céphalées")
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Rechargement à chaud des règles : seul le serveur surveille les fichiers
+    start_rules_watch()
+    yield
+    stop_rules_watch()
+
+
+app = FastAPI(title="API Arbre IA – Céphalées", lifespan=lifespan)
 
 app.add_middleware(
     CORSMiddleware,
@@ -25,6 +58,7 @@ class ChatRequest(BaseModel):
     message: str
     session_id: Optional[str] = None
     history: List[dict] = []  # [{role, content}]
+    site: Optional[str] = None  # Site hospitalier (à défaut : en-tête X-Site)
 
 class ChatResponseAPI(BaseModel):
     session_id: Optional[str]
@@ -36,20 +70,39 @@ class ChatResponseAPI(BaseModel):
 
 # ======== ENDPOINT =========
 
+def _history_messages(req: ChatRequest) -> List[ChatMessage]:
+    """Messages utilisateur de l'historique, convertis seulement s'ils reconstruisent la session.
+
+    Une session connue du worker (hors mode sans état) n'en a pas besoin :
+    l'historique n'est alors pas converti.
+    """
+    if not req.history or not session_needs_history(req.session_id):
+        return []
+    return [ChatMessage(role="user", content=h["content"]) for h in req.history if h.get("role") == "user"]
+
+
+def _request_site(req: ChatRequest, x_site: Optional[str]) -> Optional[str]:
+    """Site de la requête (champ "site", sinon en-tête X-Site); 400 si inconnu."""
+    site = req.site or x_site
+    try:
+        get_nlu_registry().site(site)
+    except ClinicalValidationError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return site
+
+
 @app.post("/chat", response_model=ChatResponseAPI)
-def chat(req: ChatRequest):
-    # convertir l'historique en ChatMessage
-    history_msgs = [
-        ChatMessage(role=h["role"], content=h["content"])
-        for h in req.history
-    ]
+def chat(req: ChatRequest, x_site: Optional[str] = Header(default=None)):
+    site = _request_site(req, x_site)
+    history_msgs = _history_messages(req)
 
     user_msg = ChatMessage(role="user", content=req.message)
 
     response = handle_user_message(
         history=history_msgs,
         new_message=user_msg,
-        session_id=req.session_id
+        session_id=req.session_id,
+        site=site
     )
 
     return {
@@ -64,20 +117,107 @@ def chat(req: ChatRequest):
         ),
     }
 
+def _chat_events(req: ChatRequest, site: Optional[str] = None):
+    """Événements du dialogue en flux (voir stream_user_message)."""
+    history_msgs = _history_messages(req)
+    user_msg = ChatMessage(role="user", content=req.message)
+    return stream_user_message(history_msgs, user_msg, req.session_id, site)
+
+
+# ======== ENDPOINTS EN FLUX =========
+
+@app.post("/chat/stream")
+def chat_stream(req: ChatRequest, x_site: Optional[str] = Header(default=None)):
+    """Dialogue en Server-Sent Events : lecture provisoire, urgences, question, résultat."""
+    site = _request_site(req, x_site)
+
+    def event_stream():
+        for event, data in _chat_events(req, site):
+            yield f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@app.websocket("/chat/ws")
+async def chat_websocket(websocket: WebSocket):
+    """Dialogue sur une connexion WebSocket gardée ouverte pour toute la session.
+
+    Chaque message client ({message, session_id?, history?}) produit les
+    événements {"event": ..., "data": ...} de stream_user_message; le
+    session_id est conservé d'un tour à l'autre. Le site vient du message
+    ou de l'en-tête X-Site de la connexion.
+    """
+    await websocket.accept()
+    session_id = None
+    try:
+        while True:
+            try:
+                payload = json.loads(await websocket.receive_text())
+            except json.JSONDecodeError as e:
+                await websocket.send_json({"event": "error", "data": {"detail": f"JSON invalide: {e}"}})
+                continue
+            try:
+                req = ChatRequest(**{"session_id": session_id, **payload})
+                site = _request_site(req, websocket.headers.get("x-site"))
+            except (TypeError, ValidationError) as e:
+                await websocket.send_json({"event": "error", "data": {"detail": str(e)}})
+                continue
+            except HTTPException as e:
+                await websocket.send_json({"event": "error", "data": {"detail": e.detail}})
+                continue
+            async for event, data in iterate_in_threadpool(_chat_events(req, site)):
+                session_id = data.get("session_id", session_id)
+                await websocket.send_json({"event": event, "data": data})
+    except WebSocketDisconnect:
+        pass
+
+
 @app.get("/")
 def root():
     return {"status": "ok", "message": "API Arbre IA en fonctionnement"}
 
 
+# ======== ENDPOINT MÉTRIQUES =========
+
+@app.get("/metrics")
+def metrics():
+    """Métriques de fonctionnement (caches d'analyses et d'ordonnances, urgences, tours de suivi, sites)."""
+    return {
+        "parse_cache": get_parse_cache_stats(),
+        "emergency_decisions": get_emergency_stats(),
+        "follow_up_turns": get_follow_up_stats(),
+        "nlu_sites": get_nlu_registry().stats(),
+        "chat_messages": get_message_coalescing_stats(),
+        "prescriptions": _prescription_cache.stats(),
+    }
+
+
 # ======== ENDPOINT ORDONNANCE =========
 
+# Attente maximale de l'analyse d'audit d'une urgence pré-triée (secondes)
+AUDIT_WAIT_SECONDS = 10.0
+
+# Ordonnances rendues par session (ETag), rendus concurrents regroupés
+_prescription_cache = PrescriptionCache()
+
 class PrescriptionRequest(BaseModel):
     session_id: str
     doctor_name: str = "Dr. [NOM]"
 
 @app.post("/prescription")
-def generate_prescription_endpoint(req: PrescriptionRequest):
-    """Génère une ordonnance à partir d'une session de dialogue terminée."""
+def generate_prescription_endpoint(req: PrescriptionRequest, if_none_match: Optional[str] = Header(default=None)):
+    """Génère une ordonnance à partir d'une session de dialogue terminée.
+
+    La réponse porte un ETag (session, cas, version des règles, médecin,
+    date) : un client qui renvoie cet ETag dans If-None-Match reçoit 304
+    tant que l'ordonnance est inchangée.
+    """
+    # Urgence pré-triée : l'ordonnance part du cas complet de l'analyse d'audit
+    wait_for_emergency_audit(req.session_id, timeout=AUDIT_WAIT_SECONDS)
     session_data = get_session_info(req.session_id)
 
     if not session_data:
@@ -87,17 +227,28 @@ def generate_prescription_endpoint(req: PrescriptionRequest):
     if not case:
         raise HTTPException(status_code=400, detail="Aucun cas clinique dans cette session")
 
-    # Récupérer la recommandation en recalculant (ou depuis le cache si disponible)
-    from .headache_assistants.rules_engine import decide_imaging
-    try:
-        recommendation = decide_imaging(case)
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Erreur lors du calcul de la recommandation: {e}")
+    rules_path = get_nlu_registry().rules_path(session_data.get("site"))
+    etag = prescription_etag(req.session_id, case, get_rules_registry(rules_path).version, req.doctor_name)
+    if etag_matches(if_none_match, etag):
+        _prescription_cache.record_not_modified()
+        return Response(status_code=304, headers={"ETag": etag})
 
-    # Générer le contenu de l'ordonnance
-    prescription_text = _format_prescription(case, recommendation, req.doctor_name)
+    def render() -> str:
+        # Recalculer la recommandation puis générer le contenu de l'ordonnance
+        from .headache_assistants.rules_engine import decide_imaging
+        try:
+            recommendation = decide_imaging(case, rules_path)
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=f"Erreur lors du calcul de la recommandation: {e}")
+        return _format_prescription(case, recommendation, req.doctor_name)
 
-    return PlainTextResponse(content=prescription_text, media_type="text/plain; charset=utf-8")
+    prescription_text = _prescription_cache.render(req.session_id, etag, render)
+
+    return PlainTextResponse(
+        content=prescription_text,
+        media_type="text/plain; charset=utf-8",
+        headers={"ETag": etag},
+    )
 
 
 # ======== ENDPOINT LOG SESSION =========
@@ -112,14 +263,25 @@ def get_session_log(session_id: str):
 
     case = session_data.get("current_case")
 
+    # Exemples du corpus référencés par identifiant : texte et annotations résolus pour l'affichage
+    extraction_metadata = dict(session_data.get("extraction_metadata") or {})
+    if extraction_metadata.get("enhancement_details"):
+        extraction_metadata["enhancement_details"] = resolve_enhancement_details(
+            extraction_metadata["enhancement_details"]
+        )
+
     # Construire le log détaillé
     log_data = {
         "session_id": session_id,
         "message_count": session_data.get("message_count", 0),
         "asked_fields": session_data.get("asked_fields", []),
         "last_asked_field": session_data.get("last_asked_field"),
-        "extraction_metadata": session_data.get("extraction_metadata", {}),
-        "special_patterns_detected": session_data.get("accumulated_special_patterns", []),
+        "extraction_metadata": extraction_metadata,
+        "special_patterns_detected": [
+            resolve_special_pattern(pattern) for pattern in session_data.get("accumulated_special_patterns", [])
+        ],
+        "emergency_screen": session_data.get("emergency_screen"),
+        "emergency_unconfirmed": session_data.get("emergency_unconfirmed", False),
         "case_data": case.model_dump() if case else None,
     }
 
@@ -133,3 +295,23 @@ def get_session_log(session_id: str):
         }
 
     return log_data
+
+
+@app.get("/session/{session_id}/export")
+def export_session_snapshot(session_id: str):
+    """Exporte une session en instantané binaire (reprise sur un autre worker)."""
+    try:
+        snapshot = export_session(session_id)
+    except SessionNotFoundError:
+        raise HTTPException(status_code=404, detail="Session introuvable")
+    return Response(content=snapshot, media_type="application/octet-stream")
+
+
+@app.post("/session/import")
+async def import_session_snapshot(request: Request, session_id: Optional[str] = None):
+    """Restaure une session depuis un instantané binaire (corps de la requête)."""
+    try:
+        restored_id = await run_in_threadpool(import_session, await request.body(), session_id)
+    except ClinicalValidationError as e:
+        raise HTTPException(status_code=400, detail=f"Instantané invalide: {e}")
+    return {"session_id": restored_id}
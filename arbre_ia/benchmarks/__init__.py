@@ -0,0 +1,13 @@
+"""Suite de benchmarks de performance du NLU, du moteur de règles et du dialogue.
+
+Exécution (hors ligne, sans dépendance supplémentaire):
+    python -m benchmarks run                     # tous les benchmarks
+    python -m benchmarks run --filter negation   # sous-ensemble
+    python -m benchmarks run --quick             # passe courte (CI)
+    python -m benchmarks compare base.json new.json --threshold 0.15
+    python -m benchmarks embedders               # backends d'embedding (latence, RSS, concordance)
+
+Les résultats sont écrits en JSON dans benchmarks/results/. La commande
+compare retourne un code de sortie non nul si un benchmark régresse au-delà
+du seuil, ce qui permet de l'utiliser comme garde-fou en CI.
+"""
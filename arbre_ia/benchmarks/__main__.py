@@ -0,0 +1,103 @@
+"""Point d'entrée : python -m benchmarks {run,compare,embedders}."""
+
+import argparse
+import json
+import logging
+import sys
+from pathlib import Path
+from typing import List, Optional
+
+from headache_assistants.logging_config import LOGGER_NAME
+
+from .embedders import compare_backends, print_comparison, run_worker
+from .harness import RESULTS_DIR, compare_results, run_suite, save_results
+from .suite import get_benchmarks
+
+
+def _cmd_run(args: argparse.Namespace) -> int:
+    # Les décisions sont journalisées en INFO/WARNING : pas d'affichage pendant la mesure
+    logging.getLogger(LOGGER_NAME).addHandler(logging.NullHandler())
+
+    min_time = 0.1 if args.quick else args.min_time
+    min_rounds = 1 if args.quick else 3
+    print(f"Benchmarks (min_time={min_time}s, min_rounds={min_rounds})")
+    document = run_suite(
+        get_benchmarks(), min_time=min_time, min_rounds=min_rounds, name_filter=args.filter
+    )
+    document["meta"]["quick"] = args.quick
+    path = save_results(document, args.output)
+    print(f"\nRésultats: {path}")
+    return 0
+
+
+def _cmd_compare(args: argparse.Namespace) -> int:
+    baseline = json.loads(Path(args.baseline).read_text(encoding="utf-8"))
+    current = json.loads(Path(args.current).read_text(encoding="utf-8"))
+    rows = compare_results(baseline, current, threshold=args.threshold)
+
+    regressions = 0
+    for row in rows:
+        if row["status"] == "skipped":
+            print(f"  {'-':<12} {row['name']}")
+            continue
+        marker = {"regression": "REGRESSION", "improvement": "mieux", "ok": "ok"}[row["status"]]
+        print(f"  {marker:<12} {row['name']:<50} "
+              f"{row['baseline_us']:>10.1f} -> {row['current_us']:>10.1f} µs  (x{row['ratio']:.2f})")
+        regressions += row["status"] == "regression"
+
+    if regressions:
+        print(f"\n{regressions} régression(s) au-delà de {args.threshold:.0%}")
+        return 1
+    print("\nAucune régression")
+    return 0
+
+
+def _cmd_embedders(args: argparse.Namespace) -> int:
+    if args.worker:
+        return run_worker(args.worker)
+
+    specs = args.backend or ["sentence-transformers", "onnx", "static"]
+    document = compare_backends(specs, word_vectors=args.word_vectors)
+    print_comparison(document)
+    if args.output is None:
+        RESULTS_DIR.mkdir(parents=True, exist_ok=True)
+        stamp = document["meta"]["timestamp"].replace(":", "").replace("-", "")
+        args.output = RESULTS_DIR / f"embedders-{stamp}.json"
+    args.output.write_text(json.dumps(document, indent=2, ensure_ascii=False), encoding="utf-8")
+    print(f"\nRésultats: {args.output}")
+    return 0
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Point d'entrée principal."""
+    parser = argparse.ArgumentParser(prog="python -m benchmarks")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run = commands.add_parser("run", help="exécute les benchmarks")
+    run.add_argument("--filter", help="ne garde que les benchmarks dont le nom contient ce texte")
+    run.add_argument("--min-time", type=float, default=1.0, help="durée de mesure par benchmark (s)")
+    run.add_argument("--quick", action="store_true", help="passe courte (min-time 0.1s, une ronde minimum)")
+    run.add_argument("--output", type=Path, help="fichier JSON de sortie")
+    run.set_defaults(handler=_cmd_run)
+
+    compare = commands.add_parser("compare", help="compare deux fichiers de résultats")
+    compare.add_argument("baseline", type=Path)
+    compare.add_argument("current", type=Path)
+    compare.add_argument("--threshold", type=float, default=0.10,
+                         help="ralentissement toléré sur la médiane (0.10 = 10%%)")
+    compare.set_defaults(handler=_cmd_compare)
+
+    embedders = commands.add_parser("embedders", help="compare les backends d'embedding")
+    embedders.add_argument("--backend", action="append",
+                           help="backend[=modèle], répétable (ex: onnx=models/minilm-onnx)")
+    embedders.add_argument("--word-vectors", help="table de vecteurs de mots à mesurer avec la référence")
+    embedders.add_argument("--output", type=Path, help="fichier JSON de sortie")
+    embedders.add_argument("--worker", help=argparse.SUPPRESS)
+    embedders.set_defaults(handler=_cmd_embedders)
+
+    args = parser.parse_args(argv)
+    return args.handler(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
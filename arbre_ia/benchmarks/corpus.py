@@ -0,0 +1,75 @@
+"""Corpus d'entrée des benchmarks.
+
+Trois sources :
+- tests_validation/cas_reels_hospitaliers.txt : descriptions cliniques réelles
+- MEDICAL_EXAMPLES : exemples annotés du corpus d'embedding
+- notes synthétiques (headache_assistants.synthetic_corpus) : étiquetées,
+  courtes pour l'exactitude, longues pour les comptes rendus volumineux
+- vecteurs synthétiques groupés, aux dimensions de all-MiniLM-L6-v2, pour
+  l'index de similarité (sans dépendre de sentence-transformers)
+"""
+
+from pathlib import Path
+from typing import List, Tuple
+
+import numpy as np
+
+from headache_assistants.medical_examples_corpus import MEDICAL_EXAMPLES
+from headache_assistants.synthetic_corpus import SyntheticNote, generate_notes
+
+
+REAL_CASES_PATH = Path(__file__).parent.parent / "tests_validation" / "cas_reels_hospitaliers.txt"
+
+
+def load_real_cases(path: Path = REAL_CASES_PATH) -> List[str]:
+    """Descriptions cliniques de cas_reels_hospitaliers.txt (titres exclus)."""
+    lines = path.read_text(encoding="utf-8").splitlines()
+    return [line.strip() for line in lines if line.strip() and not line.startswith("#")]
+
+
+def load_example_texts() -> List[str]:
+    """Textes des exemples annotés de MEDICAL_EXAMPLES."""
+    return [example["text"] for example in MEDICAL_EXAMPLES]
+
+
+def make_long_notes(count: int = 20, target_chars: int = 2000, seed: int = 0) -> List[str]:
+    """Notes longues synthétiques, reproductibles.
+
+    Args:
+        count: Nombre de notes
+        target_chars: Longueur minimale de chaque note (caractères)
+        seed: Graine du générateur
+
+    Returns:
+        Liste de notes
+    """
+    notes = generate_notes(count, seed=seed, target_chars=target_chars, typo_rate=0.02)
+    return [note.text for note in notes]
+
+
+def make_synthetic_notes(count: int = 200, seed: int = 0, typo_rate: float = 0.05) -> List[SyntheticNote]:
+    """Notes synthétiques courtes avec leur vérité terrain."""
+    return generate_notes(count, seed=seed, typo_rate=typo_rate)
+
+
+def make_embedding_corpus(
+    count: int,
+    queries: int = 200,
+    dim: int = 384,
+    clusters: int = 500,
+    seed: int = 0
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Corpus et requêtes de vecteurs normalisés, groupés autour de centres aléatoires.
+
+    Les requêtes sont des exemples du corpus légèrement bruités (reformulations).
+
+    Returns:
+        Tuple (corpus (count, dim), requêtes (queries, dim)) en float32
+    """
+    rng = np.random.default_rng(seed)
+    centers = rng.standard_normal((clusters, dim)).astype(np.float32)
+    centers /= np.linalg.norm(centers, axis=1, keepdims=True)
+    corpus = centers[rng.integers(0, clusters, count)] + 0.08 * rng.standard_normal((count, dim)).astype(np.float32)
+    corpus /= np.linalg.norm(corpus, axis=1, keepdims=True)
+    picks = corpus[rng.integers(0, count, queries)] + 0.05 * rng.standard_normal((queries, dim)).astype(np.float32)
+    return corpus, picks / np.linalg.norm(picks, axis=1, keepdims=True)
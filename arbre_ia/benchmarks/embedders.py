@@ -0,0 +1,179 @@
+"""Comparaison des backends d'embedding (latence, mémoire, concordance).
+
+Chaque backend est mesuré dans un sous-processus (RSS propre au backend) :
+chargement, mémoire résidente maximale, latence d'encodage par texte, puis
+les sorties utilisées par le NLU sur les textes des suites de tests :
+
+    - correspondances SemanticVocabulary.match_text (ensemble champ=valeur)
+    - 5 exemples les plus proches (HybridNLU.find_similar_examples)
+
+La concordance est calculée par rapport au backend de référence
+(sentence-transformers) : part des textes aux correspondances identiques et
+recouvrement moyen des 5 plus proches exemples.
+
+Avec --word-vectors, le backend de référence est aussi mesuré avec la table
+de vecteurs de mots (mots isolés servis par la table, n-grams par le modèle).
+
+Exécution:
+    python -m benchmarks embedders --backend sentence-transformers \\
+        --backend onnx=models/minilm-onnx --backend static=models/static.npz \\
+        --word-vectors models/word_vectors
+"""
+
+import json
+import os
+import resource
+import statistics
+import subprocess
+import sys
+import time
+import warnings
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from headache_assistants.embedders import embedder_available
+from headache_assistants.word_vectors import WORD_VECTORS_ENV_VAR
+
+from .corpus import load_example_texts, load_real_cases, make_synthetic_notes
+
+
+REFERENCE_BACKEND = "sentence-transformers"
+
+
+def evaluation_texts() -> List[str]:
+    """Textes des suites de tests : cas réels, exemples annotés, notes synthétiques."""
+    notes = [note.text for note in make_synthetic_notes(count=100)]
+    return load_real_cases() + load_example_texts() + notes
+
+
+def parse_backend_spec(spec: str) -> Tuple[str, Optional[str]]:
+    """"onnx=models/minilm-onnx" -> ("onnx", "models/minilm-onnx")."""
+    backend, _, model = spec.partition("=")
+    return backend, model or None
+
+
+def measure_backend(backend: str, model: Optional[str] = None) -> Dict[str, Any]:
+    """Mesures d'un backend dans le processus courant (appelé par le sous-processus)."""
+    from headache_assistants.nlu_hybrid import HybridNLU
+
+    texts = evaluation_texts()
+    start = time.perf_counter()
+    nlu = HybridNLU(embedding_model=model, embedding_backend=backend, verbose=False)
+    load_seconds = time.perf_counter() - start
+
+    latencies = []
+    for text in texts:
+        start = time.perf_counter()
+        nlu.embedder.encode([text], convert_to_numpy=True)
+        latencies.append((time.perf_counter() - start) * 1e6)
+
+    matches = [
+        sorted(f"{match.field}={match.value}" for match in nlu.semantic_vocab.match_text(text))
+        for text in texts
+    ] if nlu.semantic_vocab is not None else []
+    neighbours = [
+        [example["text"] for example, _ in row]
+        for row in nlu.find_similar_examples(texts, top_k=5)
+    ]
+    return {
+        "backend": backend,
+        "model": model,
+        "load_s": load_seconds,
+        "word_vectors": os.environ.get(WORD_VECTORS_ENV_VAR),
+        "rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+        "encode_median_us": statistics.median(latencies),
+        "encode_p95_us": sorted(latencies)[int(0.95 * (len(latencies) - 1))],
+        "texts": len(texts),
+        "matches": matches,
+        "neighbours": neighbours,
+    }
+
+
+def _run_isolated(backend: str, model: Optional[str], word_vectors: Optional[str] = None) -> Dict[str, Any]:
+    spec = f"{backend}={model}" if model else backend
+    env = {key: value for key, value in os.environ.items() if key != WORD_VECTORS_ENV_VAR}
+    if word_vectors:
+        env[WORD_VECTORS_ENV_VAR] = word_vectors
+    completed = subprocess.run(
+        [sys.executable, "-m", "benchmarks", "embedders", "--worker", spec],
+        capture_output=True, text=True, cwd=Path(__file__).parent.parent, env=env
+    )
+    if completed.returncode != 0:
+        return {"backend": backend, "model": model, "error": completed.stderr.strip().splitlines()[-1:]}
+    return json.loads(completed.stdout.strip().splitlines()[-1])
+
+
+def agreement(reference: Dict[str, Any], candidate: Dict[str, Any]) -> Dict[str, float]:
+    """Concordance des sorties d'un backend avec la référence."""
+    same_matches = [a == b for a, b in zip(reference["matches"], candidate["matches"])]
+    overlaps = [
+        len(set(a) & set(b)) / max(len(a), 1)
+        for a, b in zip(reference["neighbours"], candidate["neighbours"])
+    ]
+    return {
+        "semantic_matches": statistics.fmean(same_matches) if same_matches else 0.0,
+        "top5_overlap": statistics.fmean(overlaps) if overlaps else 0.0,
+    }
+
+
+def compare_backends(specs: List[str], word_vectors: Optional[str] = None) -> Dict[str, Any]:
+    """Mesure chaque backend ("nom" ou "nom=modèle") et sa concordance avec la référence.
+
+    Args:
+        specs: Backends à mesurer
+        word_vectors: Table de vecteurs de mots à mesurer avec le backend de référence
+
+    Returns:
+        Document de résultats (sérialisable JSON), sorties détaillées exclues
+    """
+    measures = {}
+    for spec in specs:
+        backend, model = parse_backend_spec(spec)
+        if not embedder_available(backend):
+            measures[spec] = {"backend": backend, "model": model, "skipped": "dépendances non installées"}
+            continue
+        measures[spec] = _run_isolated(backend, model)
+    if word_vectors and embedder_available(REFERENCE_BACKEND):
+        measures[f"{REFERENCE_BACKEND}+word_vectors"] = _run_isolated(REFERENCE_BACKEND, None, word_vectors)
+
+    reference = next(
+        (m for m in measures.values()
+         if m.get("backend") == REFERENCE_BACKEND and not m.get("word_vectors") and "matches" in m),
+        None
+    )
+    for measure in measures.values():
+        if reference is not None and "matches" in measure:
+            measure["agreement"] = agreement(reference, measure)
+        measure.pop("matches", None)
+        measure.pop("neighbours", None)
+
+    return {
+        "meta": {
+            "timestamp": datetime.now().isoformat(timespec="seconds"),
+            "reference": REFERENCE_BACKEND if reference is not None else None,
+        },
+        "backends": measures,
+    }
+
+
+def print_comparison(document: Dict[str, Any]) -> None:
+    """Affiche un tableau récapitulatif."""
+    for spec, measure in document["backends"].items():
+        if "skipped" in measure or "error" in measure:
+            print(f"  {spec:<40} ignoré ({measure.get('skipped') or measure.get('error')})")
+            continue
+        line = (f"  {spec:<40} chargement {measure['load_s']:5.1f}s  RSS {measure['rss_mb']:7.0f} Mo"
+                f"  encode {measure['encode_median_us']:9.0f} µs")
+        if "agreement" in measure:
+            line += (f"  concordance {measure['agreement']['semantic_matches']:.1%}"
+                     f" / top5 {measure['agreement']['top5_overlap']:.1%}")
+        print(line)
+
+
+def run_worker(spec: str) -> int:
+    """Mesure un backend et écrit le résultat JSON sur la sortie standard."""
+    warnings.simplefilter("ignore")
+    backend, model = parse_backend_spec(spec)
+    print(json.dumps(measure_backend(backend, model), ensure_ascii=False))
+    return 0
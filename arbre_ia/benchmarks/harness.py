@@ -0,0 +1,208 @@
+"""Harnais de mesure minimal (bibliothèque standard uniquement).
+
+Chaque benchmark appelle une fonction sur une liste d'entrées. Une "ronde"
+est un passage complet sur les entrées; on enchaîne les rondes jusqu'à
+atteindre un temps minimal, puis on retient le temps par appel de chaque
+ronde. La médiane sert de référence pour la comparaison (robuste au bruit).
+"""
+
+import json
+import platform
+import statistics
+import subprocess
+import sys
+import time
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+
+RESULTS_DIR = Path(__file__).parent / "results"
+
+SCHEMA_VERSION = 1
+
+
+@dataclass
+class Benchmark:
+    """Définition d'un benchmark.
+
+    Attributes:
+        name: Identifiant unique (ex: "nlu_hybrid.parse_hybrid[real]")
+        func: Fonction mesurée, appelée avec une entrée
+        inputs: Fabrique des entrées (appelée une fois, hors mesure)
+        skip_reason: Fonction retournant une raison de saut, ou None
+        score: Évaluation des sorties (entrées, sorties) -> métriques, hors mesure
+    """
+    name: str
+    func: Callable[[Any], Any]
+    inputs: Callable[[], List[Any]]
+    skip_reason: Optional[Callable[[], Optional[str]]] = None
+    score: Optional[Callable[[List[Any], List[Any]], Dict[str, Any]]] = None
+
+
+def run_benchmark(
+    benchmark: Benchmark,
+    min_time: float = 1.0,
+    min_rounds: int = 3,
+    max_rounds: int = 200
+) -> Dict[str, Any]:
+    """Mesure un benchmark.
+
+    Args:
+        benchmark: Benchmark à exécuter
+        min_time: Durée minimale cumulée des rondes (secondes)
+        min_rounds: Nombre minimal de rondes
+        max_rounds: Nombre maximal de rondes
+
+    Returns:
+        Statistiques (temps par appel en microsecondes) ou {"skipped": raison}
+    """
+    if benchmark.skip_reason is not None:
+        reason = benchmark.skip_reason()
+        if reason:
+            return {"skipped": reason}
+
+    inputs = benchmark.inputs()
+    func = benchmark.func
+
+    # Échauffement : caches, imports paresseux, singletons
+    for item in inputs[:10]:
+        func(item)
+
+    per_call: List[float] = []
+    total = 0.0
+    while (total < min_time or len(per_call) < min_rounds) and len(per_call) < max_rounds:
+        start = time.perf_counter()
+        for item in inputs:
+            func(item)
+        elapsed = time.perf_counter() - start
+        total += elapsed
+        per_call.append(elapsed / len(inputs) * 1e6)
+
+    ordered = sorted(per_call)
+    p95_index = min(len(ordered) - 1, int(round(0.95 * (len(ordered) - 1))))
+    median = statistics.median(ordered)
+    stats = {
+        "inputs": len(inputs),
+        "rounds": len(per_call),
+        "median_us": median,
+        "mean_us": statistics.fmean(ordered),
+        "min_us": ordered[0],
+        "p95_us": ordered[p95_index],
+        "stdev_us": statistics.stdev(ordered) if len(ordered) > 1 else 0.0,
+        "ops_per_sec": 1e6 / median if median else 0.0,
+    }
+    if benchmark.score is not None:
+        stats["accuracy"] = benchmark.score(inputs, [func(item) for item in inputs])
+    return stats
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True, text=True, timeout=5, cwd=Path(__file__).parent
+        ).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+def run_suite(
+    benchmarks: List[Benchmark],
+    min_time: float = 1.0,
+    min_rounds: int = 3,
+    name_filter: Optional[str] = None,
+    verbose: bool = True
+) -> Dict[str, Any]:
+    """Exécute une liste de benchmarks.
+
+    Args:
+        benchmarks: Benchmarks à exécuter
+        min_time: Durée minimale de mesure par benchmark (secondes)
+        min_rounds: Nombre minimal de rondes par benchmark
+        name_filter: Sous-chaîne que le nom doit contenir
+        verbose: Affiche chaque résultat au fil de l'eau
+
+    Returns:
+        Document de résultats (sérialisable JSON)
+    """
+    results: Dict[str, Any] = {}
+    for benchmark in benchmarks:
+        if name_filter and name_filter not in benchmark.name:
+            continue
+        stats = run_benchmark(benchmark, min_time=min_time, min_rounds=min_rounds)
+        results[benchmark.name] = stats
+        if verbose:
+            if "skipped" in stats:
+                print(f"  {benchmark.name:<50} ignoré ({stats['skipped']})")
+            else:
+                accuracy = stats.get("accuracy", {}).get("overall")
+                print(f"  {benchmark.name:<50} {stats['median_us']:>12.1f} µs/appel"
+                      f"  ({stats['ops_per_sec']:.0f}/s, {stats['rounds']} rondes)"
+                      + (f"  exactitude {accuracy:.1%}" if accuracy is not None else ""))
+
+    return {
+        "schema": SCHEMA_VERSION,
+        "meta": {
+            "timestamp": datetime.now().isoformat(timespec="seconds"),
+            "commit": _git_commit(),
+            "python": sys.version.split()[0],
+            "platform": platform.platform(),
+            "min_time": min_time,
+            "min_rounds": min_rounds,
+        },
+        "benchmarks": results,
+    }
+
+
+def save_results(document: Dict[str, Any], output: Optional[Path] = None) -> Path:
+    """Écrit les résultats en JSON (benchmarks/results/<horodatage>.json par défaut)."""
+    if output is None:
+        RESULTS_DIR.mkdir(parents=True, exist_ok=True)
+        stamp = document["meta"]["timestamp"].replace(":", "").replace("-", "")
+        output = RESULTS_DIR / f"{stamp}.json"
+    output = Path(output)
+    output.write_text(json.dumps(document, indent=2, ensure_ascii=False), encoding="utf-8")
+    return output
+
+
+def compare_results(
+    baseline: Dict[str, Any],
+    current: Dict[str, Any],
+    threshold: float = 0.10
+) -> List[Dict[str, Any]]:
+    """Compare deux documents de résultats benchmark par benchmark.
+
+    Args:
+        baseline: Résultats de référence
+        current: Résultats à évaluer
+        threshold: Ralentissement relatif toléré (0.10 = +10 % sur la médiane)
+
+    Returns:
+        Une ligne par benchmark présent dans les deux documents, avec
+        "status" = "regression" | "improvement" | "ok" | "skipped"
+    """
+    rows = []
+    for name, current_stats in current.get("benchmarks", {}).items():
+        base_stats = baseline.get("benchmarks", {}).get(name)
+        if base_stats is None:
+            continue
+        if "skipped" in base_stats or "skipped" in current_stats:
+            rows.append({"name": name, "status": "skipped"})
+            continue
+        ratio = current_stats["median_us"] / base_stats["median_us"] if base_stats["median_us"] else 1.0
+        if ratio > 1 + threshold:
+            status = "regression"
+        elif ratio < 1 - threshold:
+            status = "improvement"
+        else:
+            status = "ok"
+        rows.append({
+            "name": name,
+            "status": status,
+            "baseline_us": base_stats["median_us"],
+            "current_us": current_stats["median_us"],
+            "ratio": ratio,
+        })
+    return rows
@@ -0,0 +1,615 @@
+"""Définition des benchmarks.
+
+Couvre les étages coûteux du pipeline, du plus fin au plus large :
+détecteurs du NLU hybride, parseurs complets, moteur de règles, fusion de
+cas et dialogues complets via handle_user_message.
+"""
+
+import json
+import pickle
+import sys
+import uuid
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from headache_assistants.case_batch import CaseBatch
+from headache_assistants.decision_oracle import get_decision_oracle
+from headache_assistants.emergency_screen import emergency_reason, get_emergency_screener
+from headache_assistants.dialogue import (
+    export_session,
+    get_or_create_session,
+    handle_user_message,
+    import_session,
+    merge_cases,
+    reset_session,
+    set_emergency_screen,
+    set_question_strategy,
+    set_stateless_sessions,
+    stream_user_message,
+    wait_for_emergency_audit,
+)
+from headache_assistants.models import ChatMessage, HeadacheCase
+from headache_assistants.embedders import embedder_available, resolve_backend
+from headache_assistants.nlu_base import get_missing_critical_fields
+from headache_assistants.nlu_hybrid import (
+    HybridNLU,
+    detect_negations,
+    detect_ngrams,
+    fuzzy_correct_text,
+)
+from headache_assistants.nlu_registry import NLURegistry, SiteConfig
+from headache_assistants.nlu_v2 import NLUv2
+from headache_assistants.parse_cache import ParseCache
+from headache_assistants.prescription import PrescriptionCache, _format_prescription, prescription_etag
+from headache_assistants.question_planner import get_question_planner
+from headache_assistants.session_snapshot import pack_session, unpack_session
+from headache_assistants.short_answers import interpret_short_answer
+from headache_assistants.rules_engine import decide_imaging
+from headache_assistants.rules_registry import get_rules_registry
+from headache_assistants.synthetic_corpus import field_accuracy, generate_notes
+from headache_assistants.vector_index import ExactIndex, IVFIndex, recall_at_k
+
+from .corpus import (
+    load_example_texts,
+    load_real_cases,
+    make_embedding_corpus,
+    make_long_notes,
+    make_synthetic_notes,
+)
+from .harness import Benchmark
+
+
+# Dialogues scriptés : premier message puis réponses aux questions de suivi
+DIALOGUES: List[List[str]] = [
+    ["Femme 35 ans, céphalée brutale depuis 1h, pire douleur de sa vie", "non", "non", "non"],
+    ["Homme 60 ans, céphalées progressives depuis 3 semaines", "non", "oui", "non", "non"],
+    ["Patiente 28 ans enceinte, mal de tête depuis 2 jours", "non", "non", "non", "non"],
+    ["Céphalée chronique depuis des années, migraine connue", "non", "non", "non", "non", "non"],
+    ["Homme 45 ans fébrile 39°C avec raideur de nuque", "oui", "non"],
+]
+
+# Réponses libres aux questions de suivi : (texte, champ demandé)
+FOLLOW_UPS: List[Tuple[str, str]] = [
+    ("c'était brutal, d'un coup", "onset"),
+    ("j'ai 45 ans", "age"),
+    ("pas de fièvre je crois", "fever"),
+    ("la nuque est un peu raide", "meningeal_signs"),
+    ("aucune faiblesse dans les bras", "neuro_deficit"),
+    ("elle est enceinte de 5 mois", "pregnancy_trimester"),
+    ("ça dure depuis 3 semaines", "profile"),
+    ("jamais eu de convulsions", "seizure"),
+]
+
+# Réponses courtes aux questions de suivi : (réponse, champ demandé, valeur attendue)
+SHORT_REPLIES: List[Tuple[str, str, Any]] = [
+    ("oui", "fever", True),
+    ("non", "meningeal_signs", False),
+    ("jamais", "seizure", False),
+    ("un peu", "meningeal_signs", True),
+    ("je crois que oui", "trauma", True),
+    ("pas vraiment", "neuro_deficit", False),
+    ("non jamais", "immunosuppression", False),
+    ("pas du tout", "htic_pattern", False),
+    ("aucune idée", "fever", None),
+    ("7/10", "intensity", 7),
+    ("8 sur 10", "intensity", 8),
+    ("huit", "intensity", 8),
+    ("45 ans", "age", 45),
+    ("jamais eu de convulsions", "seizure", False),
+    ("aucune faiblesse dans les bras", "neuro_deficit", False),
+    ("la nuque est un peu raide", "meningeal_signs", True),
+]
+
+# Passage à l'échelle du mode segmenté de NLUv2 : (libellé, taille en caractères)
+LONG_TEXT_SIZES: List[Tuple[str, int]] = [
+    ("1KB", 1_000), ("10KB", 10_000), ("100KB", 100_000), ("1MB", 1_000_000),
+]
+
+# Réponses du patient simulé à la question sur le mode de début
+_ONSET_ANSWERS: Dict[str, str] = {
+    "thunderclap": "c'était brutal, d'un coup",
+    "progressive": "ça s'est installé progressivement",
+    "chronic": "j'en ai depuis des années",
+}
+
+
+@lru_cache(maxsize=None)
+def _nlu_v2() -> NLUv2:
+    return NLUv2()
+
+
+@lru_cache(maxsize=None)
+def _long_text_nlu(pool: Optional[str]) -> NLUv2:
+    # Seuil nul : toutes les tailles passent par le mode segmenté
+    return NLUv2(long_text_pool=pool, long_text_threshold=0)
+
+
+def _long_text_benchmarks() -> List[Benchmark]:
+    benchmarks = []
+    for label, size in LONG_TEXT_SIZES:
+        notes = lambda size=size: generate_notes(2, seed=0, target_chars=size, typo_rate=0.02)
+        benchmarks.append(Benchmark(
+            f"nlu_v2.parse[long_text][{label}][sequential]",
+            lambda note: _nlu_v2().parse(note.text)[0],
+            notes,
+            score=field_accuracy,
+        ))
+        for pool in ("thread", "process"):
+            benchmarks.append(Benchmark(
+                f"nlu_v2.parse[long_text][{label}][{pool}]",
+                lambda note, pool=pool: _long_text_nlu(pool).parse(note.text)[0],
+                notes,
+                score=field_accuracy,
+            ))
+    return benchmarks
+
+
+@lru_cache(maxsize=None)
+def _hybrid(use_embedding: bool) -> HybridNLU:
+    return HybridNLU(use_embedding=use_embedding, verbose=False)
+
+
+@lru_cache(maxsize=None)
+def _parse_cache() -> ParseCache:
+    return ParseCache()
+
+
+@lru_cache(maxsize=None)
+def _parsed_real_cases() -> Tuple[HeadacheCase, ...]:
+    return tuple(_nlu_v2().parse_free_text_to_case(text)[0] for text in load_real_cases())
+
+
+@lru_cache(maxsize=None)
+def _synthetic_cohort() -> Tuple[HeadacheCase, ...]:
+    return tuple(note.case for note in make_synthetic_notes(count=5000, typo_rate=0.0))
+
+
+def _screen_cases(cases: Tuple[HeadacheCase, ...]) -> Tuple[int, int]:
+    return sum(case.has_red_flags() for case in cases), sum(case.is_emergency() for case in cases)
+
+
+def _screen_batch(batch: CaseBatch) -> Tuple[int, int]:
+    return int(batch.has_red_flags().sum()), int(batch.is_emergency().sum())
+
+
+@lru_cache(maxsize=None)
+def _embedding_corpus(count: int) -> Tuple[np.ndarray, np.ndarray]:
+    return make_embedding_corpus(count)
+
+
+@lru_cache(maxsize=None)
+def _vector_index(kind: str, count: int) -> Any:
+    corpus, _ = _embedding_corpus(count)
+    if kind == "ivf":
+        return IVFIndex(corpus)
+    return ExactIndex(corpus, quantize=(kind == "int8"))
+
+
+def _index_benchmark(kind: str, count: int, batched: bool = False) -> Benchmark:
+    """Recherche top-5, avec le rappel@5 par rapport à la recherche exacte float32."""
+    def queries() -> List[np.ndarray]:
+        query_matrix = _embedding_corpus(count)[1]
+        return [query_matrix] if batched else list(query_matrix)
+
+    def recall(inputs: List[np.ndarray], outputs: List[Tuple[np.ndarray, np.ndarray]]) -> Dict[str, float]:
+        exact = _vector_index("exact", count).search(np.vstack(inputs), k=5)[0]
+        found = np.vstack([np.atleast_2d(indices) for indices, _ in outputs])
+        return {"overall": recall_at_k(found, exact)}
+
+    suffix = "[batch]" if batched else ""
+    return Benchmark(
+        f"vector_index.{kind}.search[{count // 1000}k]{suffix}",
+        lambda query: _vector_index(kind, count).search(query, k=5),
+        queries,
+        score=recall,
+    )
+
+
+def _case_pairs() -> List[Tuple[HeadacheCase, HeadacheCase]]:
+    cases = _parsed_real_cases()
+    return [(cases[i], cases[(i + 1) % len(cases)]) for i in range(len(cases))]
+
+
+def _run_dialogue(messages: List[str], stateless: bool = False) -> None:
+    """Dialogue scripté; sans état : session reconstruite depuis l'historique à chaque tour."""
+    previous = set_stateless_sessions(stateless)
+    session_id = f"bench-{uuid.uuid4().hex[:8]}"
+    history: List[ChatMessage] = []
+    try:
+        for text in messages:
+            message = ChatMessage(role="user", content=text)
+            response = handle_user_message(history, message, session_id)
+            history.append(message)
+            history.append(ChatMessage(role="assistant", content=response.message))
+            if response.dialogue_complete:
+                break
+    finally:
+        reset_session(session_id)
+        set_stateless_sessions(previous)
+
+
+def _stream_events(text: str, first_only: bool) -> None:
+    """Dialogue en flux sur un premier message : premier événement seul ou flux complet."""
+    session_id = f"bench-{uuid.uuid4().hex[:8]}"
+    events = stream_user_message([], ChatMessage(role="user", content=text), session_id)
+    if first_only:
+        next(events)
+        events.close()
+    else:
+        for _ in events:
+            pass
+    reset_session(session_id)
+
+
+def _emergency_pipeline_decision(text: str) -> str:
+    """Premier message d'une urgence décidé par le pipeline complet (pré-tri désactivé).
+
+    Le message est rendu unique (pas de hit du cache d'analyses). Le chemin
+    du pré-tri se mesure par emergency_screen.screen : son analyse d'audit
+    en arrière-plan s'intercalerait dans la mesure du dialogue (délais de
+    décision réels par chemin : /metrics).
+    """
+    previous = set_emergency_screen(False)
+    session_id = f"bench-{uuid.uuid4().hex[:8]}"
+    try:
+        message = ChatMessage(role="user", content=f"{text} Dossier {session_id}.")
+        response = handle_user_message([], message, session_id)
+        return response.imaging_recommendation.urgency if response.imaging_recommendation else "none"
+    finally:
+        reset_session(session_id)
+        set_emergency_screen(previous)
+
+
+def _emergency_notes() -> List[str]:
+    """Notes synthétiques d'urgence (coup de tonnerre, fièvre + syndrome méningé)."""
+    return [note.text for note in generate_notes(400) if emergency_reason(note.case)]
+
+
+@lru_cache(maxsize=None)
+def _real_case_sessions() -> Tuple[Tuple[str, Dict[str, Any]], ...]:
+    """Sessions après un premier message (cas réel) et une réponse "non"."""
+    sessions = []
+    for index, text in enumerate(load_real_cases()):
+        session_id = f"bench-snapshot-{index}"
+        for content in (text, "non"):
+            response = handle_user_message([], ChatMessage(role="user", content=content), session_id)
+            if response.dialogue_complete:
+                break
+        wait_for_emergency_audit(session_id)
+        sessions.append((session_id, get_or_create_session(session_id)[1]))
+        reset_session(session_id)
+    return tuple(sessions)
+
+
+def _deep_sizeof(value: Any, seen: Optional[set] = None) -> int:
+    """Taille mémoire récursive (sys.getsizeof sur les conteneurs et modèles)."""
+    seen = set() if seen is None else seen
+    if id(value) in seen:
+        return 0
+    seen.add(id(value))
+    size = sys.getsizeof(value)
+    if isinstance(value, dict):
+        size += sum(_deep_sizeof(k, seen) + _deep_sizeof(v, seen) for k, v in value.items())
+    elif isinstance(value, (list, tuple, set, frozenset)):
+        size += sum(_deep_sizeof(item, seen) for item in value)
+    elif hasattr(value, "__dict__"):
+        size += _deep_sizeof(value.__dict__, seen)
+    return size
+
+
+def _snapshot_score(inputs: List[Tuple[str, Dict[str, Any]]], outputs: List[bytes]) -> Dict[str, Any]:
+    """Fidélité de l'aller-retour, tailles sérialisées et mémoire par session.
+
+    Les métadonnées d'extraction stockées par référence sont recalculées à
+    l'import (dialogue.import_session) : la fidélité les exclut ici.
+    """
+    def as_json(session: Dict[str, Any]) -> bytes:
+        return json.dumps(
+            {key: value.model_dump() if hasattr(value, "model_dump") else value for key, value in session.items()},
+            default=str,
+        ).encode("utf-8")
+
+    def restored(item: Tuple[str, Dict[str, Any]], snapshot: bytes) -> bool:
+        session_id, session = unpack_session(snapshot)
+        if session["extraction_metadata"] is None:
+            session["extraction_metadata"] = item[1]["extraction_metadata"]
+        return (session_id, session) == item
+
+    count = len(inputs)
+    return {
+        "overall": sum(restored(item, out) for item, out in zip(inputs, outputs)) / count,
+        "mean_snapshot_bytes": sum(len(out) for out in outputs) / count,
+        "mean_pickle_bytes": sum(len(pickle.dumps(session)) for _, session in inputs) / count,
+        "mean_json_bytes": sum(len(as_json(session)) for _, session in inputs) / count,
+        "mean_session_memory_bytes": sum(_deep_sizeof(session) for _, session in inputs) / count,
+    }
+
+
+def _session_roundtrip(item: Tuple[str, Dict[str, Any]]) -> bool:
+    """Export puis import d'une session du dialogue (métadonnées recalculées)."""
+    session_id, session = item
+    get_or_create_session(session_id)[1].update(session)
+    imported = import_session(export_session(session_id))
+    restored = get_or_create_session(imported)[1] == session
+    reset_session(session_id)
+    return restored
+
+
+def _render_prescription(item: Tuple[str, Dict[str, Any]]) -> str:
+    """Ordonnance d'une session : décision puis mise en forme."""
+    case = item[1]["current_case"]
+    return _format_prescription(case, decide_imaging(case), "Dr. [NOM]")
+
+
+@lru_cache(maxsize=None)
+def _prescription_cache() -> PrescriptionCache:
+    return PrescriptionCache()
+
+
+def _prescription_etag(item: Tuple[str, Dict[str, Any]]) -> str:
+    """ETag d'une ordonnance (seul calcul d'une réponse 304)."""
+    session_id, session = item
+    return prescription_etag(session_id, session["current_case"], get_rules_registry().version, "Dr. [NOM]")
+
+
+def _cached_prescription(item: Tuple[str, Dict[str, Any]]) -> str:
+    """Ordonnance servie par le cache (rendue au premier appel)."""
+    return _prescription_cache().render(item[0], _prescription_etag(item), lambda: _render_prescription(item))
+
+
+# Ressources lourdes qu'une vue de site doit partager avec l'instance de base
+_SHARED_NLU_RESOURCES = ("rule_nlu", "embedder", "semantic_vocab", "example_embeddings", "example_index")
+
+
+def _new_site_view(index: int) -> HybridNLU:
+    """Vue NLU d'un nouveau site (registre neuf sur l'instance partagée)."""
+    registry = NLURegistry(lambda: _hybrid(True))
+    registry.register_site(SiteConfig(f"site-{index}", confidence_threshold=0.5 + index / 1000))
+    return registry.nlu(f"site-{index}")
+
+
+def _shared_resources_score(inputs: List[int], outputs: List[HybridNLU]) -> Dict[str, float]:
+    """Part des vues qui partagent toutes les ressources lourdes de l'instance de base."""
+    base = _hybrid(True)
+    shared = [
+        all(getattr(view, name) is getattr(base, name) for name in _SHARED_NLU_RESOURCES)
+        for view in outputs
+    ]
+    return {"overall": sum(shared) / len(shared)}
+
+
+def _short_reply_score(inputs: List[Tuple[str, str, Any]], outputs: List[Any]) -> Dict[str, Any]:
+    """Valeur attendue du champ demandé, et part des réponses interprétées."""
+    values = [None if out is None else out.value for out in outputs]
+    return {
+        "overall": sum(value == expected for value, (_, _, expected) in zip(values, inputs)) / len(inputs),
+        "interpreted_rate": sum(out is not None for out in outputs) / len(outputs),
+    }
+
+
+def _simulated_answer(truth: Dict[str, Any], field: str) -> str:
+    """Réponse du patient simulé d'après la vérité terrain."""
+    value = truth.get(field)
+    if field == "onset":
+        return _ONSET_ANSWERS.get(value, "difficile à dire")
+    if field == "intensity":
+        return "difficile à dire" if value is None else str(value)
+    # Signe booléen : "non" s'il n'est pas mentionné dans la note
+    return "oui" if value is True else "non"
+
+
+def _simulate_session(session: Tuple[str, Dict[str, Any]], strategy: str) -> Tuple[int, Any]:
+    """Dialogue complet avec un patient simulé : (questions posées, recommandation)."""
+    text, truth = session
+    previous = set_question_strategy(strategy)
+    session_id = f"bench-{uuid.uuid4().hex[:8]}"
+    try:
+        response = handle_user_message([], ChatMessage(role="user", content=text), session_id)
+        turns = 0
+        while not response.dialogue_complete and turns < 20:
+            field = get_or_create_session(session_id)[1]["last_asked_field"]
+            answer = ChatMessage(role="user", content=_simulated_answer(truth, field))
+            response = handle_user_message([], answer, session_id)
+            turns += 1
+        recommendation = response.imaging_recommendation
+        return turns, (recommendation.applied_rule_id, tuple(recommendation.imaging), recommendation.urgency)
+    finally:
+        reset_session(session_id)
+        set_question_strategy(previous)
+
+
+def _synthetic_sessions() -> List[Tuple[str, Dict[str, Any]]]:
+    return [
+        (note.text, {name: getattr(note.case, name) for name in note.labelled_fields})
+        for note in make_synthetic_notes(count=100)
+    ]
+
+
+def _real_sessions() -> List[Tuple[str, Dict[str, Any]]]:
+    return [(text, {}) for text in load_real_cases()]
+
+
+def _turns_score(inputs: List[Any], outputs: List[Tuple[int, Any]]) -> Dict[str, Any]:
+    """Questions posées par session, et accord avec la table de priorités fixe."""
+    reference = [_simulate_session(session, "priority") for session in inputs]
+    return {
+        "overall": sum(out[1] == ref[1] for out, ref in zip(outputs, reference)) / len(outputs),
+        "mean_turns": sum(out[0] for out in outputs) / len(outputs),
+        "mean_turns_priority": sum(ref[0] for ref in reference) / len(reference),
+    }
+
+
+def _dialogue_planner_benchmarks() -> List[Benchmark]:
+    benchmarks = []
+    for corpus, sessions in (("synthetic", _synthetic_sessions), ("real", _real_sessions)):
+        for strategy in ("priority", "information_gain"):
+            benchmarks.append(Benchmark(
+                f"dialogue.simulated_session[{strategy}][{corpus}]",
+                lambda session, strategy=strategy: _simulate_session(session, strategy),
+                sessions,
+                score=_turns_score,
+            ))
+    return benchmarks
+
+
+def _embedding_skip_reason() -> Optional[str]:
+    return None if embedder_available() else f"backend d'embedding {resolve_backend()} non installé"
+
+
+def _text_benchmarks(prefix: str, func: Any) -> List[Benchmark]:
+    return [
+        Benchmark(f"{prefix}[real]", func, load_real_cases),
+        Benchmark(f"{prefix}[examples]", func, load_example_texts),
+        Benchmark(f"{prefix}[long]", func, lambda: make_long_notes(count=10)),
+    ]
+
+
+def get_benchmarks() -> List[Benchmark]:
+    """Liste complète des benchmarks, dans l'ordre d'exécution."""
+    benchmarks: List[Benchmark] = []
+    benchmarks += _text_benchmarks("nlu_hybrid.detect_negations", detect_negations)
+    benchmarks += _text_benchmarks("nlu_hybrid.detect_ngrams", detect_ngrams)
+    benchmarks += _text_benchmarks("nlu_hybrid.fuzzy_correct_text", fuzzy_correct_text)
+    benchmarks += _text_benchmarks(
+        "nlu_v2.parse_free_text_to_case",
+        lambda text: _nlu_v2().parse_free_text_to_case(text)
+    )
+    benchmarks += _text_benchmarks(
+        "nlu_hybrid.parse_hybrid[no_embedding]",
+        lambda text: _hybrid(False).parse_hybrid(text)
+    )
+    benchmarks += _text_benchmarks(
+        "parse_cache.parse_hybrid[no_embedding]",
+        lambda text: _parse_cache().parse_hybrid(_hybrid(False), text)
+    )
+    benchmarks += [
+        Benchmark(
+            "nlu_v2.parse_free_text_to_case[synthetic]",
+            lambda note: _nlu_v2().parse_free_text_to_case(note.text)[0],
+            make_synthetic_notes,
+            score=field_accuracy,
+        ),
+        Benchmark(
+            "nlu_v2.parse_free_text_to_case[follow-up]",
+            lambda reply: _nlu_v2().parse_free_text_to_case(reply[0]),
+            lambda: FOLLOW_UPS,
+        ),
+        Benchmark(
+            "short_answers.interpret_short_answer[short-reply]",
+            lambda reply: interpret_short_answer(reply[0], reply[1]),
+            lambda: SHORT_REPLIES,
+            score=_short_reply_score,
+        ),
+        Benchmark(
+            "nlu_hybrid.parse_free_text_to_case[fields][short-reply]",
+            lambda reply: _hybrid(False).parse_free_text_to_case(reply[0], fields=[reply[1]]),
+            lambda: SHORT_REPLIES,
+        ),
+        Benchmark(
+            "nlu_v2.parse[fields][follow-up]",
+            lambda reply: _nlu_v2().parse(reply[0], fields=[reply[1]]),
+            lambda: FOLLOW_UPS,
+        ),
+    ]
+    benchmarks += _long_text_benchmarks()
+    benchmarks += [
+        Benchmark(
+            "nlu_hybrid.parse_hybrid[no_embedding][synthetic]",
+            lambda note: _hybrid(False).parse_hybrid(note.text).case,
+            make_synthetic_notes,
+            score=field_accuracy,
+        ),
+        Benchmark(
+            "nlu_hybrid.parse_hybrid[embedding][real]",
+            lambda text: _hybrid(True).parse_hybrid(text),
+            load_real_cases,
+            skip_reason=_embedding_skip_reason,
+        ),
+        Benchmark(
+            "nlu_hybrid.parse_hybrid[embedding][long]",
+            lambda text: _hybrid(True).parse_hybrid(text),
+            lambda: make_long_notes(count=10),
+            skip_reason=_embedding_skip_reason,
+        ),
+        Benchmark("rules_engine.decide_imaging", decide_imaging, lambda: list(_parsed_real_cases())),
+        _index_benchmark("exact", 10_000),
+        _index_benchmark("exact", 10_000, batched=True),
+        _index_benchmark("int8", 10_000),
+        _index_benchmark("exact", 100_000),
+        _index_benchmark("ivf", 100_000),
+        Benchmark("models.HeadacheCase.screen[cohort]", _screen_cases, lambda: [_synthetic_cohort()]),
+        Benchmark(
+            "case_batch.CaseBatch.screen[cohort]",
+            _screen_batch,
+            lambda: [CaseBatch.from_cases(_synthetic_cohort())]
+        ),
+        Benchmark("dialogue.merge_cases", lambda pair: merge_cases(*pair), _case_pairs),
+        Benchmark(
+            "decision_oracle.check[real]",
+            lambda case: get_decision_oracle().check(case, get_missing_critical_fields(case)),
+            lambda: list(_parsed_real_cases()),
+        ),
+        Benchmark(
+            "question_planner.order_questions[real]",
+            lambda case: get_question_planner().order_questions(case, get_missing_critical_fields(case)),
+            lambda: list(_parsed_real_cases()),
+        ),
+        Benchmark("dialogue.handle_user_message[dialogue]", _run_dialogue, lambda: DIALOGUES),
+        Benchmark(
+            "dialogue.handle_user_message[dialogue][stateless]",
+            lambda messages: _run_dialogue(messages, stateless=True),
+            lambda: DIALOGUES,
+        ),
+        Benchmark("emergency_screen.screen[emergency]", lambda text: get_emergency_screener().screen(text), _emergency_notes),
+        Benchmark("dialogue.handle_user_message[emergency, pipeline]", _emergency_pipeline_decision, _emergency_notes),
+        Benchmark(
+            "dialogue.stream_user_message[first_event]",
+            lambda text: _stream_events(text, first_only=True),
+            load_real_cases,
+        ),
+        Benchmark(
+            "dialogue.stream_user_message[all_events]",
+            lambda text: _stream_events(text, first_only=False),
+            load_real_cases,
+        ),
+        Benchmark(
+            "session_snapshot.pack_session[real]",
+            lambda item: pack_session(*item),
+            lambda: list(_real_case_sessions()),
+            score=_snapshot_score,
+        ),
+        Benchmark(
+            "session_snapshot.unpack_session[real]",
+            unpack_session,
+            lambda: [pack_session(*item) for item in _real_case_sessions()],
+        ),
+        Benchmark("pickle.dumps[session][real]", lambda item: pickle.dumps(item[1]), lambda: list(_real_case_sessions())),
+        Benchmark(
+            "pickle.loads[session][real]",
+            pickle.loads,
+            lambda: [pickle.dumps(session) for _, session in _real_case_sessions()],
+        ),
+        Benchmark(
+            "prescription._format_prescription+decide_imaging[real]",
+            _render_prescription,
+            lambda: list(_real_case_sessions()),
+        ),
+        Benchmark("prescription.PrescriptionCache.render[real]", _cached_prescription, lambda: list(_real_case_sessions())),
+        Benchmark("prescription.prescription_etag[real]", _prescription_etag, lambda: list(_real_case_sessions())),
+        Benchmark(
+            "nlu_registry.NLURegistry.nlu[new-site]",
+            _new_site_view,
+            lambda: list(range(50)),
+            score=_shared_resources_score,
+        ),
+        Benchmark(
+            "dialogue.export_session+import_session[real]",
+            _session_roundtrip,
+            lambda: list(_real_case_sessions()),
+            score=lambda inputs, outputs: {"overall": sum(outputs) / len(outputs)},
+        ),
+    ]
+    benchmarks += _dialogue_planner_benchmarks()
+    return benchmarks
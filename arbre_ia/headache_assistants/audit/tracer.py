@@ -120,6 +120,8 @@ class ClinicalDecisionTrace:
         confidence_scores: Per-field confidence metrics
         processing_time_ms: Time taken to process in milliseconds
         metadata: Additional context (NLU mode, version, etc.)
+        rules_version: Version of the rules snapshot that produced the
+            recommendation (see rules_registry)
 
     Immutability:
         This class is frozen to prevent modification after creation.
@@ -160,6 +162,7 @@ class ClinicalDecisionTrace:
     confidence_scores: Dict[str, float] = field(default_factory=dict)
     processing_time_ms: Optional[float] = None
     metadata: Dict[str, Any] = field(default_factory=dict)
+    rules_version: Optional[str] = None
 
     @classmethod
     def create(
@@ -171,7 +174,8 @@ class ClinicalDecisionTrace:
         recommendation: Optional[Dict[str, Any]] = None,
         confidence_scores: Optional[Dict[str, float]] = None,
         processing_time_ms: Optional[float] = None,
-        metadata: Optional[Dict[str, Any]] = None
+        metadata: Optional[Dict[str, Any]] = None,
+        rules_version: Optional[str] = None
     ) -> "ClinicalDecisionTrace":
         """
         Factory method to create a new trace with auto-generated ID.
@@ -185,6 +189,7 @@ class ClinicalDecisionTrace:
             confidence_scores: Per-field confidence
             processing_time_ms: Processing duration
             metadata: Additional context
+            rules_version: Version of the rules snapshot used for the decision
 
         Returns:
             New ClinicalDecisionTrace instance
@@ -208,7 +213,8 @@ class ClinicalDecisionTrace:
             recommendation=recommendation or {},
             confidence_scores=confidence_scores or {},
             processing_time_ms=processing_time_ms,
-            metadata=metadata or {}
+            metadata=metadata or {},
+            rules_version=rules_version
         )
 
     @staticmethod
@@ -272,7 +278,8 @@ class ClinicalDecisionTrace:
             recommendation=self.recommendation,
             confidence_scores=self.confidence_scores,
             processing_time_ms=self.processing_time_ms,
-            metadata=self.metadata
+            metadata=self.metadata,
+            rules_version=self.rules_version
         )
 
 
@@ -371,6 +378,7 @@ class AuditLogger:
             f"AUDIT|{trace.trace_id}|"
             f"session={trace.session_id}|"
             f"rule={trace.matched_rule}|"
+            f"rules_version={trace.rules_version}|"
             f"urgency={urgency}|"
             f"imaging={','.join(imaging)}"
         )
@@ -381,6 +389,7 @@ class AuditLogger:
             f"AUDIT|{trace.trace_id}|"
             f"session={trace.session_id}|"
             f"rule={trace.matched_rule}|"
+            f"rules_version={trace.rules_version}|"
             f"case={json.dumps(trace.extracted_case)}|"
             f"recommendation={json.dumps(trace.recommendation)}|"
             f"confidence={json.dumps(trace.confidence_scores)}"
@@ -0,0 +1,348 @@
+"""Représentation en colonnes d'un lot de HeadacheCase.
+
+HeadacheCase est un modèle pydantic de 30+ champs : plusieurs Ko par cas,
+ce qui interdit de garder des millions de cas en mémoire pour une
+réévaluation en masse ou des statistiques de cohorte. CaseBatch stocke
+un tableau NumPy par champ :
+
+    - booléens tri-états (Optional[bool]) : int8, -1 = None, 0 = False, 1 = True
+    - catégories (Literal, Optional[Literal]) : codes int8 dans la liste des
+      valeurs autorisées, -1 = None
+    - entiers optionnels (âge, EVA, trimestre) : int16, -1 = None
+    - durées : float64, NaN = None
+    - texte libre (headache_location) : codes int32 dans un vocabulaire du lot
+    - listes de texte (red_flag_context) : format CSR (offsets + codes)
+
+Les colonnes sont déduites des annotations de HeadacheCase : un champ ajouté
+au modèle est pris en charge sans modification ici. La conversion est sans
+perte (to_cases(from_cases(cases)) redonne les mêmes cas).
+
+Utilisation:
+    >>> batch = CaseBatch.from_cases(cases)
+    >>> batch.is_emergency().sum()
+    >>> batch.save("cohorte.npz")                  # archive unique
+    >>> batch.save("cohorte/")                     # un .npy par colonne
+    >>> CaseBatch.load("cohorte/", mmap=True)      # colonnes mappées en mémoire
+"""
+
+import json
+import math
+import typing
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+from .models import HeadacheCase
+
+
+# Valeur sentinelle des colonnes entières (tri-états, codes, entiers optionnels)
+MISSING = -1
+
+# Champs critiques, dans l'ordre de HeadacheCase.get_missing_critical_fields
+CRITICAL_FIELDS = ("onset", "fever", "meningeal_signs", "neuro_deficit", "htic_pattern", "seizure")
+
+# Version du format de sauvegarde
+FORMAT_VERSION = 1
+
+
+# ==============================================================================
+# Schéma des colonnes
+# ==============================================================================
+
+@dataclass(frozen=True)
+class ColumnSpec:
+    """Encodage d'un champ de HeadacheCase.
+
+    Attributes:
+        name: Nom du champ
+        kind: "tribool" | "category" | "int" | "float" | "string" | "string_list"
+        dtype: Type NumPy de la colonne (codes pour string_list)
+        choices: Valeurs autorisées (category)
+        optional: True si le champ accepte None
+    """
+    name: str
+    kind: str
+    dtype: Any
+    choices: Tuple[Any, ...] = ()
+    optional: bool = True
+
+
+def _column_spec(name: str, annotation: Any) -> ColumnSpec:
+    optional = False
+    args = typing.get_args(annotation)
+    if typing.get_origin(annotation) is Union and type(None) in args:
+        optional = True
+        (annotation,) = [arg for arg in args if arg is not type(None)]
+
+    origin = typing.get_origin(annotation)
+    if origin is typing.Literal:
+        return ColumnSpec(name, "category", np.int8, typing.get_args(annotation), optional)
+    if origin in (list, List):
+        return ColumnSpec(name, "string_list", np.int32, optional=optional)
+    if annotation is bool:
+        return ColumnSpec(name, "tribool", np.int8, optional=optional)
+    if annotation is int:
+        return ColumnSpec(name, "int", np.int16, optional=optional)
+    if annotation is float:
+        return ColumnSpec(name, "float", np.float64, optional=optional)
+    if annotation is str:
+        return ColumnSpec(name, "string", np.int32, optional=optional)
+    raise TypeError(f"Champ {name}: type {annotation!r} non pris en charge par CaseBatch")
+
+
+SCHEMA: Tuple[ColumnSpec, ...] = tuple(
+    _column_spec(name, field.annotation) for name, field in HeadacheCase.model_fields.items()
+)
+_SPECS: Dict[str, ColumnSpec] = {spec.name: spec for spec in SCHEMA}
+
+
+def _encode(spec: ColumnSpec, values: Sequence[Any], vocabulary: Dict[str, int]) -> np.ndarray:
+    if spec.kind == "float":
+        return np.array([math.nan if value is None else value for value in values], dtype=spec.dtype)
+    if spec.kind == "category":
+        codes = {choice: code for code, choice in enumerate(spec.choices)}
+        return np.array([MISSING if value is None else codes[value] for value in values], dtype=spec.dtype)
+    if spec.kind == "string":
+        return np.array(
+            [MISSING if value is None else vocabulary.setdefault(value, len(vocabulary)) for value in values],
+            dtype=spec.dtype
+        )
+    # tribool, int : None -> -1, bool -> 0/1
+    return np.array([MISSING if value is None else int(value) for value in values], dtype=spec.dtype)
+
+
+def _decode(spec: ColumnSpec, column: np.ndarray, vocabulary: Sequence[str]) -> List[Any]:
+    if spec.kind == "float":
+        return [None if math.isnan(value) else value for value in column.tolist()]
+    if spec.kind == "tribool":
+        return [None if code == MISSING else code == 1 for code in column.tolist()]
+    if spec.kind == "int":
+        return [None if value == MISSING else value for value in column.tolist()]
+    choices = spec.choices if spec.kind == "category" else vocabulary
+    return [None if code == MISSING else choices[code] for code in column.tolist()]
+
+
+# ==============================================================================
+# Lot de cas
+# ==============================================================================
+
+class CaseBatch:
+    """Lot de cas en colonnes NumPy.
+
+    Args:
+        columns: Tableau par champ (et "<champ>.offsets" pour les listes)
+        vocabularies: Vocabulaire des champs texte, par champ
+    """
+
+    def __init__(self, columns: Dict[str, np.ndarray], vocabularies: Optional[Dict[str, List[str]]] = None):
+        self.columns = columns
+        self.vocabularies = {spec.name: list((vocabularies or {}).get(spec.name, ()))
+                             for spec in SCHEMA if spec.kind in ("string", "string_list")}
+        self._size = len(columns[SCHEMA[0].name])
+
+    # ------------------------------------------------------------------
+    # Conversion
+    # ------------------------------------------------------------------
+
+    @classmethod
+    def from_cases(cls, cases: Iterable[HeadacheCase]) -> "CaseBatch":
+        """Construit un lot à partir de cas (une passe par champ)."""
+        cases = list(cases)
+        columns: Dict[str, np.ndarray] = {}
+        vocabularies: Dict[str, List[str]] = {}
+        for spec in SCHEMA:
+            values = [getattr(case, spec.name) for case in cases]
+            vocabulary: Dict[str, int] = {}
+            if spec.kind == "string_list":
+                lengths = [len(value) for value in values]
+                columns[f"{spec.name}.offsets"] = np.concatenate(
+                    ([0], np.cumsum(lengths, dtype=np.int64))
+                ).astype(np.int64)
+                flat = [item for value in values for item in value]
+                columns[spec.name] = np.array(
+                    [vocabulary.setdefault(item, len(vocabulary)) for item in flat], dtype=spec.dtype
+                )
+            else:
+                columns[spec.name] = _encode(spec, values, vocabulary)
+            if spec.kind in ("string", "string_list"):
+                vocabularies[spec.name] = list(vocabulary)
+        return cls(columns, vocabularies)
+
+    def to_cases(self) -> List[HeadacheCase]:
+        """Reconstruit les HeadacheCase (valeurs déjà validées à l'entrée du lot)."""
+        decoded = {spec.name: self.decode(spec.name) for spec in SCHEMA}
+        return [
+            HeadacheCase.model_construct(**{name: values[index] for name, values in decoded.items()})
+            for index in range(self._size)
+        ]
+
+    def case(self, index: int) -> HeadacheCase:
+        """Reconstruit un seul cas (indice négatif compté depuis la fin).
+
+        Raises:
+            IndexError: Si l'indice est hors du lot
+        """
+        position = index + self._size if index < 0 else index
+        if not 0 <= position < self._size:
+            raise IndexError(f"Indice {index} hors du lot de {self._size} cas")
+        return self[position:position + 1].to_cases()[0]
+
+    def decode(self, field: str) -> List[Any]:
+        """Valeurs Python d'un champ (None pour les valeurs manquantes)."""
+        spec = _SPECS[field]
+        vocabulary = self.vocabularies.get(field, ())
+        if spec.kind == "string_list":
+            offsets = self.columns[f"{field}.offsets"].tolist()
+            codes = self.columns[field].tolist()
+            return [[vocabulary[code] for code in codes[offsets[i]:offsets[i + 1]]] for i in range(self._size)]
+        return _decode(spec, self.columns[field], vocabulary)
+
+    def __len__(self) -> int:
+        return self._size
+
+    def __getitem__(self, selection: Union[int, slice, np.ndarray, Sequence[int]]) -> "CaseBatch":
+        """Sous-lot (tranche, masque booléen ou indices)."""
+        if isinstance(selection, (int, np.integer)):
+            selection = [selection]
+        indices = np.arange(self._size)[selection]
+        columns: Dict[str, np.ndarray] = {}
+        for spec in SCHEMA:
+            if spec.kind == "string_list":
+                offsets = self.columns[f"{spec.name}.offsets"]
+                starts, ends = offsets[indices], offsets[indices + 1]
+                lengths = ends - starts
+                columns[f"{spec.name}.offsets"] = np.concatenate(([0], np.cumsum(lengths))).astype(np.int64)
+                gather = (np.repeat(starts - columns[f"{spec.name}.offsets"][:-1], lengths)
+                          + np.arange(int(lengths.sum())))
+                columns[spec.name] = np.asarray(self.columns[spec.name])[gather]
+            else:
+                columns[spec.name] = np.asarray(self.columns[spec.name])[indices]
+        return CaseBatch(columns, self.vocabularies)
+
+    # ------------------------------------------------------------------
+    # Prédicats vectorisés (mêmes critères que HeadacheCase)
+    # ------------------------------------------------------------------
+
+    def _is(self, field: str, value: Any) -> np.ndarray:
+        spec = _SPECS[field]
+        if spec.kind == "tribool":
+            return self.columns[field] == int(value)
+        return self.columns[field] == spec.choices.index(value)
+
+    def has_red_flags(self) -> np.ndarray:
+        """Équivalent vectorisé de HeadacheCase.has_red_flags()."""
+        age = self.columns["age"]
+        red_flag_counts = np.diff(self.columns["red_flag_context.offsets"])
+        return (
+            self._is("onset", "thunderclap")
+            | self._is("fever", True)
+            | self._is("meningeal_signs", True)
+            | self._is("neuro_deficit", True)
+            | self._is("seizure", True)
+            | self._is("htic_pattern", True)
+            | ((age != MISSING) & (age > 50) & self._is("profile", "acute"))
+            | self._is("immunosuppression", True)
+            | self._is("cancer_history", True)
+            | self._is("vertigo", True)
+            | self._is("visual_disturbance_type", "blindness")
+            | self._is("horton_criteria", True)
+            | (red_flag_counts > 0)
+        )
+
+    def is_emergency(self) -> np.ndarray:
+        """Équivalent vectorisé de HeadacheCase.is_emergency()."""
+        acute = self._is("profile", "acute")
+        deficit = self._is("neuro_deficit", True)
+        seizure = self._is("seizure", True)
+        return (
+            self._is("onset", "thunderclap")
+            | (self._is("fever", True) & self._is("meningeal_signs", True))
+            | (deficit & acute)
+            | (seizure & acute)
+            | (self._is("htic_pattern", True) & (deficit | seizure))
+        )
+
+    def missing_critical_mask(self) -> np.ndarray:
+        """Matrice (n, len(CRITICAL_FIELDS)) : True si le champ critique manque."""
+        return np.column_stack([
+            self._is("onset", "unknown") if field == "onset" else self.columns[field] == MISSING
+            for field in CRITICAL_FIELDS
+        ])
+
+    def get_missing_critical_fields(self) -> List[List[str]]:
+        """Équivalent de HeadacheCase.get_missing_critical_fields() pour chaque cas."""
+        return [[CRITICAL_FIELDS[j] for j in np.flatnonzero(row)] for row in self.missing_critical_mask()]
+
+    def value_counts(self, field: str) -> Dict[Any, int]:
+        """Effectifs par valeur d'un champ (None inclus), pour les statistiques de cohorte."""
+        spec = _SPECS[field]
+        if spec.kind in ("float", "string_list"):
+            raise ValueError(f"value_counts non défini pour le champ {field} ({spec.kind})")
+        codes, counts = np.unique(self.columns[field], return_counts=True)
+        values = _decode(spec, codes, self.vocabularies.get(field, ()))
+        return dict(zip(values, counts.tolist()))
+
+    # ------------------------------------------------------------------
+    # Persistance
+    # ------------------------------------------------------------------
+
+    def _metadata(self) -> Dict[str, Any]:
+        return {
+            "format_version": FORMAT_VERSION,
+            "size": self._size,
+            "fields": [spec.name for spec in SCHEMA],
+            "vocabularies": self.vocabularies,
+        }
+
+    def save(self, path: Union[str, Path], compressed: bool = False) -> Path:
+        """Sauvegarde le lot.
+
+        Args:
+            path: Fichier .npz (archive unique) ou répertoire (un .npy par colonne,
+                  chargeable en mémoire mappée)
+            compressed: Compression de l'archive .npz
+
+        Returns:
+            Chemin écrit
+        """
+        path = Path(path)
+        metadata = json.dumps(self._metadata(), ensure_ascii=False)
+        if path.suffix == ".npz":
+            save = np.savez_compressed if compressed else np.savez
+            save(path, __metadata__=np.array(metadata), **self.columns)
+            return path
+
+        path.mkdir(parents=True, exist_ok=True)
+        for name, column in self.columns.items():
+            np.save(path / f"{name}.npy", np.ascontiguousarray(column))
+        (path / "metadata.json").write_text(metadata, encoding="utf-8")
+        return path
+
+    @classmethod
+    def load(cls, path: Union[str, Path], mmap: bool = False) -> "CaseBatch":
+        """Charge un lot sauvegardé par save().
+
+        Args:
+            path: Fichier .npz ou répertoire de colonnes
+            mmap: Mappe les colonnes en mémoire (répertoire uniquement)
+
+        Raises:
+            ValueError: Format incompatible ou champs différents du modèle courant
+        """
+        path = Path(path)
+        if path.suffix == ".npz":
+            with np.load(path, allow_pickle=False) as archive:
+                metadata = json.loads(str(archive["__metadata__"]))
+                columns = {name: archive[name] for name in archive.files if name != "__metadata__"}
+        else:
+            metadata = json.loads((path / "metadata.json").read_text(encoding="utf-8"))
+            mode = "r" if mmap else None
+            columns = {file.stem: np.load(file, mmap_mode=mode) for file in path.glob("*.npy")}
+
+        if metadata.get("format_version") != FORMAT_VERSION:
+            raise ValueError(f"Format CaseBatch {metadata.get('format_version')} non supporté")
+        if metadata["fields"] != [spec.name for spec in SCHEMA]:
+            raise ValueError("Les champs sauvegardés ne correspondent pas à HeadacheCase")
+        return cls(columns, metadata["vocabularies"])
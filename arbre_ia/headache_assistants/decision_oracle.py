@@ -0,0 +1,212 @@
+"""Oracle d'invariance de la décision pour un cas partiel.
+
+should_end_dialogue() est une cascade de cas particuliers (coup de tonnerre,
+méningite, HTIC, chronique stable...). Ce module répond, pour un cas dont
+certains champs sont encore inconnus, à la question : toutes les valeurs
+possibles de ces champs mènent-elles à la même ImagingRecommendation ?
+
+Évaluation à trois valeurs sur le DAG de décision compilé (rules_compiler) :
+
+    - un champ connu suit la branche de sa classe; un champ inconnu suit
+      toutes ses branches : on obtient l'ensemble des règles atteignables
+    - un champ inconnu est "décisif" s'il branche, sur un chemin atteignable,
+      vers des ensembles de règles différents
+    - la recommandation finale dépend aussi de champs lus hors des
+      conditions : adaptations contextuelles (ADAPTATION_FIELDS) et, pour
+      le fallback, red flags et profil (FALLBACK_FIELDS) ; un de ces champs
+      inconnu rend la décision non acquise (conservateur)
+
+La décision est invariante si une seule règle (ou le seul fallback) reste
+atteignable et qu'aucun champ lu par l'adaptation n'est inconnu. Deux
+règles différentes donnent des ImagingRecommendation différentes
+(applied_rule_id, commentaire) : l'invariance est stricte.
+
+Les explorations du DAG sont mémoïsées par signature (classe de chaque
+champ, None si inconnu) : un appel coûte quelques microsecondes.
+"""
+
+import threading
+import weakref
+from dataclasses import dataclass
+from typing import Dict, FrozenSet, Iterable, Optional, Tuple, Union
+
+from .models import HeadacheCase
+from .rules_compiler import FALLBACK_LEAF, CompiledRuleSet, DecisionNode
+
+
+# Champs lus par _apply_contextual_adaptations (examens, urgence, précautions)
+ADAPTATION_FIELDS = frozenset({"pregnancy_postpartum", "cancer_history", "sex", "age"})
+
+# Champs lus par _get_fallback_recommendation (HeadacheCase.has_red_flags et profil)
+FALLBACK_FIELDS = frozenset({
+    "onset", "fever", "meningeal_signs", "neuro_deficit", "seizure", "htic_pattern",
+    "age", "profile", "immunosuppression", "cancer_history", "vertigo",
+    "visual_disturbance_type", "horton_criteria", "red_flag_context",
+})
+
+# Valeurs par défaut (aucun red flag) des champs inconnus, pour l'évaluation du fallback
+_NEUTRAL_VALUES = {
+    name: field.get_default(call_default_factory=True)
+    for name, field in HeadacheCase.model_fields.items()
+}
+
+# Nombre maximal de signatures mémorisées par oracle
+ORACLE_MEMO_SIZE = 8192
+
+Signature = Tuple[Optional[int], ...]
+
+
+def open_fields(case: HeadacheCase, fields: Iterable[str]) -> FrozenSet[str]:
+    """Champs inconnus : ceux demandés, plus le profil s'il sera inféré du début.
+
+    Le profil "unknown" est inféré de la réponse sur le début (merge_cases) :
+    il reste ouvert tant que onset l'est.
+    """
+    unknown = set(fields)
+    if "onset" in unknown and case.profile == "unknown":
+        unknown.add("profile")
+    return frozenset(unknown)
+
+
+@dataclass(frozen=True)
+class InvarianceReport:
+    """Réponse de l'oracle pour un cas partiel.
+
+    Attributes:
+        invariant: True si toute complétion donne la même ImagingRecommendation
+        reachable_rules: Règles encore atteignables ("FALLBACK" sans règle)
+        relevant_fields: Champs inconnus dont la réponse peut changer la décision
+    """
+    invariant: bool
+    reachable_rules: Tuple[str, ...]
+    relevant_fields: Tuple[str, ...]
+
+
+class DecisionOracle:
+    """Invariance de la décision sur le DAG de décision compilé.
+
+    Args:
+        compiled: Règles compilées (snapshot du registre)
+
+    Example:
+        >>> oracle = get_decision_oracle()
+        >>> report = oracle.check(HeadacheCase(onset="thunderclap", profile="acute"), ["fever"])
+        >>> report.invariant, report.reachable_rules
+        (True, ('HSA_001',))
+    """
+
+    def __init__(self, compiled: CompiledRuleSet):
+        self.compiled = compiled
+        self._memo: Dict[Signature, Tuple[FrozenSet[int], Tuple[str, ...], FrozenSet[str]]] = {}
+        self._lock = threading.Lock()
+
+    def signature(self, case: HeadacheCase, unknown: FrozenSet[str]) -> Optional[Signature]:
+        """Classe de chaque champ du DAG (None si inconnu); None si une valeur sort du domaine."""
+        signature = []
+        for partition in self.compiled.fields:
+            if partition.name in unknown:
+                signature.append(None)
+                continue
+            class_index = partition.classify(getattr(case, partition.name, None))
+            if class_index is None:
+                return None
+            signature.append(class_index)
+        return tuple(signature)
+
+    def explore(self, signature: Signature) -> Tuple[FrozenSet[int], Tuple[str, ...], FrozenSet[str]]:
+        """(feuilles atteignables, identifiants des règles, champs décisifs) pour une signature."""
+        cached = self._memo.get(signature)
+        if cached is not None:
+            return cached
+
+        visited: Dict[int, Tuple[FrozenSet[int], FrozenSet[int]]] = {}
+
+        def visit(node: Union[DecisionNode, int]) -> Tuple[FrozenSet[int], FrozenSet[int]]:
+            if not isinstance(node, DecisionNode):
+                return frozenset((node,)), frozenset()
+            result = visited.get(id(node))
+            if result is not None:
+                return result
+            class_index = signature[node.field_index]
+            if class_index is not None:
+                result = visit(node.children[class_index])
+            else:
+                branches = [visit(child) for child in node.children]
+                leaves = frozenset().union(*(branch[0] for branch in branches))
+                relevant = frozenset().union(*(branch[1] for branch in branches))
+                # Branches vers des règles différentes (ou ambiguës) : champ décisif
+                if len(leaves) > 1:
+                    relevant |= {node.field_index}
+                result = (leaves, relevant)
+            visited[id(node)] = result
+            return result
+
+        leaves, relevant = visit(self.compiled.root)
+        result = (
+            leaves,
+            tuple(self._rule_id(leaf) for leaf in sorted(leaves)),
+            frozenset(self.compiled.fields[index].name for index in relevant),
+        )
+        with self._lock:
+            if len(self._memo) >= ORACLE_MEMO_SIZE:
+                self._memo.clear()
+            self._memo[signature] = result
+        return result
+
+    def _rule_id(self, leaf: int) -> str:
+        return "FALLBACK" if leaf == FALLBACK_LEAF else self.compiled.rules[leaf].get("id", str(leaf))
+
+    def check(self, case: HeadacheCase, fields: Iterable[str]) -> InvarianceReport:
+        """Toutes les valeurs des champs inconnus mènent-elles à la même recommandation ?
+
+        Args:
+            case: Cas partiel (les valeurs des champs inconnus sont ignorées)
+            fields: Champs encore inconnus (questions restantes)
+
+        Returns:
+            InvarianceReport (non invariant, tous champs décisifs, si le cas
+            sort du domaine analysé)
+        """
+        unknown = open_fields(case, fields)
+        signature = self.signature(case, unknown)
+        if signature is None:
+            return InvarianceReport(False, (), tuple(sorted(unknown)))
+
+        leaves, rule_ids, relevant = self.explore(signature)
+
+        # Champs lus hors des conditions des règles
+        relevant = relevant | (unknown & ADAPTATION_FIELDS)
+        if FALLBACK_LEAF in leaves and unknown & FALLBACK_FIELDS:
+            # Red flag déjà présent parmi les champs connus : le fallback ne dépend plus des inconnus
+            neutral = case.model_copy(update={
+                name: _NEUTRAL_VALUES[name] for name in unknown if name in _NEUTRAL_VALUES
+            })
+            if not neutral.has_red_flags():
+                relevant |= unknown & FALLBACK_FIELDS
+
+        return InvarianceReport(
+            invariant=len(leaves) == 1 and not relevant,
+            reachable_rules=rule_ids,
+            relevant_fields=tuple(sorted(relevant)),
+        )
+
+
+_oracles: "weakref.WeakKeyDictionary[CompiledRuleSet, DecisionOracle]" = weakref.WeakKeyDictionary()
+_oracles_lock = threading.Lock()
+
+
+def get_decision_oracle(compiled: Optional[CompiledRuleSet] = None) -> DecisionOracle:
+    """Oracle des règles compilées (par défaut : snapshot courant du registre).
+
+    Un oracle (et sa mémoïsation) par jeu de règles compilé : un
+    rechargement à chaud des règles en crée un nouveau.
+    """
+    if compiled is None:
+        from .rules_registry import get_rules_registry
+        compiled = get_rules_registry().snapshot().compiled
+    with _oracles_lock:
+        oracle = _oracles.get(compiled)
+        if oracle is None:
+            oracle = DecisionOracle(compiled)
+            _oracles[compiled] = oracle
+        return oracle
@@ -10,18 +10,37 @@ Le dialogue suit une stratégie de questions progressives basée sur les red fla
 et les conditions nécessaires pour matcher les règles médicales.
 """
 
+import hashlib
+import os
+import time
 import uuid
-from typing import Optional, Dict, Any, List, Tuple
+from concurrent.futures import Future, ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from pathlib import Path
+from typing import Optional, Dict, Any, Iterator, List, Tuple
 from datetime import datetime
 
 from .models import ChatMessage, ChatResponse, HeadacheCase, ImagingRecommendation
-from .nlu_hybrid import HybridNLU
+from .nlu_hybrid import HybridNLU, resolve_special_pattern
+from .nlu_registry import NLURegistry, registry_from_env
+from .nlu_v2 import SAFETY_DETECTORS
+from .parse_cache import ParseCache, cache_size_from_env
+from .decision_oracle import get_decision_oracle
+from .session_snapshot import pack_session, unpack_session
+from .emergency_screen import (
+    SCREEN_REASONS, EmergencyMetrics, ScreenResult, emergency_reason, get_emergency_screener
+)
+from .question_planner import get_question_planner
+from .short_answers import FollowUpMetrics, interpret_short_answer, is_bare_answer, is_short_answer
+from .single_flight import SingleFlight
 from .nlu_base import (
     suggest_clarification_questions,
     get_missing_critical_fields
 )
 from .rules_engine import decide_imaging, load_rules
+from .rules_compiler import CompiledRuleSet
+from .rules_registry import get_rules_registry
 from .logging_config import get_logger, log_nlu_parsing, log_error_with_context
+from .core.exceptions import SessionNotFoundError
 
 
 def get_critical_fields_for_rules() -> Dict[str, List[str]]:
@@ -228,49 +247,36 @@ def merge_cases(current_case: HeadacheCase, new_info: HeadacheCase) -> HeadacheC
     
     return merged_case
 
+def _follow_up_fields(last_asked: str) -> List[str]:
+    """Champs analysés dans une réponse de suivi : le champ demandé et les détecteurs de sécurité."""
+    return sorted({last_asked, *SAFETY_DETECTORS})
+
+
 # détecte oui/non dans l'input utilisateur lors du dialogue
 def _interpret_yes_no_response(text: str, field_name: str, current_case: HeadacheCase) -> HeadacheCase:
-    import re
-    
-    text_lower = text.lower().strip()
-    
-    # Détecter oui/non avec correspondance de mots entiers
-    is_yes = bool(re.search(r'\b(oui|yes|o)\b', text_lower))
-    is_no = bool(re.search(r'\b(non|no|n|aucun|aucune|pas)\b', text_lower))
-    
-    # Si c'est un champ booléen
-    boolean_fields = [
-        'fever', 'meningeal_signs', 'neuro_deficit', 'seizure',
-        'htic_pattern', 'pregnancy_postpartum', 'trauma',
-        'recent_pl_or_peridural', 'immunosuppression',
-        'recent_pattern_change'  # Changement récent de pattern (red flag)
-    ]
-    
-    if field_name in boolean_fields:
-        # Prioriser "non" car plus spécifique que "oui" ex: pas de fièvre
-        if is_no:
-            return current_case.model_copy(update={field_name: False})
-        elif is_yes:
-            return current_case.model_copy(update={field_name: True})
-    
-    # Si c'est une intensité, extraire la valeur
-    if field_name == 'intensity':
-        numbers = re.findall(r'\d+', text)
-        if numbers:
-            intensity_val = int(numbers[0])
-            if 0 <= intensity_val <= 10:
-                return current_case.model_copy(update={'intensity': intensity_val})
-
-    # Si c'est l'âge, extraire la valeur
-    if field_name == 'age':
-        numbers = re.findall(r'\d+', text)
-        if numbers:
-            age_val = int(numbers[0])
-            if 0 <= age_val <= 120:
-                return current_case.model_copy(update={'age': age_val})
-    
-    # Sinon, retourner le cas inchangé
-    return current_case
+    """Cas complété de la réponse au champ demandé (voir short_answers), inchangé sinon."""
+    answer = interpret_short_answer(text, field_name)
+    return answer.apply(current_case) if answer is not None else current_case
+
+
+def _accumulate_special_patterns(session_data: Dict[str, Any], extraction_metadata: Dict[str, Any]) -> None:
+    """Ajoute à la session les patterns spéciaux d'une analyse, sans doublons.
+
+    Un pattern est identifié par son type et l'exemple du corpus qu'il
+    référence : redétecté à un tour suivant, il garde sa meilleure
+    similarité au lieu d'être ajouté une nouvelle fois.
+    """
+    new_patterns = (extraction_metadata.get("enhancement_details") or {}).get("special_patterns_detected", [])
+    accumulated = session_data["accumulated_special_patterns"]
+    for pattern in new_patterns:
+        key = (pattern.get("type"), pattern.get("example_id"))
+        existing = next(
+            (item for item in accumulated if (item.get("type"), item.get("example_id")) == key), None
+        )
+        if existing is None:
+            accumulated.append(dict(pattern))
+        elif pattern.get("similarity", 0.0) > existing.get("similarity", 0.0):
+            existing["similarity"] = pattern["similarity"]
 
 
 def _infer_profile_from_onset(case: HeadacheCase) -> HeadacheCase:
@@ -405,38 +411,149 @@ def should_end_dialogue(case: HeadacheCase, missing_fields: List[str]) -> Tuple[
 # Stockage en mémoire des sessions actives
 _active_sessions: Dict[str, Dict[str, Any]] = {}
 
-# Instance globale de HybridNLU (éviter de recharger l'embedding à chaque appel)
-_hybrid_nlu: Optional[HybridNLU] = None
+# NLU hybride par site (HEADACHE_SITES) : une instance partagée, une vue par configuration
+_nlu_registry: Optional[NLURegistry] = None
+
+# Cache des analyses (messages répétés : réessais, réponses courtes, notes types)
+_parse_cache = ParseCache(maxsize=cache_size_from_env())
+
+# Choix des questions : "information_gain" (question_planner) ou "priority" (table fixe)
+QUESTION_STRATEGY_ENV_VAR = "HEADACHE_QUESTION_STRATEGY"
+QUESTION_STRATEGIES = ("information_gain", "priority")
+_question_strategy = os.environ.get(QUESTION_STRATEGY_ENV_VAR, "information_gain")
+
+
+def set_question_strategy(strategy: str) -> str:
+    """Change la stratégie de choix des questions; retourne la précédente.
+
+    Raises:
+        ValueError: Si la stratégie est inconnue
+    """
+    global _question_strategy
+    if strategy not in QUESTION_STRATEGIES:
+        raise ValueError(f"Stratégie de questions inconnue: {strategy!r}")
+    previous, _question_strategy = _question_strategy, strategy
+    return previous
+
+
+# Pré-tri des urgences avant le pipeline NLU (HEADACHE_EMERGENCY_SCREEN=0 le désactive)
+EMERGENCY_SCREEN_ENV_VAR = "HEADACHE_EMERGENCY_SCREEN"
+_emergency_screen_enabled = os.environ.get(EMERGENCY_SCREEN_ENV_VAR, "1") != "0"
+
+# Délais de décision des urgences (pré-tri / pipeline complet), exposés par /metrics
+_emergency_metrics = EmergencyMetrics()
+
+# Chemins d'analyse des réponses aux questions de suivi, exposés par /metrics
+_follow_up_metrics = FollowUpMetrics()
+
+# Messages identiques traités en même temps pour une session (double envoi) : un seul tour
+_message_flights = SingleFlight()
+
+# Analyses complètes en arrière-plan des urgences pré-triées (audit), par session
+_audit_executor: Optional[ThreadPoolExecutor] = None
+_pending_audits: Dict[str, Future] = {}
+
+
+def set_emergency_screen(enabled: bool) -> bool:
+    """Active ou désactive le pré-tri des urgences; retourne l'état précédent."""
+    global _emergency_screen_enabled
+    previous, _emergency_screen_enabled = _emergency_screen_enabled, enabled
+    return previous
+
 
-def _get_hybrid_nlu() -> HybridNLU:
-    """Récupère l'instance globale de HybridNLU (singleton).
+# Mode sans état (HEADACHE_STATELESS_SESSIONS=1) : chaque message reconstruit la session
+# depuis l'historique du client et la session n'est pas conservée (workers interchangeables)
+STATELESS_SESSIONS_ENV_VAR = "HEADACHE_STATELESS_SESSIONS"
+_stateless_sessions = os.environ.get(STATELESS_SESSIONS_ENV_VAR, "0") == "1"
+
+
+def set_stateless_sessions(enabled: bool) -> bool:
+    """Active ou désactive le mode sans état; retourne l'état précédent."""
+    global _stateless_sessions
+    previous, _stateless_sessions = _stateless_sessions, enabled
+    return previous
+
+
+def _create_hybrid_nlu() -> HybridNLU:
+    """Crée l'instance de HybridNLU partagée par tous les sites.
+
+    Raises:
+        RuntimeError: Si l'initialisation du NLU échoue
+    """
+    logger = get_logger()
+    try:
+        logger.debug("Initialisation du NLU hybride...")
+        hybrid_nlu = HybridNLU()
+        logger.info("NLU hybride initialisé avec succès")
+    except Exception as e:
+        log_error_with_context(e, "initialisation NLU hybride")
+        raise RuntimeError(f"Impossible d'initialiser le NLU: {e}") from e
+    return hybrid_nlu
+
+
+def get_nlu_registry() -> NLURegistry:
+    """Registre des NLU par site (sites lus depuis HEADACHE_SITES au premier appel)."""
+    global _nlu_registry
+    if _nlu_registry is None:
+        _nlu_registry = registry_from_env(_create_hybrid_nlu)
+    return _nlu_registry
+
+
+def _get_hybrid_nlu(site: Optional[str] = None) -> HybridNLU:
+    """Récupère le HybridNLU d'un site (vue sur l'instance partagée, créée au premier appel).
+
+    Args:
+        site: Site de la session (None : réglages par défaut)
 
     Returns:
         Instance de HybridNLU initialisée
 
     Raises:
         RuntimeError: Si l'initialisation du NLU échoue
+        ValidationError: Si le site est inconnu
     """
-    global _hybrid_nlu
-    logger = get_logger()
+    return get_nlu_registry().nlu(site)
+
+
+def _site_rules_path(session_data: Dict[str, Any]) -> Optional[Path]:
+    """Fichier de règles du site de la session (None : fichier par défaut)."""
+    return get_nlu_registry().rules_path(session_data.get("site"))
+
+
+def _site_compiled_rules(session_data: Dict[str, Any]) -> Optional[CompiledRuleSet]:
+    """Règles compilées du site de la session (None : snapshot par défaut)."""
+    rules_path = _site_rules_path(session_data)
+    if rules_path is None:
+        return None
+    return get_rules_registry(rules_path).snapshot().compiled
+
+
+def get_parse_cache_stats() -> Dict[str, Any]:
+    """Statistiques du cache d'analyses NLU (taille, hits, misses, taux)."""
+    return _parse_cache.stats()
+
+
+def get_emergency_stats() -> Dict[str, Any]:
+    """Délais de décision des urgences par chemin (pré-tri / pipeline) et verdicts d'audit."""
+    return _emergency_metrics.stats()
+
+
+def get_message_coalescing_stats() -> Dict[str, int]:
+    """Tours exécutés et doubles envois servis par un tour concurrent identique."""
+    return _message_flights.stats()
 
-    if _hybrid_nlu is None:
-        try:
-            logger.debug("Initialisation du NLU hybride...")
-            _hybrid_nlu = HybridNLU()
-            logger.info("NLU hybride initialisé avec succès")
-        except Exception as e:
-            log_error_with_context(e, "initialisation NLU hybride")
-            raise RuntimeError(f"Impossible d'initialiser le NLU: {e}") from e
 
-    return _hybrid_nlu
+def get_follow_up_stats() -> Dict[str, Any]:
+    """Tours de suivi par chemin d'analyse (interpréteur, règles seules, pipeline complet)."""
+    return _follow_up_metrics.stats()
 
 
-def get_or_create_session(session_id: Optional[str] = None) -> Tuple[str, Dict[str, Any]]:
+def get_or_create_session(session_id: Optional[str] = None, site: Optional[str] = None) -> Tuple[str, Dict[str, Any]]:
     """Récupère ou crée une session de dialogue.
     
     Args:
         session_id: ID de session existant (None pour créer nouvelle session)
+        site: Site de la nouvelle session (ignoré pour une session existante)
         
     Returns:
         Tuple (session_id, session_data)
@@ -448,9 +565,11 @@ def get_or_create_session(session_id: Optional[str] = None) -> Tuple[str, Dict[s
     new_session_id = session_id or str(uuid.uuid4())
     _active_sessions[new_session_id] = {
         "created_at": datetime.now(),
+        "site": site,  # Site hospitalier : réglages NLU et fichier de règles
         "current_case": None,
         "message_count": 0,
         "extraction_metadata": {},
+        "extraction_source": None,  # Message analysé (texte, champs ciblés) : métadonnées par référence
         "asked_fields": [],  # Champs déjà questionnés 
         "last_asked_field": None,  # Dernier champ questionné pour interpréter oui/non
         "accumulated_special_patterns": [],  # Patterns spéciaux détectés durant toute la session
@@ -458,11 +577,68 @@ def get_or_create_session(session_id: Optional[str] = None) -> Tuple[str, Dict[s
     
     return new_session_id, _active_sessions[new_session_id]
 
+
+def session_needs_history(session_id: Optional[str]) -> bool:
+    """Indique si l'historique du client servira à reconstruire la session.
+
+    Vrai en mode sans état, ou si la session est inconnue de ce worker :
+    sinon l'historique est ignoré et l'appelant peut se passer de le convertir.
+    """
+    return _stateless_sessions or not session_id or session_id not in _active_sessions
+
+
+def rebuild_session(
+    history: List[ChatMessage],
+    session_id: Optional[str] = None,
+    site: Optional[str] = None
+) -> Tuple[str, Dict[str, Any]]:
+    """Reconstruit une session en rejouant les messages utilisateur de l'historique.
+
+    Chaque tour passe par le même traitement que handle_user_message (cas
+    fusionné, questions posées, dernier champ demandé), sans pré-tri des
+    urgences, métriques ni journalisation (analyses NLU, log d'audit des
+    décisions) : seul le nouveau tour est journalisé. Les analyses viennent
+    du cache d'analyses quand le message a déjà été vu. Les messages de
+    l'assistant sont ignorés.
+
+    Args:
+        history: Historique de la conversation (tours précédents)
+        session_id: ID sous lequel reconstruire (défaut : nouvel ID)
+        site: Site de la session
+
+    Returns:
+        Tuple (session_id, session_data); une session existante est remplacée
+    """
+    if session_id:
+        reset_session(session_id)
+    session_id, session_data = get_or_create_session(session_id, site)
+    for message in history:
+        if message.role == "user":
+            _handle_turn(session_id, session_data, message.content, time.perf_counter(), replay=True)
+    return session_id, session_data
+
+
+def _session_for_message(
+    history: List[ChatMessage],
+    session_id: Optional[str],
+    site: Optional[str]
+) -> Tuple[str, Dict[str, Any]]:
+    """Session d'un nouveau message : reconstruite depuis l'historique si nécessaire.
+
+    Raises:
+        ValidationError: Si le site est inconnu
+    """
+    get_nlu_registry().site(site)
+    if history and session_needs_history(session_id):
+        return rebuild_session(history, session_id, site)
+    return get_or_create_session(session_id, site)
+
 # fonction principale de dialogue
 def handle_user_message(
     history: List[ChatMessage],
     new_message: ChatMessage,
-    session_id: Optional[str] = None
+    session_id: Optional[str] = None,
+    site: Optional[str] = None
 ) -> ChatResponse:
     """Gère un nouveau message utilisateur et retourne la réponse du système.
     
@@ -476,22 +652,75 @@ def handle_user_message(
        - Sinon → poser question ciblée pour champ prioritaire
     
     Args:
-        history: Historique des messages de la conversation
+        history: Historique des messages de la conversation (utilisé seulement
+            pour reconstruire une session inconnue ou en mode sans état)
         new_message: Nouveau message de l'utilisateur
         session_id: ID de session (optionnel)
+        site: Site hospitalier (réglages NLU et règles), retenu à la création
+            de la session (défaut : site par défaut)
         
     Returns:
         ChatResponse avec message, état du cas, et recommandation si applicable
-        
+
+    Raises:
+        ValidationError: Si le site est inconnu
+
+    Note:
+        Un message identique reçu pour la même session pendant son traitement
+        (double envoi) n'est pas traité une seconde fois : les deux appels
+        reçoivent la même réponse.
     """
-    
+    if session_id is None:
+        return _handle_message(history, new_message, session_id, site)
+    message_hash = hashlib.sha256(new_message.content.encode("utf-8")).hexdigest()
+    response, _ = _message_flights.do(
+        (session_id, site, message_hash), _handle_message, history, new_message, session_id, site
+    )
+    return response
+
+
+def _handle_message(
+    history: List[ChatMessage],
+    new_message: ChatMessage,
+    session_id: Optional[str],
+    site: Optional[str]
+) -> ChatResponse:
+    """Traitement d'un message (voir handle_user_message), sans regroupement des doubles envois."""
     # 1 gestion de id de session
-    session_id, session_data = get_or_create_session(session_id)
+    started = time.perf_counter()
+    session_id, session_data = _session_for_message(history, session_id, site)
+    try:
+        return _handle_turn(session_id, session_data, new_message.content, started)
+    finally:
+        if _stateless_sessions:
+            reset_session(session_id)
+
+
+def _handle_turn(
+    session_id: str,
+    session_data: Dict[str, Any],
+    user_text: str,
+    started: float,
+    replay: bool = False
+) -> ChatResponse:
+    """Traite un message utilisateur dans sa session (étapes 2 à 5 de handle_user_message).
+
+    Args:
+        replay: Tour rejoué par rebuild_session (ni pré-tri, ni métriques, ni
+            journalisation de l'analyse NLU ou de la décision)
+    """
+    # L'analyse d'audit d'une urgence pré-triée doit avoir mis la session à jour
+    wait_for_emergency_audit(session_id)
     session_data["message_count"] += 1
+
+    # Pré-tri des urgences : décision immédiate, analyse complète en arrière-plan
+    if _emergency_screen_enabled and not replay:
+        screened_response = _screen_emergency(session_id, session_data, user_text, started)
+        if screened_response is not None:
+            return screened_response
     
    
     # 2 extraction via la NLU
-    user_text = new_message.content
     
     # Initialiser extracted_case 
     extracted_case = None
@@ -500,21 +729,33 @@ def handle_user_message(
     # Si le dernier message était une question, interpréter la réponse en contexte
     last_asked = session_data.get("last_asked_field")
     if last_asked and session_data["current_case"] is not None:
-        # Tenter d'interpréter la réponse oui/non/nombre
         current_case_before = session_data["current_case"]
-        current_case = _interpret_yes_no_response(user_text, last_asked, current_case_before)
+        # Interprétation de la réponse pour le champ demandé (oui/non/nombre)
+        answer = interpret_short_answer(user_text, last_asked)
         
-        # Si l'interprétation a fonctionné (le cas a changé), utiliser ce cas
-        if current_case != current_case_before:
+        if answer is not None and is_bare_answer(user_text):
+            # Réponse nue ("oui", "7/10") : interprétation directe, sans analyse NLU
+            if not replay:
+                _follow_up_metrics.record("interpreted")
+            current_case = answer.apply(current_case_before)
             session_data["current_case"] = current_case
             session_data["last_asked_field"] = None  # Réinitialiser
             # Créer un extracted_case vide pour la cohérence
             extracted_case = current_case_before
         else:
-            # Sinon, parser normalement avec HybridNLU (utilise embedding si nécessaire)
-            hybrid_nlu = _get_hybrid_nlu()
+            # La réponse peut mentionner d'autres champs que celui demandé ("aucune
+            # idée, il a convulsé ce matin") : tout le texte est analysé
+            hybrid_nlu = _get_hybrid_nlu(session_data.get("site"))
+            short = is_short_answer(user_text)
+            if not replay:
+                _follow_up_metrics.record("rules" if short else "full")
             try:
-                extracted_case, extraction_metadata = hybrid_nlu.parse_free_text_to_case(user_text)
+                # Le champ demandé et tous les détecteurs de sécurité (démographie,
+                # temporalité, drapeaux rouges); réponse courte : couches
+                # déterministes seules (règles, n-grams, mots-clés, négations)
+                extracted_case, extraction_metadata = _parse_cache.parse_free_text_to_case(
+                    hybrid_nlu, user_text, fields=_follow_up_fields(last_asked), use_embedding=not short
+                )
             except Exception as e:
                 log_error_with_context(e, "parsing NLU", {"text_length": len(user_text)})
                 # Fallback: créer un cas vide plutôt que crasher
@@ -522,27 +763,35 @@ def handle_user_message(
                 extraction_metadata = {"error": str(e), "overall_confidence": 0.0}
 
             session_data["extraction_metadata"] = extraction_metadata
-
-            # Logger le parsing NLU
-            log_nlu_parsing(
-                text=user_text,
-                detected_fields=extraction_metadata.get("detected_fields", []),
-                confidence=extraction_metadata.get("overall_confidence", 0.0),
-                method=extraction_metadata.get("method", "hybrid")
+            # Réponse courte : métadonnées gardées telles quelles (la référence de
+            # l'instantané décrit une analyse avec embedding)
+            session_data["extraction_source"] = (
+                None if short else {"text": user_text, "fields": _follow_up_fields(last_asked)}
             )
 
+            # Logger le parsing NLU (pas pour un tour rejoué : déjà journalisé)
+            if not replay:
+                log_nlu_parsing(
+                    text=user_text,
+                    detected_fields=extraction_metadata.get("detected_fields", []),
+                    confidence=extraction_metadata.get("overall_confidence", 0.0),
+                    method="rules" if short else extraction_metadata.get("method", "hybrid")
+                )
+
             # Accumuler les patterns spéciaux détectés
-            new_patterns = extraction_metadata.get("enhancement_details", {}).get("special_patterns_detected", [])
-            if new_patterns:
-                session_data["accumulated_special_patterns"].extend(new_patterns)
+            _accumulate_special_patterns(session_data, extraction_metadata)
 
-            current_case = merge_cases(session_data["current_case"], extracted_case)
+            current_case = merge_cases(current_case_before, extracted_case)
+            if answer is not None:
+                # L'interprétation tranche le champ demandé
+                current_case = answer.apply(current_case)
+                session_data["last_asked_field"] = None
             session_data["current_case"] = current_case
     else:
         # Analyser le texte normalement avec HybridNLU (utilise embedding si nécessaire)
-        hybrid_nlu = _get_hybrid_nlu()
+        hybrid_nlu = _get_hybrid_nlu(session_data.get("site"))
         try:
-            extracted_case, extraction_metadata = hybrid_nlu.parse_free_text_to_case(user_text)
+            extracted_case, extraction_metadata = _parse_cache.parse_free_text_to_case(hybrid_nlu, user_text)
         except Exception as e:
             log_error_with_context(e, "parsing NLU", {"text_length": len(user_text)})
             # Fallback: créer un cas vide plutôt que crasher
@@ -550,19 +799,19 @@ def handle_user_message(
             extraction_metadata = {"error": str(e), "overall_confidence": 0.0}
 
         session_data["extraction_metadata"] = extraction_metadata
+        session_data["extraction_source"] = {"text": user_text, "fields": None}
 
-        # Logger le parsing NLU
-        log_nlu_parsing(
-            text=user_text,
-            detected_fields=extraction_metadata.get("detected_fields", []),
-            confidence=extraction_metadata.get("overall_confidence", 0.0),
-            method=extraction_metadata.get("method", "hybrid")
-        )
+        # Logger le parsing NLU (pas pour un tour rejoué : déjà journalisé)
+        if not replay:
+            log_nlu_parsing(
+                text=user_text,
+                detected_fields=extraction_metadata.get("detected_fields", []),
+                confidence=extraction_metadata.get("overall_confidence", 0.0),
+                method=extraction_metadata.get("method", "hybrid")
+            )
 
         # Accumuler les patterns spéciaux détectés
-        new_patterns = extraction_metadata.get("enhancement_details", {}).get("special_patterns_detected", [])
-        if new_patterns:
-            session_data["accumulated_special_patterns"].extend(new_patterns)
+        _accumulate_special_patterns(session_data, extraction_metadata)
 
         # ÉTAPE 3: Fusionner avec le cas en cours
         if session_data["current_case"] is None:
@@ -576,34 +825,24 @@ def handle_user_message(
 
         session_data["current_case"] = current_case
     
-    # 4 identification des cas manquants
-    
-    missing_critical = get_missing_critical_fields(current_case)
-    
-    # Prioriser les champs manquants
-    prioritized_missing = prioritize_missing_fields(missing_critical, current_case)
+    # 4 identification des cas manquants et 5 décision : continuer le dialogue ou le terminer
+    next_field, end_reason, relevant_fields = _plan_next_field(session_data, current_case)
+    if relevant_fields is not None:
+        session_data["decision_relevant_fields"] = relevant_fields
     
-    # Filtrer les champs déjà demandés récemment 
-    # On garde les champs critiques même si déjà demandés (max 1 fois)
-    available_to_ask = [
-        field for field in prioritized_missing
-        if session_data["asked_fields"].count(field) < 1
-    ]
-    
-    # 5 prendre la décision : continuer le dialogue ou le terminer 
-    
-    can_end, end_reason = should_end_dialogue(current_case, missing_critical)
-    
-    if can_end or len(available_to_ask) == 0:
+    if next_field is None:
         # DIALOGUE TERMINÉ: Générer recommandation
         
         try:
-            recommendation = decide_imaging(current_case)
+            recommendation = decide_imaging(current_case, _site_rules_path(session_data), audit=not replay)
         except Exception as e:
             # Fallback en cas d'erreur
             from .rules_engine import _get_fallback_recommendation
             recommendation = _get_fallback_recommendation(current_case)
             recommendation.comment += f" (Évaluation de secours activée: {str(e)})"
+
+        if recommendation.is_emergency() and not replay:
+            _emergency_metrics.record("pipeline", time.perf_counter() - started)
         
         # Construire message de réponse (inclure patterns spéciaux accumulés durant la session)
         special_patterns = session_data.get("accumulated_special_patterns", [])
@@ -628,7 +867,6 @@ def handle_user_message(
     else:
         # DIALOGUE EN COURS: Poser question pour le champ le plus prioritaire
         
-        next_field = available_to_ask[0]
         session_data["asked_fields"].append(next_field)
         session_data["last_asked_field"] = next_field  # Sauvegarder pour interpréter la prochaine réponse
         
@@ -653,7 +891,310 @@ def handle_user_message(
         )
 
 
-# fonctions utilitaires pour le formatage 
+# choix de la prochaine question (tour complet ou lecture provisoire du flux)
+def _plan_next_field(
+    session_data: Dict[str, Any],
+    current_case: HeadacheCase
+) -> Tuple[Optional[str], str, Optional[List[str]]]:
+    """Prochain champ à demander pour un cas, sans modifier la session.
+
+    Returns:
+        Tuple (champ à demander ou None si le dialogue se termine, raison de
+        fin, champs pertinents pour la décision ou None sans planificateur)
+    """
+    missing_critical = get_missing_critical_fields(current_case)
+    
+    # Prioriser les champs manquants
+    prioritized_missing = prioritize_missing_fields(missing_critical, current_case)
+    
+    # Filtrer les champs déjà demandés récemment 
+    # On garde les champs critiques même si déjà demandés (max 1 fois)
+    available_to_ask = [
+        field for field in prioritized_missing
+        if session_data["asked_fields"].count(field) < 1
+    ]
+    
+    can_end, end_reason = should_end_dialogue(current_case, missing_critical)
+    relevant_fields = None
+
+    # Planificateur : questions qui peuvent encore changer la recommandation d'abord
+    if _question_strategy == "information_gain" and not can_end:
+        compiled_rules = _site_compiled_rules(session_data)
+        invariance = get_decision_oracle(compiled_rules).check(current_case, available_to_ask)
+        relevant_fields = list(invariance.relevant_fields)
+        if invariance.invariant:
+            # Toute réponse restante mène à la même recommandation
+            can_end, end_reason = True, "decision_settled"
+        else:
+            available_to_ask = get_question_planner(compiled_rules).order_questions(current_case, available_to_ask)
+            # Chronique : le changement récent se demande avant les autres red flags
+            if end_reason == "needs_pattern_change_assessment" and "recent_pattern_change" in available_to_ask:
+                available_to_ask.remove("recent_pattern_change")
+                available_to_ask.insert(0, "recent_pattern_change")
+
+    if can_end or not available_to_ask:
+        return None, end_reason, relevant_fields
+    return available_to_ask[0], end_reason, relevant_fields
+
+
+# pré-tri des urgences : réponse immédiate, analyse complète en arrière-plan pour l'audit
+def _screen_emergency(
+    session_id: str,
+    session_data: Dict[str, Any],
+    user_text: str,
+    started: float
+) -> Optional[ChatResponse]:
+    """Réponse d'urgence immédiate si le pré-tri repère un coup de tonnerre ou une méningite.
+
+    Returns:
+        ChatResponse finale, ou None si le pré-tri ne conclut pas à une
+        urgence "immediate" (le pipeline complet prend alors le relais)
+    """
+    screen = get_emergency_screener().screen(user_text)
+    if screen is None:
+        return None
+    previous_case = session_data["current_case"]
+    screened_case = screen.apply(previous_case)
+    reason = emergency_reason(screened_case)
+    if reason not in SCREEN_REASONS:
+        return None
+    recommendation = decide_imaging(screened_case, _site_rules_path(session_data))
+    if not recommendation.is_emergency():
+        return None
+
+    session_data["current_case"] = screened_case
+    session_data["last_asked_field"] = None
+    session_data["emergency_screen"] = {
+        "fields": dict(screen.fields),
+        "terms": [hit.term for hit in screen.hits],
+        "reason": reason,
+        "applied_rule_id": recommendation.applied_rule_id,
+        "urgency": recommendation.urgency,
+        "imaging": list(recommendation.imaging),
+        "audit": None,
+    }
+    _emergency_metrics.record("screen", time.perf_counter() - started)
+
+    global _audit_executor
+    if _audit_executor is None:
+        _audit_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="emergency-audit")
+    _pending_audits[session_id] = _audit_executor.submit(
+        _complete_emergency_audit, session_data, user_text, previous_case, screen
+    )
+
+    response_message = _build_final_response_message(
+        screened_case,
+        recommendation,
+        reason,
+        session_data.get("accumulated_special_patterns", [])
+    )
+    return ChatResponse(
+        message=response_message,
+        session_id=session_id,
+        next_question=None,
+        headache_case=screened_case,
+        imaging_recommendation=recommendation,
+        requires_more_info=False,
+        dialogue_complete=True,
+        confidence_score=max(hit.confidence for hit in screen.hits)
+    )
+
+
+def _complete_emergency_audit(
+    session_data: Dict[str, Any],
+    user_text: str,
+    previous_case: Optional[HeadacheCase],
+    screen: ScreenResult
+) -> None:
+    """Analyse complète d'un message pré-trié : cas complet et verdict d'audit dans la session.
+
+    L'urgence est confirmée si l'analyse complète retient la même règle et
+    la même imagerie que le pré-tri (la réponse déjà donnée). Sinon le cas
+    qu'elle a lu est conservé tel quel et la session est marquée
+    emergency_unconfirmed. La décision du pré-tri est seule journalisée
+    dans le log d'audit : celle de l'analyse complète en est la vérification.
+    """
+    logger = get_logger()
+    try:
+        extracted_case, extraction_metadata = _parse_cache.parse_free_text_to_case(
+            _get_hybrid_nlu(session_data.get("site")), user_text
+        )
+    except Exception as e:
+        log_error_with_context(e, "audit urgence pré-triée", {"text_length": len(user_text)})
+        session_data["emergency_screen"]["audit"] = {"error": str(e)}
+        return
+
+    if previous_case is None:
+        full_case = extracted_case
+        if full_case.onset and full_case.profile == "unknown":
+            full_case = _infer_profile_from_onset(full_case)
+    else:
+        full_case = merge_cases(previous_case, extracted_case)
+    recommendation = decide_imaging(full_case, _site_rules_path(session_data), audit=False)
+    screened = session_data["emergency_screen"]
+    confirmed = (
+        recommendation.is_emergency()
+        and recommendation.applied_rule_id == screened["applied_rule_id"]
+        and list(recommendation.imaging) == screened["imaging"]
+    )
+    _emergency_metrics.record_audit(confirmed)
+    if not confirmed:
+        logger.warning(
+            f"Urgence pré-triée ({', '.join(hit.term for hit in screen.hits)}, règle "
+            f"{screened['applied_rule_id']}, imagerie {screened['imaging']}) non confirmée par l'analyse "
+            f"complète (règle {recommendation.applied_rule_id}, urgence {recommendation.urgency}, "
+            f"imagerie {list(recommendation.imaging)})"
+        )
+
+    session_data["extraction_metadata"] = extraction_metadata
+    session_data["extraction_source"] = {"text": user_text, "fields": None}
+    _accumulate_special_patterns(session_data, extraction_metadata)
+    # Cas complet (ordonnance), tel que lu par l'analyse complète; un désaccord
+    # avec la réponse d'urgence déjà donnée est signalé au clinicien
+    session_data["current_case"] = full_case
+    session_data["emergency_unconfirmed"] = not confirmed
+    session_data["emergency_screen"]["audit"] = {
+        "confirmed": confirmed,
+        "detected_fields": list(extraction_metadata.get("detected_fields", [])),
+        "applied_rule_id": recommendation.applied_rule_id,
+        "urgency": recommendation.urgency,
+        "imaging": list(recommendation.imaging),
+    }
+
+
+def wait_for_emergency_audit(session_id: str, timeout: Optional[float] = None) -> bool:
+    """Attend la fin de l'analyse d'audit d'une urgence pré-triée de la session.
+
+    Returns:
+        True si aucune analyse n'est en cours (ou si elle s'est terminée à temps)
+    """
+    future = _pending_audits.get(session_id)
+    if future is None:
+        return True
+    try:
+        future.result(timeout=timeout)
+    except FutureTimeoutError:
+        return False
+    _pending_audits.pop(session_id, None)
+    return True
+
+
+# dialogue en flux (SSE / WebSocket) : lecture provisoire et urgences avant le pipeline complet
+def _provisional_reading(text: str, session_data: Dict[str, Any]) -> Tuple[HeadacheCase, List[str]]:
+    """Lecture rapide d'un message par la seule couche règles (NLUv2), sans embedding.
+
+    Le résultat est fusionné à une copie du cas en cours : la session n'est
+    pas modifiée (handle_user_message reste seul à la mettre à jour).
+
+    Returns:
+        Tuple (cas provisoire, champs détectés dans le message)
+    """
+    current_case = session_data.get("current_case")
+    last_asked = session_data.get("last_asked_field")
+
+    # Réponse à la question précédente (oui/non/nombre) : nue, elle suffit
+    answer = None
+    if last_asked and current_case is not None:
+        answer = interpret_short_answer(text, last_asked)
+        if answer is not None and is_bare_answer(text):
+            return answer.apply(current_case), [last_asked] if not answer.uncertain else []
+
+    extracted_case, metadata = _get_hybrid_nlu(session_data.get("site")).rule_nlu.parse(text)
+    detected_fields = list(metadata.get("detected_fields", []))
+    if current_case is None:
+        if extracted_case.onset and extracted_case.profile == "unknown":
+            extracted_case = _infer_profile_from_onset(extracted_case)
+        return extracted_case, detected_fields
+    provisional_case = merge_cases(current_case, extracted_case)
+    if answer is not None and not answer.uncertain:
+        provisional_case = answer.apply(provisional_case)
+        if last_asked not in detected_fields:
+            detected_fields.append(last_asked)
+    return provisional_case, detected_fields
+
+
+def stream_user_message(
+    history: List[ChatMessage],
+    new_message: ChatMessage,
+    session_id: Optional[str] = None,
+    site: Optional[str] = None
+) -> Iterator[Tuple[str, Dict[str, Any]]]:
+    """Variante événementielle de handle_user_message pour les endpoints en flux.
+
+    Événements produits, dans l'ordre :
+    1. "provisional" : lecture règles seules (NLUv2) fusionnée au cas en cours
+    2. "emergency" : si la lecture provisoire remplit un critère d'urgence
+       (coup de tonnerre, fièvre + signes méningés...), avec la recommandation
+       des règles, avant la fin du pipeline hybride
+    3. "question" : prochaine question, déterminée sur la lecture provisoire
+       avant le pipeline hybride ("provisional": True); renvoyée après le
+       pipeline ("provisional": False) seulement si la lecture hybride la
+       change
+    4. "result" : réponse complète de handle_user_message (lecture hybride affinée)
+
+    Args:
+        history: Historique des messages de la conversation
+        new_message: Nouveau message de l'utilisateur
+        session_id: ID de session (optionnel)
+        site: Site hospitalier (voir handle_user_message)
+
+    Yields:
+        Tuples (nom de l'événement, données sérialisables en JSON)
+    """
+    started = time.perf_counter()
+    session_id, session_data = _session_for_message(history, session_id, site)
+    try:
+        yield from _stream_turn(session_id, session_data, new_message.content, started)
+    finally:
+        if _stateless_sessions:
+            reset_session(session_id)
+
+
+def _stream_turn(
+    session_id: str,
+    session_data: Dict[str, Any],
+    user_text: str,
+    started: float
+) -> Iterator[Tuple[str, Dict[str, Any]]]:
+    """Événements d'un tour (voir stream_user_message)."""
+    try:
+        provisional_case, detected_fields = _provisional_reading(user_text, session_data)
+    except Exception as e:
+        # La lecture provisoire est facultative : le pipeline complet reste la référence
+        log_error_with_context(e, "lecture provisoire", {"text_length": len(user_text)})
+        provisional_case = None
+
+    provisional_question = None
+    if provisional_case is not None:
+        yield "provisional", {
+            "session_id": session_id,
+            "detected_fields": detected_fields,
+            "headache_case": provisional_case.model_dump(mode="json"),
+        }
+        if provisional_case.is_emergency():
+            # Décision provisoire : pas d'entrée d'audit (le tour complet journalise la sienne)
+            yield "emergency", {
+                "session_id": session_id,
+                "reason": emergency_reason(provisional_case),
+                "imaging_recommendation": decide_imaging(
+                    provisional_case, _site_rules_path(session_data), audit=False
+                ).model_dump(mode="json"),
+            }
+        else:
+            # Question déterminée sur la lecture provisoire, avant le pipeline hybride
+            next_field, _, _ = _plan_next_field(session_data, provisional_case)
+            if next_field is not None:
+                provisional_question = generate_question_for_field(next_field, provisional_case)
+                yield "question", {"session_id": session_id, "question": provisional_question, "provisional": True}
+
+    response = _handle_turn(session_id, session_data, user_text, started)
+    if response.next_question and response.next_question != provisional_question:
+        # La lecture hybride change la question (ou aucune n'a été envoyée)
+        yield "question", {"session_id": session_id, "question": response.next_question, "provisional": False}
+    yield "result", response.model_dump(mode="json")
+
+
+# fonctions utilitaires pour le formatage
 def _build_clarification_message(
     extracted_case: HeadacheCase,
     metadata: Dict[str, Any],
@@ -714,7 +1255,7 @@ def _build_final_response_message(
     # Patterns spéciaux détectés grâce à l'embedding 
     if special_patterns:
         body += "Diagnostic différentiel suggéré (via analyse sémantique):\n"
-        for pattern in special_patterns:
+        for pattern in map(resolve_special_pattern, special_patterns):
             pattern_type = pattern.get("type", "unknown")
             description = pattern.get("description", "")
             similarity = pattern.get("similarity", 0.0)
@@ -770,12 +1311,66 @@ def reset_session(session_id: str) -> bool:
     Returns:
         True si session réinitialisée, False si session introuvable
     """
+    _pending_audits.pop(session_id, None)
     if session_id in _active_sessions:
         del _active_sessions[session_id]
         return True
     return False
 
 
+def export_session(session_id: str) -> bytes:
+    """Exporte une session en instantané binaire compact (session_snapshot).
+
+    Args:
+        session_id: ID de la session
+
+    Returns:
+        Instantané à passer à import_session (autre worker, persistance)
+
+    Raises:
+        SessionNotFoundError: Si la session est introuvable
+    """
+    wait_for_emergency_audit(session_id)
+    session_data = _active_sessions.get(session_id)
+    if session_data is None:
+        raise SessionNotFoundError(f"Session introuvable: {session_id}", session_id=session_id)
+    return pack_session(session_id, session_data)
+
+
+def import_session(snapshot: bytes, session_id: Optional[str] = None) -> str:
+    """Restaure une session exportée par export_session.
+
+    Les métadonnées d'extraction, stockées par référence au message analysé,
+    sont recalculées par le cache d'analyses.
+
+    Args:
+        snapshot: Instantané binaire
+        session_id: ID sous lequel restaurer (défaut : celui de l'instantané)
+
+    Returns:
+        ID de la session restaurée (une session existante est remplacée)
+
+    Raises:
+        ValidationError: Si l'instantané est invalide ou d'un autre schéma,
+            ou si son site est inconnu de ce worker
+    """
+    snapshot_id, session_data = unpack_session(snapshot)
+    get_nlu_registry().site(session_data.get("site"))
+    source = session_data.get("extraction_source")
+    if source is not None:
+        try:
+            _, session_data["extraction_metadata"] = _parse_cache.parse_free_text_to_case(
+                _get_hybrid_nlu(session_data.get("site")), source["text"], fields=source["fields"]
+            )
+        except Exception as e:
+            log_error_with_context(e, "import de session", {"text_length": len(source["text"])})
+            session_data["extraction_metadata"] = {"error": str(e), "overall_confidence": 0.0}
+    session_id = session_id or snapshot_id
+    _pending_audits.pop(session_id, None)
+    _active_sessions[session_id] = session_data
+    return session_id
+
+
 def get_session_info(session_id: str) -> Optional[Dict[str, Any]]:
     """Récupère les informations d'une session.
     
@@ -0,0 +1,357 @@
+"""Encodeurs de phrases interchangeables (sentence-transformers, ONNX Runtime, NumPy).
+
+SemanticVocabulary et HybridNLU instanciaient directement
+SentenceTransformer : PyTorch sur CPU, plusieurs centaines de Mo par worker.
+Ils passent désormais par create_embedder(), qui retourne un Embedder dont
+l'interface encode() est celle de SentenceTransformer (les appels existants
+ne changent pas) :
+
+    - "sentence-transformers" : modèle PyTorch d'origine (référence)
+    - "onnx" : modèle exporté par export_onnx(), quantifié int8 (quantification
+      dynamique), exécuté par ONNX Runtime avec le tokenizer rapide "tokenizers"
+    - "static" : table de vecteurs pré-calculée, pure NumPy; un mot = une
+      ligne, une expression = moyenne de ses mots (adapté aux jetons courts
+      de SemanticVocabulary, pas aux phrases du corpus d'exemples)
+
+Le backend est choisi par le paramètre embedding_backend, sinon par la
+variable d'environnement HEADACHE_EMBEDDING_BACKEND (défaut:
+sentence-transformers). Le modèle ou l'artefact (nom sentence-transformers,
+répertoire ONNX ou table .npz) est donné par embedding_model, sinon par
+HEADACHE_EMBEDDING_MODEL (défaut: all-MiniLM-L6-v2).
+
+Utilisation:
+    >>> export_onnx("all-MiniLM-L6-v2", "models/minilm-onnx")          # une fois, avec torch
+    >>> embedder = create_embedder("onnx", "models/minilm-onnx")         # en production, sans torch
+    >>> embedder.encode(["céphalée brutale"], convert_to_numpy=True).shape
+    (1, 384)
+"""
+
+import json
+import os
+import re
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Union
+
+import numpy as np
+
+# Dépendances optionnelles, une par backend
+try:
+    from sentence_transformers import SentenceTransformer
+    SENTENCE_TRANSFORMERS_AVAILABLE = True
+except ImportError:
+    SENTENCE_TRANSFORMERS_AVAILABLE = False
+
+try:
+    import onnxruntime
+    from tokenizers import Tokenizer
+    ONNX_AVAILABLE = True
+except ImportError:
+    ONNX_AVAILABLE = False
+
+
+# Variables d'environnement de sélection du backend et du modèle
+BACKEND_ENV_VAR = "HEADACHE_EMBEDDING_BACKEND"
+MODEL_ENV_VAR = "HEADACHE_EMBEDDING_MODEL"
+DEFAULT_BACKEND = "sentence-transformers"
+DEFAULT_MODEL = "all-MiniLM-L6-v2"
+
+# Fichiers d'un répertoire exporté par export_onnx
+ONNX_MODEL_FILE = "model.onnx"
+ONNX_QUANTIZED_FILE = "model_quantized.onnx"
+ONNX_TOKENIZER_FILE = "tokenizer.json"
+ONNX_CONFIG_FILE = "embedder.json"
+
+_WORD_RE = re.compile(r"[\w'-]+")
+
+
+# ==============================================================================
+# Interface commune
+# ==============================================================================
+
+class Embedder:
+    """Encodeur de textes en vecteurs (interface de SentenceTransformer.encode).
+
+    Attributes:
+        backend: Nom du backend ("sentence-transformers", "onnx", "static")
+        dimension: Dimension des vecteurs
+    """
+
+    backend = ""
+    dimension = 0
+
+    def encode(
+        self,
+        texts: Union[str, Sequence[str]],
+        convert_to_numpy: bool = True,
+        show_progress_bar: bool = False,
+        batch_size: int = 32
+    ) -> np.ndarray:
+        """Encode un texte (vecteur (d,)) ou une liste de textes (matrice (n, d))."""
+        single = isinstance(texts, str)
+        batch = [texts] if single else list(texts)
+        if not batch:
+            return np.zeros((0, self.dimension), dtype=np.float32)
+        vectors = np.vstack([
+            self._encode_batch(batch[start:start + batch_size])
+            for start in range(0, len(batch), batch_size)
+        ])
+        return vectors[0] if single else vectors
+
+    def _encode_batch(self, texts: List[str]) -> np.ndarray:
+        raise NotImplementedError
+
+
+def _l2_normalize(vectors: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    return (vectors / np.where(norms == 0, 1, norms)).astype(np.float32)
+
+
+# ==============================================================================
+# Backend PyTorch (référence)
+# ==============================================================================
+
+class SentenceTransformerEmbedder(Embedder):
+    """Modèle sentence-transformers d'origine (PyTorch)."""
+
+    backend = "sentence-transformers"
+
+    def __init__(self, model_name: str = DEFAULT_MODEL):
+        if not SENTENCE_TRANSFORMERS_AVAILABLE:
+            raise ImportError(
+                "sentence-transformers requis pour ce backend. "
+                "Installer avec: pip install sentence-transformers"
+            )
+        self.model = SentenceTransformer(model_name)
+        self.dimension = self.model.get_sentence_embedding_dimension()
+
+    def encode(self, texts, convert_to_numpy=True, show_progress_bar=False, batch_size=32):
+        return self.model.encode(
+            texts, convert_to_numpy=True, show_progress_bar=show_progress_bar, batch_size=batch_size
+        )
+
+
+# ==============================================================================
+# Backend ONNX Runtime (int8)
+# ==============================================================================
+
+class OnnxEmbedder(Embedder):
+    """Modèle exporté par export_onnx(), exécuté par ONNX Runtime sur CPU.
+
+    Reproduit le pipeline sentence-transformers de MiniLM : transformeur,
+    moyenne des états cachés pondérée par le masque d'attention, normalisation L2.
+
+    Args:
+        model_dir: Répertoire produit par export_onnx()
+        quantized: Utilise le modèle quantifié int8 s'il existe
+        threads: Threads intra-opération d'ONNX Runtime (défaut: runtime)
+    """
+
+    backend = "onnx"
+
+    def __init__(self, model_dir: Union[str, Path], quantized: bool = True, threads: Optional[int] = None):
+        if not ONNX_AVAILABLE:
+            raise ImportError(
+                "onnxruntime et tokenizers requis pour ce backend. "
+                "Installer avec: pip install onnxruntime tokenizers"
+            )
+        model_dir = Path(model_dir)
+        config = json.loads((model_dir / ONNX_CONFIG_FILE).read_text(encoding="utf-8"))
+        self.dimension = config["dimension"]
+        self.max_length = config.get("max_length", 256)
+        self.normalize = config.get("normalize", True)
+
+        model_file = model_dir / ONNX_QUANTIZED_FILE
+        if not quantized or not model_file.exists():
+            model_file = model_dir / ONNX_MODEL_FILE
+        options = onnxruntime.SessionOptions()
+        if threads:
+            options.intra_op_num_threads = threads
+        self.session = onnxruntime.InferenceSession(
+            str(model_file), options, providers=["CPUExecutionProvider"]
+        )
+        self.input_names = {node.name for node in self.session.get_inputs()}
+
+        self.tokenizer = Tokenizer.from_file(str(model_dir / ONNX_TOKENIZER_FILE))
+        self.tokenizer.enable_truncation(self.max_length)
+        self.tokenizer.enable_padding(pad_id=config.get("pad_id", 0), pad_token=config.get("pad_token", "[PAD]"))
+
+    def _encode_batch(self, texts: List[str]) -> np.ndarray:
+        encodings = self.tokenizer.encode_batch(texts)
+        inputs = {
+            "input_ids": np.array([e.ids for e in encodings], dtype=np.int64),
+            "attention_mask": np.array([e.attention_mask for e in encodings], dtype=np.int64),
+            "token_type_ids": np.array([e.type_ids for e in encodings], dtype=np.int64),
+        }
+        hidden = self.session.run(None, {name: value for name, value in inputs.items() if name in self.input_names})[0]
+        mask = inputs["attention_mask"][:, :, None].astype(np.float32)
+        pooled = (hidden * mask).sum(axis=1) / np.maximum(mask.sum(axis=1), 1e-9)
+        return _l2_normalize(pooled) if self.normalize else pooled.astype(np.float32)
+
+
+def export_onnx(
+    model_name: str,
+    output_dir: Union[str, Path],
+    quantize: bool = True,
+    max_length: int = 256
+) -> Path:
+    """Exporte un modèle sentence-transformers en ONNX (+ version int8).
+
+    À exécuter une fois sur une machine disposant de torch et
+    sentence-transformers; les workers n'ont ensuite besoin que
+    d'onnxruntime et tokenizers.
+
+    Args:
+        model_name: Modèle sentence-transformers
+        output_dir: Répertoire de sortie
+        quantize: Produit aussi model_quantized.onnx (quantification dynamique int8)
+        max_length: Longueur maximale des séquences (jetons)
+
+    Returns:
+        Répertoire de sortie
+    """
+    import torch
+    from onnxruntime.quantization import QuantType, quantize_dynamic
+
+    output_dir = Path(output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    model = SentenceTransformer(model_name, device="cpu")
+    transformer = model[0].auto_model.eval()
+    tokenizer = model.tokenizer
+
+    sample = tokenizer(["céphalée brutale"], return_tensors="pt")
+    names = [name for name in ("input_ids", "attention_mask", "token_type_ids") if name in sample]
+    dynamic_axes = {name: {0: "batch", 1: "sequence"} for name in names}
+    dynamic_axes["last_hidden_state"] = {0: "batch", 1: "sequence"}
+    torch.onnx.export(
+        transformer,
+        tuple(sample[name] for name in names),
+        str(output_dir / ONNX_MODEL_FILE),
+        input_names=names,
+        output_names=["last_hidden_state"],
+        dynamic_axes=dynamic_axes,
+        opset_version=14,
+    )
+    if quantize:
+        quantize_dynamic(
+            str(output_dir / ONNX_MODEL_FILE),
+            str(output_dir / ONNX_QUANTIZED_FILE),
+            weight_type=QuantType.QInt8,
+        )
+
+    tokenizer.backend_tokenizer.save(str(output_dir / ONNX_TOKENIZER_FILE))
+    config = {
+        "source_model": model_name,
+        "dimension": model.get_sentence_embedding_dimension(),
+        "max_length": max_length,
+        "normalize": any(type(module).__name__ == "Normalize" for module in model),
+        "pad_id": tokenizer.pad_token_id,
+        "pad_token": tokenizer.pad_token,
+    }
+    (output_dir / ONNX_CONFIG_FILE).write_text(json.dumps(config, indent=2), encoding="utf-8")
+    return output_dir
+
+
+# ==============================================================================
+# Backend statique (NumPy)
+# ==============================================================================
+
+class StaticEmbedder(Embedder):
+    """Table de vecteurs pré-calculés, sans modèle.
+
+    Un texte présent dans la table reçoit son vecteur exact; sinon, la
+    moyenne normalisée des vecteurs de ses mots connus (vecteur nul si aucun
+    mot n'est connu : similarité nulle, donc aucune correspondance).
+
+    Args:
+        tokens: Textes de la table
+        vectors: Vecteurs correspondants (n, d)
+    """
+
+    backend = "static"
+
+    def __init__(self, tokens: Sequence[str], vectors: np.ndarray):
+        self.vectors = _l2_normalize(np.asarray(vectors, dtype=np.float32))
+        self.index: Dict[str, int] = {token: row for row, token in enumerate(tokens)}
+        self.dimension = self.vectors.shape[1]
+
+    @classmethod
+    def from_embedder(cls, embedder: Embedder, tokens: Iterable[str]) -> "StaticEmbedder":
+        """Pré-calcule la table avec un autre encodeur (ex: sentence-transformers)."""
+        tokens = list(dict.fromkeys(tokens))
+        return cls(tokens, embedder.encode(tokens, convert_to_numpy=True))
+
+    @classmethod
+    def load(cls, path: Union[str, Path]) -> "StaticEmbedder":
+        """Charge une table sauvegardée par save()."""
+        with np.load(path, allow_pickle=False) as archive:
+            return cls(archive["tokens"].tolist(), archive["vectors"])
+
+    def save(self, path: Union[str, Path]) -> Path:
+        """Sauvegarde la table (.npz)."""
+        tokens = sorted(self.index, key=self.index.get)
+        np.savez(path, tokens=np.array(tokens), vectors=self.vectors)
+        return Path(path)
+
+    def _encode_batch(self, texts: List[str]) -> np.ndarray:
+        result = np.zeros((len(texts), self.dimension), dtype=np.float32)
+        for row, text in enumerate(texts):
+            key = text.strip().lower()
+            if key in self.index:
+                result[row] = self.vectors[self.index[key]]
+                continue
+            rows = [self.index[word] for word in _WORD_RE.findall(key) if word in self.index]
+            if rows:
+                result[row] = self.vectors[rows].mean(axis=0)
+        return _l2_normalize(result)
+
+
+# ==============================================================================
+# Sélection du backend
+# ==============================================================================
+
+EMBEDDER_BACKENDS: Dict[str, Callable[..., Embedder]] = {
+    "sentence-transformers": lambda model, **options: SentenceTransformerEmbedder(model, **options),
+    "onnx": lambda model, **options: OnnxEmbedder(model, **options),
+    "static": lambda model, **options: StaticEmbedder.load(model),
+}
+
+_BACKEND_AVAILABLE = {
+    "sentence-transformers": lambda: SENTENCE_TRANSFORMERS_AVAILABLE,
+    "onnx": lambda: ONNX_AVAILABLE,
+    "static": lambda: True,
+}
+
+
+def resolve_backend(backend: Optional[str] = None) -> str:
+    """Backend effectif : argument, sinon HEADACHE_EMBEDDING_BACKEND, sinon défaut.
+
+    Raises:
+        ValueError: Backend inconnu
+    """
+    backend = backend or os.environ.get(BACKEND_ENV_VAR) or DEFAULT_BACKEND
+    if backend not in EMBEDDER_BACKENDS:
+        raise ValueError(f"Backend d'embedding inconnu: {backend} (choix: {', '.join(EMBEDDER_BACKENDS)})")
+    return backend
+
+
+def embedder_available(backend: Optional[str] = None) -> bool:
+    """True si les dépendances du backend sont installées."""
+    return _BACKEND_AVAILABLE[resolve_backend(backend)]()
+
+
+def create_embedder(backend: Optional[str] = None, model: Optional[str] = None, **options) -> Embedder:
+    """Instancie l'encodeur du backend choisi.
+
+    Args:
+        backend: "sentence-transformers", "onnx" ou "static" (défaut: variable
+                 d'environnement HEADACHE_EMBEDDING_BACKEND, puis sentence-transformers)
+        model: Nom du modèle, répertoire ONNX ou table .npz selon le backend
+               (défaut: HEADACHE_EMBEDDING_MODEL, puis all-MiniLM-L6-v2)
+        **options: Options du backend (ex: quantized=False pour ONNX)
+
+    Raises:
+        ImportError: Dépendances du backend absentes
+        ValueError: Backend inconnu
+    """
+    model = model or os.environ.get(MODEL_ENV_VAR) or DEFAULT_MODEL
+    return EMBEDDER_BACKENDS[resolve_backend(backend)](model, **options)
@@ -0,0 +1,263 @@
+"""Pré-tri rapide des urgences vitales, avant le pipeline NLU complet.
+
+Chaque message traverse correction orthographique, n-grams, mots-clés,
+négations, NLUv2 et embedding avant que should_end_dialogue() ne constate
+une urgence (coup de tonnerre, fièvre + syndrome méningé). Le pré-tri
+répond en quelques microsecondes pour ces messages :
+
+    - un seul balayage regex du texte en minuscules, compilé à l'import
+      depuis le lexique hybride : n-grams du coup de tonnerre et termes de
+      fièvre / syndrome méningé de confiance >= SCREEN_MIN_CONFIDENCE,
+      formulations d'examen normal ("nuque souple", "apyrétique") valant
+      négation
+    - un terme dans une portée niée (negation.annotate_negations) est écarté
+    - prudence : le pré-tri s'abstient dès qu'une phrase contenant un terme
+      retenu contient un indice de négation, quelle que soit sa place
+      ("nie toute fièvre", "fièvre absente", "méningé négatif") : seul le
+      pipeline complet sait à quoi la négation se rapporte
+    - prudence : le pré-tri s'abstient si le texte évoque un antécédent ou
+      un délai passé en jours ou plus ("il y a 10 jours" : la mention peut
+      être ancienne) ou un contexte qui adapte l'imagerie (grossesse,
+      cancer) : le pipeline complet décide
+
+Le dialogue applique la recommandation des règles au cas pré-trié si elle
+est "immediate"; l'analyse complète termine en arrière-plan pour l'audit
+(dialogue.wait_for_emergency_audit). Les délais de décision des urgences
+(pré-tri / pipeline complet) sont suivis par EmergencyMetrics (/metrics).
+"""
+
+import re
+import threading
+from collections import deque
+from dataclasses import dataclass
+from typing import Any, Deque, Dict, List, Mapping, Optional, Tuple
+
+from .lexicon import CompiledLexicon
+from .models import HeadacheCase
+from .negation import annotate_negations
+from .nlu_hybrid import LEXICON
+
+
+# Confiance minimale d'un terme du lexique pour déclencher le pré-tri
+SCREEN_MIN_CONFIDENCE = 0.85
+
+# Valeurs recherchées par champ (les autres valeurs du lexique sont ignorées)
+SCREEN_FIELDS: Mapping[str, Any] = {"onset": "thunderclap", "fever": True, "meningeal_signs": True}
+
+# Urgences que le pré-tri peut conclure seul (emergency_reason)
+SCREEN_REASONS = frozenset({"emergency_thunderclap", "emergency_meningitis"})
+
+# Mentions qui rendent le pré-tri non concluant (antécédents, contextes adaptant l'imagerie)
+ABSTAIN_PATTERNS = [
+    r"ant[ée]c[ée]dents?", r"atcd", r"il\s+y\s+a\s+(?:\d+|une?|deux|trois|quelques|plusieurs)\s+(?:ans?|ann[ée]es?|mois|semaines?|jours?)", r"dans\s+le\s+pass[ée]",
+    r"enceinte", r"grossesse", r"post[\s-]?partum", r"accouch\w*", r"\d+\s*sa\b",
+    r"cancer\w*", r"n[ée]oplasi\w*", r"m[ée]tasta\w*", r"tumeur\w*",
+]
+
+# Indices de négation (verbe, adjectif postposé, négation préposée) : abstention
+NEGATION_CUE_PATTERNS = [
+    r"nie(?:nt|r|rait|ait)?", r"ni[ée]e?s?", r"absente?s?", r"absence", r"n[ée]gati(?:fs?|ves?)",
+    r"pas", r"sans", r"aucune?s?", r"ni", r"non", r"jamais", r"n['’]", r"ne", r"exclue?s?", r"[ée]limin[ée]e?s?",
+]
+_SENTENCE_END_RE = re.compile(r"[.;!?\n]")
+
+# Nombre de délais conservés par chemin de décision
+METRICS_WINDOW = 1024
+
+
+@dataclass(frozen=True)
+class ScreenHit:
+    """Terme repéré par le pré-tri.
+
+    Attributes:
+        field: Champ du cas
+        value: Valeur du champ
+        term: Terme du texte
+        start: Position du terme
+        confidence: Confiance du terme dans le lexique
+    """
+    field: str
+    value: Any
+    term: str
+    start: int
+    confidence: float
+
+
+@dataclass(frozen=True)
+class ScreenResult:
+    """Champs affirmés par le pré-tri (termes non niés).
+
+    Attributes:
+        fields: {champ: valeur} retenus
+        hits: Termes retenus
+    """
+    fields: Dict[str, Any]
+    hits: Tuple[ScreenHit, ...]
+
+    def apply(self, case: Optional[HeadacheCase]) -> HeadacheCase:
+        """Cas en cours complété des champs pré-triés (profil aigu si coup de tonnerre)."""
+        update = dict(self.fields)
+        if update.get("onset") == "thunderclap":
+            update["profile"] = "acute"
+        return (case or HeadacheCase()).model_copy(update=update)
+
+
+class EmergencyScreener:
+    """Balayage unique des termes d'urgence du lexique hybride.
+
+    Args:
+        lexicon: Lexique compilé (nlu_hybrid.LEXICON)
+        min_confidence: Confiance minimale d'un terme
+
+    Example:
+        >>> screener = get_emergency_screener()
+        >>> screener.screen("Céphalée en coup de tonnerre il y a 1 heure").fields
+        {'onset': 'thunderclap'}
+        >>> screener.screen("Pas de coup de tonnerre") is None
+        True
+    """
+
+    def __init__(self, lexicon: CompiledLexicon = LEXICON, min_confidence: float = SCREEN_MIN_CONFIDENCE):
+        terms: Dict[str, List[Tuple[str, Any, float]]] = {}
+        for entry in lexicon.ngrams:
+            for field, value in entry.fields.items():
+                if SCREEN_FIELDS.get(field) == value and entry.confidence >= min_confidence:
+                    terms.setdefault(entry.pattern.lower(), []).append((field, value, entry.confidence))
+        for keyword, matches in lexicon.keyword_index.items():
+            for match in matches:
+                if SCREEN_FIELDS.get(match["field"]) == match["value"] and match["weight"] >= min_confidence:
+                    terms.setdefault(keyword.lower(), []).append((match["field"], match["value"], match["weight"]))
+
+        self.terms = terms
+        self.exam_negations = lexicon.exam_negations
+        groups = "".join(
+            f"|(?P<exam{i}>{pattern})"
+            for i, (pattern, field) in enumerate(lexicon.exam_negations) if field in SCREEN_FIELDS
+        )
+        self._scanner = re.compile(
+            r"(?<!\w)(?:(?P<term>" + "|".join(re.escape(term) for term in sorted(terms, key=len, reverse=True))
+            + r")(?!\w)" + groups + ")"
+        )
+        self._abstain = re.compile(r"(?<!\w)(?:" + "|".join(ABSTAIN_PATTERNS) + ")")
+        self._negation_cue = re.compile(r"(?<!\w)(?:" + "|".join(NEGATION_CUE_PATTERNS) + r")(?:(?<=['’])|(?!\w))")
+
+    def screen(self, text: str) -> Optional[ScreenResult]:
+        """Champs d'urgence affirmés dans le texte.
+
+        Returns:
+            ScreenResult, ou None si aucun terme affirmé, si le texte
+            évoque un antécédent / un contexte adaptant l'imagerie, ou si
+            la phrase d'un terme retenu contient un indice de négation
+        """
+        # Motifs sensibles à la casse sur le texte en minuscules (deux fois plus rapide)
+        text = text.lower()
+        matches = list(self._scanner.finditer(text))
+        if not matches or self._abstain.search(text):
+            return None
+
+        scopes = annotate_negations(text)
+        hits = []
+        denied = set()
+        for match in matches:
+            if match.group("term") is None:
+                # Examen normal ("nuque souple", "apyrétique") : champ nié
+                index = int(next(name for name, value in match.groupdict().items() if value and name != "term")[4:])
+                denied.add(self.exam_negations[index][1])
+                continue
+            if scopes.is_negated(match.start()):
+                denied.update(field for field, _, _ in self.terms[match.group(0)])
+                continue
+            for field, value, confidence in self.terms[match.group(0)]:
+                hits.append(ScreenHit(field, value, match.group(0), match.start(), confidence))
+
+        hits = [hit for hit in hits if hit.field not in denied]
+        if not hits or any(self._negated_sentence(text, hit.start) for hit in hits):
+            return None
+        return ScreenResult(fields={hit.field: hit.value for hit in hits}, hits=tuple(hits))
+
+    def _negated_sentence(self, text: str, position: int) -> bool:
+        start = max(text.rfind(end, 0, position) for end in ".;!?\n") + 1
+        match = _SENTENCE_END_RE.search(text, position)
+        end = match.start() if match else len(text)
+        return self._negation_cue.search(text, start, end) is not None
+
+
+def emergency_reason(case: HeadacheCase) -> Optional[str]:
+    """Critère d'urgence rempli (mêmes critères que HeadacheCase.is_emergency), ou None.
+
+    Le pré-tri ne conclut que sur SCREEN_REASONS; le flux du dialogue
+    (stream_user_message) nomme toutes les urgences.
+    """
+    if case.onset == "thunderclap":
+        return "emergency_thunderclap"
+    if case.fever is True and case.meningeal_signs is True:
+        return "emergency_meningitis"
+    if case.htic_pattern is True and (case.neuro_deficit is True or case.seizure is True):
+        return "emergency_htic"
+    if case.neuro_deficit is True and case.profile == "acute":
+        return "emergency_neuro_deficit"
+    if case.seizure is True and case.profile == "acute":
+        return "emergency_seizure"
+    return None
+
+
+_screener: Optional[EmergencyScreener] = None
+
+
+def get_emergency_screener() -> EmergencyScreener:
+    """Pré-tri compilé sur le lexique hybride (singleton)."""
+    global _screener
+    if _screener is None:
+        _screener = EmergencyScreener()
+    return _screener
+
+
+# ==============================================================================
+# Délais de décision des urgences
+# ==============================================================================
+
+class EmergencyMetrics:
+    """Délais de décision des urgences, par chemin ("screen" ou "pipeline").
+
+    Compte aussi les analyses d'audit qui confirment (ou non) l'urgence
+    décidée par le pré-tri.
+    """
+
+    PATHS = ("screen", "pipeline")
+
+    def __init__(self, window: int = METRICS_WINDOW):
+        self._lock = threading.Lock()
+        self._delays: Dict[str, Deque[float]] = {path: deque(maxlen=window) for path in self.PATHS}
+        self._counts = {path: 0 for path in self.PATHS}
+        self.audits_confirmed = 0
+        self.audits_unconfirmed = 0
+
+    def record(self, path: str, seconds: float) -> None:
+        """Enregistre le délai d'une décision d'urgence."""
+        with self._lock:
+            self._delays[path].append(seconds)
+            self._counts[path] += 1
+
+    def record_audit(self, confirmed: bool) -> None:
+        """Enregistre le verdict de l'analyse complète d'une urgence pré-triée."""
+        with self._lock:
+            if confirmed:
+                self.audits_confirmed += 1
+            else:
+                self.audits_unconfirmed += 1
+
+    def stats(self) -> Dict[str, Any]:
+        """Délais (ms) par chemin sur la fenêtre récente, et verdicts d'audit."""
+        with self._lock:
+            result: Dict[str, Any] = {}
+            for path in self.PATHS:
+                delays = sorted(self._delays[path])
+                result[path] = {
+                    "count": self._counts[path],
+                    "mean_ms": 1000 * sum(delays) / len(delays) if delays else 0.0,
+                    "p50_ms": 1000 * delays[len(delays) // 2] if delays else 0.0,
+                    "p95_ms": 1000 * delays[min(len(delays) - 1, int(0.95 * len(delays)))] if delays else 0.0,
+                    "max_ms": 1000 * delays[-1] if delays else 0.0,
+                }
+            result["audits"] = {"confirmed": self.audits_confirmed, "unconfirmed": self.audits_unconfirmed}
+            return result
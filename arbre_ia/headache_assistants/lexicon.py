@@ -0,0 +1,202 @@
+"""Lexique compilé des détecteurs de la couche hybride.
+
+Les tables de nlu_hybrid (SYMPTOM_TO_FIELD, formulations d'examen normal,
+NGRAM_PATTERNS, KEYWORD_INDEX, CRITICAL_MEDICAL_TERMS) restent la source
+éditable. compile_lexicon() les transforme une fois, à l'import, en un
+artefact immuable que tous les détecteurs lisent :
+
+    - négations : termes niables (entrées None écartées), rangs de priorité,
+      index par initiale et expression régulière de balayage unique
+    - n-grams : entrées figées dans l'ordre de la table
+    - mots-clés : index figé et motif \\bmot\\b précompilé par mot-clé
+    - correction orthographique : ensemble des mots connus (test O(1)) et,
+      pour chaque longueur de mot, les termes candidats (écart de longueur
+      <= 3) dans l'ordre de CRITICAL_MEDICAL_TERMS
+
+L'artefact porte une version "<format>+<SHA-256 des tables>" reportée dans
+les métadonnées de HybridNLU.parse_hybrid : deux analyses de même version
+ont utilisé exactement le même lexique.
+"""
+
+import hashlib
+import json
+import re
+from dataclasses import dataclass, field
+from types import MappingProxyType
+from typing import Any, Dict, Mapping, Optional, Sequence, Tuple
+
+
+# Version du format de l'artefact (à incrémenter si la compilation change)
+LEXICON_FORMAT_VERSION = "1"
+
+# Écart de longueur maximal entre un mot et un terme candidat à la correction
+FUZZY_MAX_LENGTH_GAP = 3
+
+
+@dataclass(frozen=True)
+class NgramEntry:
+    """Expression composée de NGRAM_PATTERNS.
+
+    Attributes:
+        pattern: Expression (minuscules)
+        fields: Champs à appliquer
+        confidence: Confiance de l'expression
+        category: Catégorie clinique
+        note: Note explicative
+    """
+    pattern: str
+    fields: Mapping[str, Any]
+    confidence: float
+    category: str
+    note: Optional[str] = None
+
+
+@dataclass(frozen=True)
+class CompiledLexicon:
+    """Artefact immuable et versionné des détecteurs hybrides.
+
+    Attributes:
+        version: "<format>+<12 premiers caractères du SHA-256 des tables>"
+        sha256: Empreinte complète des tables sources
+        symptom_to_field: Terme -> champ (termes niables uniquement)
+        negation_terms: Termes niables, dans l'ordre de priorité
+        negation_rank: Terme -> rang de priorité
+        terms_by_initial: Initiale -> termes niables commençant par elle
+        exam_negations: (motif, champ) des formulations d'examen normal
+        exam_groups: Nom de groupe de chaque formulation dans negation_scanner
+        negation_scanner: Balayage unique termes niables | examens normaux
+        ngrams: Expressions composées, dans l'ordre de la table
+        keyword_index: Mot-clé -> correspondances
+        keyword_patterns: Mot-clé -> motif \\bmot-clé\\b compilé
+        fuzzy_terms: Termes de référence de la correction orthographique
+        known_words: Mots à ne jamais corriger (mots-clés + termes de référence)
+        fuzzy_candidates: Longueur de mot -> termes candidats
+    """
+    version: str
+    sha256: str
+    symptom_to_field: Mapping[str, str] = field(repr=False)
+    negation_terms: Tuple[str, ...] = field(repr=False)
+    negation_rank: Mapping[str, int] = field(repr=False)
+    terms_by_initial: Mapping[str, Tuple[str, ...]] = field(repr=False)
+    exam_negations: Tuple[Tuple[str, str], ...] = field(repr=False)
+    exam_groups: Tuple[str, ...] = field(repr=False)
+    negation_scanner: "re.Pattern[str]" = field(repr=False)
+    ngrams: Tuple[NgramEntry, ...] = field(repr=False)
+    keyword_index: Mapping[str, Tuple[Dict[str, Any], ...]] = field(repr=False)
+    keyword_patterns: Mapping[str, "re.Pattern[str]"] = field(repr=False)
+    fuzzy_terms: Tuple[str, ...] = field(repr=False)
+    known_words: frozenset = field(repr=False)
+    fuzzy_candidates: Mapping[int, Tuple[str, ...]] = field(repr=False)
+
+    def fuzzy_candidates_for(self, word: str) -> Tuple[str, ...]:
+        """Termes dont la longueur est compatible avec le mot (ordre de la table)."""
+        return self.fuzzy_candidates.get(len(word), ())
+
+
+def lexicon_hash(
+    symptom_to_field: Mapping[str, Optional[str]],
+    exam_negations: Sequence[Tuple[str, str]],
+    ngram_patterns: Mapping[str, Mapping[str, Any]],
+    keyword_index: Mapping[str, Sequence[Mapping[str, Any]]],
+    critical_terms: Sequence[str]
+) -> str:
+    """SHA-256 des tables sources (l'ordre des entrées compte : il fixe les priorités)."""
+    payload = json.dumps(
+        [
+            list(symptom_to_field.items()),
+            [list(entry) for entry in exam_negations],
+            list(ngram_patterns.items()),
+            list(keyword_index.items()),
+            list(critical_terms),
+        ],
+        ensure_ascii=False, sort_keys=True, default=str
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def compile_lexicon(
+    symptom_to_field: Mapping[str, Optional[str]],
+    exam_negations: Sequence[Tuple[str, str]],
+    ngram_patterns: Mapping[str, Mapping[str, Any]],
+    keyword_index: Mapping[str, Sequence[Mapping[str, Any]]],
+    critical_terms: Sequence[str]
+) -> CompiledLexicon:
+    """Compile les tables des détecteurs hybrides.
+
+    Args:
+        symptom_to_field: Terme -> champ niable (None : terme sans champ, écarté)
+        exam_negations: (motif regex, champ) des formulations d'examen normal
+        ngram_patterns: Expression -> {"fields", "confidence", "category", "note"}
+        keyword_index: Mot-clé -> liste de {"field", "value", "weight", "note"}
+        critical_terms: Termes de référence de la correction orthographique
+
+    Returns:
+        Lexique compilé
+    """
+    sha256 = lexicon_hash(symptom_to_field, exam_negations, ngram_patterns, keyword_index, critical_terms)
+
+    # Négations : un seul balayage, termes du plus long au plus court
+    negatable = {term: name for term, name in symptom_to_field.items() if name is not None}
+    negation_terms = tuple(negatable)
+    exam_groups = tuple(f"exam{i}" for i in range(len(exam_negations)))
+    negation_scanner = re.compile(
+        r"(?<!\w)(?P<term>" + "|".join(re.escape(term) for term in sorted(negation_terms, key=len, reverse=True)) + ")"
+        + "".join(f"|(?P<{group}>{pattern})" for group, (pattern, _) in zip(exam_groups, exam_negations)),
+        re.IGNORECASE
+    )
+    terms_by_initial = {
+        initial: tuple(term for term in negation_terms if term[0] == initial)
+        for initial in {term[0] for term in negation_terms}
+    }
+
+    ngrams = tuple(
+        NgramEntry(
+            pattern=pattern,
+            fields=info["fields"],
+            confidence=info["confidence"],
+            category=info.get("category", "unknown"),
+            note=info.get("note"),
+        )
+        for pattern, info in ngram_patterns.items()
+    )
+
+    # Correction orthographique : candidats par longueur de mot
+    fuzzy_terms = tuple(critical_terms)
+    lengths = {len(term) for term in fuzzy_terms}
+    fuzzy_candidates: Dict[int, Tuple[str, ...]] = {}
+    for length in range(1, max(lengths, default=0) + FUZZY_MAX_LENGTH_GAP + 1):
+        candidates = tuple(term for term in fuzzy_terms if abs(length - len(term)) <= FUZZY_MAX_LENGTH_GAP)
+        if candidates:
+            fuzzy_candidates[length] = candidates
+
+    return CompiledLexicon(
+        version=f"{LEXICON_FORMAT_VERSION}+{sha256[:12]}",
+        sha256=sha256,
+        symptom_to_field=MappingProxyType(negatable),
+        negation_terms=negation_terms,
+        negation_rank=MappingProxyType({term: rank for rank, term in enumerate(negation_terms)}),
+        terms_by_initial=MappingProxyType(terms_by_initial),
+        exam_negations=tuple((pattern, name) for pattern, name in exam_negations),
+        exam_groups=exam_groups,
+        negation_scanner=negation_scanner,
+        ngrams=ngrams,
+        keyword_index=MappingProxyType({keyword: tuple(entries) for keyword, entries in keyword_index.items()}),
+        keyword_patterns=MappingProxyType({
+            keyword: re.compile(r"\b" + re.escape(keyword) + r"\b") for keyword in keyword_index
+        }),
+        fuzzy_terms=fuzzy_terms,
+        known_words=frozenset(keyword_index) | frozenset(fuzzy_terms),
+        fuzzy_candidates=MappingProxyType(fuzzy_candidates),
+    )
+
+
+def lexicon_summary(lexicon: CompiledLexicon) -> Dict[str, Any]:
+    """Tailles des sections du lexique (diagnostic)."""
+    return {
+        "version": lexicon.version,
+        "negation_terms": len(lexicon.negation_terms),
+        "exam_negations": len(lexicon.exam_negations),
+        "ngrams": len(lexicon.ngrams),
+        "keywords": len(lexicon.keyword_index),
+        "fuzzy_terms": len(lexicon.fuzzy_terms),
+    }
@@ -120,7 +120,8 @@ def log_medical_decision(
     rule_matched: Optional[str] = None,
     confidence: float = 0.0,
     urgency: Optional[str] = None,
-    extra_data: Optional[Dict[str, Any]] = None
+    extra_data: Optional[Dict[str, Any]] = None,
+    rules_version: Optional[str] = None
 ) -> None:
     """Log une décision médicale pour l'audit trail.
 
@@ -134,6 +135,7 @@ def log_medical_decision(
         confidence: Score de confiance de la décision (0-1)
         urgency: Niveau d'urgence (emergency, urgent, routine)
         extra_data: Données supplémentaires pour l'audit
+        rules_version: Version du jeu de règles appliqué (rules_registry)
     """
     logger = get_logger()
 
@@ -141,6 +143,7 @@ def log_medical_decision(
         "case_id": case_id,
         "decision": decision,
         "rule_matched": rule_matched,
+        "rules_version": rules_version,
         "confidence": confidence,
         "urgency": urgency,
         "timestamp": datetime.utcnow().isoformat(),
@@ -0,0 +1,235 @@
+"""Détection par segments des notes cliniques très longues (mode opt-in de NLUv2).
+
+Les comptes rendus d'hospitalisation ou les dossiers collés en bloc peuvent
+atteindre plusieurs centaines de Ko. Le coût des détecteurs du vocabulaire
+médical croît avec la longueur du texte; au-delà d'un seuil, NLUv2 peut
+répartir ce travail sur un pool de threads ou de processus (mode opt-in :
+un pool ET un seuil, voir LONG_TEXT_THRESHOLD) :
+
+    - le texte normalisé (MedicalVocabulary.normalize_text) est découpé en
+      segments de ~CHUNK_CHARS caractères, aux frontières de phrases, avec
+      recouvrement d'une phrase pour ne pas couper une mention à la frontière
+    - chaque segment passe par les détecteurs du vocabulaire (detect_*) dans
+      un worker; les détecteurs sont insensibles à la normalisation
+    - fusion : pour chaque détecteur, la détection retenue est celle dont la
+      priorité temporelle (extract_temporal_priority sur le texte complet)
+      est la plus haute, puis la plus tardive dans le texte — la mention la
+      plus récente de l'histoire clinique l'emporte
+
+Différence avec le parse séquentiel : sur le texte complet, chaque détecteur
+applique sa propre préséance (ordre du vocabulaire pour detect_onset, nombre
+de termes pour detect_headache_location, négation d'abord pour detect_fever
+sans marqueur temporel...). Quand un champ a des mentions contradictoires
+dans des segments différents, les deux chemins peuvent retenir des valeurs
+différentes; avec une seule mention par champ, ou des mentions concordantes,
+le cas est identique (test_long_text.TestChunkedParse).
+
+Les étapes regex globales de NLUv2 (âge, sexe, durée, intensité, profils)
+restent calculées sur le texte complet.
+"""
+
+import re
+from concurrent.futures import Executor
+from functools import lru_cache
+from itertools import repeat
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from .medical_vocabulary import DetectionResult, MedicalVocabulary
+
+
+# Longueur (caractères) à partir de laquelle NLUv2 passe en mode segmenté.
+# Aucun seuil par défaut : sur l'hôte du benchmark (python -m benchmarks run
+# --filter long_text), les modes thread et process sont plus lents que le
+# parse séquentiel à toutes les tailles mesurées (100 Ko : 0,58 s séquentiel,
+# 0,94 s thread, 0,87 s process; 1 Mo : 9,0 s, 11,9 s, 10,7 s). Le seuil se
+# calibre sur la machine cible multi-cœurs avec ce benchmark : plus petite
+# taille où le mode process bat le séquentiel, passée à
+# NLUv2(long_text_threshold=...).
+LONG_TEXT_THRESHOLD: Optional[int] = None
+
+# Taille cible d'un segment (caractères du texte normalisé)
+CHUNK_CHARS = 4_000
+
+# Nombre de phrases reprises au début du segment suivant
+CHUNK_OVERLAP_SENTENCES = 1
+
+# Phrases du texte normalisé (les sauts de ligne y sont déjà réduits en espaces)
+_SENTENCE_RE = re.compile(r"[^.!?;]+[.!?;]*")
+
+
+# ==============================================================================
+# Découpage
+# ==============================================================================
+
+def _sentence_spans(text: str, max_chars: int) -> List[Tuple[int, int]]:
+    """Bornes (début, fin) des phrases; une phrase trop longue est coupée aux espaces."""
+    spans = []
+    for match in _SENTENCE_RE.finditer(text):
+        start, end = match.start(), match.end()
+        while start < end and text[start] == " ":
+            start += 1
+        while end - start > max_chars:
+            cut = text.rfind(" ", start + 1, start + max_chars)
+            if cut <= start:
+                cut = start + max_chars
+            spans.append((start, cut))
+            start = cut
+            while start < end and text[start] == " ":
+                start += 1
+        if start < end:
+            spans.append((start, end))
+    return spans
+
+
+def split_chunks(
+    text: str,
+    max_chars: int = CHUNK_CHARS,
+    overlap: int = CHUNK_OVERLAP_SENTENCES
+) -> List[Tuple[int, str]]:
+    """Découpe un texte normalisé en segments chevauchants.
+
+    Args:
+        text: Texte normalisé
+        max_chars: Taille maximale d'un segment (sauf phrase unique plus longue)
+        overlap: Nombre de phrases répétées en tête du segment suivant
+
+    Returns:
+        Liste de (position du segment dans le texte, segment)
+    """
+    spans = _sentence_spans(text, max_chars)
+    chunks: List[Tuple[int, str]] = []
+    current: List[Tuple[int, int]] = []
+    for span in spans:
+        if current and span[1] - current[0][0] > max_chars:
+            chunks.append((current[0][0], text[current[0][0]:current[-1][1]]))
+            current = current[-overlap:] if overlap > 0 else []
+            # Le recouvrement ne doit pas à lui seul dépasser la taille cible
+            while current and span[1] - current[0][0] > max_chars:
+                current.pop(0)
+        current.append(span)
+    if current:
+        chunks.append((current[0][0], text[current[0][0]:current[-1][1]]))
+    return chunks
+
+
+# ==============================================================================
+# Détection par segment (exécutée dans les workers)
+# ==============================================================================
+
+@lru_cache(maxsize=1)
+def _worker_vocabulary() -> MedicalVocabulary:
+    """Vocabulaire médical du worker (un par processus)."""
+    return MedicalVocabulary()
+
+
+def detect_chunk(chunk: str, detectors: Sequence[str]) -> Dict[str, Tuple[DetectionResult, int]]:
+    """Applique les détecteurs à un segment.
+
+    Fonction de module (sérialisable) pour ProcessPoolExecutor.
+
+    Returns:
+        {détecteur: (résultat, position de matched_term dans le segment)}
+        pour les seuls détecteurs positifs
+    """
+    vocab = _worker_vocabulary()
+    found = {}
+    for name in detectors:
+        result = getattr(vocab, name)(chunk)
+        if result.detected:
+            position = chunk.find(vocab.normalize_text(result.matched_term)) if result.matched_term else -1
+            found[name] = (result, max(position, 0))
+    return found
+
+
+# ==============================================================================
+# Fusion
+# ==============================================================================
+
+class ChunkedDetections:
+    """Résultats fusionnés, exposés avec l'interface detect_* de MedicalVocabulary.
+
+    Le texte passé aux méthodes est ignoré : les résultats ont été calculés
+    sur les segments du texte complet.
+    """
+
+    def __init__(self, results: Dict[str, DetectionResult], chunk_count: int):
+        self.results = results
+        self.chunk_count = chunk_count
+
+    def __getattr__(self, name: str):
+        results = self.__dict__.get("results", {})
+        if name not in results:
+            raise AttributeError(name)
+        return lambda text: results[name]
+
+
+def merge_detections(
+    vocab: MedicalVocabulary,
+    text: str,
+    chunks: Sequence[Tuple[int, str]],
+    chunk_results: Sequence[Dict[str, Tuple[DetectionResult, int]]],
+    detectors: Sequence[str]
+) -> Dict[str, DetectionResult]:
+    """Fusionne les détections des segments (priorité temporelle puis position).
+
+    Cette préséance commune remplace celle, propre à chaque détecteur, du
+    parse séquentiel (voir la docstring du module).
+
+    Args:
+        vocab: Vocabulaire médical (marqueurs temporels)
+        text: Texte normalisé complet
+        chunks: Segments (position, segment) issus de split_chunks
+        chunk_results: Sorties de detect_chunk, dans l'ordre des segments
+        detectors: Détecteurs à fusionner
+
+    Returns:
+        {détecteur: résultat retenu}; DetectionResult négatif si aucun segment
+    """
+    markers = vocab.extract_temporal_priority(text)
+    merged = {}
+    for name in detectors:
+        best = None
+        for (offset, _), found in zip(chunks, chunk_results):
+            if name not in found:
+                continue
+            result, position = found[name]
+            position += offset
+            rank = (vocab._get_temporal_priority_at_position(text, position, markers), position)
+            if best is None or rank > best[0]:
+                best = (rank, result)
+        merged[name] = best[1] if best else DetectionResult(detected=False, value=None, confidence=0.0)
+    return merged
+
+
+def detect_long_text(
+    vocab: MedicalVocabulary,
+    text: str,
+    detectors: Sequence[str],
+    executor: Optional[Executor] = None,
+    max_chars: int = CHUNK_CHARS,
+    workers: int = 1
+) -> ChunkedDetections:
+    """Détecteurs du vocabulaire appliqués par segments, en parallèle si un pool est fourni.
+
+    Args:
+        vocab: Vocabulaire médical (normalisation et fusion)
+        text: Texte brut complet
+        detectors: Noms des méthodes detect_* à appliquer
+        executor: Pool de threads ou de processus (None : séquentiel)
+        max_chars: Taille cible des segments
+        workers: Nombre de workers du pool (taille des lots envoyés)
+
+    Returns:
+        ChunkedDetections utilisable à la place du vocabulaire
+    """
+    text_norm = vocab.normalize_text(text)
+    chunks = split_chunks(text_norm, max_chars=max_chars)
+    segments = [chunk for _, chunk in chunks]
+    detectors = tuple(detectors)
+    if executor is None:
+        chunk_results = [detect_chunk(segment, detectors) for segment in segments]
+    else:
+        chunksize = max(1, len(segments) // (4 * max(workers, 1)))
+        chunk_results = list(executor.map(detect_chunk, segments, repeat(detectors), chunksize=chunksize))
+    merged = merge_detections(vocab, text_norm, chunks, chunk_results, detectors)
+    return ChunkedDetections(merged, chunk_count=len(chunks))
@@ -17,7 +17,8 @@ IMPORTANT - Principes de rédaction des exemples:
        vaut avoir des exemples propres dès le départ.
 """
 
-from typing import List, Dict, Any
+import hashlib
+from typing import List, Dict, Any, Optional
 
 # Corpus d'exemples médicaux annotés
 MEDICAL_EXAMPLES: List[Dict[str, Any]] = [
@@ -1045,6 +1046,25 @@ def get_examples_by_field(field: str, value: Any = True) -> List[Dict[str, Any]]
     return [ex for ex in MEDICAL_EXAMPLES if ex.get(field) == value]
 
 
+def example_id(example: Dict[str, Any]) -> str:
+    """Identifiant stable d'un exemple (empreinte de son texte).
+
+    Les métadonnées d'analyse référencent les exemples par cet identifiant
+    plutôt que de copier leur texte et leurs annotations; il ne dépend pas
+    de la position de l'exemple dans le corpus.
+    """
+    return "ex-" + hashlib.sha1(example["text"].encode("utf-8")).hexdigest()[:10]
+
+
+# Index des exemples par identifiant
+EXAMPLES_BY_ID: Dict[str, Dict[str, Any]] = {example_id(ex): ex for ex in MEDICAL_EXAMPLES}
+
+
+def get_example(example_ref: str) -> Optional[Dict[str, Any]]:
+    """Exemple du corpus correspondant à un identifiant (None si inconnu)."""
+    return EXAMPLES_BY_ID.get(example_ref)
+
+
 def get_all_texts() -> List[str]:
     """Retourne tous les textes du corpus."""
     return [ex["text"] for ex in MEDICAL_EXAMPLES]
@@ -16,6 +16,8 @@ from enum import Enum
 import re
 import unicodedata
 
+from .negation import annotate_negations
+
 
 class ConceptCategory(Enum):
     """Catégories de concepts médicaux."""
@@ -864,26 +866,14 @@ class MedicalVocabulary:
         text_norm = self.normalize_text(text)
         negation_norm = self.normalize_text(negation_term)
 
-        # Marqueurs d'exception
-        exception_markers = ["mais", "cependant", "toutefois", "sauf", "excepte"]
-
         # Trouver la position de la négation
         negation_pos = text_norm.find(negation_norm)
         if negation_pos == -1:
             return False
 
-        # Extraire le texte après la négation
-        text_after_negation = text_norm[negation_pos + len(negation_norm):]
-
-        # Chercher un marqueur d'exception dans les 100 premiers caractères suivants
+        # Marqueur d'exception dans les 100 caractères suivants
         # (limite raisonnable pour considérer que l'exception suit la négation)
-        search_window = text_after_negation[:100]
-
-        for marker in exception_markers:
-            if marker in search_window:
-                return True
-
-        return False
+        return annotate_negations(text_norm).exception_follows(negation_pos + len(negation_norm))
 
     def extract_temporal_priority(self, text: str) -> Dict[str, int]:
         """Extrait les marqueurs temporels et leur priorité.
@@ -1068,10 +1058,9 @@ class MedicalVocabulary:
         temporal_markers = self.extract_temporal_priority(text)
         has_temporal_evolution = len(temporal_markers) > 0
 
-        # Vérifier si présence de marqueur d'exception (mais)
-        has_exception_marker_in_text = any(
-            marker in text_norm for marker in ["mais", "cependant", "toutefois"]
-        )
+        # Portées de négation (annotation partagée) et marqueurs d'exception (mais)
+        scopes = annotate_negations(text_norm)
+        has_exception_marker_in_text = scopes.has_exception_marker
 
         # Si évolution temporelle détectée, chercher toutes les occurrences
         # et prioriser la plus récente
@@ -1105,14 +1094,12 @@ class MedicalVocabulary:
             for term in vocab_true.get("canonical", []) + vocab_true.get("acronyms", []) + vocab_true.get("synonyms", []):
                 term_norm = self.normalize_text(term)
                 if term_norm in text_norm:
-                    # Vérifier qu'il n'est pas précédé par une négation
-                    negation_pattern = r'(?:pas de |sans |aucun[e]? |absence de |non )' + re.escape(term_norm)
-                    if re.search(negation_pattern, text_norm):
-                        # C'est une négation, ne pas ajouter comme positif
+                    # Ignorer les occurrences dans une portée de négation
+                    pos = scopes.first_affirmed(term_norm)
+                    if pos < 0:
                         continue
                     pattern = r'(?<![a-z])' + re.escape(term_norm)
                     if re.search(pattern, text_norm):
-                        pos = text_norm.find(term_norm)
                         positive_detections.append({
                             "result": DetectionResult(
                                 detected=True,
@@ -1204,11 +1191,9 @@ class MedicalVocabulary:
             # Éviter faux positifs: "féb" isolé mais pas dans "afébrile"
             term_norm = self.normalize_text(term)
             if term_norm in text_norm:
-                # Vérifier qu'il n'est pas précédé par une négation
-                # Patterns de negation: "pas de X", "sans X", "aucun X", "absence de X"
-                negation_pattern = r'(?:pas de |sans |aucun[e]? |absence de |non )' + re.escape(term_norm)
-                if re.search(negation_pattern, text_norm):
-                    # C'est une négation, ne pas matcher comme positif
+                # Ignorer les occurrences dans une portée de négation
+                # ("pas de X", "sans X", "aucun X", "absence de X"...)
+                if scopes.first_affirmed(term_norm) < 0:
                     continue
                 # Vérifier qu'il n'est pas précédé de "a" (pour afébrile)
                 pattern = r'(?<![a-z])' + re.escape(term_norm)
@@ -1305,10 +1290,8 @@ class MedicalVocabulary:
         for sign in vocab_true.get("clinical_signs", []):
             sign_norm = self.normalize_text(sign)
             if sign_norm in text_norm:
-                # Vérifier qu'il n'est pas précédé par une négation
-                negation_pattern = r'(?:pas de |sans |aucun[e]? |absence de |non )' + re.escape(sign_norm)
-                if re.search(negation_pattern, text_norm):
-                    # C'est une négation, ne pas matcher comme positif
+                # Ignorer les occurrences dans une portée de négation
+                if annotate_negations(text_norm).first_affirmed(sign_norm) < 0:
                     continue
                 return DetectionResult(
                     detected=True,
@@ -861,6 +861,15 @@ class ImagingRecommendation(BaseModel):
         )
     )
 
+    rules_version: Optional[str] = Field(
+        default=None,
+        description=(
+            "Version of the rules snapshot that produced this recommendation "
+            "(see rules_registry). Together with applied_rule_id, identifies "
+            "exactly which rule text was applied, even across hot reloads."
+        )
+    )
+
     @field_validator('imaging')
     @classmethod
     def validate_imaging_list(cls, v: List[str]) -> List[str]:
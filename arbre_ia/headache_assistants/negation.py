@@ -0,0 +1,251 @@
+"""Annotation des portées de négation (style NegEx), partagée par les détecteurs.
+
+La négation était traitée trois fois, chaque couche avec ses propres
+balayages : patterns False de detect_pattern (nlu_base), préfixes
+"(?:pas de |sans |...)" reconstruits dans chaque MedicalVocabulary.detect_*,
+et detect_negations du NLU hybride. Ce module calcule une seule fois par
+texte les portées niées, puis répond en O(1) à "cette position est-elle
+niée ?".
+
+Modèle (NegEx simplifié):
+    - un indice de négation ("pas de", "sans", "aucun", "absence de", "ni"...)
+      ouvre une portée juste après lui
+    - la portée couvre le premier concept nié : son nom, ses adjectifs et ses
+      compléments ("raideur de nuque", "céphalée brutale"), au plus
+      MAX_SCOPE_TOKENS mots; elle s'arrête avant un second terme clinique,
+      un verbe ou un sujet ("sans antécédent fièvre 39°C" ne nie pas la
+      fièvre), une ponctuation, une conjonction ("et", "avec", "puis") ou
+      un marqueur d'exception ("mais", "cependant", "toutefois", "sauf",
+      "excepté")
+    - "non" ne nie que le mot qui le suit ("non fébrile"), et rien pour les
+      mots de NON_STOP_WORDS ("non fumeur", "non il...")
+    - "sans déficit, mais hémiparésie" : hémiparésie est hors portée
+
+Dans le doute, la portée est courte : un red flag présent marqué nié est
+l'erreur la plus grave pour le triage.
+
+Les indices tolèrent l'absence d'accents : le même annotateur sert le texte
+brut (NLU hybride), le texte en minuscules (detect_pattern) et le texte
+normalisé sans accents (MedicalVocabulary). Les annotations sont mises en
+cache par texte : tous les détecteurs d'un même message partagent un seul
+balayage par représentation du texte.
+
+Utilisation:
+    >>> scopes = annotate_negations("pas de fièvre, raideur de nuque")
+    >>> scopes.is_negated(7)   # "fièvre"
+    True
+    >>> scopes.is_negated(15)  # "raideur"
+    False
+"""
+
+import re
+import unicodedata
+from bisect import bisect_right
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import List, Optional, Tuple
+
+
+def _base_form(token: str) -> str:
+    """Mot en minuscules, sans accents ni marque du pluriel ("Céphalées" -> "cephalee")."""
+    word = unicodedata.normalize("NFKD", token.lower()).encode("ascii", "ignore").decode("ascii")
+    if len(word) > 3 and word[-1] in "sx":
+        word = word[:-1]
+    return word
+
+
+# Nombre maximal de mots couverts par une portée (fenêtre NegEx)
+MAX_SCOPE_TOKENS = 5
+
+# Noms de concepts cliniques (sans accents, au singulier) : un second concept ferme la portée;
+# les adjectifs ("méningé", "moteur", "fébrile") restent dans la portée du concept nié
+CLINICAL_TERMS = frozenset(map(_base_form, {
+    "fievre", "temperature", "hyperthermie", "raideur", "syndrome", "meningite",
+    "deficit", "paralysie", "hemiparesie", "paresie", "faiblesse", "engourdissement", "fourmillement",
+    "convulsion", "crise", "epilepsie", "vomissement", "nausee", "photophobie", "phonophobie",
+    "cephalee", "douleur", "mal", "migraine", "traumatisme", "choc", "chute", "cancer", "tumeur",
+    "metastase", "grossesse", "enceinte", "post-partum", "confusion", "trouble", "diplopie", "vision",
+    "aura", "syncope", "perte", "antecedent", "traitement", "hypertension", "hta", "immunodepression",
+    "vih", "anticoagulant", "oedeme", "somnolence", "coma", "vertige",
+}))
+
+# Verbes, sujets et prépositions qui ouvrent une nouvelle proposition : fin de portée
+CLAUSE_STARTERS = frozenset(map(_base_form, {
+    "a", "ont", "avait", "avaient", "est", "etait", "sont", "etaient", "note", "il", "elle", "ils",
+    "elles", "on", "je", "j", "nous", "vous", "patient", "patiente", "depuis", "chez", "pour", "car",
+    "qui", "que", "dont", "lorsque", "quand",
+}))
+_VERB_RE = re.compile(
+    r"(?:present|signal|rapport|decri|plaign|plaint|souffr|ressen|declar|retrouv|constat|evoqu|"
+    r"expliqu|consult|arriv|report|developp|survien|apparai)\w*"
+)
+
+# Mots dans la portée avant le concept nié (déterminants, adjectifs antéposés)
+_LEADING_WORDS = frozenset(map(_base_form, {
+    "de", "d", "du", "des", "la", "le", "les", "l", "un", "une", "toute", "tout", "toutes", "tous",
+    "vrai", "vraie", "reel", "reelle", "franc", "franche", "nouveau", "nouvelle", "autre", "notion",
+}))
+# Introducteurs de complément du concept ("raideur de nuque")
+_COMPLEMENT_WORDS = frozenset(map(_base_form, {"de", "d", "du", "des", "a", "au", "aux"}))
+
+# "non" suivi de ces mots ne nie rien (habitudes de vie, début de phrase, réponse)
+NON_STOP_WORDS = frozenset(map(_base_form, {
+    "fumeur", "fumeuse", "alcoolique", "buveur", "buveuse", "sportif", "sportive", "voyageur",
+    "il", "elle", "ils", "elles", "je", "j", "on", "le", "la", "les", "l", "un", "une", "plus",
+    "merci", "rien", "jamais", "pas",
+}))
+
+# Fenêtre de recherche d'un marqueur d'exception après une négation (caractères)
+EXCEPTION_WINDOW = 100
+
+# Indices de négation précédant le terme nié (du plus spécifique au plus court)
+NEGATION_CUES = [
+    r"pas\s+de\s+notion\s+d[e']?",
+    r"pas\s+d[e']?",
+    r"absence\s+d[e']?",
+    r"aucune?s?",
+    r"sans",
+    r"ni",
+    r"non",
+]
+_NON_CUE = "non"
+
+# Marqueurs d'exception : invalident la négation qui les précède
+EXCEPTION_MARKERS = ["mais", "cependant", "toutefois", "sauf", "except[ée]"]
+
+# Conjonctions qui ferment une portée
+SCOPE_CONJUNCTIONS = ["et", "avec", "puis"]
+
+_CUE_RE = re.compile(
+    r"(?<!\w)(?:" + "|".join(NEGATION_CUES) + r")(?:(?<=')|(?!\w))\s*",
+    re.IGNORECASE
+)
+_EXCEPTION_RE = re.compile(r"(?<!\w)(?:" + "|".join(EXCEPTION_MARKERS) + r")(?!\w)", re.IGNORECASE)
+_TERMINATOR_RE = re.compile(
+    r"[.;:!?,\n()]|(?<!\w)(?:" + "|".join(EXCEPTION_MARKERS + SCOPE_CONJUNCTIONS) + r")(?!\w)",
+    re.IGNORECASE
+)
+_TOKEN_RE = re.compile(r"[\w'+°-]+")
+
+
+@dataclass(frozen=True)
+class NegationScope:
+    """Portée d'un indice de négation.
+
+    Attributes:
+        cue_start: Début de l'indice ("pas de", "sans"...)
+        start: Début de la portée (fin de l'indice)
+        end: Fin de la portée (exclue)
+        cue: Texte de l'indice
+    """
+    cue_start: int
+    start: int
+    end: int
+    cue: str
+
+
+class NegationScopes:
+    """Portées niées d'un texte, avec requêtes O(1) par position.
+
+    Args:
+        text: Texte annoté (les positions s'y réfèrent)
+    """
+
+    def __init__(self, text: str):
+        self.text = text
+        self.scopes: Tuple[NegationScope, ...] = tuple(_find_scopes(text))
+        self._mask = bytearray(len(text))
+        for scope in self.scopes:
+            self._mask[scope.start:scope.end] = b"\x01" * (scope.end - scope.start)
+        self._scope_starts = [scope.start for scope in self.scopes]
+        self._exceptions = [match.start() for match in _EXCEPTION_RE.finditer(text)]
+
+    def is_negated(self, position: int) -> bool:
+        """True si la position (début d'un terme) est dans une portée niée."""
+        return 0 <= position < len(self._mask) and self._mask[position] == 1
+
+    def scope_at(self, position: int) -> Optional[NegationScope]:
+        """Portée contenant la position, ou None."""
+        if not self.is_negated(position):
+            return None
+        return self.scopes[bisect_right(self._scope_starts, position) - 1]
+
+    def first_affirmed(self, term: str) -> int:
+        """Position de la première occurrence non niée de term, ou -1."""
+        position = self.text.find(term)
+        while position != -1:
+            if not self.is_negated(position):
+                return position
+            position = self.text.find(term, position + 1)
+        return -1
+
+    @property
+    def has_exception_marker(self) -> bool:
+        """True si le texte contient un marqueur d'exception ("mais", "sauf"...)."""
+        return bool(self._exceptions)
+
+    def exception_follows(self, position: int, window: int = EXCEPTION_WINDOW) -> bool:
+        """True si un marqueur d'exception suit la position dans la fenêtre donnée."""
+        index = bisect_right(self._exceptions, position - 1)
+        return index < len(self._exceptions) and self._exceptions[index] < position + window
+
+
+def _scope_end(text: str, start: int, limit: int, cue: str) -> int:
+    """Fin de la portée ouverte en start : le premier concept nié et ses compléments."""
+    tokens = _TOKEN_RE.finditer(text, start, limit)
+    if cue == _NON_CUE:
+        token = next(tokens, None)
+        if token is None or _base_form(token.group(0)) in NON_STOP_WORDS:
+            return start
+        return token.end()
+
+    end = start
+    head_seen = False
+    complement = False
+    for count, token in enumerate(tokens):
+        if count == MAX_SCOPE_TOKENS:
+            break
+        raw = token.group(0).lower()
+        word = _base_form(raw)
+        if raw != "à" and (word in CLAUSE_STARTERS or _VERB_RE.fullmatch(word)):
+            break
+        elided = word[:2] in ("d'", "l'")
+        if elided:
+            word = word[2:]
+        if head_seen and not complement and not elided and word in CLINICAL_TERMS:
+            break
+        end = token.end()
+        if not head_seen and word in _LEADING_WORDS:
+            continue
+        if head_seen and (word in _COMPLEMENT_WORDS or complement and word in _LEADING_WORDS):
+            complement = True
+            continue
+        head_seen = True
+        complement = False
+    return end
+
+
+def _find_scopes(text: str) -> List[NegationScope]:
+    scopes = []
+    terminators = [match.start() for match in _TERMINATOR_RE.finditer(text)]
+    for cue in _CUE_RE.finditer(text):
+        start = cue.end()
+        index = bisect_right(terminators, start - 1)
+        limit = terminators[index] if index < len(terminators) else len(text)
+        cue_text = cue.group(0).strip()
+        end = _scope_end(text, start, limit, cue_text.lower())
+        if end <= start:
+            continue
+        if scopes and scopes[-1].start == cue.start():
+            # Indice suivi d'un quantificateur ("sans aucun") : une seule portée
+            previous = scopes.pop()
+            scopes.append(NegationScope(previous.cue_start, start, end, f"{previous.cue} {cue_text}"))
+        else:
+            scopes.append(NegationScope(cue.start(), start, end, cue_text))
+    return scopes
+
+
+@lru_cache(maxsize=256)
+def annotate_negations(text: str) -> NegationScopes:
+    """Annote (et met en cache) les portées de négation d'un texte."""
+    return NegationScopes(text)
@@ -63,6 +63,7 @@ from typing import Dict, Any, Optional, Tuple, List
 from datetime import datetime
 
 from .models import HeadacheCase
+from .negation import annotate_negations
 
 
 # =============================================================================
@@ -945,10 +946,12 @@ def detect_pattern(text: str, patterns: Dict[Any, list], check_negation: bool =
         for pattern in patterns[False]:
             if re.search(pattern, text_lower):
                 return False
-        # Puis affirmations
+        # Puis affirmations, hors portées de négation ("sans notion de X")
+        scopes = annotate_negations(text_lower)
         for pattern in patterns[True]:
-            if re.search(pattern, text_lower):
-                return True
+            for match in re.finditer(pattern, text_lower):
+                if not scopes.is_negated(match.start()):
+                    return True
         return None
     
     # Pour les autres patterns, ordre normal
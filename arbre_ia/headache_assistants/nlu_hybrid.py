@@ -83,22 +83,25 @@ Author: Medical NLU Team
 """
 
 from typing import Tuple, Dict, Any, List, Optional
-import numpy as np
+import copy
 import re
 from dataclasses import dataclass
+from functools import lru_cache
 import warnings
 
 # Import du NLU v2
 from .nlu_v2 import NLUv2
 from .models import HeadacheCase
-from .medical_examples_corpus import MEDICAL_EXAMPLES
-
-# Lazy import de sentence-transformers
-try:
-    from sentence_transformers import SentenceTransformer
-    EMBEDDING_AVAILABLE = True
-except ImportError:
-    EMBEDDING_AVAILABLE = False
+from .medical_examples_corpus import MEDICAL_EXAMPLES, example_id, get_example
+from .negation import annotate_negations
+from .lexicon import compile_lexicon
+from .vector_index import build_index
+from .embedders import SENTENCE_TRANSFORMERS_AVAILABLE, create_embedder, embedder_available
+
+# Backend par défaut (sentence-transformers); les backends ONNX / statique sont
+# vérifiés à l'initialisation de HybridNLU (embedding_backend)
+EMBEDDING_AVAILABLE = SENTENCE_TRANSFORMERS_AVAILABLE
+if not EMBEDDING_AVAILABLE:
     warnings.warn(
         "sentence-transformers non installé. NLU hybride fonctionnera en mode règles uniquement.\n"
         "Pour activer l'embedding: pip install sentence-transformers"
@@ -107,7 +110,7 @@ except ImportError:
 # Import SemanticVocabulary (uses sentence-transformers)
 try:
     from .vocabulary.semantic_vocabulary import SemanticVocabulary, SemanticMatch
-    SEMANTIC_VOCAB_AVAILABLE = EMBEDDING_AVAILABLE  # Requires embedding
+    SEMANTIC_VOCAB_AVAILABLE = True  # Requires an available embedding backend
 except ImportError:
     SEMANTIC_VOCAB_AVAILABLE = False
     SemanticVocabulary = None
@@ -224,26 +227,6 @@ SYMPTOM_TO_FIELD = {
     "nausées": None,
 }
 
-# Patterns de négation en français
-NEGATION_PATTERNS = [
-    # "pas de X", "pas d'X"
-    r"pas\s+d[e']?\s*",
-    # "sans X"
-    r"sans\s+",
-    # "absence de X", "absence d'X"
-    r"absence\s+d[e']?\s*",
-    # "aucun(e) X"
-    r"aucune?\s+",
-    # "ni X" (dans contexte "ni fièvre ni déficit")
-    r"ni\s+",
-    # "pas de notion de X"
-    r"pas\s+de\s+notion\s+d[e']?\s*",
-    # "examen normal" patterns
-    r"(?:examen\s+)?(?:neurologique\s+)?(?:strictement\s+)?normal",
-    # "négatif" / "négative"
-    r"n[ée]gatif(?:ve)?\s*",
-]
-
 
 @dataclass
 class NegationResult:
@@ -254,11 +237,22 @@ class NegationResult:
     confidence: float  # Confiance dans la détection
 
 
+# Formulations d'examen normal valant négation d'un champ
+_EXAM_NEGATIONS = [
+    (r"examen\s+neurologique\s+(?:strictement\s+)?normal", "neuro_deficit"),
+    (r"nuque\s+souple", "meningeal_signs"),
+    (r"apyrétique", "fever"),
+    (r"apyrexie", "fever"),
+]
+
+
 def detect_negations(text: str) -> Tuple[List[NegationResult], str]:
     """Détecte les négations dans le texte médical.
 
-    Identifie les patterns de négation (pas de, sans, absence de, etc.)
-    et extrait les champs concernés.
+    Identifie les termes de SYMPTOM_TO_FIELD situés dans une portée de
+    négation (pas de, sans, absence de, etc.) et extrait les champs concernés.
+    Les portées viennent de l'annotateur partagé avec MedicalVocabulary et
+    detect_pattern; les termes sont trouvés en un seul balayage.
 
     Args:
         text: Texte médical à analyser
@@ -275,71 +269,58 @@ def detect_negations(text: str) -> Tuple[List[NegationResult], str]:
         >>> negations[1].field
         'neuro_deficit'
     """
-    negations = []
-    text_lower = text.lower()
-    cleaned_text = text
+    lexicon = LEXICON
+    scopes = annotate_negations(text)
+    best: Dict[str, Tuple[Tuple[int, int], str, float]] = {}
+    spans: List[Tuple[int, int]] = []
+
+    # Un seul balayage : termes niables (du plus long au plus court) ou
+    # formulations d'examen normal; la négation d'un terme est décidée par
+    # les portées partagées (negation.annotate_negations)
+    for match in lexicon.negation_scanner.finditer(text):
+        start = match.start()
+        if match.start("term") < 0:
+            # Formulation d'examen normal ("nuque souple", "apyrétique"...)
+            index = next(i for i, group in enumerate(lexicon.exam_groups) if match.start(group) >= 0)
+            field = lexicon.exam_negations[index][1]
+            key = (len(lexicon.negation_terms) + index, start)
+            if field not in best or key < best[field][0]:
+                best[field] = (key, match.group(0).lower(), 0.95)
+            spans.append((start, match.end()))
+            continue
 
-    # Construire les patterns complets pour chaque symptôme
-    for symptom, field in SYMPTOM_TO_FIELD.items():
-        if field is None:
+        scope = scopes.scope_at(start)
+        if scope is None:
             continue
+        spans.append((scope.cue_start, match.end()))
 
-        for neg_pattern in NEGATION_PATTERNS:
-            # Pattern complet : négation + symptôme
-            full_pattern = neg_pattern + r"(" + re.escape(symptom) + r")"
-
-            matches = list(re.finditer(full_pattern, text_lower, re.IGNORECASE))
-            for match in matches:
-                negations.append(NegationResult(
-                    field=field,
-                    value=False,
-                    matched_text=match.group(0),
-                    confidence=0.9
-                ))
-                # Retirer du texte pour l'embedding
-                cleaned_text = re.sub(
-                    re.escape(match.group(0)),
-                    "",
-                    cleaned_text,
-                    flags=re.IGNORECASE
-                )
-
-    # Patterns spéciaux pour "examen normal"
-    exam_patterns = [
-        (r"examen\s+neurologique\s+(?:strictement\s+)?normal", "neuro_deficit"),
-        (r"nuque\s+souple", "meningeal_signs"),
-        (r"apyrétique", "fever"),
-        (r"apyrexie", "fever"),
+        # Tous les termes commençant ici (ex: "déficit" et "déficit moteur")
+        # concourent : l'ordre de SYMPTOM_TO_FIELD départage
+        for symptom in lexicon.terms_by_initial.get(text[start].lower(), ()):
+            end = start + len(symptom)
+            if text[start:end].lower() != symptom:
+                continue
+            field = lexicon.symptom_to_field[symptom]
+            key = (lexicon.negation_rank[symptom], scope.cue_start)
+            if field not in best or key < best[field][0]:
+                best[field] = (key, text[scope.cue_start:end].lower(), 0.9)
+
+    negations = [
+        NegationResult(field=field, value=False, matched_text=matched_text, confidence=confidence)
+        for field, (_, matched_text, confidence) in sorted(best.items(), key=lambda item: item[1][0])
     ]
 
-    for pattern, field in exam_patterns:
-        matches = list(re.finditer(pattern, text_lower, re.IGNORECASE))
-        for match in matches:
-            negations.append(NegationResult(
-                field=field,
-                value=False,
-                matched_text=match.group(0),
-                confidence=0.95
-            ))
-            cleaned_text = re.sub(
-                re.escape(match.group(0)),
-                "",
-                cleaned_text,
-                flags=re.IGNORECASE
-            )
+    # Texte nettoyé : retrait des portées niées en une passe
+    pieces = []
+    position = 0
+    for start, end in spans:
+        if start > position:
+            pieces.append(text[position:start])
+        position = max(position, end)
+    pieces.append(text[position:])
+    cleaned_text = re.sub(r"\s+", " ", " ".join(pieces)).strip()
 
-    # Nettoyer les espaces multiples
-    cleaned_text = re.sub(r"\s+", " ", cleaned_text).strip()
-
-    # Dédupliquer les négations (même champ)
-    seen_fields = set()
-    unique_negations = []
-    for neg in negations:
-        if neg.field not in seen_fields:
-            unique_negations.append(neg)
-            seen_fields.add(neg.field)
-
-    return unique_negations, cleaned_text
+    return negations, cleaned_text
 
 
 def apply_negations_to_case(
@@ -734,18 +715,18 @@ def detect_ngrams(text: str) -> List[NgramMatch]:
     matches = []
     text_lower = text.lower()
 
-    for pattern, info in NGRAM_PATTERNS.items():
+    for entry in LEXICON.ngrams:
         # Chercher le pattern dans le texte
-        idx = text_lower.find(pattern)
+        idx = text_lower.find(entry.pattern)
         if idx != -1:
             matches.append(NgramMatch(
-                pattern=pattern,
-                fields=info["fields"],
-                confidence=info["confidence"],
-                category=info.get("category", "unknown"),
+                pattern=entry.pattern,
+                fields=entry.fields,
+                confidence=entry.confidence,
+                category=entry.category,
                 start=idx,
-                end=idx + len(pattern),
-                note=info.get("note")
+                end=idx + len(entry.pattern),
+                note=entry.note
             ))
 
     # Trier par position (début)
@@ -1227,13 +1208,13 @@ def detect_keywords(text: str) -> List[KeywordMatch]:
     words = re.findall(r'\b[\w-]+\b', text_lower)
 
     # Lookup dans l'index pour chaque mot
+    keyword_index = LEXICON.keyword_index
     for i, word in enumerate(words):
-        if word in KEYWORD_INDEX:
-            for mapping in KEYWORD_INDEX[word]:
-                # Trouver la position réelle dans le texte
-                pattern = r'\b' + re.escape(word) + r'\b'
-                match = re.search(pattern, text_lower)
-                position = match.start() if match else i
+        if word in keyword_index:
+            # Trouver la position réelle dans le texte (motif précompilé)
+            match = LEXICON.keyword_patterns[word].search(text_lower)
+            position = match.start() if match else i
+            for mapping in keyword_index[word]:
 
                 matches.append(KeywordMatch(
                     keyword=word,
@@ -1364,6 +1345,11 @@ CRITICAL_MEDICAL_TERMS: List[str] = [
     "octogénaire", "septuagénaire", "sexagénaire", "quinquagénaire",
 ]
 
+# Lexique compilé et versionné lu par tous les détecteurs (voir lexicon.py)
+LEXICON = compile_lexicon(
+    SYMPTOM_TO_FIELD, _EXAM_NEGATIONS, NGRAM_PATTERNS, KEYWORD_INDEX, CRITICAL_MEDICAL_TERMS
+)
+
 
 def levenshtein_distance(s1: str, s2: str) -> int:
     """Calcule la distance de Levenshtein entre deux chaînes.
@@ -1421,6 +1407,56 @@ def similarity_ratio(s1: str, s2: str) -> float:
     return 1.0 - (distance / max_len)
 
 
+def _bounded_levenshtein(s1: str, s2: str, max_distance: int) -> int:
+    """Distance de Levenshtein, ou max_distance + 1 dès qu'elle est dépassée."""
+    if abs(len(s1) - len(s2)) > max_distance:
+        return max_distance + 1
+
+    previous_row = list(range(len(s2) + 1))
+    for i, c1 in enumerate(s1):
+        current_row = [i + 1]
+        for j, c2 in enumerate(s2):
+            current_row.append(min(previous_row[j + 1] + 1, current_row[j] + 1, previous_row[j] + (c1 != c2)))
+        # Le minimum d'une ligne ne décroît jamais : arrêt anticipé
+        if min(current_row) > max_distance:
+            return max_distance + 1
+        previous_row = current_row
+
+    return previous_row[-1]
+
+
+@lru_cache(maxsize=4096)
+def _best_fuzzy_match(word: str, min_similarity: float) -> Tuple[Optional[str], float]:
+    """Meilleur terme de référence pour un mot (premier terme en cas d'égalité).
+
+    Même résultat que similarity_ratio sur chaque terme (mot et termes sont en
+    minuscules), mais la distance est bornée par le seuil de similarité.
+    """
+    best_match = None
+    best_similarity = 0.0
+
+    # Seuls les termes d'écart de longueur <= 3 sont candidats (précalculés)
+    for term in LEXICON.fuzzy_candidates_for(word):
+        max_len = max(len(word), len(term))
+        # Plus grande distance d'édition encore acceptée par le seuil
+        max_distance = max_len
+        while max_distance >= 0 and 1.0 - (max_distance / max_len) < min_similarity:
+            max_distance -= 1
+        if max_distance < 0:
+            continue
+
+        distance = _bounded_levenshtein(word, term, max_distance)
+        if distance > max_distance:
+            continue
+        sim = 1.0 - (distance / max_len)
+
+        if sim >= min_similarity and sim > best_similarity:
+            best_similarity = sim
+            best_match = term
+
+    return best_match, best_similarity
+
+
 @dataclass
 class FuzzyMatch:
     """Résultat d'une correction fuzzy."""
@@ -1478,23 +1514,11 @@ def fuzzy_correct_text(
             continue
 
         # Ignorer si le mot est déjà dans le dictionnaire
-        if word in KEYWORD_INDEX or word in CRITICAL_MEDICAL_TERMS:
+        if word in LEXICON.known_words:
             continue
 
         # Chercher le meilleur match dans les termes médicaux
-        best_match = None
-        best_similarity = 0.0
-
-        for term in CRITICAL_MEDICAL_TERMS:
-            # Optimisation: ignorer si la différence de longueur est trop grande
-            if abs(len(word) - len(term)) > 3:
-                continue
-
-            sim = similarity_ratio(word, term)
-
-            if sim >= min_similarity and sim > best_similarity:
-                best_similarity = sim
-                best_match = term
+        best_match, best_similarity = _best_fuzzy_match(word, min_similarity)
 
         # Si on a trouvé une correction valide
         if best_match and best_match != word:
@@ -1680,9 +1704,12 @@ class HybridNLU:
     Attributes:
         rule_nlu (NLUv2): The rule-based NLU engine.
         confidence_threshold (float): Threshold below which embedding is activated.
+        similarity_threshold (float): Semantic vocabulary threshold for this
+            instance (None: the vocabulary's own threshold).
         use_embedding (bool): Whether embedding layer is enabled.
-        embedder: SentenceTransformer model instance (if embedding enabled).
+        embedder: Embedder instance, backend from embedders.py (if embedding enabled).
         example_embeddings: Pre-computed corpus embeddings (if embedding enabled).
+        example_index: Normalized top-k index over example_embeddings (vector_index).
         examples (list): Medical example corpus for similarity matching.
 
     Example:
@@ -1703,8 +1730,10 @@ class HybridNLU:
         self,
         confidence_threshold: float = 0.7,
         use_embedding: bool = True,
-        embedding_model: str = 'all-MiniLM-L6-v2',
-        verbose: bool = False
+        embedding_model: Optional[str] = None,
+        verbose: bool = False,
+        embedding_backend: Optional[str] = None,
+        word_vectors: Optional[str] = None
     ):
         """
         Initialize the hybrid NLU engine.
@@ -1717,13 +1746,19 @@ class HybridNLU:
             use_embedding: Enable the embedding layer. Set to False for
                           faster processing when rules are sufficient.
                           Default: True
-            embedding_model: Name of the sentence-transformers model.
+            embedding_model: Model name (sentence-transformers), exported ONNX
+                            directory or static table, depending on the backend.
                             Default: 'all-MiniLM-L6-v2' (fast, good quality)
             verbose: Print initialization messages (model loading, etc.).
                     Default: False (silent operation)
+            embedding_backend: "sentence-transformers", "onnx" or "static"
+                              (see embedders.py). Default: HEADACHE_EMBEDDING_BACKEND
+                              env var, then sentence-transformers.
+            word_vectors: Word-vector table for single-word semantic matching
+                         (see word_vectors.py). Default: HEADACHE_WORD_VECTORS env var.
 
         Raises:
-            ImportError: If sentence-transformers not installed and
+            ImportError: If the backend dependencies are not installed and
                         use_embedding=True. Falls back to rules-only mode.
 
         Note:
@@ -1733,19 +1768,25 @@ class HybridNLU:
         # Layer 1: Rules (NLU v2)
         self.rule_nlu = NLUv2()
         self.confidence_threshold = confidence_threshold
+        self.similarity_threshold: Optional[float] = None
         self.verbose = verbose
 
         # Layer 2: Semantic Vocabulary (replaces keyword matching)
         # Only use if embedding is enabled (semantic vocab uses embedding internally)
-        self.use_semantic = SEMANTIC_VOCAB_AVAILABLE and use_embedding
+        backend_available = embedder_available(embedding_backend)
+        self.embedding_backend = embedding_backend
+        self.embedding_model = embedding_model
+        self.word_vectors = word_vectors
+        self.use_semantic = SEMANTIC_VOCAB_AVAILABLE and use_embedding and backend_available
         self.semantic_vocab = None
         if self.use_semantic:
             self._initialize_semantic_vocabulary(embedding_model)
 
         # Layer 3: Corpus Embedding (fallback for low confidence)
-        self.use_embedding = use_embedding and EMBEDDING_AVAILABLE
+        self.use_embedding = use_embedding and backend_available
         self.embedder = None
         self.example_embeddings = None
+        self.example_index = None
         self.examples = MEDICAL_EXAMPLES
 
         if self.use_embedding and not self.use_semantic:
@@ -1755,7 +1796,7 @@ class HybridNLU:
             # Reuse embedder from semantic vocab for corpus
             self._initialize_corpus_from_semantic()
 
-    def _initialize_embedding(self, model_name: str):
+    def _initialize_embedding(self, model_name: Optional[str]):
         """Initialise le modèle d'embedding et pré-calcule les embeddings.
 
         Les textes du corpus sont prétraités pour retirer les durées temporelles
@@ -1765,7 +1806,7 @@ class HybridNLU:
         try:
             if self.verbose:
                 print(f"[INIT] Chargement du modèle embedding '{model_name}'...")
-            self.embedder = SentenceTransformer(model_name)
+            self.embedder = create_embedder(self.embedding_backend, model_name)
 
             # Pré-calculer les embeddings du corpus AVEC prétraitement
             if self.verbose:
@@ -1783,6 +1824,7 @@ class HybridNLU:
                 convert_to_numpy=True,
                 show_progress_bar=False
             )
+            self.example_index = build_index(self.example_embeddings)
             if self.verbose:
                 print(f"[OK] Modèle embedding initialisé ({self.example_embeddings.shape})")
                 print(f"[OK] Textes prétraités pour matching symptomatique pur")
@@ -1791,7 +1833,7 @@ class HybridNLU:
             warnings.warn(f"Erreur initialisation embedding: {e}. Mode règles uniquement.")
             self.use_embedding = False
 
-    def _initialize_semantic_vocabulary(self, model_name: str):
+    def _initialize_semantic_vocabulary(self, model_name: Optional[str]):
         """Initialize the semantic vocabulary with pre-computed embeddings.
 
         The semantic vocabulary provides embedding-based matching of medical
@@ -1805,7 +1847,9 @@ class HybridNLU:
                 similarity_threshold=0.82,  # Higher threshold to avoid false positives (e.g., "crise" → seizure)
                 embedding_model=model_name,
                 verbose=self.verbose,
-                min_token_length=3  # Avoid matching short words like "en"
+                min_token_length=3,  # Avoid matching short words like "en"
+                embedding_backend=self.embedding_backend,
+                word_vectors=self.word_vectors
             )
 
             if self.verbose:
@@ -1840,6 +1884,7 @@ class HybridNLU:
                 convert_to_numpy=True,
                 show_progress_bar=False
             )
+            self.example_index = build_index(self.example_embeddings)
 
             if self.verbose:
                 print(f"[OK] Corpus embeddings ready ({self.example_embeddings.shape})")
@@ -1848,6 +1893,37 @@ class HybridNLU:
             warnings.warn(f"Erreur initialisation corpus: {e}")
             self.use_embedding = False
 
+    def with_settings(
+        self,
+        confidence_threshold: Optional[float] = None,
+        similarity_threshold: Optional[float] = None
+    ) -> "HybridNLU":
+        """Vue de cette instance avec d'autres seuils (configuration d'un site).
+
+        La vue partage toutes les ressources de l'instance : moteur de règles,
+        embedder, embeddings des termes et du corpus, index et vocabulaire
+        sémantique. Seuls les seuils lui sont propres : créer une vue ne
+        recharge aucun modèle et ne recalcule aucun embedding.
+
+        Args:
+            confidence_threshold: Seuil d'activation de l'embedding (défaut : inchangé)
+            similarity_threshold: Seuil du vocabulaire sémantique (défaut : inchangé)
+
+        Returns:
+            Nouvelle instance HybridNLU (copie superficielle)
+
+        Example:
+            >>> site_nlu = nlu.with_settings(confidence_threshold=0.6)
+            >>> site_nlu.semantic_vocab is nlu.semantic_vocab
+            True
+        """
+        view = copy.copy(self)
+        if confidence_threshold is not None:
+            view.confidence_threshold = confidence_threshold
+        if similarity_threshold is not None:
+            view.similarity_threshold = similarity_threshold
+        return view
+
     # Mapping for intensity string values to EVA scores
     INTENSITY_MAP = {
         "maximum": 10,
@@ -1932,7 +2008,12 @@ class HybridNLU:
 
         return case_dict, detected_fields, applied
 
-    def parse_free_text_to_case(self, text: str) -> Tuple[HeadacheCase, Dict[str, Any]]:
+    def parse_free_text_to_case(
+        self,
+        text: str,
+        fields: Optional[List[str]] = None,
+        use_embedding: bool = True
+    ) -> Tuple[HeadacheCase, Dict[str, Any]]:
         """
         Parse clinical text using hybrid NLU (API-compatible interface).
 
@@ -1941,6 +2022,9 @@ class HybridNLU:
 
         Args:
             text: Free-text clinical description in French.
+            fields: Restrict the rule layer to these fields (see NLUv2.parse).
+                    Default: None (full parse).
+            use_embedding: See parse_hybrid. Default: True.
 
         Returns:
             Tuple[HeadacheCase, Dict[str, Any]]:
@@ -1953,10 +2037,15 @@ class HybridNLU:
             >>> print(meta["hybrid_mode"])
             rules+ngrams+keywords
         """
-        hybrid_result = self.parse_hybrid(text)
+        hybrid_result = self.parse_hybrid(text, fields=fields, use_embedding=use_embedding)
         return hybrid_result.case, hybrid_result.metadata
 
-    def parse_hybrid(self, text: str) -> HybridResult:
+    def parse_hybrid(
+        self,
+        text: str,
+        fields: Optional[List[str]] = None,
+        use_embedding: bool = True
+    ) -> HybridResult:
         """
         Full hybrid analysis with detailed processing information.
 
@@ -1984,6 +2073,15 @@ class HybridNLU:
         Args:
             text: Free-text clinical description in French.
                   Supports both medical notation and patient vernacular.
+            fields: Fields targeted by the rule layer (e.g. the field asked
+                    in a dialogue follow-up). Only the NLU v2 detectors for
+                    these fields and their dependencies run; n-grams,
+                    keywords and negations still apply to every field.
+                    Default: None (full NLU v2 parse).
+            use_embedding: False keeps the deterministic layers only (fuzzy
+                    correction, n-grams, keywords, negations, rules): no
+                    semantic vocabulary and no embedding fallback, for short
+                    dialogue replies. Default: True.
 
         Returns:
             HybridResult containing:
@@ -2021,13 +2119,14 @@ class HybridNLU:
 
         # ÉTAPE 2: Semantic vocabulary matching (replaces keyword index)
         # Uses embedding similarity to find medical terms including synonyms
+        use_semantic = use_embedding and self.use_semantic and self.semantic_vocab is not None
         semantic_matches = []
-        if self.use_semantic and self.semantic_vocab:
-            semantic_matches = self.semantic_vocab.match_text(working_text)
+        if use_semantic:
+            semantic_matches = self.semantic_vocab.match_text(working_text, self.similarity_threshold)
 
-        # Fallback to keyword matching if semantic vocab not available
+        # Fallback to keyword matching if semantic vocab not available (or not requested)
         keyword_matches = []
-        if not self.use_semantic:
+        if not use_semantic:
             keyword_matches = detect_keywords(working_text)
 
         # ÉTAPE 3: Détection des négations
@@ -2035,7 +2134,8 @@ class HybridNLU:
 
         # ÉTAPE 4: Analyse par règles (Layer 1)
         # On passe le texte corrigé pour que les règles bénéficient des corrections
-        case, metadata = self.rule_nlu.parse_free_text_to_case(working_text)
+        case, metadata = self.rule_nlu.parse(working_text, fields=fields)
+        metadata["lexicon_version"] = LEXICON.version
 
         # Ajouter les métadonnées de correction orthographique
         if fuzzy_corrections:
@@ -2135,7 +2235,7 @@ class HybridNLU:
 
         # ÉTAPE 8: Vérifier si enrichissement embedding nécessaire
         # On utilise le texte SANS négations pour l'embedding
-        if self._should_use_embedding(metadata):
+        if use_embedding and self._should_use_embedding(metadata):
             # Enrichir avec embedding (texte sans négations pour éviter faux positifs)
             case, enhancement_details = self._enhance_with_embedding(
                 text_without_negations, case, metadata
@@ -2200,6 +2300,34 @@ class HybridNLU:
 
         return False
 
+    def find_similar_examples(
+        self,
+        texts: List[str],
+        top_k: int = 5
+    ) -> List[List[Tuple[Dict[str, Any], float]]]:
+        """Recherche les exemples du corpus les plus similaires à chaque texte.
+
+        Les textes sont prétraités (durées retirées) puis encodés en un seul
+        lot; l'index (self.example_index) répond à toutes les requêtes en une
+        passe.
+
+        Args:
+            texts: Textes requêtes
+            top_k: Nombre d'exemples par texte
+
+        Returns:
+            Pour chaque texte, liste (exemple, similarité cosinus) par similarité décroissante
+        """
+        queries = self.embedder.encode(
+            [preprocess_for_embedding(text) for text in texts],
+            convert_to_numpy=True
+        )
+        indices, similarities = self.example_index.search(queries, k=top_k)
+        return [
+            [(self.examples[i], float(sim)) for i, sim in zip(row_indices, row_similarities) if i >= 0]
+            for row_indices, row_similarities in zip(indices, similarities)
+        ]
+
     def _enhance_with_embedding(
         self,
         text: str,
@@ -2220,28 +2348,15 @@ class HybridNLU:
         Returns:
             Tuple (case enrichi, détails enrichissement)
         """
-        # Prétraiter le texte pour retirer les durées temporelles
-        text_preprocessed = preprocess_for_embedding(text)
-
-        # Encoder le texte requête prétraité
-        query_embedding = self.embedder.encode([text_preprocessed], convert_to_numpy=True)[0]
-
-        # Calculer similarités avec tous les exemples
-        similarities = np.dot(self.example_embeddings, query_embedding)
-
         # Trouver top-5 exemples les plus similaires
-        top_k = 5
-        top_indices = np.argsort(similarities)[-top_k:][::-1]
-        top_similarities = similarities[top_indices]
-        top_examples = [self.examples[i] for i in top_indices]
+        matches = self.find_similar_examples([text], top_k=5)[0]
+        top_examples = [example for example, _ in matches]
+        top_similarities = [similarity for _, similarity in matches]
 
+        # Exemples référencés par identifiant (texte et annotations : resolve_enhancement_details)
         enhancement_details = {
             "top_matches": [
-                {
-                    "text": ex["text"],
-                    "similarity": float(sim),
-                    "annotations": ex.get("annotations", {})
-                }
+                {"example_id": example_id(ex), "similarity": float(sim)}
                 for ex, sim in zip(top_examples, top_similarities)
             ],
             "enriched_fields": []
@@ -2305,21 +2420,16 @@ class HybridNLU:
                 if any(keyword in source.lower() for keyword in ["névralgie", "neuropathie"]):
                     special_patterns.append({
                         "type": "neuralgia",
-                        "description": source,
-                        "similarity": float(sim),
-                        "imaging_recommendation": annotations.get("imaging", "irm_cerebrale"),
-                        "matched_text": ex["text"]
+                        "example_id": example_id(ex),
+                        "similarity": float(sim)
                     })
 
                 # Détecter CCQ
                 if "ccq" in source.lower() or "chronique quotidienne" in source.lower():
                     special_patterns.append({
                         "type": "chronic_daily_headache",
-                        "description": source,
-                        "similarity": float(sim),
-                        "imaging_recommendation": "irm_cerebrale",
-                        "note": annotations.get("note", ""),
-                        "matched_text": ex["text"]
+                        "example_id": example_id(ex),
+                        "similarity": float(sim)
                     })
 
         if special_patterns:
@@ -2331,6 +2441,50 @@ class HybridNLU:
         return case, enhancement_details
 
 
+def resolve_special_pattern(pattern: Dict[str, Any]) -> Dict[str, Any]:
+    """Pattern spécial complété depuis l'exemple du corpus qu'il référence.
+
+    Ajoute description, recommandation d'imagerie, note (CCQ) et texte de
+    l'exemple; un pattern sans référence connue est rendu tel quel.
+    """
+    resolved = dict(pattern)
+    example = get_example(pattern.get("example_id", ""))
+    if example is None:
+        return resolved
+    annotations = example.get("annotations", {})
+    resolved["description"] = annotations.get("source", "")
+    resolved["matched_text"] = example["text"]
+    if pattern.get("type") == "neuralgia":
+        resolved["imaging_recommendation"] = annotations.get("imaging", "irm_cerebrale")
+    elif pattern.get("type") == "chronic_daily_headache":
+        resolved["imaging_recommendation"] = "irm_cerebrale"
+        resolved["note"] = annotations.get("note", "")
+    return resolved
+
+
+def resolve_enhancement_details(details: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+    """Détails d'enrichissement embedding avec le texte et les annotations des exemples.
+
+    Réservé à l'affichage (/session-log) : les métadonnées stockées ne
+    gardent que les identifiants et similarités.
+    """
+    if details is None:
+        return None
+    resolved = dict(details)
+    top_matches = []
+    for match in details.get("top_matches", []):
+        example = get_example(match.get("example_id", ""))
+        top_matches.append(dict(match) if example is None else {
+            **match, "text": example["text"], "annotations": example.get("annotations", {})
+        })
+    resolved["top_matches"] = top_matches
+    if "special_patterns_detected" in details:
+        resolved["special_patterns_detected"] = [
+            resolve_special_pattern(pattern) for pattern in details["special_patterns_detected"]
+        ]
+    return resolved
+
+
 def parse_free_text_to_case_hybrid(text: str) -> Tuple[HeadacheCase, Dict[str, Any]]:
     """
     Convenience function for hybrid NLU parsing.
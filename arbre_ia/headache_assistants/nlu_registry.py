@@ -0,0 +1,219 @@
+"""Registre des NLU par site hospitalier : vues légères sur des ressources partagées.
+
+Chaque site a ses propres réglages (seuil de confiance des règles, seuil du
+vocabulaire sémantique, fichier de règles). Créer un HybridNLU par site
+rechargerait le modèle d'embedding et recalculerait les embeddings des
+termes et du corpus pour chacun. Le registre crée une seule instance de
+base, puis une vue par configuration distincte (HybridNLU.with_settings) :
+copie superficielle qui partage moteur de règles, embedder, matrices
+d'embeddings, index et vocabulaire compilé, et ne porte que ses seuils.
+Ajouter un site coûte donc quelques kilo-octets.
+
+Deux sites aux réglages NLU identiques partagent la même vue; le fichier de
+règles d'un site passe par rules_registry (un registre par fichier, lui
+aussi partagé).
+
+Fichier des sites (variable d'environnement HEADACHE_SITES) :
+
+    {
+        "sites": {
+            "chu-nord": {"confidence_threshold": 0.6, "similarity_threshold": 0.85},
+            "ch-sud": {"rules_path": "rules/ch_sud_rules.json"}
+        }
+    }
+
+Les chemins relatifs sont résolus depuis le dossier du fichier. Un réglage
+absent reprend celui de l'instance de base. Le site "default" (réglages de
+base) existe toujours.
+"""
+
+import json
+import os
+import threading
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+from .core.exceptions import ValidationError
+from .nlu_hybrid import HybridNLU
+
+
+SITES_ENV_VAR = "HEADACHE_SITES"
+
+DEFAULT_SITE = "default"
+
+_SITE_KEYS = ("confidence_threshold", "similarity_threshold", "rules_path")
+
+
+@dataclass(frozen=True)
+class SiteConfig:
+    """Réglages d'un site.
+
+    Attributes:
+        name: Identifiant du site (champ "site" de /chat ou en-tête X-Site)
+        confidence_threshold: Seuil d'activation de l'embedding (None : base)
+        similarity_threshold: Seuil du vocabulaire sémantique (None : base)
+        rules_path: Fichier de règles (None : headache_rules.json)
+    """
+    name: str
+    confidence_threshold: Optional[float] = None
+    similarity_threshold: Optional[float] = None
+    rules_path: Optional[Path] = None
+
+    @property
+    def nlu_settings(self) -> Tuple[Optional[float], Optional[float]]:
+        """Réglages NLU : deux sites aux mêmes réglages partagent une vue."""
+        return self.confidence_threshold, self.similarity_threshold
+
+
+def _validate_site(config: SiteConfig) -> None:
+    if not config.name or not isinstance(config.name, str):
+        raise ValidationError("Site sans identifiant", field="name", value=config.name)
+    for key in ("confidence_threshold", "similarity_threshold"):
+        value = getattr(config, key)
+        if value is not None and not (isinstance(value, (int, float)) and 0.0 <= value <= 1.0):
+            raise ValidationError(
+                f"Site {config.name!r} : {key} invalide", field=key, value=value, expected="0.0-1.0"
+            )
+    if config.rules_path is not None and not Path(config.rules_path).is_file():
+        raise ValidationError(
+            f"Site {config.name!r} : fichier de règles introuvable", field="rules_path", value=config.rules_path
+        )
+
+
+def load_site_configs(path: Path) -> List[SiteConfig]:
+    """Lit un fichier de sites (voir le format en tête de module).
+
+    Raises:
+        ValidationError: Fichier illisible, site ou réglage invalide
+    """
+    path = Path(path)
+    try:
+        data = json.loads(path.read_text(encoding="utf-8"))
+    except (OSError, json.JSONDecodeError) as e:
+        raise ValidationError(f"Fichier des sites illisible: {path}", field="sites", original_exception=e) from e
+    sites = data.get("sites") if isinstance(data, dict) else None
+    if not isinstance(sites, dict):
+        raise ValidationError("Fichier des sites sans objet 'sites'", field="sites", value=data)
+
+    configs = []
+    for name, settings in sites.items():
+        if not isinstance(settings, dict) or set(settings) - set(_SITE_KEYS):
+            raise ValidationError(
+                f"Site {name!r} : réglages invalides", field=name, value=settings, expected=", ".join(_SITE_KEYS)
+            )
+        rules_path = settings.get("rules_path")
+        if rules_path is not None:
+            rules_path = (path.parent / rules_path).resolve()
+        configs.append(SiteConfig(
+            name=name,
+            confidence_threshold=settings.get("confidence_threshold"),
+            similarity_threshold=settings.get("similarity_threshold"),
+            rules_path=rules_path,
+        ))
+    return configs
+
+
+# ==============================================================================
+# Registre
+# ==============================================================================
+
+class NLURegistry:
+    """NLU hybride de chaque site, créés à la demande.
+
+    L'instance de base est construite au premier appel (chargement du modèle
+    et des embeddings, une seule fois); chaque configuration NLU distincte
+    en obtient une vue.
+
+    Args:
+        factory: Construit l'instance de base (défaut : HybridNLU())
+        sites: Sites enregistrés à la création
+
+    Example:
+        >>> registry = NLURegistry()
+        >>> registry.register_site(SiteConfig("chu-nord", confidence_threshold=0.6))
+        >>> registry.nlu("chu-nord").semantic_vocab is registry.nlu().semantic_vocab
+        True
+    """
+
+    def __init__(self, factory: Callable[[], HybridNLU] = HybridNLU, sites: Iterable[SiteConfig] = ()):
+        self._factory = factory
+        self._lock = threading.Lock()
+        self._base: Optional[HybridNLU] = None
+        self._views: Dict[Tuple[Optional[float], Optional[float]], HybridNLU] = {}
+        self._sites: Dict[str, SiteConfig] = {DEFAULT_SITE: SiteConfig(DEFAULT_SITE)}
+        for config in sites:
+            self.register_site(config)
+
+    def register_site(self, config: SiteConfig) -> None:
+        """Enregistre (ou remplace) un site.
+
+        Raises:
+            ValidationError: Seuil hors de [0, 1] ou fichier de règles introuvable
+        """
+        _validate_site(config)
+        with self._lock:
+            self._sites[config.name] = config
+
+    def site(self, name: Optional[str] = None) -> SiteConfig:
+        """Réglages d'un site (None : site par défaut).
+
+        Raises:
+            ValidationError: Site inconnu
+        """
+        config = self._sites.get(name or DEFAULT_SITE) if isinstance(name or DEFAULT_SITE, str) else None
+        if config is None:
+            raise ValidationError(
+                f"Site inconnu: {name!r}", field="site", value=name, expected=", ".join(sorted(self._sites))
+            )
+        return config
+
+    def sites(self) -> List[str]:
+        """Identifiants des sites enregistrés."""
+        return sorted(self._sites)
+
+    def base(self) -> HybridNLU:
+        """Instance de base, partagée par toutes les vues (créée au premier appel)."""
+        if self._base is None:
+            with self._lock:
+                if self._base is None:
+                    self._base = self._factory()
+        return self._base
+
+    def nlu(self, site: Optional[str] = None) -> HybridNLU:
+        """NLU hybride d'un site : l'instance de base ou une vue aux réglages du site.
+
+        Raises:
+            ValidationError: Site inconnu
+        """
+        settings = self.site(site).nlu_settings
+        if settings == (None, None):
+            return self.base()
+        view = self._views.get(settings)
+        if view is None:
+            base = self.base()
+            with self._lock:
+                view = self._views.get(settings)
+                if view is None:
+                    view = base.with_settings(*settings)
+                    self._views[settings] = view
+        return view
+
+    def rules_path(self, site: Optional[str] = None) -> Optional[Path]:
+        """Fichier de règles d'un site (None : fichier par défaut)."""
+        return self.site(site).rules_path
+
+    def stats(self) -> Dict[str, Any]:
+        """Sites enregistrés, vues créées et état de l'instance de base."""
+        return {
+            "sites": self.sites(),
+            "views": len(self._views),
+            "base_loaded": self._base is not None,
+        }
+
+
+def registry_from_env(factory: Callable[[], HybridNLU] = HybridNLU) -> NLURegistry:
+    """Registre des sites du fichier HEADACHE_SITES (site par défaut seul si absent)."""
+    sites_path = os.environ.get(SITES_ENV_VAR)
+    sites = load_site_configs(Path(sites_path)) if sites_path else ()
+    return NLURegistry(factory, sites)
@@ -79,7 +79,9 @@ Author: Medical NLU Team
 Version: 2.0 (Vocabulary-based refactoring)
 """
 
-from typing import Dict, Any, Optional, Tuple, List
+import os
+from typing import Dict, Any, FrozenSet, Iterable, Optional, Tuple, List, Union
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
 from datetime import datetime
 
 from .models import HeadacheCase
@@ -185,6 +187,7 @@ def calculate_overall_confidence(
 
 
 from .medical_vocabulary import MedicalVocabulary, DetectionResult
+from .long_text import LONG_TEXT_THRESHOLD, detect_long_text
 from .pregnancy_utils import extract_pregnancy_trimester
 from .nlu_base import (
     extract_age,
@@ -198,6 +201,98 @@ from .nlu_base import (
 )
 
 
+# =============================================================================
+# PLAN DE DÉTECTION (PARSE CIBLÉ)
+# =============================================================================
+
+# Détecteurs de NLUv2.parse, nommés par le champ qu'ils renseignent
+DETECTORS = (
+    "age", "sex", "onset", "profile", "duration_current_episode_hours", "intensity",
+    "fever", "meningeal_signs", "htic_pattern", "neuro_deficit", "seizure",
+    "pregnancy_postpartum", "pregnancy_trimester", "trauma", "recent_pl_or_peridural",
+    "immunosuppression", "recent_pattern_change", "cancer_history", "vertigo",
+    "tinnitus", "visual_disturbance_type", "joint_pain", "horton_criteria",
+    "headache_location", "headache_profile",
+)
+
+# Détecteurs toujours exécutés sur une réponse de suivi, quel que soit le champ
+# demandé : démographie, temporalité, drapeaux rouges et contextes à risque
+# (tout ce que lisent les règles de décision). Seuls les descripteurs
+# (vertiges, acouphènes, troubles visuels, localisation...) restent ciblés.
+SAFETY_DETECTORS = (
+    "age", "sex", "onset", "profile", "duration_current_episode_hours", "intensity",
+    "fever", "meningeal_signs", "htic_pattern", "neuro_deficit", "seizure",
+    "pregnancy_postpartum", "pregnancy_trimester", "trauma", "recent_pl_or_peridural",
+    "immunosuppression", "recent_pattern_change", "cancer_history", "horton_criteria",
+    "headache_profile",
+)
+
+# Détecteurs dont un détecteur lit le résultat
+DETECTOR_DEPENDENCIES: Dict[str, Tuple[str, ...]] = {
+    # Le trimestre n'est cherché que si la grossesse est détectée
+    "pregnancy_trimester": ("pregnancy_postpartum",),
+    # Inférence du profil depuis le mode de début et la durée (étape 9)
+    "profile": ("onset", "duration_current_episode_hours"),
+}
+
+
+# Méthodes de MedicalVocabulary appelées par chaque détecteur (mode segmenté)
+VOCABULARY_DETECTORS: Dict[str, str] = {
+    "onset": "detect_onset",
+    "fever": "detect_fever",
+    "meningeal_signs": "detect_meningeal_signs",
+    "htic_pattern": "detect_htic",
+    "neuro_deficit": "detect_neuro_deficit",
+    "seizure": "detect_seizure",
+    "pregnancy_postpartum": "detect_pregnancy_postpartum",
+    "trauma": "detect_trauma",
+    "immunosuppression": "detect_immunosuppression",
+    "recent_pattern_change": "detect_pattern_change",
+    "cancer_history": "detect_cancer_history",
+    "vertigo": "detect_vertigo",
+    "tinnitus": "detect_tinnitus",
+    "visual_disturbance_type": "detect_visual_disturbance_type",
+    "joint_pain": "detect_joint_pain",
+    "horton_criteria": "detect_horton_criteria",
+    "headache_location": "detect_headache_location",
+}
+
+
+def plan_detectors(fields: Optional[Iterable[str]] = None) -> FrozenSet[str]:
+    """
+    Compute the detectors needed to fill the requested fields.
+
+    Args:
+        fields: HeadacheCase field names. None means a full parse.
+
+    Returns:
+        Requested detectors plus their transitive dependencies. Fields
+        without a detector (e.g. first_episode) contribute nothing.
+
+    Raises:
+        ValueError: If a name is not a HeadacheCase field.
+
+    Example:
+        >>> sorted(plan_detectors(["pregnancy_trimester"]))
+        ['pregnancy_postpartum', 'pregnancy_trimester']
+    """
+    if fields is None:
+        return frozenset(DETECTORS)
+    fields = [fields] if isinstance(fields, str) else list(fields)
+    unknown = [name for name in fields if name not in HeadacheCase.model_fields]
+    if unknown:
+        raise ValueError(f"Champs inconnus: {unknown}")
+
+    plan = set()
+    pending = [name for name in fields if name in DETECTORS]
+    while pending:
+        name = pending.pop()
+        if name not in plan:
+            plan.add(name)
+            pending.extend(DETECTOR_DEPENDENCIES.get(name, ()))
+    return frozenset(plan)
+
+
 class NLUv2:
     """
     Vocabulary-Based NLU for Clinical Headache Assessment.
@@ -230,16 +325,70 @@ class NLUv2:
         fébrile
     """
 
-    def __init__(self):
+    def __init__(
+        self,
+        long_text_pool: Optional[Union[str, Executor]] = None,
+        long_text_threshold: Optional[int] = LONG_TEXT_THRESHOLD,
+        long_text_workers: Optional[int] = None
+    ):
         """
         Initialize NLU v2 with the centralized medical vocabulary.
 
         The MedicalVocabulary instance is created once and reused for all
         parsing operations, ensuring consistent terminology handling.
+
+        Args:
+            long_text_pool: Opt-in chunked mode for very long notes (see
+                            long_text). "process" or "thread" creates a pool
+                            lazily; an Executor instance is used as is.
+                            None (default) parses every text sequentially.
+            long_text_threshold: Text length (characters) from which the
+                                 vocabulary detectors run per chunk. No
+                                 default: the chunked mode has shown no
+                                 speedup on the benchmark host, so the
+                                 threshold must be tuned on the target
+                                 multi-core machine (see
+                                 long_text.LONG_TEXT_THRESHOLD). None keeps
+                                 every text sequential, even with a pool.
+            long_text_workers: Pool size (default: os.cpu_count()); also
+                               the size of an Executor passed as pool.
         """
         self.vocab = MedicalVocabulary()
+        if isinstance(long_text_pool, str) and long_text_pool not in ("process", "thread"):
+            raise ValueError(f"long_text_pool inconnu: {long_text_pool!r}")
+        self.long_text_pool = long_text_pool
+        self.long_text_threshold = long_text_threshold
+        self.long_text_workers = long_text_workers or os.cpu_count() or 1
+        self._long_text_executor: Optional[Executor] = None
+
+    def _get_long_text_executor(self) -> Executor:
+        """Pool of the chunked mode, created on first use."""
+        if isinstance(self.long_text_pool, Executor):
+            return self.long_text_pool
+        if self._long_text_executor is None:
+            pool_class = ProcessPoolExecutor if self.long_text_pool == "process" else ThreadPoolExecutor
+            self._long_text_executor = pool_class(max_workers=self.long_text_workers)
+        return self._long_text_executor
+
+    def close(self) -> None:
+        """Shut down the pool created by the chunked mode, if any."""
+        if self._long_text_executor is not None:
+            self._long_text_executor.shutdown()
+            self._long_text_executor = None
 
     def parse_free_text_to_case(self, text: str) -> Tuple[HeadacheCase, Dict[str, Any]]:
+        """
+        Parse free-text clinical description with every detector.
+
+        Equivalent to parse(text); see parse for the detection pipeline.
+        """
+        return self.parse(text)
+
+    def parse(
+        self,
+        text: str,
+        fields: Optional[Iterable[str]] = None
+    ) -> Tuple[HeadacheCase, Dict[str, Any]]:
         """
         Parse free-text clinical description into a structured HeadacheCase.
 
@@ -272,6 +421,10 @@ class NLUv2:
         Args:
             text: Free-text clinical description in French.
                   Supports medical notation and patient expressions.
+            fields: Fields to extract (e.g. the field just asked in the
+                    dialogue). Only the detectors for these fields and their
+                    dependencies run (see plan_detectors); other fields keep
+                    their defaults. None runs every detector.
 
         Returns:
             Tuple[HeadacheCase, Dict[str, Any]]:
@@ -295,6 +448,20 @@ class NLUv2:
             - parse_free_text_to_case_v2: Wrapper function for compatibility
             - HybridNLU: Combines rules + embedding for best coverage
         """
+        plan = plan_detectors(fields)
+        vocab = self.vocab
+        if (
+            self.long_text_pool is not None
+            and self.long_text_threshold is not None
+            and len(text) >= self.long_text_threshold
+        ):
+            # Notes très longues : détecteurs du vocabulaire par segments, en parallèle
+            vocab = detect_long_text(
+                self.vocab, text,
+                [VOCABULARY_DETECTORS[name] for name in DETECTORS if name in plan and name in VOCABULARY_DETECTORS],
+                executor=self._get_long_text_executor(),
+                workers=self.long_text_workers
+            )
         extracted_data = {}
         detected_fields = []
         confidence_scores = {}
@@ -303,324 +470,347 @@ class NLUv2:
         # ====================================================================
         # ÉTAPE 1: Extraction démographique 
         # ====================================================================
-        age = extract_age(text)
-        sex = extract_sex(text)
-
-        if age is not None and 1 <= age <= 120:
-            extracted_data["age"] = age
-            detected_fields.append("age")
-            confidence_scores["age"] = 0.9
-        # Si âge non détecté, on ne met pas de valeur par défaut - reste None
-
-        if sex is not None:
-            extracted_data["sex"] = sex
-            detected_fields.append("sex")
-            confidence_scores["sex"] = 0.8
-        else:
-            extracted_data["sex"] = "Other"
-            confidence_scores["sex"] = 0.0
+        if "age" in plan:
+            age = extract_age(text)
+            if age is not None and 1 <= age <= 120:
+                extracted_data["age"] = age
+                detected_fields.append("age")
+                confidence_scores["age"] = 0.9
+            # Si âge non détecté, on ne met pas de valeur par défaut - reste None
+
+        if "sex" in plan:
+            sex = extract_sex(text)
+            if sex is not None:
+                extracted_data["sex"] = sex
+                detected_fields.append("sex")
+                confidence_scores["sex"] = 0.8
+            else:
+                extracted_data["sex"] = "Other"
+                confidence_scores["sex"] = 0.0
 
         # ====================================================================
         # ÉTAPE 2: Détection ONSET avec vocabulaire médical
         # ====================================================================
-        onset_result = self.vocab.detect_onset(text)
-        if onset_result.detected:
-            extracted_data["onset"] = onset_result.value
-            detected_fields.append("onset")
-            confidence_scores["onset"] = onset_result.confidence
-            detection_trace["onset"] = {
-                "matched_term": onset_result.matched_term,
-                "canonical": onset_result.canonical_form,
-                "source": onset_result.source
-            }
-        else:
-            extracted_data["onset"] = "unknown"
+        if "onset" in plan:
+            onset_result = vocab.detect_onset(text)
+            if onset_result.detected:
+                extracted_data["onset"] = onset_result.value
+                detected_fields.append("onset")
+                confidence_scores["onset"] = onset_result.confidence
+                detection_trace["onset"] = {
+                    "matched_term": onset_result.matched_term,
+                    "canonical": onset_result.canonical_form,
+                    "source": onset_result.source
+                }
+            else:
+                extracted_data["onset"] = "unknown"
 
         # ====================================================================
         # ÉTAPE 3: Détection PROFILE (réutilise nlu.py pour l'instant)
         # ====================================================================
-        profile = detect_pattern(text, PROFILE_PATTERNS)
-        if profile:
-            extracted_data["profile"] = profile
-            detected_fields.append("profile")
-            confidence_scores["profile"] = 0.8
-        else:
-            extracted_data["profile"] = "unknown"
+        if "profile" in plan:
+            profile = detect_pattern(text, PROFILE_PATTERNS)
+            if profile:
+                extracted_data["profile"] = profile
+                detected_fields.append("profile")
+                confidence_scores["profile"] = 0.8
+            else:
+                extracted_data["profile"] = "unknown"
 
         # ====================================================================
         # ÉTAPE 4: Durée et intensité (réutilise nlu.py)
         # ====================================================================
-        duration = extract_duration_hours(text)
-        if duration is not None:
-            extracted_data["duration_current_episode_hours"] = duration
-            detected_fields.append("duration_current_episode_hours")
-            confidence_scores["duration_current_episode_hours"] = 0.9
-
-        intensity = extract_intensity_score(text)
-        if intensity is not None:
-            extracted_data["intensity"] = intensity
-            detected_fields.append("intensity")
-            confidence_scores["intensity"] = 0.85
+        if "duration_current_episode_hours" in plan:
+            duration = extract_duration_hours(text)
+            if duration is not None:
+                extracted_data["duration_current_episode_hours"] = duration
+                detected_fields.append("duration_current_episode_hours")
+                confidence_scores["duration_current_episode_hours"] = 0.9
+
+        if "intensity" in plan:
+            intensity = extract_intensity_score(text)
+            if intensity is not None:
+                extracted_data["intensity"] = intensity
+                detected_fields.append("intensity")
+                confidence_scores["intensity"] = 0.85
 
         # ====================================================================
         # ÉTAPE 5: RED FLAGS - Vocabulaire médical
         # ====================================================================
 
         # 5.1 FIÈVRE
-        fever_result = self.vocab.detect_fever(text)
-        if fever_result.detected:
-            extracted_data["fever"] = fever_result.value
-            detected_fields.append("fever")
-            confidence_scores["fever"] = fever_result.confidence
-            detection_trace["fever"] = {
-                "matched_term": fever_result.matched_term,
-                "canonical": fever_result.canonical_form,
-                "source": fever_result.source
-            }
+        if "fever" in plan:
+            fever_result = vocab.detect_fever(text)
+            if fever_result.detected:
+                extracted_data["fever"] = fever_result.value
+                detected_fields.append("fever")
+                confidence_scores["fever"] = fever_result.confidence
+                detection_trace["fever"] = {
+                    "matched_term": fever_result.matched_term,
+                    "canonical": fever_result.canonical_form,
+                    "source": fever_result.source
+                }
 
         # 5.2 SYNDROME MÉNINGÉ
-        meningeal_result = self.vocab.detect_meningeal_signs(text)
-        if meningeal_result.detected:
-            extracted_data["meningeal_signs"] = meningeal_result.value
-            detected_fields.append("meningeal_signs")
-            confidence_scores["meningeal_signs"] = meningeal_result.confidence
-            detection_trace["meningeal_signs"] = {
-                "matched_term": meningeal_result.matched_term,
-                "canonical": meningeal_result.canonical_form,
-                "source": meningeal_result.source
-            }
+        if "meningeal_signs" in plan:
+            meningeal_result = vocab.detect_meningeal_signs(text)
+            if meningeal_result.detected:
+                extracted_data["meningeal_signs"] = meningeal_result.value
+                detected_fields.append("meningeal_signs")
+                confidence_scores["meningeal_signs"] = meningeal_result.confidence
+                detection_trace["meningeal_signs"] = {
+                    "matched_term": meningeal_result.matched_term,
+                    "canonical": meningeal_result.canonical_form,
+                    "source": meningeal_result.source
+                }
 
         # 5.3 HTIC - SEUIL DE CONFIANCE pour éviter faux positifs
         # "pire le matin" seul (confiance 0.45) ne devrait PAS déclencher HTIC
         # HTIC nécessite: vomissements en jet OU œdème papillaire OU céphalée matutinale + autre signe
         HTIC_CONFIDENCE_THRESHOLD = 0.70  # Seuil pour valider HTIC
-        htic_result = self.vocab.detect_htic(text)
-        if htic_result.detected and htic_result.value is True:
-            # Appliquer seuil de confiance
-            if htic_result.confidence >= HTIC_CONFIDENCE_THRESHOLD:
-                extracted_data["htic_pattern"] = True
-                detected_fields.append("htic_pattern")
-                confidence_scores["htic_pattern"] = htic_result.confidence
-                detection_trace["htic_pattern"] = {
-                    "matched_term": htic_result.matched_term,
-                    "canonical": htic_result.canonical_form,
-                    "source": htic_result.source
-                }
-            # Si confiance < seuil, ne pas détecter HTIC (éviter faux positifs)
-            # Tracer quand même pour debugging
-            elif htic_result.confidence > 0:
-                detection_trace["htic_pattern_low_confidence"] = {
-                    "matched_term": htic_result.matched_term,
-                    "confidence": htic_result.confidence,
-                    "reason": "below_threshold"
-                }
+        if "htic_pattern" in plan:
+            htic_result = vocab.detect_htic(text)
+            if htic_result.detected and htic_result.value is True:
+                # Appliquer seuil de confiance
+                if htic_result.confidence >= HTIC_CONFIDENCE_THRESHOLD:
+                    extracted_data["htic_pattern"] = True
+                    detected_fields.append("htic_pattern")
+                    confidence_scores["htic_pattern"] = htic_result.confidence
+                    detection_trace["htic_pattern"] = {
+                        "matched_term": htic_result.matched_term,
+                        "canonical": htic_result.canonical_form,
+                        "source": htic_result.source
+                    }
+                # Si confiance < seuil, ne pas détecter HTIC (éviter faux positifs)
+                # Tracer quand même pour debugging
+                elif htic_result.confidence > 0:
+                    detection_trace["htic_pattern_low_confidence"] = {
+                        "matched_term": htic_result.matched_term,
+                        "confidence": htic_result.confidence,
+                        "reason": "below_threshold"
+                    }
 
         # 5.4 DÉFICIT NEUROLOGIQUE
-        neuro_result = self.vocab.detect_neuro_deficit(text)
-        if neuro_result.detected and neuro_result.value is True:
-            extracted_data["neuro_deficit"] = True
-            detected_fields.append("neuro_deficit")
-            confidence_scores["neuro_deficit"] = neuro_result.confidence
-            detection_trace["neuro_deficit"] = {
-                "matched_term": neuro_result.matched_term,
-                "canonical": neuro_result.canonical_form,
-                "source": neuro_result.source
-            }
+        if "neuro_deficit" in plan:
+            neuro_result = vocab.detect_neuro_deficit(text)
+            if neuro_result.detected and neuro_result.value is True:
+                extracted_data["neuro_deficit"] = True
+                detected_fields.append("neuro_deficit")
+                confidence_scores["neuro_deficit"] = neuro_result.confidence
+                detection_trace["neuro_deficit"] = {
+                    "matched_term": neuro_result.matched_term,
+                    "canonical": neuro_result.canonical_form,
+                    "source": neuro_result.source
+                }
 
         # 5.5 CRISES D'ÉPILEPSIE
-        seizure_result = self.vocab.detect_seizure(text)
-        if seizure_result.detected and seizure_result.value is True:
-            extracted_data["seizure"] = True
-            detected_fields.append("seizure")
-            confidence_scores["seizure"] = seizure_result.confidence
-            detection_trace["seizure"] = {
-                "matched_term": seizure_result.matched_term,
-                "canonical": seizure_result.canonical_form,
-                "source": seizure_result.source
-            }
+        if "seizure" in plan:
+            seizure_result = vocab.detect_seizure(text)
+            if seizure_result.detected and seizure_result.value is True:
+                extracted_data["seizure"] = True
+                detected_fields.append("seizure")
+                confidence_scores["seizure"] = seizure_result.confidence
+                detection_trace["seizure"] = {
+                    "matched_term": seizure_result.matched_term,
+                    "canonical": seizure_result.canonical_form,
+                    "source": seizure_result.source
+                }
 
         # ====================================================================
         # ÉTAPE 6: CONTEXTES À RISQUE - Vocabulaire médical
         # ====================================================================
 
         # 6.1 GROSSESSE / POST-PARTUM
-        pregnancy_result = self.vocab.detect_pregnancy_postpartum(text)
-        if pregnancy_result.detected:
-            extracted_data["pregnancy_postpartum"] = pregnancy_result.value
-            detected_fields.append("pregnancy_postpartum")
-            confidence_scores["pregnancy_postpartum"] = pregnancy_result.confidence
-            detection_trace["pregnancy_postpartum"] = {
-                "matched_term": pregnancy_result.matched_term,
-                "canonical": pregnancy_result.canonical_form,
-                "source": pregnancy_result.source
-            }
-
-            # 6.1.1 TRIMESTRE DE GROSSESSE (si enceinte)
-            # Extraction robuste: semaines, mois, jours, SA, trimestre explicite
-            if pregnancy_result.value is True:  # Si enceinte (pas post-partum)
-                trimester = extract_pregnancy_trimester(text)
-                if trimester is not None:
-                    extracted_data["pregnancy_trimester"] = trimester
-                    detected_fields.append("pregnancy_trimester")
-                    confidence_scores["pregnancy_trimester"] = 0.85
-                    detection_trace["pregnancy_trimester"] = {
-                        "trimester": trimester,
-                        "source": "robust_extraction"
-                    }
+        if "pregnancy_postpartum" in plan:
+            pregnancy_result = vocab.detect_pregnancy_postpartum(text)
+            if pregnancy_result.detected:
+                extracted_data["pregnancy_postpartum"] = pregnancy_result.value
+                detected_fields.append("pregnancy_postpartum")
+                confidence_scores["pregnancy_postpartum"] = pregnancy_result.confidence
+                detection_trace["pregnancy_postpartum"] = {
+                    "matched_term": pregnancy_result.matched_term,
+                    "canonical": pregnancy_result.canonical_form,
+                    "source": pregnancy_result.source
+                }
+
+                # 6.1.1 TRIMESTRE DE GROSSESSE (si enceinte)
+                # Extraction robuste: semaines, mois, jours, SA, trimestre explicite
+                if pregnancy_result.value is True and "pregnancy_trimester" in plan:  # Si enceinte (pas post-partum)
+                    trimester = extract_pregnancy_trimester(text)
+                    if trimester is not None:
+                        extracted_data["pregnancy_trimester"] = trimester
+                        detected_fields.append("pregnancy_trimester")
+                        confidence_scores["pregnancy_trimester"] = 0.85
+                        detection_trace["pregnancy_trimester"] = {
+                            "trimester": trimester,
+                            "source": "robust_extraction"
+                        }
 
         # 6.2 TRAUMATISME
-        trauma_result = self.vocab.detect_trauma(text)
-        if trauma_result.detected:
-            extracted_data["trauma"] = trauma_result.value
-            detected_fields.append("trauma")
-            confidence_scores["trauma"] = trauma_result.confidence
-            detection_trace["trauma"] = {
-                "matched_term": trauma_result.matched_term,
-                "canonical": trauma_result.canonical_form,
-                "source": trauma_result.source
-            }
+        if "trauma" in plan:
+            trauma_result = vocab.detect_trauma(text)
+            if trauma_result.detected:
+                extracted_data["trauma"] = trauma_result.value
+                detected_fields.append("trauma")
+                confidence_scores["trauma"] = trauma_result.confidence
+                detection_trace["trauma"] = {
+                    "matched_term": trauma_result.matched_term,
+                    "canonical": trauma_result.canonical_form,
+                    "source": trauma_result.source
+                }
 
         # 6.3 PL / PÉRIDURALE récente (réutilise nlu.py)
-        recent_pl = detect_pattern(text, RECENT_PL_OR_PERIDURAL_PATTERNS)
-        if recent_pl is not None:
-            extracted_data["recent_pl_or_peridural"] = recent_pl
-            detected_fields.append("recent_pl_or_peridural")
-            confidence_scores["recent_pl_or_peridural"] = 0.9
+        if "recent_pl_or_peridural" in plan:
+            recent_pl = detect_pattern(text, RECENT_PL_OR_PERIDURAL_PATTERNS)
+            if recent_pl is not None:
+                extracted_data["recent_pl_or_peridural"] = recent_pl
+                detected_fields.append("recent_pl_or_peridural")
+                confidence_scores["recent_pl_or_peridural"] = 0.9
 
         # 6.4 IMMUNODÉPRESSION
-        immunosup_result = self.vocab.detect_immunosuppression(text)
-        if immunosup_result.detected:
-            extracted_data["immunosuppression"] = immunosup_result.value
-            detected_fields.append("immunosuppression")
-            confidence_scores["immunosuppression"] = immunosup_result.confidence
-            detection_trace["immunosuppression"] = {
-                "matched_term": immunosup_result.matched_term,
-                "canonical": immunosup_result.canonical_form,
-                "source": immunosup_result.source
-            }
+        if "immunosuppression" in plan:
+            immunosup_result = vocab.detect_immunosuppression(text)
+            if immunosup_result.detected:
+                extracted_data["immunosuppression"] = immunosup_result.value
+                detected_fields.append("immunosuppression")
+                confidence_scores["immunosuppression"] = immunosup_result.confidence
+                detection_trace["immunosuppression"] = {
+                    "matched_term": immunosup_result.matched_term,
+                    "canonical": immunosup_result.canonical_form,
+                    "source": immunosup_result.source
+                }
 
         # 6.5 CHANGEMENT RÉCENT DE PATTERN (céphalées chroniques)
-        pattern_change_result = self.vocab.detect_pattern_change(text)
-        if pattern_change_result.detected:
-            extracted_data["recent_pattern_change"] = pattern_change_result.value
-            detected_fields.append("recent_pattern_change")
-            confidence_scores["recent_pattern_change"] = pattern_change_result.confidence
-            detection_trace["recent_pattern_change"] = {
-                "matched_term": pattern_change_result.matched_term,
-                "canonical": pattern_change_result.canonical_form,
-                "source": pattern_change_result.source
-            }
+        if "recent_pattern_change" in plan:
+            pattern_change_result = vocab.detect_pattern_change(text)
+            if pattern_change_result.detected:
+                extracted_data["recent_pattern_change"] = pattern_change_result.value
+                detected_fields.append("recent_pattern_change")
+                confidence_scores["recent_pattern_change"] = pattern_change_result.confidence
+                detection_trace["recent_pattern_change"] = {
+                    "matched_term": pattern_change_result.matched_term,
+                    "canonical": pattern_change_result.canonical_form,
+                    "source": pattern_change_result.source
+                }
 
         # 6.6 CONTEXTE ONCOLOGIQUE (PRIORITÉ 1 - impact décision scanner/IRM)
-        cancer_result = self.vocab.detect_cancer_history(text)
-        if cancer_result.detected:
-            extracted_data["cancer_history"] = cancer_result.value
-            detected_fields.append("cancer_history")
-            confidence_scores["cancer_history"] = cancer_result.confidence
-            detection_trace["cancer_history"] = {
-                "matched_term": cancer_result.matched_term,
-                "canonical": cancer_result.canonical_form,
-                "source": cancer_result.source
-            }
+        if "cancer_history" in plan:
+            cancer_result = vocab.detect_cancer_history(text)
+            if cancer_result.detected:
+                extracted_data["cancer_history"] = cancer_result.value
+                detected_fields.append("cancer_history")
+                confidence_scores["cancer_history"] = cancer_result.confidence
+                detection_trace["cancer_history"] = {
+                    "matched_term": cancer_result.matched_term,
+                    "canonical": cancer_result.canonical_form,
+                    "source": cancer_result.source
+                }
 
         # 6.7 VERTIGES (PRIORITÉ 2)
-        vertigo_result = self.vocab.detect_vertigo(text)
-        if vertigo_result.detected:
-            extracted_data["vertigo"] = vertigo_result.value
-            detected_fields.append("vertigo")
-            confidence_scores["vertigo"] = vertigo_result.confidence
-            detection_trace["vertigo"] = {
-                "matched_term": vertigo_result.matched_term,
-                "canonical": vertigo_result.canonical_form,
-                "source": vertigo_result.source
-            }
+        if "vertigo" in plan:
+            vertigo_result = vocab.detect_vertigo(text)
+            if vertigo_result.detected:
+                extracted_data["vertigo"] = vertigo_result.value
+                detected_fields.append("vertigo")
+                confidence_scores["vertigo"] = vertigo_result.confidence
+                detection_trace["vertigo"] = {
+                    "matched_term": vertigo_result.matched_term,
+                    "canonical": vertigo_result.canonical_form,
+                    "source": vertigo_result.source
+                }
 
         # 6.8 ACOUPHÈNES (PRIORITÉ 2)
-        tinnitus_result = self.vocab.detect_tinnitus(text)
-        if tinnitus_result.detected:
-            extracted_data["tinnitus"] = tinnitus_result.value
-            detected_fields.append("tinnitus")
-            confidence_scores["tinnitus"] = tinnitus_result.confidence
-            detection_trace["tinnitus"] = {
-                "matched_term": tinnitus_result.matched_term,
-                "canonical": tinnitus_result.canonical_form,
-                "source": tinnitus_result.source
-            }
+        if "tinnitus" in plan:
+            tinnitus_result = vocab.detect_tinnitus(text)
+            if tinnitus_result.detected:
+                extracted_data["tinnitus"] = tinnitus_result.value
+                detected_fields.append("tinnitus")
+                confidence_scores["tinnitus"] = tinnitus_result.confidence
+                detection_trace["tinnitus"] = {
+                    "matched_term": tinnitus_result.matched_term,
+                    "canonical": tinnitus_result.canonical_form,
+                    "source": tinnitus_result.source
+                }
 
         # 6.9 TROUBLES VISUELS - TYPE (PRIORITÉ 2)
-        visual_result = self.vocab.detect_visual_disturbance_type(text)
-        if visual_result.detected:
-            extracted_data["visual_disturbance_type"] = visual_result.value
-            detected_fields.append("visual_disturbance_type")
-            confidence_scores["visual_disturbance_type"] = visual_result.confidence
-            detection_trace["visual_disturbance_type"] = {
-                "matched_term": visual_result.matched_term,
-                "canonical": visual_result.canonical_form,
-                "source": visual_result.source
-            }
+        if "visual_disturbance_type" in plan:
+            visual_result = vocab.detect_visual_disturbance_type(text)
+            if visual_result.detected:
+                extracted_data["visual_disturbance_type"] = visual_result.value
+                detected_fields.append("visual_disturbance_type")
+                confidence_scores["visual_disturbance_type"] = visual_result.confidence
+                detection_trace["visual_disturbance_type"] = {
+                    "matched_term": visual_result.matched_term,
+                    "canonical": visual_result.canonical_form,
+                    "source": visual_result.source
+                }
 
         # 6.10 DOULEURS ARTICULAIRES (PRIORITÉ 2 - lié Horton)
-        joint_pain_result = self.vocab.detect_joint_pain(text)
-        if joint_pain_result.detected:
-            extracted_data["joint_pain"] = joint_pain_result.value
-            detected_fields.append("joint_pain")
-            confidence_scores["joint_pain"] = joint_pain_result.confidence
-            detection_trace["joint_pain"] = {
-                "matched_term": joint_pain_result.matched_term,
-                "canonical": joint_pain_result.canonical_form,
-                "source": joint_pain_result.source
-            }
+        if "joint_pain" in plan:
+            joint_pain_result = vocab.detect_joint_pain(text)
+            if joint_pain_result.detected:
+                extracted_data["joint_pain"] = joint_pain_result.value
+                detected_fields.append("joint_pain")
+                confidence_scores["joint_pain"] = joint_pain_result.confidence
+                detection_trace["joint_pain"] = {
+                    "matched_term": joint_pain_result.matched_term,
+                    "canonical": joint_pain_result.canonical_form,
+                    "source": joint_pain_result.source
+                }
 
         # 6.11 CRITÈRES HORTON (PRIORITÉ 2)
-        horton_result = self.vocab.detect_horton_criteria(text)
-        if horton_result.detected:
-            extracted_data["horton_criteria"] = horton_result.value
-            detected_fields.append("horton_criteria")
-            confidence_scores["horton_criteria"] = horton_result.confidence
-            detection_trace["horton_criteria"] = {
-                "matched_term": horton_result.matched_term,
-                "canonical": horton_result.canonical_form,
-                "source": horton_result.source
-            }
+        if "horton_criteria" in plan:
+            horton_result = vocab.detect_horton_criteria(text)
+            if horton_result.detected:
+                extracted_data["horton_criteria"] = horton_result.value
+                detected_fields.append("horton_criteria")
+                confidence_scores["horton_criteria"] = horton_result.confidence
+                detection_trace["horton_criteria"] = {
+                    "matched_term": horton_result.matched_term,
+                    "canonical": horton_result.canonical_form,
+                    "source": horton_result.source
+                }
 
         # 6.12 LOCALISATION CÉPHALÉE (PRIORITÉ 4)
-        location_result = self.vocab.detect_headache_location(text)
-        if location_result.detected:
-            extracted_data["headache_location"] = location_result.value
-            detected_fields.append("headache_location")
-            confidence_scores["headache_location"] = location_result.confidence
-            detection_trace["headache_location"] = {
-                "matched_term": location_result.matched_term,
-                "canonical": location_result.canonical_form,
-                "source": location_result.source
-            }
+        if "headache_location" in plan:
+            location_result = vocab.detect_headache_location(text)
+            if location_result.detected:
+                extracted_data["headache_location"] = location_result.value
+                detected_fields.append("headache_location")
+                confidence_scores["headache_location"] = location_result.confidence
+                detection_trace["headache_location"] = {
+                    "matched_term": location_result.matched_term,
+                    "canonical": location_result.canonical_form,
+                    "source": location_result.source
+                }
 
         # ====================================================================
         # ÉTAPE 7: PROFIL CLINIQUE CÉPHALÉE (réutilise nlu.py)
         # ====================================================================
-        import re
-        headache_profile_scores = {}
-        text_lower = text.lower()
-
-        for profile_type, pattern_list in HEADACHE_PROFILE_PATTERNS.items():
-            score = 0
-            for pattern in pattern_list:
-                if re.search(pattern, text_lower):
-                    score += 1
-            if score > 0:
-                headache_profile_scores[profile_type] = score
-
-        # Bonus tension_like si absence explicite signes migraineux
-        if any(re.search(pattern, text_lower) for pattern in [r"Ø\s*(?:n/?v|photo|phono)", r"sans\s+n/?v", r"pas\s+de\s+n/?v", r"aucun s associé"]):
-            headache_profile_scores["tension_like"] = headache_profile_scores.get("tension_like", 0) + 3
-
-        if headache_profile_scores:
-            headache_profile = max(headache_profile_scores, key=headache_profile_scores.get)
-            extracted_data["headache_profile"] = headache_profile
-            detected_fields.append("headache_profile")
-            confidence_scores["headache_profile"] = 0.75
-        else:
-            extracted_data["headache_profile"] = "unknown"
+        if "headache_profile" in plan:
+            import re
+            headache_profile_scores = {}
+            text_lower = text.lower()
+
+            for profile_type, pattern_list in HEADACHE_PROFILE_PATTERNS.items():
+                score = 0
+                for pattern in pattern_list:
+                    if re.search(pattern, text_lower):
+                        score += 1
+                if score > 0:
+                    headache_profile_scores[profile_type] = score
+
+            # Bonus tension_like si absence explicite signes migraineux
+            if any(re.search(pattern, text_lower) for pattern in [r"Ø\s*(?:n/?v|photo|phono)", r"sans\s+n/?v", r"pas\s+de\s+n/?v", r"aucun s associé"]):
+                headache_profile_scores["tension_like"] = headache_profile_scores.get("tension_like", 0) + 3
+
+            if headache_profile_scores:
+                headache_profile = max(headache_profile_scores, key=headache_profile_scores.get)
+                extracted_data["headache_profile"] = headache_profile
+                detected_fields.append("headache_profile")
+                confidence_scores["headache_profile"] = 0.75
+            else:
+                extracted_data["headache_profile"] = "unknown"
 
         # ====================================================================
         # ÉTAPE 8: Construction HeadacheCase
@@ -638,7 +828,7 @@ class NLUv2:
         # ====================================================================
         # ÉTAPE 9: Inférence automatique profile depuis onset/durée
         # ====================================================================
-        if case.onset != "unknown" and case.profile == "unknown":
+        if "profile" in plan and case.onset != "unknown" and case.profile == "unknown":
             if case.onset == "thunderclap":
                 case = case.model_copy(update={"profile": "acute"})
                 detected_fields.append("profile")
@@ -667,7 +857,7 @@ class NLUv2:
                 confidence_scores["profile"] = 0.9
 
         # Inférence depuis durée seule si profile toujours unknown
-        if case.profile == "unknown" and case.duration_current_episode_hours is not None:
+        if "profile" in plan and case.profile == "unknown" and case.duration_current_episode_hours is not None:
             if case.duration_current_episode_hours < 168:
                 case = case.model_copy(update={"profile": "acute"})
             elif case.duration_current_episode_hours < 2160:
@@ -714,6 +904,10 @@ class NLUv2:
             "contradictions": contradictions,
             "detection_trace": detection_trace  # Nouveau: traçabilité complète
         }
+        if fields is not None:
+            metadata["parse_plan"] = sorted(plan)
+        if vocab is not self.vocab:
+            metadata["long_text_chunks"] = vocab.chunk_count
 
         return case, metadata
 
@@ -0,0 +1,303 @@
+"""Cache borné des analyses HybridNLU, indexé par la forme canonique du message.
+
+Les messages identiques ou quasi identiques sont fréquents : réessais du
+frontend, réponses courtes ("non", "pas de fièvre"), note type collée par
+plusieurs médecins. Le cache évite de relancer tout parse_hybrid :
+
+    - clé : forme canonique du texte (NFC, espaces réduits, minuscules),
+      champs ciblés (NLUv2.parse), couche d'embedding autorisée ou non
+      (réponses courtes du dialogue) et version de la configuration NLU
+      (réglages HybridNLU, version du lexique compilé, empreintes des
+      vocabulaires médical et sémantique)
+    - le texte analysé est la forme canonique : le résultat ne dépend que de
+      la clé (tous les détecteurs travaillent en minuscules)
+    - résultats profondément immuables : cas FrozenHeadacheCase, métadonnées
+      en FrozenDict / FrozenList (sous-classes de dict / list, donc
+      sérialisables telles quelles); toute modification lève TypeError
+    - LRU borné, sûr en accès concurrent (verrou court autour du
+      dictionnaire; l'analyse elle-même se fait hors verrou)
+    - analyses concurrentes d'une même clé regroupées (single_flight) :
+      un double envoi ne lance qu'un parse_hybrid
+    - statistiques (hits, misses, évictions, regroupements, taux) exposées
+      par /metrics
+
+Taille par défaut : HEADACHE_PARSE_CACHE_SIZE (0 désactive le cache).
+"""
+
+import hashlib
+import json
+import os
+import re
+import threading
+import unicodedata
+import weakref
+from collections import OrderedDict
+from dataclasses import replace
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from pydantic import ConfigDict
+
+from .models import HeadacheCase
+from .nlu_hybrid import LEXICON, HybridNLU, HybridResult
+from .single_flight import SingleFlight
+
+
+# Variable d'environnement fixant la taille du cache du dialogue
+CACHE_SIZE_ENV_VAR = "HEADACHE_PARSE_CACHE_SIZE"
+
+# Taille par défaut (nombre d'analyses conservées)
+DEFAULT_CACHE_SIZE = 1024
+
+_WHITESPACE_RE = re.compile(r"\s+")
+
+
+# ==============================================================================
+# Valeurs immuables
+# ==============================================================================
+
+def _read_only(self, *args, **kwargs):
+    raise TypeError(f"{type(self).__name__} est en lecture seule (résultat partagé du cache)")
+
+
+class FrozenDict(dict):
+    """Dictionnaire en lecture seule (copy() renvoie un dict modifiable)."""
+
+    __setitem__ = __delitem__ = __ior__ = _read_only
+    clear = pop = popitem = setdefault = update = _read_only
+
+    def __reduce__(self):
+        return type(self), (dict(self),)
+
+
+class FrozenList(list):
+    """Liste en lecture seule (copy() renvoie une list modifiable)."""
+
+    __setitem__ = __delitem__ = __iadd__ = __imul__ = _read_only
+    append = extend = insert = pop = remove = clear = sort = reverse = _read_only
+
+    def __reduce__(self):
+        return type(self), (list(self),)
+
+
+class FrozenHeadacheCase(HeadacheCase):
+    """HeadacheCase figé : affectation interdite, listes en lecture seule.
+
+    model_copy(update=...) reste disponible pour dériver un nouveau cas.
+    Égal à tout HeadacheCase de mêmes valeurs.
+    """
+
+    model_config = ConfigDict(frozen=True)
+
+    def __eq__(self, other: Any) -> bool:
+        if isinstance(other, HeadacheCase):
+            return self.model_dump() == other.model_dump()
+        return NotImplemented
+
+    __hash__ = None
+
+
+def freeze(value: Any) -> Any:
+    """Copie profondément immuable d'une valeur (dict, list, tuple, HeadacheCase)."""
+    if isinstance(value, HeadacheCase):
+        return freeze_case(value)
+    if isinstance(value, dict):
+        return FrozenDict((key, freeze(item)) for key, item in value.items())
+    if isinstance(value, (list, tuple)):
+        return FrozenList(freeze(item) for item in value)
+    if isinstance(value, set):
+        return frozenset(value)
+    return value
+
+
+def freeze_case(case: HeadacheCase) -> FrozenHeadacheCase:
+    """Copie figée d'un cas (sans revalidation)."""
+    if isinstance(case, FrozenHeadacheCase):
+        return case
+    return FrozenHeadacheCase.model_construct(
+        _fields_set=set(case.model_fields_set),
+        **{name: freeze(value) for name, value in case.__dict__.items()}
+    )
+
+
+# ==============================================================================
+# Clé de cache
+# ==============================================================================
+
+def canonical_text(text: str) -> str:
+    """Forme canonique d'un message : NFC, espaces réduits et minuscules."""
+    return _WHITESPACE_RE.sub(" ", unicodedata.normalize("NFC", text)).strip().lower()
+
+
+def _digest(payload: Any) -> str:
+    encoded = json.dumps(payload, ensure_ascii=False, sort_keys=True, default=str)
+    return hashlib.sha256(encoded.encode("utf-8")).hexdigest()
+
+
+_vocabulary_versions: "weakref.WeakKeyDictionary[Any, str]" = weakref.WeakKeyDictionary()
+
+
+def vocabulary_version(vocabulary: Any) -> str:
+    """Empreinte des tables d'un vocabulaire (attributs *vocabulary*), calculée une fois."""
+    version = _vocabulary_versions.get(vocabulary)
+    if version is None:
+        tables = {
+            name: value for name, value in vars(vocabulary).items()
+            if "vocabulary" in name and isinstance(value, dict)
+        }
+        version = _digest(tables)[:12]
+        _vocabulary_versions[vocabulary] = version
+    return version
+
+
+def nlu_config_version(nlu: HybridNLU) -> str:
+    """Version de la configuration d'un HybridNLU (réglages, lexique, vocabulaires)."""
+    settings = {
+        "confidence_threshold": nlu.confidence_threshold,
+        "use_embedding": nlu.use_embedding,
+        "use_semantic": nlu.use_semantic,
+        "embedding_backend": getattr(nlu.embedder, "backend", nlu.embedding_backend),
+        "embedding_model": nlu.embedding_model,
+        "word_vectors": nlu.word_vectors,
+        "lexicon": LEXICON.version,
+        "medical_vocabulary": vocabulary_version(nlu.rule_nlu.vocab),
+    }
+    if nlu.semantic_vocab is not None:
+        settings["semantic_vocabulary"] = vocabulary_version(nlu.semantic_vocab)
+        settings["similarity_threshold"] = (
+            nlu.similarity_threshold if nlu.similarity_threshold is not None
+            else nlu.semantic_vocab.similarity_threshold
+        )
+    return _digest(settings)[:12]
+
+
+# ==============================================================================
+# Cache
+# ==============================================================================
+
+class ParseCache:
+    """Cache LRU borné des résultats de HybridNLU.parse_hybrid.
+
+    Args:
+        maxsize: Nombre maximal d'analyses conservées (0 : cache désactivé)
+
+    Example:
+        >>> cache = ParseCache(maxsize=256)
+        >>> result = cache.parse_hybrid(nlu, "Pas de fièvre")
+        >>> cache.parse_hybrid(nlu, "pas de  fièvre").case is result.case
+        True
+    """
+
+    def __init__(self, maxsize: int = DEFAULT_CACHE_SIZE):
+        self.maxsize = maxsize
+        self._entries: "OrderedDict[Tuple[Any, ...], HybridResult]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._flights = SingleFlight()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.coalesced = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def key(
+        self,
+        nlu: HybridNLU,
+        text: str,
+        fields: Optional[Iterable[str]] = None,
+        use_embedding: bool = True
+    ) -> Tuple[Any, ...]:
+        """Clé d'une analyse : (texte canonique, champs ciblés, embedding, version de configuration)."""
+        targeted = None if fields is None else tuple(sorted(set(fields)))
+        return canonical_text(text), targeted, use_embedding, nlu_config_version(nlu)
+
+    def parse_hybrid(
+        self,
+        nlu: HybridNLU,
+        text: str,
+        fields: Optional[List[str]] = None,
+        use_embedding: bool = True
+    ) -> HybridResult:
+        """Résultat (immuable) de nlu.parse_hybrid sur la forme canonique du texte.
+
+        Args:
+            nlu: Moteur NLU hybride
+            text: Message à analyser
+            fields: Champs ciblés (voir NLUv2.parse)
+            use_embedding: False : couches déterministes seules (voir parse_hybrid)
+
+        Returns:
+            HybridResult propre à l'appelant, dont le contenu (partagé) est
+            profondément immuable
+        """
+        key = self.key(nlu, text, fields, use_embedding)
+        with self._lock:
+            result = self._entries.get(key)
+            if result is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return replace(result)
+            self.misses += 1
+
+        # Analyse de la même clé déjà en cours : attendre son résultat
+        result, shared = self._flights.do(key, self._parse_and_store, nlu, key, fields)
+        if shared:
+            with self._lock:
+                self.coalesced += 1
+        return replace(result)
+
+    def _parse_and_store(self, nlu: HybridNLU, key: Tuple[Any, ...], fields: Optional[List[str]]) -> HybridResult:
+        parsed = nlu.parse_hybrid(key[0], fields=fields, use_embedding=key[2])
+        result = HybridResult(
+            case=freeze_case(parsed.case),
+            metadata=freeze(parsed.metadata),
+            hybrid_enhanced=parsed.hybrid_enhanced,
+            enhancement_details=freeze(parsed.enhancement_details),
+        )
+        if self.maxsize <= 0:
+            return result
+
+        with self._lock:
+            # Une analyse de la même clé a pu être publiée entre-temps
+            result = self._entries.setdefault(key, result)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+        return result
+
+    def parse_free_text_to_case(
+        self,
+        nlu: HybridNLU,
+        text: str,
+        fields: Optional[List[str]] = None,
+        use_embedding: bool = True
+    ) -> Tuple[HeadacheCase, Dict[str, Any]]:
+        """Interface de HybridNLU.parse_free_text_to_case, avec cache."""
+        result = self.parse_hybrid(nlu, text, fields=fields, use_embedding=use_embedding)
+        return result.case, result.metadata
+
+    def clear(self) -> None:
+        """Vide le cache et remet les compteurs à zéro."""
+        with self._lock:
+            self._entries.clear()
+            self.hits = self.misses = self.evictions = self.coalesced = 0
+
+    def stats(self) -> Dict[str, Any]:
+        """Compteurs du cache (exposés par /metrics)."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "maxsize": self.maxsize,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "coalesced": self.coalesced,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+            }
+
+
+def cache_size_from_env() -> int:
+    """Taille du cache du dialogue (HEADACHE_PARSE_CACHE_SIZE, sinon DEFAULT_CACHE_SIZE)."""
+    return int(os.environ.get(CACHE_SIZE_ENV_VAR, DEFAULT_CACHE_SIZE))
@@ -5,11 +5,16 @@ Génère des ordonnances formatées pour les examens d'imagerie
 recommandés par le système d'évaluation des céphalées.
 """
 
+import hashlib
+import json
+import threading
+from collections import OrderedDict
 from datetime import datetime
 from pathlib import Path
-from typing import Optional, Union
+from typing import Any, Callable, Dict, Optional, Tuple, Union
 from .models import HeadacheCase, ImagingRecommendation
 from .logging_config import get_logger, log_error_with_context
+from .single_flight import SingleFlight
 
 
 class PrescriptionError(Exception):
@@ -347,3 +352,108 @@ def _format_exam_name(exam: str) -> str:
     }
     
     return exam_names.get(exam, exam.replace("_", " ").title())
+
+
+# ==============================================================================
+# Cache des ordonnances rendues (ETag)
+# ==============================================================================
+
+# Nombre de sessions dont la dernière ordonnance rendue est conservée
+DEFAULT_PRESCRIPTION_CACHE_SIZE = 256
+
+
+def prescription_etag(
+    session_id: str,
+    case: HeadacheCase,
+    rules_version: str,
+    doctor_name: str,
+    date_str: Optional[str] = None
+) -> str:
+    """ETag d'une ordonnance, calculable sans décision ni rendu.
+
+    L'ordonnance ne dépend que du cas, de la version des règles, du
+    prescripteur et de la date imprimée (défaut : aujourd'hui).
+
+    Returns:
+        ETag fort, entre guillemets
+    """
+    date_str = date_str or datetime.now().strftime("%d/%m/%Y")
+    payload = json.dumps([session_id, case.model_dump_json(), rules_version, doctor_name, date_str])
+    return '"' + hashlib.sha256(payload.encode("utf-8")).hexdigest()[:32] + '"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Vrai si l'en-tête If-None-Match désigne l'ETag (liste, préfixe W/ toléré).
+
+    "*" est ignoré : l'ordonnance est calculée par POST et existe toujours,
+    "*" ne dit pas quelle version le client a déjà.
+    """
+    if not if_none_match:
+        return False
+    return any(value.strip().removeprefix("W/") == etag for value in if_none_match.split(","))
+
+
+class PrescriptionCache:
+    """Dernière ordonnance rendue de chaque session, indexée par son ETag.
+
+    Les rendus concurrents d'une même ordonnance (requêtes répétées pendant
+    la relecture du médecin) sont regroupés : un seul calcul.
+
+    Args:
+        maxsize: Nombre maximal de sessions conservées (LRU)
+    """
+
+    def __init__(self, maxsize: int = DEFAULT_PRESCRIPTION_CACHE_SIZE):
+        self.maxsize = maxsize
+        self._entries: "OrderedDict[str, Tuple[str, str]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._flights = SingleFlight()
+        self.hits = 0
+        self.renders = 0
+        self.not_modified = 0
+
+    def render(self, session_id: str, etag: str, render: Callable[[], str]) -> str:
+        """Ordonnance de la session pour cet ETag : en cache, ou rendue une seule fois.
+
+        Args:
+            session_id: Session de l'ordonnance
+            etag: ETag de l'ordonnance demandée (prescription_etag)
+            render: Calcule l'ordonnance (décision + mise en forme)
+
+        Returns:
+            Texte de l'ordonnance
+        """
+        with self._lock:
+            entry = self._entries.get(session_id)
+            if entry is not None and entry[0] == etag:
+                self._entries.move_to_end(session_id)
+                self.hits += 1
+                return entry[1]
+        text, _ = self._flights.do((session_id, etag), self._render_and_store, session_id, etag, render)
+        return text
+
+    def _render_and_store(self, session_id: str, etag: str, render: Callable[[], str]) -> str:
+        text = render()
+        with self._lock:
+            self.renders += 1
+            self._entries[session_id] = (etag, text)
+            self._entries.move_to_end(session_id)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+        return text
+
+    def record_not_modified(self) -> None:
+        """Compte une réponse 304 (ordonnance déjà détenue par le client)."""
+        with self._lock:
+            self.not_modified += 1
+
+    def stats(self) -> Dict[str, Any]:
+        """Compteurs du cache (exposés par /metrics)."""
+        with self._lock:
+            return {
+                "size": len(self._entries),
+                "hits": self.hits,
+                "renders": self.renders,
+                "coalesced": self._flights.shared,
+                "not_modified": self.not_modified,
+            }
@@ -0,0 +1,185 @@
+"""Planification des questions du dialogue par gain d'information.
+
+prioritize_missing_fields() suit une table de priorités fixe : le dialogue
+pose souvent des questions dont la réponse ne peut plus changer la
+recommandation de decide_imaging(). Ce module raisonne sur le DAG de
+décision compilé (rules_compiler) :
+
+    - les champs encore sans réponse ("ouverts") peuvent prendre n'importe
+      quelle classe de leur partition; les autres sont fixés par le cas
+    - les règles atteignables sont les feuilles du DAG accessibles en ne
+      branchant que sur les champs ouverts
+    - la question retenue est celle dont la réponse apporte le plus
+      d'information sur la règle appliquée (réduction d'entropie, classes
+      équiprobables); égalités départagées par la table fixe
+    - la décision est acquise quand la recommandation ne peut plus changer
+      (decision_oracle) : le dialogue peut se terminer
+
+Le profil temporel "unknown" est inféré de la réponse sur le début
+(decision_oracle.open_fields) : il est ouvert tant que onset l'est.
+
+Les calculs sont mémoïsés par signature (classe de chaque champ lu par les
+règles, None si ouvert) : une étape de planification déjà vue ne coûte
+qu'une consultation de dictionnaire.
+"""
+
+import math
+import threading
+import weakref
+from typing import Dict, List, Optional, Tuple, Union
+
+from .decision_oracle import get_decision_oracle, open_fields
+from .models import HeadacheCase
+from .rules_compiler import CompiledRuleSet, DecisionNode
+
+
+# Nombre maximal de signatures mémorisées par planificateur
+PLAN_MEMO_SIZE = 8192
+
+# Écart d'entropie considéré comme nul (arrondis flottants)
+_EPSILON = 1e-9
+
+Signature = Tuple[Optional[int], ...]
+
+
+def _entropy(distribution: Dict[int, float]) -> float:
+    return -sum(p * math.log2(p) for p in distribution.values() if p > 0)
+
+
+class QuestionPlanner:
+    """Choix de la prochaine question sur le DAG de décision compilé.
+
+    Args:
+        compiled: Règles compilées (snapshot du registre)
+
+    Example:
+        >>> planner = get_question_planner()
+        >>> planner.is_settled(case, ["fever", "meningeal_signs"])
+        False
+        >>> planner.order_questions(case, ["intensity", "fever"])
+        ['fever', 'intensity']
+    """
+
+    def __init__(self, compiled: CompiledRuleSet):
+        self.compiled = compiled
+        self._field_index = {partition.name: i for i, partition in enumerate(compiled.fields)}
+        self._memo: Dict[Signature, Tuple[float, Dict[int, float]]] = {}
+        self._lock = threading.Lock()
+
+    # --------------------------------------------------------------------------
+    # Distribution de la règle appliquée
+    # --------------------------------------------------------------------------
+
+    def _distribution(self, signature: Signature) -> Dict[int, float]:
+        """Loi de la règle appliquée (feuille du DAG), classes des champs ouverts équiprobables."""
+        memo: Dict[int, Dict[int, float]] = {}
+
+        def visit(node: Union[DecisionNode, int]) -> Dict[int, float]:
+            if not isinstance(node, DecisionNode):
+                return {node: 1.0}
+            cached = memo.get(id(node))
+            if cached is not None:
+                return cached
+            class_index = signature[node.field_index]
+            if class_index is not None:
+                result = visit(node.children[class_index])
+            else:
+                weight = 1.0 / len(node.children)
+                result = {}
+                for child in node.children:
+                    for outcome, p in visit(child).items():
+                        result[outcome] = result.get(outcome, 0.0) + p * weight
+            memo[id(node)] = result
+            return result
+
+        return visit(self.compiled.root)
+
+    def _plan(self, signature: Signature) -> Tuple[float, Dict[int, float]]:
+        """(entropie de la règle appliquée, gain d'information par champ ouvert du DAG)."""
+        cached = self._memo.get(signature)
+        if cached is not None:
+            return cached
+
+        entropy = _entropy(self._distribution(signature))
+        gains: Dict[int, float] = {}
+        if entropy > _EPSILON:
+            for field_index, class_index in enumerate(signature):
+                if class_index is not None:
+                    continue
+                size = self.compiled.fields[field_index].size
+                conditional = 0.0
+                for value in range(size):
+                    fixed = signature[:field_index] + (value,) + signature[field_index + 1:]
+                    conditional += _entropy(self._distribution(fixed)) / size
+                gains[field_index] = max(0.0, entropy - conditional)
+
+        plan = (entropy, gains)
+        with self._lock:
+            if len(self._memo) >= PLAN_MEMO_SIZE:
+                self._memo.clear()
+            self._memo[signature] = plan
+        return plan
+
+    # --------------------------------------------------------------------------
+    # Interface du dialogue
+    # --------------------------------------------------------------------------
+
+    def information_gains(self, case: HeadacheCase, fields: List[str]) -> Optional[Dict[str, float]]:
+        """Gain d'information (bits) de chaque question sur la règle appliquée.
+
+        Args:
+            case: Cas en cours
+            fields: Champs encore sans réponse (questions possibles)
+
+        Returns:
+            {champ: gain}, 0.0 pour un champ qu'aucune règle ne lit; None si le
+            cas sort du domaine analysé (ordre fixe à conserver)
+        """
+        signature = get_decision_oracle(self.compiled).signature(case, open_fields(case, fields))
+        if signature is None:
+            return None
+        _, gains = self._plan(signature)
+        return {
+            name: gains.get(self._field_index.get(name, -1), 0.0)
+            for name in fields
+        }
+
+    def is_settled(self, case: HeadacheCase, fields: List[str]) -> bool:
+        """True si toutes les réponses possibles mènent à la même recommandation (decision_oracle)."""
+        return get_decision_oracle(self.compiled).check(case, fields).invariant
+
+    def order_questions(self, case: HeadacheCase, fields: List[str]) -> List[str]:
+        """Questions triées par gain d'information décroissant.
+
+        Args:
+            case: Cas en cours
+            fields: Questions possibles, dans l'ordre de priorité fixe
+
+        Returns:
+            Champs réordonnés (tri stable : l'ordre fixe départage les égalités)
+        """
+        gains = self.information_gains(case, fields)
+        if gains is None:
+            return list(fields)
+        return sorted(fields, key=lambda name: -round(gains[name], 9))
+
+
+_planners: "weakref.WeakKeyDictionary[CompiledRuleSet, QuestionPlanner]" = weakref.WeakKeyDictionary()
+_planners_lock = threading.Lock()
+
+
+def get_question_planner(compiled: Optional[CompiledRuleSet] = None) -> QuestionPlanner:
+    """Planificateur des règles compilées (par défaut : snapshot courant du registre).
+
+    Un planificateur (et sa mémoïsation) par jeu de règles compilé : un
+    rechargement à chaud des règles en crée un nouveau.
+    """
+    if compiled is None:
+        from .rules_registry import get_rules_registry
+        compiled = get_rules_registry().snapshot().compiled
+    with _planners_lock:
+        planner = _planners.get(compiled)
+        if planner is None:
+            planner = QuestionPlanner(compiled)
+            _planners[compiled] = planner
+        return planner
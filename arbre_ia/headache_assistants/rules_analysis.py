@@ -0,0 +1,376 @@
+"""Analyse statique des règles médicales (headache_rules.json).
+
+Chaque champ de HeadacheCase lu par une règle est découpé en un nombre fini
+de "cellules" : valeurs d'un Literal, True/False/None pour les booléens,
+intervalles délimités par les seuils des règles pour les champs numériques.
+Une condition est constante sur chaque cellule, ce qui permet de raisonner
+sur l'ensemble des cas possibles sans en énumérer aucun :
+
+- conditions mortes (jamais vraies, ex: champ absent de HeadacheCase)
+- règles insatisfiables
+- exclusion mutuelle entre deux règles (aucun cas ne peut matcher les deux)
+- réordonnancement des règles qui préserve la sémantique "première règle"
+
+Les conditions sont évaluées avec evaluate_condition_value() du moteur :
+l'analyse ne peut pas diverger de la sémantique de match_rule().
+"""
+
+import math
+from dataclasses import dataclass, field
+from typing import Any, Dict, FrozenSet, List, Literal, Optional, Tuple, Union, get_args, get_origin
+
+from .models import HeadacheCase
+from .rules_engine import condition_field, evaluate_condition_value
+
+
+# Valeur représentant "toute autre chaîne" pour les champs texte libres
+OTHER_VALUE = "__autre__"
+
+
+# ==============================================================================
+# Domaines finis des champs
+# ==============================================================================
+
+@dataclass(frozen=True, eq=False)
+class FieldDomain:
+    """Découpage d'un champ de HeadacheCase en cellules.
+
+    Attributes:
+        name: Nom du champ
+        values: Une valeur représentative par cellule
+        in_model: False si le champ n'existe pas dans HeadacheCase
+                  (getattr renvoie alors toujours None)
+    """
+    name: str
+    values: Tuple[Any, ...]
+    in_model: bool = True
+
+    @property
+    def all_cells(self) -> FrozenSet[int]:
+        """Ensemble de toutes les cellules du domaine."""
+        return frozenset(range(len(self.values)))
+
+
+def _unwrap_optional(annotation: Any) -> Tuple[Any, bool]:
+    """Retourne (type de base, accepte None) pour une annotation Pydantic."""
+    if get_origin(annotation) is Union:
+        args = [arg for arg in get_args(annotation) if arg is not type(None)]
+        optional = len(args) < len(get_args(annotation))
+        if len(args) == 1:
+            return args[0], optional
+        return annotation, optional
+    return annotation, False
+
+
+def _field_bounds(field_info: Any) -> Tuple[Optional[float], Optional[float]]:
+    """Bornes ge/le déclarées sur un Field numérique."""
+    lower = upper = None
+    for constraint in field_info.metadata:
+        if getattr(constraint, "ge", None) is not None:
+            lower = constraint.ge
+        if getattr(constraint, "le", None) is not None:
+            upper = constraint.le
+    return lower, upper
+
+
+def _is_number(value: Any) -> bool:
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+def _numeric_cells(
+    points: List[float],
+    lower: Optional[float],
+    upper: Optional[float],
+    integral: bool
+) -> List[Any]:
+    """Représentants des intervalles délimités par les seuils des règles.
+
+    Chaque seuil est une cellule à part entière (les comparaisons >= et <=
+    changent de valeur exactement sur le seuil), ainsi que chaque intervalle
+    ouvert entre deux seuils consécutifs.
+    """
+    pts = {p for p in points
+           if (lower is None or p >= lower) and (upper is None or p <= upper)}
+    if lower is not None:
+        pts.add(lower)
+    if upper is not None:
+        pts.add(upper)
+    ordered = sorted(pts) or [0]
+
+    cells: List[Any] = []
+    if lower is None:
+        cells.append(ordered[0] - 1)
+    for index, point in enumerate(ordered):
+        cells.append(point)
+        if index + 1 < len(ordered):
+            following = ordered[index + 1]
+            if integral:
+                candidate = math.floor(point) + 1
+                if candidate < following:
+                    cells.append(candidate)
+            else:
+                cells.append((point + following) / 2)
+    if upper is None:
+        cells.append(ordered[-1] + 1)
+
+    if integral:
+        return [int(c) if float(c).is_integer() else c for c in cells]
+    return [float(c) for c in cells]
+
+
+def _build_domain(name: str, conditions: List[Tuple[str, Any]]) -> FieldDomain:
+    """Construit le domaine d'un champ à partir du modèle et des conditions."""
+    field_info = HeadacheCase.model_fields.get(name)
+    if field_info is None:
+        return FieldDomain(name=name, values=(None,), in_model=False)
+
+    base, optional = _unwrap_optional(field_info.annotation)
+    mentioned: List[Any] = []
+    for _, expected in conditions:
+        if isinstance(expected, (list, tuple)):
+            mentioned.extend(expected)
+        else:
+            mentioned.append(expected)
+
+    if get_origin(base) is Literal:
+        values: List[Any] = list(get_args(base))
+    elif base is bool:
+        values = [True, False]
+    elif base in (int, float):
+        lower, upper = _field_bounds(field_info)
+        values = _numeric_cells(
+            [v for v in mentioned if _is_number(v)], lower, upper, integral=base is int
+        )
+    elif get_origin(base) is list or base is list:
+        # Listes : vide, chaque valeur citée seule, et toutes les valeurs citées
+        # ensemble (témoin des conjonctions de tests d'intersection)
+        items = []
+        for value in mentioned:
+            if isinstance(value, str) and value not in items:
+                items.append(value)
+        values = [[]] + [[item] for item in items] + [items + [OTHER_VALUE]]
+    else:
+        values = []
+        for value in mentioned:
+            if isinstance(value, str) and value not in values:
+                values.append(value)
+        values.append(OTHER_VALUE)
+
+    if optional and None not in values:
+        values.append(None)
+    return FieldDomain(name=name, values=tuple(values), in_model=True)
+
+
+def build_field_domains(rules: List[Dict[str, Any]]) -> Dict[str, FieldDomain]:
+    """Construit le domaine fini de chaque champ lu par les règles.
+
+    Args:
+        rules: Liste des règles (section "rules" du JSON)
+
+    Returns:
+        Dictionnaire {nom du champ: FieldDomain}
+    """
+    by_field: Dict[str, List[Tuple[str, Any]]] = {}
+    for rule in rules:
+        for key, expected in rule.get("conditions", {}).items():
+            by_field.setdefault(condition_field(key), []).append((key, expected))
+    return {name: _build_domain(name, conds) for name, conds in by_field.items()}
+
+
+def condition_cells(domain: FieldDomain, key: str, expected: Any) -> FrozenSet[int]:
+    """Cellules du domaine sur lesquelles une condition est vraie."""
+    cells = set()
+    for index, value in enumerate(domain.values):
+        try:
+            if evaluate_condition_value(key, expected, value):
+                cells.add(index)
+        except TypeError:
+            # Comparaison impossible (ex: liste >= entier) : le moteur lèverait
+            # aussi, la condition ne peut donc jamais être satisfaite
+            continue
+    return frozenset(cells)
+
+
+# ==============================================================================
+# Contraintes par règle
+# ==============================================================================
+
+# Terme conjonctif : {champ: cellules autorisées}. Un champ absent est libre.
+Term = Dict[str, FrozenSet[int]]
+
+
+@dataclass
+class RuleConstraint:
+    """Ensemble des cas satisfaisant une règle, en forme disjonctive.
+
+    Attributes:
+        rule_id: Identifiant de la règle
+        position: Position de la règle dans la liste analysée
+        terms: OU de termes conjonctifs; vide si la règle est insatisfiable
+    """
+    rule_id: str
+    position: int
+    terms: List[Term] = field(default_factory=list)
+
+    @property
+    def satisfiable(self) -> bool:
+        return bool(self.terms)
+
+
+def _terms_compatible(a: Term, b: Term) -> bool:
+    for name in a.keys() & b.keys():
+        if not a[name] & b[name]:
+            return False
+    return True
+
+
+class RuleSetAnalysis:
+    """Analyse statique d'une liste ordonnée de règles.
+
+    Utilisation:
+        >>> analysis = RuleSetAnalysis(load_rules()["rules"])
+        >>> analysis.mutually_exclusive("HSA_001", "HTIC_003")
+        True
+        >>> analysis.dead_conditions()[0]["reason"]
+        'unknown_field'
+    """
+
+    def __init__(self, rules: List[Dict[str, Any]]):
+        """Analyse les règles.
+
+        Args:
+            rules: Liste ordonnée des règles (section "rules" du JSON)
+        """
+        self.rules = list(rules)
+        self.domains = build_field_domains(self.rules)
+        self._dead: List[Dict[str, Any]] = []
+        self.constraints = [
+            self._build_constraint(position, rule)
+            for position, rule in enumerate(self.rules)
+        ]
+        self._by_id = {c.rule_id: c for c in self.constraints}
+
+    def _build_constraint(self, position: int, rule: Dict[str, Any]) -> RuleConstraint:
+        rule_id = rule.get("id", f"RULE_{position}")
+        conditions = rule.get("conditions", {})
+        logic = rule.get("logic", "all")
+        constraint = RuleConstraint(rule_id=rule_id, position=position)
+
+        per_condition: List[Tuple[str, FrozenSet[int]]] = []
+        for key, expected in conditions.items():
+            domain = self.domains[condition_field(key)]
+            cells = condition_cells(domain, key, expected)
+            per_condition.append((domain.name, cells))
+
+            reason = None
+            if not domain.in_model:
+                reason = "unknown_field"
+            elif not cells:
+                reason = "never_true"
+            elif cells == domain.all_cells:
+                reason = "always_true"
+            if reason is not None:
+                self._dead.append({
+                    "rule_id": rule_id,
+                    "condition": key,
+                    "field": domain.name,
+                    "expected": expected,
+                    "reason": reason,
+                })
+
+        if not per_condition:
+            return constraint
+
+        if logic == "any":
+            constraint.terms = [{name: cells} for name, cells in per_condition if cells]
+        else:
+            term: Term = {}
+            for name, cells in per_condition:
+                term[name] = term.get(name, self.domains[name].all_cells) & cells
+            if all(term.values()):
+                constraint.terms = [term]
+        return constraint
+
+    def constraint(self, rule_id: str) -> RuleConstraint:
+        """Contrainte d'une règle par identifiant (KeyError si inconnue)."""
+        return self._by_id[rule_id]
+
+    def is_satisfiable(self, rule_id: str) -> bool:
+        """True si au moins un cas peut satisfaire la règle."""
+        return self._by_id[rule_id].satisfiable
+
+    def _overlap(self, a: RuleConstraint, b: RuleConstraint) -> bool:
+        return any(_terms_compatible(ta, tb) for ta in a.terms for tb in b.terms)
+
+    def can_overlap(self, rule_a: str, rule_b: str) -> bool:
+        """True si un même cas peut satisfaire les deux règles."""
+        return self._overlap(self._by_id[rule_a], self._by_id[rule_b])
+
+    def mutually_exclusive(self, rule_a: str, rule_b: str) -> bool:
+        """True s'il est prouvé qu'aucun cas ne satisfait les deux règles."""
+        return not self.can_overlap(rule_a, rule_b)
+
+    def overlapping_pairs(self) -> List[Tuple[str, str]]:
+        """Paires de règles (dans l'ordre courant) pouvant matcher un même cas."""
+        pairs = []
+        for i, a in enumerate(self.constraints):
+            for b in self.constraints[i + 1:]:
+                if self._overlap(a, b):
+                    pairs.append((a.rule_id, b.rule_id))
+        return pairs
+
+    def unsatisfiable_rules(self) -> List[str]:
+        """Règles qu'aucun cas ne peut déclencher."""
+        return [c.rule_id for c in self.constraints if not c.satisfiable]
+
+    def dead_conditions(self) -> List[Dict[str, Any]]:
+        """Conditions constantes (champ inconnu, jamais vraie ou toujours vraie)."""
+        return list(self._dead)
+
+    def safe_reorder(self, weights: Dict[str, float]) -> List[Dict[str, Any]]:
+        """Réordonne les règles par poids décroissant sans changer les décisions.
+
+        Une règle ne passe devant une autre que si elles sont mutuellement
+        exclusives : pour tout cas, la première règle qui matche reste donc
+        la même. Tri topologique (Kahn) des contraintes de précédence, en
+        choisissant à chaque étape la règle disponible de plus fort poids
+        (position d'origine en cas d'égalité). Les règles insatisfiables,
+        exclusives de toutes les autres, passent en fin de liste.
+
+        Args:
+            weights: {rule_id: poids} (ex: nombre de déclenchements observés)
+
+        Returns:
+            Nouvelle liste ordonnée des règles
+        """
+        count = len(self.constraints)
+        predecessors = [set() for _ in range(count)]
+        for j in range(count):
+            for i in range(j):
+                if self._overlap(self.constraints[i], self.constraints[j]):
+                    predecessors[j].add(i)
+
+        placed: List[int] = []
+        remaining = set(range(count))
+        while remaining:
+            available = [i for i in remaining if not predecessors[i] - set(placed)]
+            best = min(
+                available,
+                key=lambda i: (
+                    not self.constraints[i].satisfiable,
+                    -weights.get(self.constraints[i].rule_id, 0),
+                    i,
+                )
+            )
+            placed.append(best)
+            remaining.discard(best)
+        return [self.rules[i] for i in placed]
+
+    def report(self) -> Dict[str, Any]:
+        """Synthèse de l'analyse statique (sérialisable JSON)."""
+        return {
+            "rules_count": len(self.rules),
+            "unsatisfiable_rules": self.unsatisfiable_rules(),
+            "dead_conditions": self.dead_conditions(),
+            "overlapping_pairs": [list(pair) for pair in self.overlapping_pairs()],
+        }
@@ -0,0 +1,343 @@
+"""Compilation des règles médicales en DAG de décision.
+
+Le moteur évalue les règles une par une et retient la première qui matche :
+quand plusieurs règles peuvent matcher un même cas, c'est l'ordre du JSON
+qui décide, silencieusement. Ce module compile la liste ordonnée des règles
+en un DAG de décision équivalent :
+
+1. Chaque champ lu par une règle satisfiable est partitionné en classes de
+   valeurs indiscernables pour les règles (même résultat pour toutes les
+   conditions portant sur ce champ). Ex: fever -> {True}, {False, None};
+   age -> {None, <49}, {49}, {50+} selon les seuils des règles.
+2. Le domaine fini produit de ces classes est découpé champ par champ;
+   chaque feuille porte la règle gagnante (ou le FALLBACK). Les sous-arbres
+   identiques sont partagés (DAG).
+3. La décision à l'exécution est une descente dans le DAG : une lecture de
+   champ et un accès indexé par niveau, sans évaluer aucune règle.
+
+Le compilateur rapporte aussi les règles masquées (satisfiables mais jamais
+gagnantes, car toujours précédées d'une règle plus générale) et les règles
+inatteignables (insatisfiables).
+
+Utilisation:
+    >>> compiled = compile_rules(load_rules()["rules"])
+    >>> compiled.lookup(case)["id"]
+    'HSA_001'
+    >>> compiled.report()["shadowed_rules"]
+
+En ligne de commande (rapport JSON):
+    python -m headache_assistants.rules_compiler [rules.json]
+"""
+
+import json
+import sys
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+from .models import HeadacheCase
+from .rules_analysis import RuleSetAnalysis
+from .rules_engine import condition_field, evaluate_condition_value, load_rules, match_rule
+
+
+# Feuille du DAG sans règle gagnante
+FALLBACK_LEAF = -1
+
+# Nombre maximal de valeurs mémorisées par champ (durées flottantes : domaine ouvert)
+_MEMO_MAX_VALUES = 1024
+
+
+# ==============================================================================
+# Partition des champs
+# ==============================================================================
+
+class FieldPartition:
+    """Partition d'un champ en classes de valeurs équivalentes pour les règles.
+
+    Deux valeurs sont équivalentes si toutes les conditions des règles portant
+    sur ce champ leur donnent le même résultat.
+    """
+
+    def __init__(self, name: str, conditions: List[Tuple[str, Any]], values: Tuple[Any, ...]):
+        """Construit la partition.
+
+        Args:
+            name: Nom du champ HeadacheCase
+            conditions: Conditions distinctes (clé, valeur attendue) sur ce champ
+            values: Valeurs représentatives du domaine (FieldDomain.values)
+        """
+        self.name = name
+        self.conditions = conditions
+        self._class_by_signature: Dict[Tuple[bool, ...], int] = {}
+        self.cell_classes: List[int] = []
+        for value in values:
+            signature = self.signature(value)
+            if signature not in self._class_by_signature:
+                self._class_by_signature[signature] = len(self._class_by_signature)
+            self.cell_classes.append(self._class_by_signature[signature])
+        self._memo: Dict[Any, Optional[int]] = {}
+
+    @property
+    def size(self) -> int:
+        """Nombre de classes."""
+        return len(self._class_by_signature)
+
+    def signature(self, value: Any) -> Tuple[bool, ...]:
+        """Résultat de chaque condition du champ pour une valeur."""
+        results = []
+        for key, expected in self.conditions:
+            try:
+                results.append(bool(evaluate_condition_value(key, expected, value)))
+            except TypeError:
+                results.append(False)
+        return tuple(results)
+
+    def classify(self, value: Any) -> Optional[int]:
+        """Classe d'une valeur, ou None si la valeur sort du domaine analysé."""
+        try:
+            return self._memo[value]
+        except KeyError:
+            result = self._class_by_signature.get(self.signature(value))
+            if len(self._memo) < _MEMO_MAX_VALUES:
+                self._memo[value] = result
+            return result
+        except TypeError:
+            # Valeur non hashable (liste) : pas de mémoïsation
+            return self._class_by_signature.get(self.signature(value))
+
+
+# ==============================================================================
+# DAG de décision
+# ==============================================================================
+
+@dataclass(frozen=True, eq=False)
+class DecisionNode:
+    """Nœud interne : branche sur les classes d'un champ."""
+    field_index: int
+    children: Tuple[Union["DecisionNode", int], ...]
+
+
+# Terme résiduel : ((index de champ, classes autorisées), ...) trié par champ
+ResidualTerm = Tuple[Tuple[int, frozenset], ...]
+State = Tuple[Tuple[int, Tuple[ResidualTerm, ...]], ...]
+
+
+def _truncate_after_certain(state: List[Tuple[int, Tuple[ResidualTerm, ...]]]) -> State:
+    """Coupe les candidates situées après la première règle certaine."""
+    for position, (_, terms) in enumerate(state):
+        if any(len(term) == 0 for term in terms):
+            return tuple(state[:position + 1])
+    return tuple(state)
+
+
+class CompiledRuleSet:
+    """Liste ordonnée de règles compilée en DAG de décision.
+
+    lookup() retourne exactement la règle que retournerait le parcours
+    séquentiel "première règle qui matche" de decide_imaging().
+    """
+
+    def __init__(self, rules: List[Dict[str, Any]]):
+        """Compile les règles.
+
+        Args:
+            rules: Liste ordonnée des règles (section "rules" du JSON)
+        """
+        self.rules = list(rules)
+        self.analysis = RuleSetAnalysis(self.rules)
+
+        # Champs lus par au moins une règle satisfiable, les plus discriminants d'abord
+        usage: Dict[str, int] = {}
+        for constraint in self.analysis.constraints:
+            for term in constraint.terms:
+                for name in term:
+                    usage[name] = usage.get(name, 0) + 1
+        names = sorted(usage, key=lambda name: (-usage[name], name))
+
+        self.fields: List[FieldPartition] = []
+        for name in names:
+            conditions: List[Tuple[str, Any]] = []
+            for constraint in self.analysis.constraints:
+                rule = self.rules[constraint.position]
+                for key, expected in rule.get("conditions", {}).items():
+                    if condition_field(key) == name and (key, expected) not in conditions:
+                        conditions.append((key, expected))
+            self.fields.append(
+                FieldPartition(name, conditions, self.analysis.domains[name].values)
+            )
+        self._field_index = {partition.name: i for i, partition in enumerate(self.fields)}
+
+        self._memo: Dict[State, Union[DecisionNode, int]] = {}
+        self.root = self._build(_truncate_after_certain(self._initial_state()))
+        self.node_count = len({id(n) for n in self._memo.values() if isinstance(n, DecisionNode)})
+        self._memo = {}
+
+    def _initial_state(self) -> List[Tuple[int, Tuple[ResidualTerm, ...]]]:
+        state = []
+        for constraint in self.analysis.constraints:
+            terms = []
+            for term in constraint.terms:
+                residual = []
+                for name, cells in term.items():
+                    partition = self.fields[self._field_index[name]]
+                    classes = frozenset(partition.cell_classes[cell] for cell in cells)
+                    if len(classes) < partition.size:
+                        residual.append((self._field_index[name], classes))
+                terms.append(tuple(sorted(residual, key=lambda item: item[0])))
+            if terms:
+                state.append((constraint.position, tuple(terms)))
+        return state
+
+    def _build(self, state: State) -> Union[DecisionNode, int]:
+        if not state:
+            return FALLBACK_LEAF
+        first_position, first_terms = state[0]
+        if any(len(term) == 0 for term in first_terms):
+            return first_position
+
+        cached = self._memo.get(state)
+        if cached is not None:
+            return cached
+
+        field_index = min(term[0][0] for _, terms in state for term in terms if term)
+        partition = self.fields[field_index]
+
+        children = []
+        for class_index in range(partition.size):
+            next_state = []
+            for position, terms in state:
+                next_terms = []
+                for term in terms:
+                    if term and term[0][0] == field_index:
+                        if class_index in term[0][1]:
+                            next_terms.append(term[1:])
+                    else:
+                        next_terms.append(term)
+                if next_terms:
+                    next_state.append((position, tuple(next_terms)))
+            children.append(self._build(_truncate_after_certain(next_state)))
+
+        if all(child is children[0] for child in children):
+            node: Union[DecisionNode, int] = children[0]
+        else:
+            node = DecisionNode(field_index=field_index, children=tuple(children))
+        self._memo[state] = node
+        return node
+
+    def lookup(self, case: HeadacheCase) -> Optional[Dict[str, Any]]:
+        """Retourne la règle gagnante pour un cas (None = fallback).
+
+        Args:
+            case: Cas de céphalée
+
+        Returns:
+            Règle retenue, ou None si aucune règle ne matche
+        """
+        node = self.root
+        fields = self.fields
+        while isinstance(node, DecisionNode):
+            partition = fields[node.field_index]
+            class_index = partition.classify(getattr(case, partition.name, None))
+            if class_index is None:
+                # Valeur hors domaine analysé : parcours séquentiel de sécurité
+                return self._sequential(case)
+            node = node.children[class_index]
+        return None if node == FALLBACK_LEAF else self.rules[node]
+
+    def _sequential(self, case: HeadacheCase) -> Optional[Dict[str, Any]]:
+        for rule in self.rules:
+            if match_rule(case, rule):
+                return rule
+        return None
+
+    # --------------------------------------------------------------------------
+    # Rapport
+    # --------------------------------------------------------------------------
+
+    def _suffix_size(self, start: int, end: Optional[int] = None) -> int:
+        size = 1
+        for partition in self.fields[start:end]:
+            size *= partition.size
+        return size
+
+    def win_counts(self) -> Dict[int, int]:
+        """Nombre d'entrées du domaine fini gagnées par chaque règle.
+
+        Returns:
+            {position de la règle (FALLBACK_LEAF pour le fallback): nombre d'entrées}
+        """
+        memo: Dict[Tuple[int, int], Dict[int, int]] = {}
+
+        def count(node: Union[DecisionNode, int], start: int) -> Dict[int, int]:
+            key = (id(node), start)
+            if key in memo:
+                return memo[key]
+            if not isinstance(node, DecisionNode):
+                result = {node: self._suffix_size(start)}
+            else:
+                multiplier = self._suffix_size(start, node.field_index)
+                result = {}
+                for child in node.children:
+                    for winner, n in count(child, node.field_index + 1).items():
+                        result[winner] = result.get(winner, 0) + n * multiplier
+            memo[key] = result
+            return result
+
+        return count(self.root, 0)
+
+    def report(self) -> Dict[str, Any]:
+        """Rapport de compilation (sérialisable JSON)."""
+        wins = self.win_counts()
+        unreachable = self.analysis.unsatisfiable_rules()
+        shadowed = []
+        for constraint in self.analysis.constraints:
+            if constraint.satisfiable and wins.get(constraint.position, 0) == 0:
+                shadowed.append({
+                    "rule_id": constraint.rule_id,
+                    "shadowed_by": [
+                        earlier.rule_id
+                        for earlier in self.analysis.constraints[:constraint.position]
+                        if self.analysis.can_overlap(earlier.rule_id, constraint.rule_id)
+                    ],
+                })
+
+        return {
+            "rules_count": len(self.rules),
+            "fields": {
+                partition.name: partition.size for partition in self.fields
+            },
+            "domain_size": self._suffix_size(0),
+            "dag_nodes": self.node_count,
+            "wins": {
+                ("FALLBACK" if position == FALLBACK_LEAF else self.rules[position].get("id")): n
+                for position, n in sorted(wins.items())
+            },
+            "shadowed_rules": shadowed,
+            "unreachable_rules": unreachable,
+            "dead_conditions": self.analysis.dead_conditions(),
+        }
+
+
+def compile_rules(rules: List[Dict[str, Any]]) -> CompiledRuleSet:
+    """Compile une liste ordonnée de règles en DAG de décision.
+
+    Args:
+        rules: Liste ordonnée des règles (section "rules" du JSON)
+
+    Returns:
+        CompiledRuleSet équivalent au parcours "première règle qui matche"
+    """
+    return CompiledRuleSet(rules)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Compile le fichier de règles et affiche le rapport JSON."""
+    argv = sys.argv[1:] if argv is None else argv
+    rules_path = Path(argv[0]) if argv else None
+    compiled = compile_rules(load_rules(rules_path).get("rules", []))
+    print(json.dumps(compiled.report(), ensure_ascii=False, indent=2, default=str))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -12,7 +12,7 @@ Fonctions principales:
 import json
 import uuid
 from pathlib import Path
-from typing import Dict, List, Optional, Any
+from typing import Dict, Iterable, List, Optional, Any
 
 from .models import HeadacheCase, ImagingRecommendation
 from .logging_config import get_logger, log_medical_decision, log_error_with_context
@@ -73,108 +73,157 @@ def match_rule(case: HeadacheCase, rule: Dict[str, Any]) -> bool:
     if not conditions:
         return False
     
-    matches = []
+    matches = [
+        evaluate_condition(case, key, expected_value)
+        for key, expected_value in conditions.items()
+    ]
     
-    for key, expected_value in conditions.items():
-        # Gérer les champs avec suffixes spéciaux
-        if key.endswith("_min"):
-            # Comparaison >= pour les minimums
-            field_name = key[:-4]  # Retire "_min"
-            actual_value = getattr(case, field_name, None)
-            
-            if actual_value is None:
-                matches.append(False)
-            else:
-                matches.append(actual_value >= expected_value)
+    return combine_condition_results(matches, logic)
+
+
+def condition_field(key: str) -> str:
+    """Retourne le nom du champ HeadacheCase lu par une clé de condition.
+    
+    Args:
+        key: Clé de condition telle qu'écrite dans le JSON (ex: "age_min")
         
-        elif key.endswith("_max"):
-            # Comparaison <= pour les maximums
-            field_name = key[:-4]  # Retire "_max"
-            actual_value = getattr(case, field_name, None)
-            
-            if actual_value is None:
-                matches.append(False)
-            else:
-                matches.append(actual_value <= expected_value)
+    Returns:
+        Nom du champ lu sur le cas (ex: "age")
+    """
+    if key.endswith("_min") or key.endswith("_max"):
+        return key[:-4]
+    return key
+
+
+def evaluate_condition(case: HeadacheCase, key: str, expected_value: Any) -> bool:
+    """Évalue une condition unique d'une règle sur un cas.
+    
+    Args:
+        case: Cas de céphalée à évaluer
+        key: Clé de condition (nom de champ, éventuellement suffixé)
+        expected_value: Valeur attendue par la règle
         
-        elif key.endswith("_count_min"):
-            # Compte d'éléments dans une liste >= minimum
-            field_name = key[:-10]  # Retire "_count_min"
-            actual_list = getattr(case, field_name, None)
-            
-            if actual_list is None:
-                matches.append(False)
-            elif isinstance(actual_list, list):
-                matches.append(len(actual_list) >= expected_value)
-            else:
-                matches.append(False)
+    Returns:
+        True si la condition est satisfaite
+    """
+    actual_value = getattr(case, condition_field(key), None)
+    return evaluate_condition_value(key, expected_value, actual_value)
+
+
+def evaluate_condition_value(key: str, expected_value: Any, actual_value: Any) -> bool:
+    """Évalue une condition à partir de la valeur déjà lue sur le cas.
+    
+    Séparée de evaluate_condition() pour que l'analyse statique des règles
+    (rules_analysis) applique exactement la même sémantique que le moteur.
+    
+    Args:
+        key: Clé de condition (nom de champ, éventuellement suffixé)
+        expected_value: Valeur attendue par la règle
+        actual_value: Valeur du champ correspondant (condition_field(key))
         
+    Returns:
+        True si la condition est satisfaite
+    """
+    # Gérer les champs avec suffixes spéciaux
+    if key.endswith("_min"):
+        # Comparaison >= pour les minimums
+        if actual_value is None:
+            return False
+        return actual_value >= expected_value
+    
+    elif key.endswith("_max"):
+        # Comparaison <= pour les maximums
+        if actual_value is None:
+            return False
+        return actual_value <= expected_value
+    
+    elif key.endswith("_count_min"):
+        # Compte d'éléments dans une liste >= minimum
+        if actual_value is None:
+            return False
+        elif isinstance(actual_value, list):
+            return len(actual_value) >= expected_value
         else:
-            # Récupérer la valeur actuelle du cas
-            actual_value = getattr(case, key, None)
-            
-            # Cas spécial : expected_value est une liste vide
-            if isinstance(expected_value, list) and len(expected_value) == 0:
-                # Vérifier que le champ est vide ou None
-                if actual_value is None:
-                    matches.append(True)
-                elif isinstance(actual_value, list):
-                    matches.append(len(actual_value) == 0)
-                else:
-                    matches.append(False)
-            
-            elif isinstance(expected_value, list):
-                # expected_value est une liste non-vide
-                # Vérifier si actual_value est dedans OU si intersection
-                if isinstance(actual_value, list):
-                    # Vérifier si au moins un élément de actual_value est dans expected_value
-                    matches.append(any(item in expected_value for item in actual_value))
-                else:
-                    # Vérifier si actual_value est dans la liste expected_value
-                    matches.append(actual_value in expected_value)
-            
-            elif isinstance(expected_value, bool):
-                # Comparaison booléenne avec gestion None
-                # Pour TOUS les champs booléens: None est traité comme False (absence de signe/information)
-                # Ceci assure que les règles vérifiant "fever: false" matchent quand fever is None
-                if actual_value is None:
-                    # None = absence de signe = False
-                    matches.append(expected_value is False)
-                else:
-                    # Comparaison booléenne stricte
-                    matches.append(actual_value is expected_value)
-            
-            else:
-                # Comparaison d'égalité standard
-                matches.append(actual_value == expected_value)
-    
-    # Appliquer la logique spécifiée dans la règle
-    if logic == "all":
-        # Toutes les conditions doivent être vraies
-        return all(matches) if matches else False
-    elif logic == "any":
-        # Au moins une condition doit être vraie
-        return any(matches) if matches else False
+            return False
+    
+    # Cas spécial : expected_value est une liste vide
+    if isinstance(expected_value, (list, tuple)) and len(expected_value) == 0:
+        # Vérifier que le champ est vide ou None
+        if actual_value is None:
+            return True
+        elif isinstance(actual_value, list):
+            return len(actual_value) == 0
+        else:
+            return False
+    
+    elif isinstance(expected_value, (list, tuple)):
+        # expected_value est une liste non-vide
+        # Vérifier si actual_value est dedans OU si intersection
+        if isinstance(actual_value, list):
+            # Vérifier si au moins un élément de actual_value est dans expected_value
+            return any(item in expected_value for item in actual_value)
+        else:
+            # Vérifier si actual_value est dans la liste expected_value
+            return actual_value in expected_value
+    
+    elif isinstance(expected_value, bool):
+        # Comparaison booléenne avec gestion None
+        # Pour TOUS les champs booléens: None est traité comme False (absence de signe/information)
+        # Ceci assure que les règles vérifiant "fever: false" matchent quand fever is None
+        if actual_value is None:
+            # None = absence de signe = False
+            return expected_value is False
+        else:
+            # Comparaison booléenne stricte
+            return actual_value is expected_value
+    
     else:
-        # Logique non reconnue, considérer comme "all" par défaut
-        return all(matches) if matches else False
+        # Comparaison d'égalité standard
+        return actual_value == expected_value
+
+
+def combine_condition_results(matches: List[bool], logic: str = "all") -> bool:
+    """Combine les résultats des conditions selon la logique de la règle.
+    
+    Args:
+        matches: Résultat de chaque condition, dans l'ordre du JSON
+        logic: "all" (ET) ou "any" (OU); toute autre valeur vaut "all"
+        
+    Returns:
+        True si la règle est satisfaite
+    """
+    if not matches:
+        return False
+    if logic == "any":
+        # Au moins une condition doit être vraie
+        return any(matches)
+    # "all" et logique non reconnue : toutes les conditions doivent être vraies
+    return all(matches)
 
 
 def decide_imaging(
     case: HeadacheCase,
-    rules_path: Optional[Path] = None
+    rules_path: Optional[Path] = None,
+    audit: bool = True
 ) -> ImagingRecommendation:
     """Décide de l'imagerie à prescrire en fonction du cas de céphalée.
 
     Cette fonction applique le moteur de décision basé sur les règles médicales:
-    1. Charge les règles depuis le JSON
-    2. Parcourt les règles dans l'ordre
-    3. Applique la PREMIÈRE règle qui match
-    4. Retourne une recommandation fallback si aucune règle ne match
+    1. Lit le snapshot courant du registre de règles (rules_registry)
+    2. Retient la PREMIÈRE règle qui match (DAG de décision compilé,
+       équivalent au parcours des règles dans l'ordre)
+    3. Retourne une recommandation fallback si aucune règle ne match
+
+    Le snapshot est lu une seule fois : un rechargement à chaud concurrent
+    n'affecte pas la décision en cours, et sa version est reportée dans
+    ImagingRecommendation.rules_version et dans le log d'audit.
 
     Args:
         case: Cas de céphalée à évaluer (modèle Pydantic HeadacheCase)
         rules_path: Chemin optionnel vers le fichier de règles
+        audit: False pour une décision qui n'est pas une prescription
+            (lecture provisoire du flux, rejeu d'historique) : aucune entrée
+            dans le log d'audit
 
     Returns:
         ImagingRecommendation avec l'imagerie recommandée, l'urgence et un commentaire
@@ -182,13 +231,16 @@ def decide_imaging(
     Raises:
         FileNotFoundError: Si le fichier de règles n'existe pas
         json.JSONDecodeError: Si le fichier JSON est malformé
+        ValidationError: Si le jeu de règles initial est incohérent
     """
+    from .rules_registry import get_rules_registry
+
     logger = get_logger()
     case_id = str(uuid.uuid4())[:8]  # ID court pour traçabilité
 
-    # 1. Charger les règles
+    # 1. Snapshot courant des règles
     try:
-        rules_data = load_rules(rules_path)
+        snapshot = get_rules_registry(rules_path).snapshot()
     except FileNotFoundError as e:
         log_error_with_context(e, "chargement règles médicales", {"rules_path": str(rules_path)})
         raise
@@ -196,27 +248,25 @@ def decide_imaging(
         log_error_with_context(e, "parsing JSON règles", {"rules_path": str(rules_path)})
         raise
 
-    rules_list = rules_data.get("rules", [])
-
-    # 2. Parcourir les règles dans l'ordre
-    for rule in rules_list:
-        # 3. Vérifier si la règle match le cas
-        if match_rule(case, rule):
-            # 4. Première règle matchée = appliquer immédiatement
-            recommendation_data = rule.get("recommendation", {})
-            rule_id = rule.get("id", "UNKNOWN")
-
-            recommendation = ImagingRecommendation(
-                imaging=recommendation_data.get("imaging", []),
-                urgency=recommendation_data.get("urgency", "none"),
-                comment=recommendation_data.get("comment", ""),
-                applied_rule_id=rule_id
-            )
+    # 2. Première règle qui match le cas
+    rule = snapshot.compiled.lookup(case)
+    if rule is not None:
+        recommendation_data = rule.get("recommendation", {})
+        rule_id = rule.get("id", "UNKNOWN")
+
+        recommendation = ImagingRecommendation(
+            imaging=recommendation_data.get("imaging", []),
+            urgency=recommendation_data.get("urgency", "none"),
+            comment=recommendation_data.get("comment", ""),
+            applied_rule_id=rule_id
+        )
 
-            # 5. Appliquer les adaptations contextuelles (grossesse, etc.)
-            recommendation = _apply_contextual_adaptations(case, recommendation)
+        # Appliquer les adaptations contextuelles (grossesse, etc.)
+        recommendation = _apply_contextual_adaptations(case, recommendation)
+        recommendation = recommendation.model_copy(update={"rules_version": snapshot.version})
 
-            # Logger la décision médicale pour audit
+        # Logger la décision médicale pour audit
+        if audit:
             log_medical_decision(
                 case_id=case_id,
                 decision=", ".join(recommendation.imaging) if recommendation.imaging else "aucun_examen",
@@ -229,23 +279,27 @@ def decide_imaging(
                     "fever": case.fever,
                     "meningeal_signs": case.meningeal_signs,
                     "pregnancy": case.pregnancy_postpartum
-                }
+                },
+                rules_version=snapshot.version
             )
 
-            return recommendation
+        return recommendation
 
-    # 6. Aucune règle ne match : retourner recommandation fallback
+    # 3. Aucune règle ne match : retourner recommandation fallback
     logger.warning(f"[{case_id}] Aucune règle matchée - application du fallback")
     fallback = _get_fallback_recommendation(case)
     fallback = _apply_contextual_adaptations(case, fallback)
-
-    log_medical_decision(
-        case_id=case_id,
-        decision=", ".join(fallback.imaging) if fallback.imaging else "aucun_examen",
-        rule_matched="FALLBACK",
-        confidence=0.5,  # Fallback = confiance réduite
-        urgency=fallback.urgency
-    )
+    fallback = fallback.model_copy(update={"rules_version": snapshot.version})
+
+    if audit:
+        log_medical_decision(
+            case_id=case_id,
+            decision=", ".join(fallback.imaging) if fallback.imaging else "aucun_examen",
+            rule_matched="FALLBACK",
+            confidence=0.5,  # Fallback = confiance réduite
+            urgency=fallback.urgency,
+            rules_version=snapshot.version
+        )
 
     return fallback
 
@@ -622,12 +676,21 @@ class RulesEngine:
     
     """
     
-    def __init__(self, rules_path: Optional[Path] = None):
+    def __init__(
+        self,
+        rules_path: Optional[Path] = None,
+        profile: bool = False,
+        compiled: bool = False
+    ):
         """Initialise le moteur de règles.
         
         Args:
             rules_path: Chemin vers le fichier JSON des règles.
                        Si None, utilise le chemin par défaut.
+            profile: Active le profilage de couverture des règles
+                    (compteurs par règle/condition, temps, fallback)
+            compiled: Décide via le DAG de décision compilé (rules_compiler)
+                     au lieu du parcours séquentiel des règles
         """
         if rules_path is None:
             rules_path = Path(__file__).parent.parent / "rules" / "headache_rules.json"
@@ -638,19 +701,47 @@ class RulesEngine:
         self.red_flags_catalog: Dict[str, Any] = {}
         self.imaging_catalog: Dict[str, Any] = {}
         self.urgency_levels: Dict[str, Any] = {}
+        self.rules_version: Optional[str] = None
+        self._analysis = None
+        self.use_compiled = compiled
+        self._compiled = None
+        
+        self.profiler = None
+        if profile:
+            from .rules_profiler import RuleProfiler
+            self.profiler = RuleProfiler()
         
         self._load_rules()
     
     def _load_rules(self) -> None:
-        """Charge les règles depuis le fichier JSON (méthode interne)."""
-        self.rules_data = load_rules(self.rules_path)
-        self.rules = self.rules_data.get("rules", [])
-        self.red_flags_catalog = self.rules_data.get("red_flags_catalog", {})
-        self.imaging_catalog = self.rules_data.get("imaging_catalog", {})
-        self.urgency_levels = self.rules_data.get("urgency_levels", {})
+        """Charge les règles depuis le fichier JSON (méthode interne).
+        
+        Le nouveau jeu de règles est entièrement chargé et validé avant de
+        remplacer l'ancien : en cas d'erreur, les règles en service restent
+        inchangées.
+        """
+        from .rules_registry import build_snapshot
+        
+        snapshot = build_snapshot(self.rules_path)
+        self.rules_data = dict(snapshot.rules_data)
+        self.rules = list(snapshot.rules)
+        self.red_flags_catalog = dict(snapshot.red_flags_catalog)
+        self.imaging_catalog = dict(snapshot.imaging_catalog)
+        self.urgency_levels = dict(snapshot.urgency_levels)
+        self.rules_version = snapshot.version
+        self._analysis = None
+        self._compiled = snapshot.compiled
     
     def reload_rules(self) -> None:
-        """Recharge les règles depuis le fichier (utile pour le développement)."""
+        """Recharge les règles depuis le fichier (utile pour le développement).
+        
+        Pour le rechargement à chaud en production (surveillance des fichiers,
+        bascule atomique), utiliser rules_registry.RulesRegistry.
+        
+        Raises:
+            FileNotFoundError, json.JSONDecodeError, ValidationError:
+                si le nouveau fichier est inutilisable (règles inchangées)
+        """
         self._load_rules()
     
     def match_rule(self, case: HeadacheCase, rule: Dict[str, Any]) -> bool:
@@ -679,21 +770,106 @@ class RulesEngine:
         Returns:
             ImagingRecommendation avec l'imagerie recommandée
         """
-        # Parcourir les règles dans l'ordre
+        rule = self._find_first_match(case)
+        if rule is not None:
+            # Première règle matchée = appliquée
+            recommendation_data = rule.get("recommendation", {})
+            
+            return ImagingRecommendation(
+                imaging=recommendation_data.get("imaging", []),
+                urgency=recommendation_data.get("urgency", "none"),
+                comment=recommendation_data.get("comment", ""),
+                applied_rule_id=rule.get("id"),
+                rules_version=self.rules_version
+            )
+        
+        # Aucune règle ne match : fallback
+        fallback = _get_fallback_recommendation(case)
+        if self.profiler is not None:
+            self.profiler.record_fallback(fallback.applied_rule_id)
+        return fallback.model_copy(update={"rules_version": self.rules_version})
+    
+    def _find_first_match(self, case: HeadacheCase) -> Optional[Dict[str, Any]]:
+        """Retourne la première règle qui matche (profilée si activé)."""
+        if self.profiler is not None:
+            return self.profiler.first_match(case, self.rules)
+        if self.use_compiled:
+            return self.compile().lookup(case)
         for rule in self.rules:
             if self.match_rule(case, rule):
-                # Première règle matchée = appliquée
-                recommendation_data = rule.get("recommendation", {})
-                
-                return ImagingRecommendation(
-                    imaging=recommendation_data.get("imaging", []),
-                    urgency=recommendation_data.get("urgency", "none"),
-                    comment=recommendation_data.get("comment", ""),
-                    applied_rule_id=rule.get("id")
-                )
+                return rule
+        return None
+    
+    def decide_imaging_bulk(self, cases: Iterable[HeadacheCase]) -> List[ImagingRecommendation]:
+        """Décide de l'imagerie pour un lot de cas.
         
-        # Aucune règle ne match : fallback
-        return _get_fallback_recommendation(case)
+        Args:
+            cases: Cas de céphalée à évaluer
+            
+        Returns:
+            Recommandations, dans l'ordre des cas
+        """
+        return [self.decide_imaging(case) for case in cases]
+    
+    def analyze_rules(self):
+        """Analyse statique des règles chargées (mise en cache).
+        
+        Returns:
+            RuleSetAnalysis des règles dans l'ordre courant
+        """
+        if self._analysis is None:
+            from .rules_analysis import RuleSetAnalysis
+            self._analysis = RuleSetAnalysis(self.rules)
+        return self._analysis
+    
+    def compile(self):
+        """Compile les règles chargées en DAG de décision (mis en cache).
+        
+        Returns:
+            CompiledRuleSet des règles dans l'ordre courant
+        """
+        if self._compiled is None:
+            from .rules_compiler import compile_rules
+            self._compiled = compile_rules(self.rules)
+        return self._compiled
+    
+    def get_profile_report(self) -> Dict[str, Any]:
+        """Rapport de couverture des règles depuis l'activation du profilage.
+        
+        Returns:
+            Rapport (voir RuleProfiler.report), avec analyse statique
+            et ordre sûr proposé
+            
+        Raises:
+            RuntimeError: Si le moteur n'a pas été créé avec profile=True
+        """
+        if self.profiler is None:
+            raise RuntimeError("Profilage non activé (RulesEngine(profile=True))")
+        return self.profiler.report(self.rules, self.analyze_rules())
+    
+    def optimize_rule_order(self) -> List[str]:
+        """Réordonne les règles par fréquence observée, sans changer les décisions.
+        
+        Seules des règles prouvées mutuellement exclusives par l'analyse
+        statique échangent leur place : la première règle qui matche reste
+        la même pour tout cas.
+        
+        Returns:
+            Identifiants des règles dans le nouvel ordre
+            
+        Raises:
+            RuntimeError: Si le moteur n'a pas été créé avec profile=True
+        """
+        if self.profiler is None:
+            raise RuntimeError("Profilage non activé (RulesEngine(profile=True))")
+        reordered = self.analyze_rules().safe_reorder(self.profiler.hit_counts())
+        self.rules = reordered
+        self._analysis = None
+        self._compiled = None
+        
+        order = [rule.get("id") for rule in reordered]
+        get_logger().info(f"Règles réordonnées par fréquence: {order}")
+        return order
     
     def find_matching_rules(self, case: HeadacheCase) -> List[Dict[str, Any]]:
         """Trouve TOUTES les règles qui correspondent au cas.
@@ -0,0 +1,241 @@
+"""Profilage de la couverture des règles médicales.
+
+Mesure, sur un flux de cas réels ou un lot de cas, ce que fait réellement le
+moteur de règles :
+
+- nombre d'évaluations et de déclenchements par règle et par condition
+- temps d'évaluation par règle et par décision
+- position de la règle retenue (nombre de règles parcourues avant le match)
+- fréquence du FALLBACK (_get_fallback_recommendation) par type de fallback
+- conditions jamais vraies (observées) et mortes (analyse statique)
+
+Le rapport propose aussi un ordre de règles trié par fréquence observée,
+calculé par RuleSetAnalysis.safe_reorder() : seules des règles prouvées
+mutuellement exclusives échangent leur place, les décisions sont identiques.
+
+Utilisation:
+    >>> report = profile_rules(cases)
+    >>> report["fallback"]["rate"]
+    0.12
+    >>> engine = RulesEngine(profile=True)
+    >>> engine.decide_imaging_bulk(cases)
+    >>> engine.optimize_rule_order()
+"""
+
+import time
+from collections import Counter
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional
+
+from .models import HeadacheCase
+from .rules_engine import RulesEngine, combine_condition_results, evaluate_condition
+
+
+@dataclass
+class ConditionStats:
+    """Compteurs d'une condition d'une règle."""
+    evaluations: int = 0
+    true_count: int = 0
+
+
+@dataclass
+class RuleStats:
+    """Compteurs d'une règle."""
+    rule_id: str
+    evaluations: int = 0
+    hits: int = 0
+    total_time_ns: int = 0
+    conditions: Dict[str, ConditionStats] = field(default_factory=dict)
+
+
+class RuleProfiler:
+    """Instrumente la recherche de la première règle qui matche.
+
+    first_match() a exactement la sémantique de la boucle de decide_imaging()
+    (toutes les conditions d'une règle sont évaluées, puis combinées selon
+    "logic"), en comptant chaque évaluation au passage.
+    """
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self) -> None:
+        """Remet tous les compteurs à zéro."""
+        self.rule_stats: Dict[str, RuleStats] = {}
+        self.decisions = 0
+        self.fallbacks = 0
+        self.fallback_ids: Counter = Counter()
+        self.matched_positions: Counter = Counter()
+        self.rules_evaluated = 0
+        self.conditions_evaluated = 0
+        self.decision_time_ns = 0
+
+    def _stats_for(self, rule_id: str) -> RuleStats:
+        stats = self.rule_stats.get(rule_id)
+        if stats is None:
+            stats = self.rule_stats[rule_id] = RuleStats(rule_id=rule_id)
+        return stats
+
+    def first_match(
+        self,
+        case: HeadacheCase,
+        rules: List[Dict[str, Any]]
+    ) -> Optional[Dict[str, Any]]:
+        """Retourne la première règle qui matche le cas, en la profilant.
+
+        Args:
+            case: Cas de céphalée
+            rules: Règles dans l'ordre d'évaluation
+
+        Returns:
+            La règle retenue, ou None (le fallback s'appliquera)
+        """
+        decision_start = time.perf_counter_ns()
+        self.decisions += 1
+
+        for position, rule in enumerate(rules, start=1):
+            stats = self._stats_for(rule.get("id", "UNKNOWN"))
+            conditions = rule.get("conditions", {})
+
+            rule_start = time.perf_counter_ns()
+            matches = []
+            for key, expected_value in conditions.items():
+                result = evaluate_condition(case, key, expected_value)
+                matches.append(result)
+                cond_stats = stats.conditions.get(key)
+                if cond_stats is None:
+                    cond_stats = stats.conditions[key] = ConditionStats()
+                cond_stats.evaluations += 1
+                cond_stats.true_count += result
+            matched = combine_condition_results(matches, rule.get("logic", "all"))
+            stats.total_time_ns += time.perf_counter_ns() - rule_start
+
+            stats.evaluations += 1
+            self.rules_evaluated += 1
+            self.conditions_evaluated += len(matches)
+
+            if matched:
+                stats.hits += 1
+                self.matched_positions[position] += 1
+                self.decision_time_ns += time.perf_counter_ns() - decision_start
+                return rule
+
+        self.decision_time_ns += time.perf_counter_ns() - decision_start
+        return None
+
+    def record_fallback(self, applied_rule_id: Optional[str]) -> None:
+        """Enregistre l'utilisation du fallback (FALLBACK_RED_FLAGS, etc.)."""
+        self.fallbacks += 1
+        self.fallback_ids[applied_rule_id or "FALLBACK"] += 1
+
+    def hit_counts(self) -> Dict[str, int]:
+        """Nombre de déclenchements observés par règle."""
+        return {rule_id: stats.hits for rule_id, stats in self.rule_stats.items()}
+
+    def expected_rules_evaluated(self, rules: List[Dict[str, Any]]) -> float:
+        """Nombre moyen de règles parcourues par décision pour un ordre donné.
+
+        Estimé à partir des déclenchements observés : un match coûte sa
+        position, un fallback coûte la liste entière.
+        """
+        if not self.decisions:
+            return 0.0
+        hits = self.hit_counts()
+        cost = sum(
+            position * hits.get(rule.get("id"), 0)
+            for position, rule in enumerate(rules, start=1)
+        )
+        cost += len(rules) * self.fallbacks
+        return cost / self.decisions
+
+    def report(
+        self,
+        rules: List[Dict[str, Any]],
+        analysis: Optional[Any] = None
+    ) -> Dict[str, Any]:
+        """Construit le rapport de couverture (sérialisable JSON).
+
+        Args:
+            rules: Règles dans l'ordre courant d'évaluation
+            analysis: RuleSetAnalysis des mêmes règles (optionnel) pour
+                      ajouter conditions mortes et ordre sûr proposé
+
+        Returns:
+            Dictionnaire du rapport
+        """
+        decisions = self.decisions or 1
+        rules_report = []
+        never_matched = []
+        never_true_conditions = []
+
+        for position, rule in enumerate(rules, start=1):
+            rule_id = rule.get("id", "UNKNOWN")
+            stats = self.rule_stats.get(rule_id, RuleStats(rule_id=rule_id))
+            if stats.hits == 0:
+                never_matched.append(rule_id)
+            conditions = {}
+            for key, cond in stats.conditions.items():
+                conditions[key] = {
+                    "evaluations": cond.evaluations,
+                    "true_count": cond.true_count,
+                    "true_rate": cond.true_count / cond.evaluations if cond.evaluations else 0.0,
+                }
+                if cond.evaluations and cond.true_count == 0:
+                    never_true_conditions.append({"rule_id": rule_id, "condition": key})
+            rules_report.append({
+                "rule_id": rule_id,
+                "position": position,
+                "evaluations": stats.evaluations,
+                "hits": stats.hits,
+                "hit_rate": stats.hits / decisions,
+                "total_time_us": stats.total_time_ns / 1000,
+                "mean_time_us": (stats.total_time_ns / stats.evaluations / 1000
+                                 if stats.evaluations else 0.0),
+                "conditions": conditions,
+            })
+
+        report: Dict[str, Any] = {
+            "decisions": self.decisions,
+            "fallback": {
+                "count": self.fallbacks,
+                "rate": self.fallbacks / decisions,
+                "by_id": dict(self.fallback_ids),
+            },
+            "mean_rules_evaluated": self.rules_evaluated / decisions,
+            "mean_conditions_evaluated": self.conditions_evaluated / decisions,
+            "mean_decision_time_us": self.decision_time_ns / decisions / 1000,
+            "matched_position_histogram": dict(sorted(self.matched_positions.items())),
+            "rules": rules_report,
+            "never_matched_rules": never_matched,
+            "never_true_conditions": never_true_conditions,
+        }
+
+        if analysis is not None:
+            safe_order = analysis.safe_reorder(self.hit_counts())
+            report["static"] = analysis.report()
+            report["safe_order"] = [rule.get("id") for rule in safe_order]
+            report["expected_rules_evaluated"] = {
+                "current_order": self.expected_rules_evaluated(rules),
+                "safe_order": self.expected_rules_evaluated(safe_order),
+            }
+
+        return report
+
+
+def profile_rules(
+    cases: Iterable[HeadacheCase],
+    rules_path: Optional[Path] = None
+) -> Dict[str, Any]:
+    """Évalue un lot de cas en mode profilage et retourne le rapport.
+
+    Args:
+        cases: Cas de céphalée à évaluer
+        rules_path: Chemin optionnel vers le fichier de règles
+
+    Returns:
+        Rapport de couverture (voir RuleProfiler.report)
+    """
+    engine = RulesEngine(rules_path, profile=True)
+    engine.decide_imaging_bulk(cases)
+    return engine.get_profile_report()
@@ -0,0 +1,412 @@
+"""Registre des règles médicales avec rechargement à chaud.
+
+Le registre publie des "snapshots" immuables et versionnés du jeu de règles :
+
+- un snapshot contient les règles, les catalogues et le DAG de décision
+  compilé (rules_compiler), construits et validés une fois pour toutes;
+- une requête lit le snapshot courant une seule fois puis ne travaille
+  qu'avec lui : un rechargement concurrent ne peut pas mélanger deux
+  versions au milieu d'une décision;
+- un thread de surveillance (polling des rules/*.json, sans dépendance
+  externe, démarré à la demande : start_rules_watch) reconstruit et valide le nouveau snapshot en arrière-plan, puis
+  le publie par simple affectation de référence (atomique). Les threads de
+  requête ne prennent jamais de verrou et ne sont jamais bloqués;
+- un fichier invalide (JSON malformé, règle incohérente) est rejeté : le
+  snapshot précédent reste en service et l'erreur est journalisée.
+
+La version (ex: "1.0+3f2a9c1b7d4e") combine la version déclarée dans les
+métadonnées du JSON et une empreinte du contenu. Elle est reportée dans
+ImagingRecommendation.rules_version et dans les enregistrements d'audit.
+
+Seul le fichier de règles principal (headache_rules.json) alimente le
+snapshot; la modification de n'importe quel rules/*.json déclenche une
+tentative de reconstruction, sans nouvelle version si le contenu est inchangé.
+"""
+
+import hashlib
+import json
+import threading
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from types import MappingProxyType
+from typing import Any, Dict, List, Mapping, Optional, Tuple
+
+from pydantic import ValidationError as PydanticValidationError
+
+from .core.exceptions import ValidationError
+from .logging_config import get_logger, log_error_with_context
+from .models import ImagingRecommendation
+from .rules_compiler import CompiledRuleSet, compile_rules
+
+
+DEFAULT_RULES_PATH = Path(__file__).parent.parent / "rules" / "headache_rules.json"
+
+# Intervalle de surveillance des fichiers de règles (secondes)
+DEFAULT_POLL_INTERVAL = 2.0
+
+VALID_LOGICS = ("all", "any")
+
+
+@dataclass(frozen=True)
+class RulesSnapshot:
+    """Version immuable du jeu de règles, prête à l'emploi.
+
+    Attributes:
+        version: Identifiant de version (métadonnées + empreinte du contenu)
+        rules: Règles dans l'ordre d'évaluation (gelées, voir freeze_rules_data)
+        rules_data: Contenu JSON complet (gelé)
+        compiled: DAG de décision compilé des règles
+        red_flags_catalog: Catalogue des red flags
+        imaging_catalog: Catalogue des examens
+        urgency_levels: Niveaux d'urgence
+        source: Fichier de règles d'origine
+        loaded_at: Horodatage (time.time()) de construction
+    """
+    version: str
+    rules: Tuple[Mapping[str, Any], ...]
+    rules_data: Mapping[str, Any] = field(repr=False, compare=False)
+    compiled: CompiledRuleSet = field(repr=False, compare=False)
+    red_flags_catalog: Mapping[str, Any] = field(default_factory=dict, repr=False)
+    imaging_catalog: Mapping[str, Any] = field(default_factory=dict, repr=False)
+    urgency_levels: Mapping[str, Any] = field(default_factory=dict, repr=False)
+    source: Optional[Path] = None
+    loaded_at: float = 0.0
+
+
+def freeze_rules_data(value: Any) -> Any:
+    """Copie en lecture seule d'un contenu JSON décodé.
+
+    Les objets deviennent des MappingProxyType et les listes des tuples, à
+    tous les niveaux : un snapshot publié ne peut plus être modifié par ses
+    lecteurs (les règles comparent les valeurs attendues en liste ou tuple).
+    """
+    if isinstance(value, dict):
+        return MappingProxyType({key: freeze_rules_data(item) for key, item in value.items()})
+    if isinstance(value, list):
+        return tuple(freeze_rules_data(item) for item in value)
+    return value
+
+
+def compute_rules_version(rules_data: Dict[str, Any], raw: bytes) -> str:
+    """Identifiant de version d'un fichier de règles.
+
+    Args:
+        rules_data: Contenu JSON décodé
+        raw: Contenu brut du fichier
+
+    Returns:
+        "<version des métadonnées>+<12 premiers caractères du SHA-256>"
+    """
+    declared = rules_data.get("metadata", {}).get("version", "0")
+    return f"{declared}+{hashlib.sha256(raw).hexdigest()[:12]}"
+
+
+def validate_rules_data(rules_data: Any) -> None:
+    """Vérifie la structure d'un jeu de règles avant publication.
+
+    Args:
+        rules_data: Contenu JSON décodé du fichier de règles
+
+    Raises:
+        ValidationError: Si le jeu de règles est incohérent
+    """
+    if not isinstance(rules_data, dict) or not isinstance(rules_data.get("rules"), list):
+        raise ValidationError(
+            "Le fichier de règles doit contenir une liste 'rules'",
+            field="rules",
+            expected="liste de règles"
+        )
+
+    seen_ids = set()
+    for position, rule in enumerate(rules_data["rules"]):
+        if not isinstance(rule, dict):
+            raise ValidationError(f"Règle #{position} invalide", field="rules", value=rule)
+        rule_id = rule.get("id")
+        if not isinstance(rule_id, str) or not rule_id:
+            raise ValidationError(f"Règle #{position} sans identifiant", field="id", value=rule_id)
+        if rule_id in seen_ids:
+            raise ValidationError(f"Identifiant de règle dupliqué: {rule_id}", field="id", value=rule_id)
+        seen_ids.add(rule_id)
+        if not isinstance(rule.get("conditions", {}), dict):
+            raise ValidationError(
+                f"Règle {rule_id}: 'conditions' doit être un objet",
+                field="conditions", value=rule.get("conditions")
+            )
+        if rule.get("logic", "all") not in VALID_LOGICS:
+            raise ValidationError(
+                f"Règle {rule_id}: logique inconnue",
+                field="logic", value=rule.get("logic"), expected=" | ".join(VALID_LOGICS)
+            )
+        if not isinstance(rule.get("recommendation", {}), dict):
+            raise ValidationError(
+                f"Règle {rule_id}: 'recommendation' doit être un objet",
+                field="recommendation", value=rule.get("recommendation")
+            )
+
+
+def _validate_recommendations(compiled: CompiledRuleSet) -> None:
+    """Vérifie que chaque règle pouvant se déclencher produit une recommandation valide.
+
+    Une règle insatisfiable (voir rules_analysis) ne se déclenche jamais :
+    une recommandation invalide y est seulement signalée.
+    """
+    logger = get_logger()
+    for constraint in compiled.analysis.constraints:
+        rule = compiled.rules[constraint.position]
+        recommendation = rule.get("recommendation", {})
+        try:
+            ImagingRecommendation(
+                imaging=recommendation.get("imaging", []),
+                urgency=recommendation.get("urgency", "none"),
+                comment=recommendation.get("comment", ""),
+                applied_rule_id=constraint.rule_id
+            )
+        except PydanticValidationError as e:
+            if constraint.satisfiable:
+                raise ValidationError(
+                    f"Règle {constraint.rule_id}: recommandation invalide",
+                    field="recommendation",
+                    value=recommendation,
+                    original_exception=e
+                )
+            logger.warning(
+                f"Règle {constraint.rule_id} insatisfiable avec recommandation invalide (ignorée)"
+            )
+
+
+def build_snapshot(rules_path: Optional[Path] = None) -> RulesSnapshot:
+    """Charge, valide et compile un fichier de règles.
+
+    Args:
+        rules_path: Chemin vers le fichier de règles (défaut: headache_rules.json)
+
+    Returns:
+        Nouveau RulesSnapshot
+
+    Raises:
+        FileNotFoundError: Si le fichier n'existe pas
+        json.JSONDecodeError: Si le JSON est malformé
+        ValidationError: Si les règles sont incohérentes
+    """
+    rules_path = Path(rules_path) if rules_path is not None else DEFAULT_RULES_PATH
+    if not rules_path.exists():
+        raise FileNotFoundError(f"Fichier de règles introuvable: {rules_path}")
+
+    raw = rules_path.read_bytes()
+    rules_data = json.loads(raw.decode("utf-8"))
+    validate_rules_data(rules_data)
+
+    frozen = freeze_rules_data(rules_data)
+    rules = frozen["rules"]
+    compiled = compile_rules(list(rules))
+    _validate_recommendations(compiled)
+
+    return RulesSnapshot(
+        version=compute_rules_version(rules_data, raw),
+        rules=rules,
+        rules_data=frozen,
+        compiled=compiled,
+        red_flags_catalog=frozen.get("red_flags_catalog", MappingProxyType({})),
+        imaging_catalog=frozen.get("imaging_catalog", MappingProxyType({})),
+        urgency_levels=frozen.get("urgency_levels", MappingProxyType({})),
+        source=rules_path,
+        loaded_at=time.time()
+    )
+
+
+class RulesRegistry:
+    """Publie le snapshot courant des règles et le recharge à chaud.
+
+    Utilisation:
+        >>> registry = RulesRegistry()
+        >>> registry.start()              # surveillance en arrière-plan
+        >>> snapshot = registry.snapshot()  # une lecture par requête
+        >>> snapshot.compiled.lookup(case)
+    """
+
+    def __init__(
+        self,
+        rules_path: Optional[Path] = None,
+        watch_pattern: str = "*.json",
+        poll_interval: float = DEFAULT_POLL_INTERVAL
+    ):
+        """Charge le jeu de règles initial (de façon synchrone).
+
+        Args:
+            rules_path: Fichier de règles principal
+            watch_pattern: Motif des fichiers surveillés dans le dossier des règles
+            poll_interval: Intervalle de surveillance en secondes
+
+        Raises:
+            FileNotFoundError, json.JSONDecodeError, ValidationError:
+                si le jeu de règles initial est inutilisable
+        """
+        self.rules_path = Path(rules_path) if rules_path is not None else DEFAULT_RULES_PATH
+        self.watch_pattern = watch_pattern
+        self.poll_interval = poll_interval
+
+        self._swap_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+        self.history: List[str] = []
+        self.last_error: Optional[str] = None
+        self._fingerprint = self._compute_fingerprint()
+        self._snapshot = build_snapshot(self.rules_path)
+        self.history.append(self._snapshot.version)
+
+    def snapshot(self) -> RulesSnapshot:
+        """Snapshot courant (lecture de référence, sans verrou)."""
+        return self._snapshot
+
+    @property
+    def version(self) -> str:
+        """Version du snapshot courant."""
+        return self._snapshot.version
+
+    def _compute_fingerprint(self) -> Tuple[Tuple[str, int, int], ...]:
+        entries = []
+        for path in sorted(self.rules_path.parent.glob(self.watch_pattern)):
+            try:
+                stat = path.stat()
+            except OSError:
+                continue
+            entries.append((path.name, stat.st_mtime_ns, stat.st_size))
+        return tuple(entries)
+
+    def reload(self) -> bool:
+        """Reconstruit le snapshot et le publie s'il est valide et différent.
+
+        Le snapshot en service n'est jamais modifié : les requêtes en cours
+        continuent avec celui qu'elles ont lu.
+
+        Returns:
+            True si une nouvelle version a été publiée
+        """
+        try:
+            candidate = build_snapshot(self.rules_path)
+        except (OSError, ValueError, ValidationError) as e:
+            # json.JSONDecodeError hérite de ValueError
+            self.last_error = f"{type(e).__name__}: {e}"
+            log_error_with_context(e, "rechargement règles médicales", {
+                "rules_path": str(self.rules_path),
+                "version_en_service": self._snapshot.version
+            })
+            return False
+
+        with self._swap_lock:
+            self.last_error = None
+            if candidate.version == self._snapshot.version:
+                return False
+            previous = self._snapshot.version
+            self._snapshot = candidate
+            self.history.append(candidate.version)
+
+        get_logger().info(f"Règles rechargées: {previous} -> {candidate.version}")
+        return True
+
+    def check_for_changes(self) -> bool:
+        """Recharge si un fichier surveillé a changé depuis la dernière vérification.
+
+        Returns:
+            True si une nouvelle version a été publiée
+        """
+        fingerprint = self._compute_fingerprint()
+        if fingerprint == self._fingerprint:
+            return False
+        self._fingerprint = fingerprint
+        return self.reload()
+
+    def _watch(self) -> None:
+        while not self._stop.wait(self.poll_interval):
+            try:
+                self.check_for_changes()
+            except Exception as e:  # le thread de surveillance ne doit jamais mourir
+                log_error_with_context(e, "surveillance règles médicales", {
+                    "rules_path": str(self.rules_path)
+                })
+
+    def start(self) -> None:
+        """Démarre la surveillance des fichiers de règles (thread daemon)."""
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(
+            target=self._watch, name="rules-registry-watcher", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Arrête la surveillance."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=self.poll_interval + 1)
+            self._thread = None
+
+
+# ==============================================================================
+# Registres partagés (un par fichier de règles)
+# ==============================================================================
+
+_registries: Dict[Path, RulesRegistry] = {}
+# Registres par argument d'appel (None ou chemin absolu), sans Path.resolve()
+_registries_by_argument: Dict[Optional[Path], RulesRegistry] = {}
+_registries_lock = threading.Lock()
+# Surveillance opt-in (start_rules_watch, au démarrage de l'API) : un simple
+# appel de bibliothèque (decide_imaging) ne démarre aucun thread
+_watch_enabled = False
+
+
+def start_rules_watch() -> None:
+    """Surveille les fichiers de règles des registres existants et à venir."""
+    global _watch_enabled
+    with _registries_lock:
+        _watch_enabled = True
+        registries = list(_registries.values())
+    for registry in registries:
+        registry.start()
+
+
+def stop_rules_watch() -> None:
+    """Arrête la surveillance de tous les registres partagés."""
+    global _watch_enabled
+    with _registries_lock:
+        _watch_enabled = False
+        registries = list(_registries.values())
+    for registry in registries:
+        registry.stop()
+
+
+def get_rules_registry(rules_path: Optional[Path] = None, watch: Optional[bool] = None) -> RulesRegistry:
+    """Retourne le registre partagé d'un fichier de règles (créé au premier appel).
+
+    Args:
+        rules_path: Fichier de règles (défaut: headache_rules.json)
+        watch: Démarre la surveillance en arrière-plan à la création
+               (défaut: seulement après start_rules_watch)
+
+    Returns:
+        RulesRegistry partagé
+    """
+    # Chemin déjà vu tel quel (None ou absolu) : pas de résolution sur le système de fichiers
+    cacheable = rules_path is None or Path(rules_path).is_absolute()
+    if cacheable:
+        registry = _registries_by_argument.get(rules_path)
+        if registry is not None:
+            return registry
+    path = (Path(rules_path) if rules_path is not None else DEFAULT_RULES_PATH).resolve()
+    registry = _registries.get(path)
+    if registry is None:
+        with _registries_lock:
+            registry = _registries.get(path)
+            if registry is None:
+                registry = RulesRegistry(path)
+                if watch is None:
+                    watch = _watch_enabled
+                if watch:
+                    registry.start()
+                _registries[path] = registry
+    if cacheable:
+        _registries_by_argument[rules_path] = registry
+    return registry
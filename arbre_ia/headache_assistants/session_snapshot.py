@@ -0,0 +1,422 @@
+"""Instantanés binaires compacts des sessions de dialogue.
+
+Une session de dialogue._active_sessions garde un HeadacheCase pydantic
+complet et les métadonnées d'extraction avec les traces de chaque couche.
+Ce module l'encode en un instantané binaire (bibliothèque standard
+uniquement) pour migrer une session entre workers ou la persister :
+
+    - en-tête : magic, version du format, empreinte du schéma de HeadacheCase
+      (un instantané d'un autre schéma est refusé)
+    - cas clinique bit-packé : booléens optionnels sur 2 bits, énumérations
+      (Literal) sur le nombre de bits de leurs valeurs, entiers en varint,
+      flottants en float64, chaînes en UTF-8 préfixées de leur longueur
+    - champs demandés : index dans la table des champs de HeadacheCase
+    - métadonnées d'extraction par référence : le message analysé (et les
+      champs ciblés), l'import les recalcule par le cache d'analyses
+    - patterns spéciaux en JSON (exemples du corpus référencés par
+      identifiant, voir medical_examples_corpus.example_id)
+    - autres clés de la session en JSON compact
+    - CRC32 de tout ce qui précède, vérifié avant tout décodage
+
+Un instantané vient du client (/session/import) : toute erreur de décodage
+(troncature, UTF-8 ou JSON invalide, valeur hors bornes) devient une
+ValidationError.
+
+pack_session / unpack_session ne touchent pas au NLU; dialogue.export_session
+et dialogue.import_session s'en servent.
+"""
+
+import hashlib
+import json
+import math
+import struct
+import typing
+import zlib
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+from .core.exceptions import ValidationError
+from .models import HeadacheCase
+
+
+SNAPSHOT_MAGIC = b"HSS"
+
+# Version du format (à incrémenter si l'encodage change)
+SNAPSHOT_VERSION = 3
+
+# En-tête (magic et version) lu avant la vérification du CRC
+_HEADER_SIZE = len(SNAPSHOT_MAGIC) + 1
+
+_CRC = struct.Struct("<I")
+
+# Clés de la session encodées explicitement (les autres vont dans la section JSON)
+_PACKED_KEYS = frozenset({
+    "created_at", "current_case", "message_count", "asked_fields", "last_asked_field",
+    "extraction_metadata", "extraction_source", "accumulated_special_patterns",
+})
+
+_FLAG_CASE = 1
+_FLAG_METADATA_REFERENCE = 2
+_FLAG_METADATA_INLINE = 4
+
+
+# ==============================================================================
+# Schéma du cas clinique
+# ==============================================================================
+
+def _field_codec(annotation: Any) -> Tuple[str, Tuple[Any, ...]]:
+    """(type d'encodage, valeurs de l'énumération) d'une annotation de HeadacheCase."""
+    optional = type(None) in typing.get_args(annotation)
+    if optional:
+        annotation = next(arg for arg in typing.get_args(annotation) if arg is not type(None))
+    origin = typing.get_origin(annotation)
+    if origin is typing.Literal:
+        return "enum", typing.get_args(annotation)
+    if origin in (list, List) and typing.get_args(annotation) == (str,):
+        return "str_list", ()
+    if annotation is bool and optional:
+        return "bool", ()
+    for kind, python_type in (("int", int), ("float", float), ("str", str)):
+        if annotation is python_type:
+            return kind, ()
+    return "json", ()
+
+
+# (nom, type d'encodage, valeurs) de chaque champ, dans l'ordre du modèle
+CASE_SCHEMA: Tuple[Tuple[str, str, Tuple[Any, ...]], ...] = tuple(
+    (name, *_field_codec(field.annotation)) for name, field in HeadacheCase.model_fields.items()
+)
+
+_FIELD_IDS = {name: index for index, (name, _, _) in enumerate(CASE_SCHEMA)}
+
+# Nombre de bits de la partie bit-packée d'un cas
+_CASE_BITS = sum(
+    2 if kind == "bool" else len(choices).bit_length() if kind == "enum" else 1
+    for _, kind, choices in CASE_SCHEMA
+)
+
+# Empreinte du schéma (noms, encodages, valeurs des énumérations)
+SCHEMA_FINGERPRINT = hashlib.sha256(repr(CASE_SCHEMA).encode("utf-8")).digest()[:4]
+
+
+# ==============================================================================
+# Primitives
+# ==============================================================================
+
+def _write_varint(buffer: bytearray, value: int) -> None:
+    while True:
+        byte = value & 0x7F
+        value >>= 7
+        if value:
+            buffer.append(byte | 0x80)
+        else:
+            buffer.append(byte)
+            return
+
+
+def _write_str(buffer: bytearray, value: str) -> None:
+    encoded = value.encode("utf-8")
+    _write_varint(buffer, len(encoded))
+    buffer += encoded
+
+
+class _Reader:
+    """Lecture séquentielle d'un instantané (ValidationError si tronqué)."""
+
+    def __init__(self, data: bytes, position: int = 0):
+        self.data = data
+        self.position = position
+
+    def take(self, size: int) -> bytes:
+        end = self.position + size
+        if end > len(self.data):
+            raise ValidationError("Instantané de session tronqué", field="snapshot", value=len(self.data))
+        chunk = self.data[self.position:end]
+        self.position = end
+        return chunk
+
+    def varint(self) -> int:
+        value = shift = 0
+        while True:
+            byte = self.take(1)[0]
+            value |= (byte & 0x7F) << shift
+            if not byte & 0x80:
+                return value
+            shift += 7
+
+    def str(self) -> str:
+        return self.take(self.varint()).decode("utf-8")
+
+
+def _zigzag(value: int) -> int:
+    return value * 2 if value >= 0 else -value * 2 - 1
+
+
+def _unzigzag(value: int) -> int:
+    return value // 2 if value % 2 == 0 else -(value + 1) // 2
+
+
+# ==============================================================================
+# Cas clinique
+# ==============================================================================
+
+def pack_case(case: HeadacheCase) -> bytes:
+    """Encode un cas : bits (présence, booléens, énumérations) puis valeurs."""
+    bits = 0
+    bit_count = 0
+    values = bytearray()
+
+    def push(code: int, width: int) -> None:
+        nonlocal bits, bit_count
+        bits |= code << bit_count
+        bit_count += width
+
+    for name, kind, choices in CASE_SCHEMA:
+        value = getattr(case, name)
+        if kind == "bool":
+            push(0 if value is None else 1 + bool(value), 2)
+        elif kind == "enum":
+            push(0 if value is None else choices.index(value) + 1, len(choices).bit_length())
+        elif kind == "str_list":
+            push(bool(value), 1)
+            if value:
+                _write_varint(values, len(value))
+                for item in value:
+                    _write_str(values, item)
+        else:
+            push(value is not None, 1)
+            if value is None:
+                continue
+            if kind == "int":
+                _write_varint(values, _zigzag(value))
+            elif kind == "float":
+                values += struct.pack("<d", value)
+            elif kind == "str":
+                _write_str(values, value)
+            else:
+                _write_str(values, json.dumps(value, ensure_ascii=False, separators=(",", ":")))
+
+    return bits.to_bytes((bit_count + 7) // 8, "little") + bytes(values)
+
+
+def unpack_case(data: bytes) -> HeadacheCase:
+    """Décode un cas encodé par pack_case.
+
+    Raises:
+        ValidationError: Si les données sont tronquées
+    """
+    reader = _Reader(data)
+    bits = int.from_bytes(reader.take((_CASE_BITS + 7) // 8), "little")
+
+    def pull(width: int) -> int:
+        nonlocal bits
+        code = bits & ((1 << width) - 1)
+        bits >>= width
+        return code
+
+    fields: Dict[str, Any] = {}
+    for name, kind, choices in CASE_SCHEMA:
+        if kind == "bool":
+            code = pull(2)
+            fields[name] = None if code == 0 else code == 2
+        elif kind == "enum":
+            code = pull(len(choices).bit_length())
+            fields[name] = None if code == 0 else choices[code - 1]
+        elif kind == "str_list":
+            fields[name] = [reader.str() for _ in range(reader.varint())] if pull(1) else []
+        elif not pull(1):
+            fields[name] = None
+        elif kind == "int":
+            fields[name] = _unzigzag(reader.varint())
+        elif kind == "float":
+            fields[name] = struct.unpack("<d", reader.take(8))[0]
+        elif kind == "str":
+            fields[name] = reader.str()
+        else:
+            fields[name] = json.loads(reader.str())
+    return HeadacheCase.model_validate(fields)
+
+
+# ==============================================================================
+# Session
+# ==============================================================================
+
+def _write_field(buffer: bytearray, name: Optional[str]) -> None:
+    """Champ par index dans CASE_SCHEMA (0 : nom en clair suit, absent si chaîne vide)."""
+    field_id = _FIELD_IDS.get(name) if name else None
+    if field_id is None:
+        _write_varint(buffer, 0)
+        _write_str(buffer, name or "")
+    else:
+        _write_varint(buffer, field_id + 1)
+
+
+def _read_field(reader: _Reader) -> Optional[str]:
+    field_id = reader.varint()
+    if field_id == 0:
+        return reader.str() or None
+    if field_id > len(CASE_SCHEMA):
+        raise ValidationError("Champ inconnu dans l'instantané", field="snapshot", value=field_id)
+    return CASE_SCHEMA[field_id - 1][0]
+
+
+def _dumps(value: Any) -> str:
+    try:
+        return json.dumps(value, ensure_ascii=False, separators=(",", ":"))
+    except TypeError as e:
+        raise ValidationError(
+            "Valeur de session non sérialisable", field="session", value=value, original_exception=e
+        ) from e
+
+
+def pack_session(session_id: str, session: Dict[str, Any]) -> bytes:
+    """Encode une session de dialogue en instantané binaire.
+
+    Args:
+        session_id: Identifiant de la session
+        session: Données de la session (dialogue._active_sessions)
+
+    Returns:
+        Instantané (bytes)
+
+    Raises:
+        ValidationError: Si une clé de session n'est pas sérialisable en JSON
+    """
+    buffer = bytearray(SNAPSHOT_MAGIC)
+    buffer.append(SNAPSHOT_VERSION)
+    buffer += SCHEMA_FINGERPRINT
+    _write_str(buffer, session_id)
+
+    created_at = session.get("created_at")
+    buffer += struct.pack("<d", created_at.timestamp() if created_at else math.nan)
+    _write_varint(buffer, session.get("message_count", 0))
+
+    case = session.get("current_case")
+    source = session.get("extraction_source")
+    metadata = session.get("extraction_metadata")
+    flags = _FLAG_CASE if case is not None else 0
+    if source is not None:
+        flags |= _FLAG_METADATA_REFERENCE
+    elif metadata:
+        flags |= _FLAG_METADATA_INLINE
+    buffer.append(flags)
+
+    if case is not None:
+        packed_case = pack_case(case)
+        _write_varint(buffer, len(packed_case))
+        buffer += packed_case
+
+    asked_fields = session.get("asked_fields", [])
+    _write_varint(buffer, len(asked_fields))
+    for name in asked_fields:
+        _write_field(buffer, name)
+    _write_field(buffer, session.get("last_asked_field"))
+
+    # Métadonnées d'extraction : référence au message analysé, recalculée à l'import
+    if source is not None:
+        _write_str(buffer, source["text"])
+        fields = source.get("fields")
+        _write_varint(buffer, 0 if fields is None else len(fields) + 1)
+        for name in fields or ():
+            _write_field(buffer, name)
+    elif metadata:
+        _write_str(buffer, _dumps(metadata))
+
+    # Patterns spéciaux (exemples du corpus déjà référencés par identifiant)
+    patterns = session.get("accumulated_special_patterns", [])
+    _write_str(buffer, _dumps(patterns) if patterns else "")
+
+    extras = {key: value for key, value in session.items() if key not in _PACKED_KEYS}
+    _write_str(buffer, _dumps(extras) if extras else "")
+    buffer += _CRC.pack(zlib.crc32(buffer))
+    return bytes(buffer)
+
+
+def unpack_session(snapshot: bytes) -> Tuple[str, Dict[str, Any]]:
+    """Décode un instantané produit par pack_session.
+
+    Les métadonnées d'extraction stockées par référence sont rendues à None,
+    avec la référence dans session["extraction_source"] (à recalculer).
+
+    Returns:
+        Tuple (session_id, données de session)
+
+    Raises:
+        ValidationError: Instantané invalide, tronqué, corrompu (CRC32),
+            illisible, d'une autre version du format ou d'un autre schéma
+            de HeadacheCase
+    """
+    snapshot = bytes(snapshot)
+    if snapshot[:len(SNAPSHOT_MAGIC)] != SNAPSHOT_MAGIC:
+        raise ValidationError("Instantané de session invalide", field="snapshot", expected="magic HSS")
+    if len(snapshot) < _HEADER_SIZE + _CRC.size:
+        raise ValidationError("Instantané de session tronqué", field="snapshot", value=len(snapshot))
+    version = snapshot[len(SNAPSHOT_MAGIC)]
+    if version != SNAPSHOT_VERSION:
+        raise ValidationError(
+            "Version d'instantané non supportée", field="snapshot", value=version, expected=str(SNAPSHOT_VERSION)
+        )
+    payload, (checksum,) = snapshot[:-_CRC.size], _CRC.unpack(snapshot[-_CRC.size:])
+    if zlib.crc32(payload) != checksum:
+        raise ValidationError("Instantané de session corrompu (CRC32)", field="snapshot")
+
+    try:
+        return _decode_session(_Reader(payload, _HEADER_SIZE))
+    except ValidationError:
+        raise
+    except (UnicodeDecodeError, ValueError, IndexError, KeyError, TypeError, OverflowError, OSError, struct.error) as e:
+        # JSONDecodeError et les erreurs pydantic sont des ValueError
+        raise ValidationError(
+            "Instantané de session illisible", field="snapshot", original_exception=e
+        ) from e
+
+
+def _decode_session(reader: _Reader) -> Tuple[str, Dict[str, Any]]:
+    """Décode le contenu d'un instantané (après l'en-tête, CRC vérifié)."""
+    if reader.take(len(SCHEMA_FINGERPRINT)) != SCHEMA_FINGERPRINT:
+        raise ValidationError("Instantané d'un autre schéma de HeadacheCase", field="snapshot")
+
+    session_id = reader.str()
+    created_at = struct.unpack("<d", reader.take(8))[0]
+    session: Dict[str, Any] = {
+        "created_at": None if math.isnan(created_at) else datetime.fromtimestamp(created_at),
+        "message_count": reader.varint(),
+    }
+    flags = reader.take(1)[0]
+    session["current_case"] = None
+    if flags & _FLAG_CASE:
+        session["current_case"] = unpack_case(reader.take(reader.varint()))
+
+    session["asked_fields"] = [_read_field(reader) for _ in range(reader.varint())]
+    session["last_asked_field"] = _read_field(reader)
+
+    session["extraction_metadata"] = {}
+    session["extraction_source"] = None
+    if flags & _FLAG_METADATA_REFERENCE:
+        text = reader.str()
+        count = reader.varint()
+        fields = None if count == 0 else [_read_field(reader) for _ in range(count - 1)]
+        session["extraction_source"] = {"text": text, "fields": fields}
+        session["extraction_metadata"] = None
+    elif flags & _FLAG_METADATA_INLINE:
+        session["extraction_metadata"] = _loads(reader.str(), dict)
+
+    session["accumulated_special_patterns"] = _loads(reader.str() or "[]", list)
+
+    extras = _loads(reader.str() or "{}", dict)
+    if set(extras) & _PACKED_KEYS:
+        raise ValidationError("Clés de session en double dans l'instantané", field="snapshot")
+    if reader.position != len(reader.data):
+        raise ValidationError("Données en trop dans l'instantané", field="snapshot")
+    session.update(extras)
+    return session_id, session
+
+
+def _loads(text: str, expected: type) -> Any:
+    value = json.loads(text)
+    if not isinstance(value, expected):
+        raise ValidationError(
+            "Section JSON de l'instantané invalide", field="snapshot", value=type(value).__name__,
+            expected=expected.__name__
+        )
+    return value
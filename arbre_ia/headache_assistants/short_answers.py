@@ -0,0 +1,233 @@
+"""Interprétation des réponses courtes aux questions de suivi du dialogue.
+
+Après une question ciblée ("Le patient a-t-il de la fièvre ?"), la réponse
+est le plus souvent un mot ou une courte phrase. Ce module l'interprète pour
+le champ demandé, avec des motifs compilés une fois à l'import :
+
+    - polarité : oui / non et leurs variantes ("ouais", "jamais",
+      "pas du tout", "aucune"...), la négation primant sur l'affirmation
+    - nuances : "je crois que oui", "un peu", "pas vraiment" donnent la
+      polarité marquée comme nuancée; "je ne sais pas", "peut-être" une
+      réponse incertaine (champ laissé inconnu)
+    - échelles numériques : intensité ("7", "7/10", "3 sur 5", "huit"),
+      âge ("45", "45 ans")
+
+Les mots ambigus dans une phrase ("n", "o", "toujours", "souvent") ne
+comptent que s'ils forment toute la réponse. Une réponse longue n'est
+interprétée que si elle commence par oui / non ("oui il a de la fièvre").
+
+Seule une réponse nue (is_bare_answer : "oui", "je crois que non", "7/10")
+se passe d'analyse NLU. Sinon le dialogue analyse tout le texte, sans
+cibler le champ demandé ("aucune idée, il a convulsé ce matin" garde la
+crise), puis l'interprétation tranche le champ demandé. Les réponses
+courtes (au plus SHORT_ANSWER_MAX_TOKENS mots) passent par les couches
+déterministes seules (règles, n-grams, mots-clés, négations), jamais par
+l'embedding. FollowUpMetrics compte les tours de suivi qui évitent
+l'analyse complète (/metrics).
+"""
+
+import re
+import threading
+import typing
+from dataclasses import dataclass
+from typing import Any, Dict, FrozenSet, Optional
+
+from .models import HeadacheCase
+
+
+# Nombre maximal de mots d'une réponse courte
+SHORT_ANSWER_MAX_TOKENS = 8
+
+# Champs booléens du cas (réponses oui / non)
+BOOLEAN_FIELDS: FrozenSet[str] = frozenset(
+    name for name, field in HeadacheCase.model_fields.items()
+    if field.annotation == typing.Optional[bool]
+)
+
+# Champs numériques : (minimum, maximum)
+NUMERIC_FIELDS: Dict[str, tuple] = {"intensity": (0, 10), "age": (0, 120)}
+
+_NUMBER_WORDS = {
+    "zéro": 0, "zero": 0, "deux": 2, "trois": 3, "quatre": 4, "cinq": 5,
+    "six": 6, "sept": 7, "huit": 8, "neuf": 9, "dix": 10,
+}
+
+
+# ==============================================================================
+# Motifs compilés
+# ==============================================================================
+
+_TOKEN_RE = re.compile(r"\w+")
+
+# Réponse incertaine (vérifiée avant la négation : "pas sûr", "aucune idée")
+_UNCERTAIN_RE = re.compile(
+    r"\b(?:je\s+(?:ne\s+)?sais\s+pas|sais\s+pas|sait\s+pas|ne\s+sait\s+pas|pas\s+s[uû]re?|"
+    r"peut[\s-]?[eê]tre|aucune\s+id[ée]e|je\s+ne\s+suis\s+pas\s+s[uû]re?|inconnu)\b"
+)
+_NEGATIVE_RE = re.compile(
+    r"\b(?:non|nan|no|aucun|aucune|pas|jamais|rien|n[ée]gatif|nullement|niet)\b"
+)
+_POSITIVE_RE = re.compile(
+    r"\b(?:oui|ouais|ouep|yes|si|exact|exactement|effectivement|affirmatif|positif|"
+    r"bien\s+s[uû]r|tout\s+[àa]\s+fait|absolument|certainement|un\s+peu|l[ée]g[èe]rement|"
+    r"parfois|quelquefois|probablement|je\s+crois|il\s+me\s+semble|c'est\s+[çc]a)\b"
+)
+# Nuances : la polarité est retenue mais marquée incertaine
+_HEDGE_RE = re.compile(
+    r"\b(?:je\s+(?:ne\s+)?crois|je\s+(?:ne\s+)?pense|il\s+me\s+semble|probablement|plut[ôo]t|un\s+peu|"
+    r"l[ée]g[èe]rement|pas\s+vraiment|parfois|quelquefois)\b"
+)
+# Réponse longue : polarité explicite en tête
+_LEADING_RE = re.compile(
+    r"^\W*(?:(?P<no>non|nan|no|jamais|aucun|aucune|pas\s+du\s+tout)|"
+    r"(?P<yes>oui|ouais|yes|si|exact|effectivement|tout\s+[àa]\s+fait|bien\s+s[uû]r))\b"
+)
+# Réponses d'un seul mot ambiguës dans une phrase ("n'a", "toujours mal") :
+# retenues seulement quand la réponse se réduit à ce mot
+_SOLE_TOKENS = {"n": False, "o": True, "toujours": True, "souvent": True}
+# Mots qui entourent une réponse sans rien apporter au cas ("je crois que oui")
+_FILLER_RE = re.compile(
+    r"\b(?:je|j|il|elle|on|que|qu|c|est|ça|ca|mais|bon|ben|bah|euh|alors|ah|oh|"
+    r"dirais|dirait|sur|ans?|du|tout|de|la|le|les|fois)\b"
+)
+_SCALE_RE = re.compile(r"(\d+(?:[.,]\d+)?)\s*(?:/|sur)\s*(\d+)")
+_NUMBER_RE = re.compile(r"\d+(?:[.,]\d+)?|\b(?:" + "|".join(_NUMBER_WORDS) + r")\b")
+
+
+@dataclass(frozen=True)
+class ShortAnswer:
+    """Réponse interprétée pour le champ demandé.
+
+    Attributes:
+        field: Champ demandé
+        value: Valeur du champ (None : réponse incertaine, champ laissé inconnu)
+        hedged: Polarité exprimée avec une nuance ("je crois que oui")
+    """
+    field: str
+    value: Any
+    hedged: bool = False
+
+    @property
+    def uncertain(self) -> bool:
+        return self.value is None
+
+    def apply(self, case: HeadacheCase) -> HeadacheCase:
+        """Cas complété de la réponse (inchangé si la réponse est incertaine)."""
+        if self.value is None:
+            return case
+        return case.model_copy(update={self.field: self.value})
+
+
+def is_short_answer(text: str) -> bool:
+    """Vrai si la réponse compte au plus SHORT_ANSWER_MAX_TOKENS mots."""
+    return len(_TOKEN_RE.findall(text)) <= SHORT_ANSWER_MAX_TOKENS
+
+
+def is_bare_answer(text: str) -> bool:
+    """Vrai si la réponse ne contient que la réponse elle-même.
+
+    "oui", "je crois que non", "7/10" ou "45 ans" sont nues; "non, mais il
+    a convulsé" apporte d'autres informations, que l'analyse NLU doit lire.
+    """
+    text = text.lower()
+    for pattern in (_UNCERTAIN_RE, _HEDGE_RE, _NEGATIVE_RE, _POSITIVE_RE, _SCALE_RE, _NUMBER_RE, _FILLER_RE):
+        text = pattern.sub(" ", text)
+    return not any(token not in _SOLE_TOKENS for token in _TOKEN_RE.findall(text))
+
+
+def _polarity(text: str, field: str) -> Optional[ShortAnswer]:
+    sole = _SOLE_TOKENS.get(text.strip(" .!?"))
+    if sole is not None:
+        return ShortAnswer(field, sole)
+    leading = _LEADING_RE.match(text)
+    if leading is None and not is_short_answer(text):
+        return None
+    if _UNCERTAIN_RE.search(text):
+        return ShortAnswer(field, None)
+    hedged = _HEDGE_RE.search(text) is not None
+    if leading is not None:
+        return ShortAnswer(field, leading.group("yes") is not None, hedged)
+    # Négation prioritaire : "pas de fièvre je crois", "absolument pas"
+    if _NEGATIVE_RE.search(text):
+        return ShortAnswer(field, False, hedged)
+    if _POSITIVE_RE.search(text):
+        return ShortAnswer(field, True, hedged)
+    return None
+
+
+def _number(text: str, field: str) -> Optional[ShortAnswer]:
+    low, high = NUMERIC_FIELDS[field]
+    scale = _SCALE_RE.search(text)
+    if scale is not None and field == "intensity":
+        value, maximum = float(scale.group(1).replace(",", ".")), int(scale.group(2))
+        if maximum <= 0:
+            return None
+        value = value * 10 / maximum
+    else:
+        match = _NUMBER_RE.search(text)
+        if match is None:
+            return None
+        token = match.group(0)
+        value = _NUMBER_WORDS[token] if token in _NUMBER_WORDS else float(token.replace(",", "."))
+    value = int(round(value))
+    if not low <= value <= high:
+        return None
+    return ShortAnswer(field, value)
+
+
+def interpret_short_answer(text: str, field: str) -> Optional[ShortAnswer]:
+    """Interprète une réponse à la question portant sur un champ.
+
+    Args:
+        text: Réponse de l'utilisateur
+        field: Champ demandé (last_asked_field du dialogue)
+
+    Returns:
+        ShortAnswer, ou None si la réponse ne s'interprète pas pour ce champ
+
+    Example:
+        >>> interpret_short_answer("je crois que oui", "fever")
+        ShortAnswer(field='fever', value=True, hedged=True)
+        >>> interpret_short_answer("7/10", "intensity").value
+        7
+    """
+    text = text.lower().strip()
+    if field in BOOLEAN_FIELDS:
+        return _polarity(text, field)
+    if field in NUMERIC_FIELDS:
+        return _number(text, field)
+    return None
+
+
+# ==============================================================================
+# Suivi des tours de suivi
+# ==============================================================================
+
+class FollowUpMetrics:
+    """Tours de suivi par chemin d'analyse.
+
+    Chemins : "interpreted" (réponse nue interprétée), "rules" (réponse
+    courte analysée par les couches déterministes) et "full"
+    (pipeline NLU complet, réponses longues).
+    """
+
+    PATHS = ("interpreted", "rules", "full")
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counts = {path: 0 for path in self.PATHS}
+
+    def record(self, path: str) -> None:
+        """Enregistre le chemin d'analyse d'un tour de suivi."""
+        with self._lock:
+            self._counts[path] += 1
+
+    def stats(self) -> Dict[str, Any]:
+        """Compteurs par chemin et part des tours qui évitent l'analyse complète."""
+        with self._lock:
+            total = sum(self._counts.values())
+            return {
+                **self._counts,
+                "total": total,
+                "full_parse_avoided_rate": (total - self._counts["full"]) / total if total else 0.0,
+            }
@@ -0,0 +1,73 @@
+"""Exécution unique des appels concurrents identiques (single-flight).
+
+Un double clic dans le client envoie deux fois la même requête : sans
+coordination, chacune refait l'analyse complète. SingleFlight regroupe les
+appels concurrents de même clé : le premier calcule, les suivants attendent
+son résultat (ou son exception) au lieu de recalculer. Une fois l'appel
+terminé, la clé est libérée : un appel ultérieur recalcule (la mise en cache
+des résultats reste l'affaire de l'appelant).
+"""
+
+import threading
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, Hashable, Tuple
+
+
+class SingleFlight:
+    """Regroupe les appels concurrents de même clé en un seul calcul.
+
+    Example:
+        >>> flights = SingleFlight()
+        >>> result, shared = flights.do(("session", "hash"), compute)
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls: Dict[Hashable, Future] = {}
+        self.executions = 0
+        self.shared = 0
+
+    def do(self, key: Hashable, func: Callable[..., Any], *args: Any, **kwargs: Any) -> Tuple[Any, bool]:
+        """Exécute func(*args, **kwargs), ou attend l'appel en cours de même clé.
+
+        Returns:
+            Tuple (résultat, partagé) : partagé est vrai si le résultat vient
+            d'un appel concurrent
+
+        Raises:
+            Exception: Celle levée par func (transmise à tous les appelants)
+        """
+        with self._lock:
+            future = self._calls.get(key)
+            if future is None:
+                future = Future()
+                self._calls[key] = future
+                self.executions += 1
+                leader = True
+            else:
+                self.shared += 1
+                leader = False
+        if not leader:
+            return future.result(), True
+
+        try:
+            result = func(*args, **kwargs)
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        else:
+            future.set_result(result)
+            return result, False
+        finally:
+            with self._lock:
+                del self._calls[key]
+
+    def in_flight(self) -> int:
+        """Nombre de calculs en cours."""
+        with self._lock:
+            return len(self._calls)
+
+    def stats(self) -> Dict[str, int]:
+        """Calculs exécutés et appels servis par un calcul concurrent."""
+        with self._lock:
+            return {"executions": self.executions, "shared": self.shared, "in_flight": len(self._calls)}
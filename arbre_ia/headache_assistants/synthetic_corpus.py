@@ -0,0 +1,480 @@
+"""Générateur déterministe de textes cliniques synthétiques.
+
+Les 103 exemples de MEDICAL_EXAMPLES et les cas réels hospitaliers sont trop
+peu nombreux pour des tests de charge. Ce module compose les vocabulaires
+existants du NLU en descriptions cliniques variées, chacune accompagnée de
+son étiquette de vérité terrain (HeadacheCase), pour mesurer à la fois le
+débit et l'exactitude des parseurs.
+
+Sources des formulations:
+    - SEMANTIC_VOCABULARY, NGRAM_PATTERNS, KEYWORD_INDEX : formulations
+      positives (et négatives, ex: "apyrétique") par (champ, valeur)
+    - SYMPTOM_TO_FIELD : termes niés ("pas de fièvre", "sans raideur de nuque")
+    - CRITICAL_MEDICAL_TERMS : termes cibles de l'injection de fautes de frappe
+
+Déterminisme:
+    La note d'indice i ne dépend que de (seed, i) : une génération peut être
+    découpée en tranches (start, count) sur plusieurs processus et reste
+    identique à une génération d'un seul tenant.
+
+Utilisation:
+    >>> generator = SyntheticCorpusGenerator(seed=42, typo_rate=0.05)
+    >>> note = generator.generate_one(0)
+    >>> note.text, note.case.onset, note.labelled_fields
+
+En ligne de commande (JSONL, une note par ligne):
+    python -m headache_assistants.synthetic_corpus --count 100000 --seed 1 > notes.jsonl
+"""
+
+import argparse
+import json
+import random
+import re
+import sys
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+from pydantic import ValidationError as PydanticValidationError
+
+from .models import HeadacheCase
+from .nlu_hybrid import CRITICAL_MEDICAL_TERMS, KEYWORD_INDEX, NGRAM_PATTERNS, SYMPTOM_TO_FIELD
+from .vocabulary.semantic_vocabulary import SEMANTIC_VOCABULARY
+
+
+# Probabilité qu'un champ soit mentionné dans une note (modifiable par champ)
+DEFAULT_FIELD_RATES: Dict[str, float] = {
+    "onset": 0.8,
+    "duration_current_episode_hours": 0.7,
+    "intensity": 0.5,
+    "fever": 0.5,
+    "meningeal_signs": 0.4,
+    "neuro_deficit": 0.4,
+    "seizure": 0.2,
+    "htic_pattern": 0.3,
+    "trauma": 0.2,
+    "pregnancy_postpartum": 0.15,
+    "recent_pl_or_peridural": 0.1,
+    "immunosuppression": 0.15,
+    "recent_pattern_change": 0.1,
+    "vertigo": 0.1,
+    "headache_profile": 0.3,
+}
+
+# Poids minimal d'une formulation pour être retenue (écarte les termes vagues)
+MIN_PHRASE_WEIGHT = 0.75
+
+# Termes trop ambigus hors contexte ("crise" migraineuse, "choc" émotionnel...)
+_AMBIGUOUS_TERMS = frozenset({"crise", "choc", "faiblesse", "chaud", "trauma", "température"})
+
+# Adjectifs de SYMPTOM_TO_FIELD : pas de forme niée naturelle ("pas de fébrile")
+_ADJECTIVE_TERMS = frozenset({"fébrile", "méningé"})
+
+# Gabarits de négation reconnus par detect_negations
+_NEGATION_TEMPLATES = ("pas de {}", "sans {}", "absence de {}", "aucune notion de {}")
+
+# Seuils de profil temporel (heures), identiques à ceux du NLU
+_ACUTE_MAX_HOURS = 168
+_SUBACUTE_MAX_HOURS = 2160
+
+# Phrases neutres de remplissage (aucun terme des vocabulaires)
+_FILLER_SENTENCES = (
+    "Consultation aux urgences ce jour",
+    "Constantes relevées à l'arrivée",
+    "Bilan biologique prélevé",
+    "Traitement antalgique débuté à l'arrivée",
+    "Surveillance en box de soins",
+    "Antécédents familiaux non contributifs",
+    "Accompagné par un proche",
+    "Adressé par le médecin traitant",
+    "Prise de paracétamol à domicile",
+    "Dossier transmis au médecin senior",
+)
+
+_WORD_RE = re.compile(r"\w+", re.UNICODE)
+_ACCENTS = str.maketrans("éèêëàâîïôûùç", "eeeeaaiiouuc")
+
+
+# ==============================================================================
+# Note synthétique
+# ==============================================================================
+
+@dataclass(frozen=True)
+class SyntheticNote:
+    """Note clinique synthétique et sa vérité terrain.
+
+    Attributes:
+        index: Indice de la note dans la génération
+        text: Texte de la note
+        case: Cas attendu (seuls les champs de labelled_fields sont affirmés)
+        labelled_fields: Champs explicitement exprimés dans le texte
+    """
+    index: int
+    text: str
+    case: HeadacheCase
+    labelled_fields: Tuple[str, ...]
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Sérialisation JSON (texte + étiquettes des champs exprimés)."""
+        return {
+            "index": self.index,
+            "text": self.text,
+            "labels": {field: getattr(self.case, field) for field in self.labelled_fields},
+        }
+
+
+# ==============================================================================
+# Banque de formulations
+# ==============================================================================
+
+def _valid_value(field: str, value: Any) -> bool:
+    if field not in HeadacheCase.model_fields:
+        return False
+    try:
+        HeadacheCase(**{field: value})
+    except PydanticValidationError:
+        return False
+    return True
+
+
+def _is_duration(term: str) -> bool:
+    return term.startswith("depuis ") or any(char.isdigit() for char in term)
+
+
+@lru_cache(maxsize=1)
+def build_phrase_bank() -> Dict[Tuple[str, Any], Tuple[str, ...]]:
+    """Formulations par (champ, valeur), dérivées des vocabulaires du NLU.
+
+    Une formulation associée à des valeurs différentes d'un même champ selon
+    les vocabulaires est écartée (étiquette ambiguë), de même que les
+    formulations de durée ("depuis 6 mois", "depuis des années") : les durées
+    sont générées à part et ne doivent pas se contredire.
+
+    Returns:
+        Dictionnaire (champ, valeur) -> formulations triées
+    """
+    candidates: List[Tuple[str, str, Any]] = []
+    for term, entry in SEMANTIC_VOCABULARY.items():
+        if entry.get("weight", 1.0) >= MIN_PHRASE_WEIGHT:
+            candidates.append((term, entry["field"], entry["value"]))
+    for term, entry in NGRAM_PATTERNS.items():
+        fields = entry["fields"]
+        if len(fields) == 1 and entry.get("confidence", 1.0) >= MIN_PHRASE_WEIGHT:
+            (field, value), = fields.items()
+            candidates.append((term, field, value))
+    for term, entries in KEYWORD_INDEX.items():
+        for entry in entries:
+            if entry.get("weight", 1.0) >= MIN_PHRASE_WEIGHT:
+                candidates.append((term, entry["field"], entry["value"]))
+    for term, field in SYMPTOM_TO_FIELD.items():
+        if field is not None:
+            candidates.append((term, field, True))
+
+    values_by_term: Dict[Tuple[str, str], set] = {}
+    for term, field, value in candidates:
+        values_by_term.setdefault((term, field), set()).add(value)
+
+    bank: Dict[Tuple[str, Any], set] = {}
+    for (term, field), values in values_by_term.items():
+        if len(values) != 1 or term in _AMBIGUOUS_TERMS or _is_duration(term):
+            continue
+        value = next(iter(values))
+        if _valid_value(field, value):
+            bank.setdefault((field, value), set()).add(term)
+    return {key: tuple(sorted(terms)) for key, terms in sorted(bank.items(), key=repr)}
+
+
+@lru_cache(maxsize=1)
+def negatable_terms() -> Dict[str, Tuple[str, ...]]:
+    """Termes de SYMPTOM_TO_FIELD utilisables sous négation, par champ."""
+    terms: Dict[str, List[str]] = {}
+    for term, field in SYMPTOM_TO_FIELD.items():
+        if field is not None and term not in _AMBIGUOUS_TERMS | _ADJECTIVE_TERMS:
+            terms.setdefault(field, []).append(term)
+    return {field: tuple(sorted(values)) for field, values in terms.items()}
+
+
+# ==============================================================================
+# Générateur
+# ==============================================================================
+
+class SyntheticCorpusGenerator:
+    """Générateur reproductible de notes cliniques étiquetées.
+
+    Args:
+        seed: Graine globale
+        field_rates: Probabilité de mention par champ (complète DEFAULT_FIELD_RATES)
+        negation_rate: Probabilité qu'un signe booléen mentionné soit nié
+        typo_rate: Probabilité de faute de frappe par terme médical critique
+        target_chars: Longueur minimale des notes (remplissage neutre), 0 = aucune
+    """
+
+    def __init__(
+        self,
+        seed: int = 0,
+        field_rates: Optional[Dict[str, float]] = None,
+        negation_rate: float = 0.4,
+        typo_rate: float = 0.0,
+        target_chars: int = 0
+    ):
+        self.seed = seed
+        self.field_rates = {**DEFAULT_FIELD_RATES, **(field_rates or {})}
+        self.negation_rate = negation_rate
+        self.typo_rate = typo_rate
+        self.target_chars = target_chars
+
+        self._bank = build_phrase_bank()
+        self._negatable = negatable_terms()
+        self._values_by_field: Dict[str, List[Any]] = {}
+        for field, value in self._bank:
+            self._values_by_field.setdefault(field, []).append(value)
+        self._typo_targets = frozenset(term.lower() for term in CRITICAL_MEDICAL_TERMS)
+
+    def generate(self, count: int, start: int = 0) -> Iterator[SyntheticNote]:
+        """Génère paresseusement les notes d'indices start .. start + count - 1."""
+        for index in range(start, start + count):
+            yield self.generate_one(index)
+
+    def generate_one(self, index: int) -> SyntheticNote:
+        """Génère la note d'indice donné (ne dépend que de (seed, index))."""
+        rng = random.Random(f"{self.seed}:{index}")
+        labels: Dict[str, Any] = {}
+        sentences: List[str] = []
+        mentions: List[Tuple[str, Any]] = []
+
+        sentences.append(self._demographics(rng, labels))
+        self._temporal(rng, labels, sentences, mentions)
+
+        if self._mentioned(rng, "intensity"):
+            labels["intensity"] = rng.randint(2, 10)
+            sentences.append(rng.choice(("EVA {}/10", "douleur cotée à {}/10", "intensité {}/10"))
+                             .format(labels["intensity"]))
+
+        for field in self.field_rates:
+            if field in labels or field in ("onset", "duration_current_episode_hours", "intensity"):
+                continue
+            if field == "pregnancy_postpartum" and (labels["sex"] != "F" or labels["age"] > 45):
+                continue
+            if not self._mentioned(rng, field):
+                continue
+            values = self._values_by_field.get(field)
+            if not values:
+                continue
+            value = self._pick_value(rng, field, values)
+            if value is None:
+                continue
+            labels[field] = value
+            mentions.append((field, value))
+            sentences.append(self._render(rng, field, value))
+
+        if self.target_chars:
+            self._pad(rng, sentences, mentions)
+
+        text = ". ".join(sentence[0].upper() + sentence[1:] for sentence in sentences) + "."
+        if self.typo_rate:
+            text = self._inject_typos(rng, text)
+
+        return SyntheticNote(
+            index=index,
+            text=text,
+            case=HeadacheCase(**labels),
+            labelled_fields=tuple(labels),
+        )
+
+    # ------------------------------------------------------------------
+    # Composition
+    # ------------------------------------------------------------------
+
+    def _mentioned(self, rng: random.Random, field: str) -> bool:
+        return rng.random() < self.field_rates.get(field, 0.0)
+
+    def _demographics(self, rng: random.Random, labels: Dict[str, Any]) -> str:
+        sex = rng.choice(("M", "F"))
+        age = rng.randint(18, 90)
+        labels["sex"] = sex
+        labels["age"] = age
+        if sex == "F":
+            subject = rng.choice(("patiente de {} ans", "femme de {} ans", "madame X, {} ans"))
+        else:
+            subject = rng.choice(("patient de {} ans", "homme de {} ans", "monsieur X, {} ans"))
+        return subject.format(age) + rng.choice((
+            "", ", consulte pour céphalées", ", vient pour mal de tête", ", céphalées",
+        ))
+
+    def _temporal(
+        self,
+        rng: random.Random,
+        labels: Dict[str, Any],
+        sentences: List[str],
+        mentions: List[Tuple[str, Any]]
+    ) -> None:
+        onset = None
+        if self._mentioned(rng, "onset"):
+            onset = rng.choice(self._values_by_field["onset"])
+            labels["onset"] = onset
+            mentions.append(("onset", onset))
+            sentences.append(self._render(rng, "onset", onset))
+
+        if self._mentioned(rng, "duration_current_episode_hours"):
+            if onset == "thunderclap":
+                amount, unit, hours = self._duration(rng, ("heures",))
+            elif onset == "chronic":
+                amount, unit, hours = self._duration(rng, ("mois",), minimum=4)
+            else:
+                amount, unit, hours = self._duration(rng, ("heures", "jours", "semaines", "mois"))
+            labels["duration_current_episode_hours"] = hours
+            sentences.append(f"depuis {amount} {unit}")
+            if hours < _ACUTE_MAX_HOURS:
+                profile = "acute"
+            elif hours < _SUBACUTE_MAX_HOURS:
+                profile = "subacute"
+            else:
+                profile = "chronic"
+            labels["profile"] = profile
+        elif onset == "thunderclap":
+            labels["profile"] = "acute"
+        elif onset == "chronic":
+            labels["profile"] = "chronic"
+
+    @staticmethod
+    def _duration(
+        rng: random.Random,
+        units: Sequence[str],
+        minimum: int = 2
+    ) -> Tuple[int, str, float]:
+        unit = rng.choice(units)
+        hours_per_unit = {"heures": 1, "jours": 24, "semaines": 168, "mois": 720}[unit]
+        maximum = {"heures": 23, "jours": 6, "semaines": 11, "mois": 24}[unit]
+        amount = rng.randint(minimum, max(minimum, maximum))
+        return amount, unit, float(amount * hours_per_unit)
+
+    def _pick_value(self, rng: random.Random, field: str, values: List[Any]) -> Any:
+        if set(values) <= {True, False}:
+            if rng.random() < self.negation_rate:
+                has_negation = (field, False) in self._bank or field in self._negatable
+                return False if has_negation else None
+            return True if (field, True) in self._bank else None
+        return rng.choice(values)
+
+    def _render(self, rng: random.Random, field: str, value: Any) -> str:
+        """Formulation d'une valeur : terme du vocabulaire ou négation."""
+        if value is False:
+            options = list(self._bank.get((field, False), ()))
+            options += [template.format(term)
+                        for term in self._negatable.get(field, ())
+                        for template in _NEGATION_TEMPLATES]
+            return rng.choice(options)
+        return rng.choice(self._bank[(field, value)])
+
+    def _pad(
+        self,
+        rng: random.Random,
+        sentences: List[str],
+        mentions: List[Tuple[str, Any]]
+    ) -> None:
+        """Allonge la note jusqu'à target_chars (remplissage neutre ou reformulation)."""
+        length = sum(len(sentence) + 2 for sentence in sentences)
+        while length < self.target_chars:
+            if mentions and rng.random() < 0.3:
+                field, value = rng.choice(mentions)
+                sentence = self._render(rng, field, value)
+            else:
+                sentence = rng.choice(_FILLER_SENTENCES)
+            sentences.append(sentence)
+            length += len(sentence) + 2
+
+    def _inject_typos(self, rng: random.Random, text: str) -> str:
+        def replace(match: "re.Match[str]") -> str:
+            word = match.group(0)
+            if (len(word) < 5 or word.lower() not in self._typo_targets
+                    or rng.random() >= self.typo_rate):
+                return word
+            return make_typo(rng, word)
+        return _WORD_RE.sub(replace, text)
+
+
+def make_typo(rng: random.Random, word: str) -> str:
+    """Applique une faute de frappe plausible (accent, omission, inversion, doublon)."""
+    kind = rng.choice(("accent", "delete", "swap", "double"))
+    stripped = word.translate(_ACCENTS)
+    if kind == "accent" and stripped != word:
+        return stripped
+    position = rng.randint(1, len(word) - 2)
+    if kind == "delete":
+        return word[:position] + word[position + 1:]
+    if kind == "swap":
+        return word[:position] + word[position + 1] + word[position] + word[position + 2:]
+    return word[:position] + word[position] + word[position:]
+
+
+def generate_notes(count: int, seed: int = 0, start: int = 0, **options: Any) -> List[SyntheticNote]:
+    """Raccourci : liste de count notes (options de SyntheticCorpusGenerator)."""
+    return list(SyntheticCorpusGenerator(seed=seed, **options).generate(count, start=start))
+
+
+# ==============================================================================
+# Exactitude
+# ==============================================================================
+
+def field_accuracy(
+    notes: Iterable[SyntheticNote],
+    predictions: Iterable[HeadacheCase]
+) -> Dict[str, Any]:
+    """Exactitude par champ des cas prédits, sur les seuls champs exprimés.
+
+    Args:
+        notes: Notes synthétiques (vérité terrain)
+        predictions: Cas extraits par un parseur, dans le même ordre
+
+    Returns:
+        {"overall": float, "exact_notes": float, "fields": {champ: float}}
+    """
+    hits: Dict[str, int] = {}
+    totals: Dict[str, int] = {}
+    exact = count = 0
+    for note, predicted in zip(notes, predictions):
+        count += 1
+        note_exact = True
+        for field in note.labelled_fields:
+            ok = getattr(predicted, field) == getattr(note.case, field)
+            totals[field] = totals.get(field, 0) + 1
+            hits[field] = hits.get(field, 0) + ok
+            note_exact = note_exact and ok
+        exact += note_exact
+
+    total = sum(totals.values())
+    return {
+        "overall": sum(hits.values()) / total if total else 0.0,
+        "exact_notes": exact / count if count else 0.0,
+        "fields": {field: hits[field] / totals[field] for field in sorted(totals)},
+    }
+
+
+# ==============================================================================
+# Ligne de commande
+# ==============================================================================
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Écrit des notes synthétiques en JSONL sur la sortie standard."""
+    parser = argparse.ArgumentParser(prog="python -m headache_assistants.synthetic_corpus")
+    parser.add_argument("--count", type=int, default=1000)
+    parser.add_argument("--start", type=int, default=0, help="indice de la première note")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--target-chars", type=int, default=0)
+    parser.add_argument("--negation-rate", type=float, default=0.4)
+    parser.add_argument("--typo-rate", type=float, default=0.0)
+    args = parser.parse_args(argv)
+
+    generator = SyntheticCorpusGenerator(
+        seed=args.seed,
+        negation_rate=args.negation_rate,
+        typo_rate=args.typo_rate,
+        target_chars=args.target_chars,
+    )
+    for note in generator.generate(args.count, start=args.start):
+        sys.stdout.write(json.dumps(note.to_dict(), ensure_ascii=False) + "\n")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -58,13 +58,12 @@ from typing import Dict, List, Any, Optional, Tuple
 import numpy as np
 
 from .base import normalize_text, DetectionResult, ConceptCategory
+from ..embedders import SENTENCE_TRANSFORMERS_AVAILABLE, Embedder, create_embedder, embedder_available
+from ..word_vectors import wrap_with_word_vectors
 
-# Lazy import sentence-transformers
-try:
-    from sentence_transformers import SentenceTransformer
-    EMBEDDING_AVAILABLE = True
-except ImportError:
-    EMBEDDING_AVAILABLE = False
+# Backend par défaut (sentence-transformers); les autres backends sont vérifiés à l'initialisation
+EMBEDDING_AVAILABLE = SENTENCE_TRANSFORMERS_AVAILABLE
+if not EMBEDDING_AVAILABLE:
     warnings.warn(
         "sentence-transformers not installed. SemanticVocabulary will not work.\n"
         "Install with: pip install sentence-transformers"
@@ -465,7 +464,7 @@ class SemanticVocabulary:
 
     Attributes:
         vocabulary: Dict mapping terms to clinical field definitions
-        embedder: SentenceTransformer model for embedding
+        embedder: Embedder instance (backend chosen via embedders.create_embedder)
         term_embeddings: Pre-computed embeddings for vocabulary terms
         term_list: Ordered list of vocabulary terms (for index mapping)
         similarity_threshold: Minimum similarity for a match (default 0.65)
@@ -480,9 +479,12 @@ class SemanticVocabulary:
     def __init__(
         self,
         similarity_threshold: float = 0.78,
-        embedding_model: str = 'all-MiniLM-L6-v2',
+        embedding_model: Optional[str] = None,
         verbose: bool = False,
-        min_token_length: int = 3
+        min_token_length: int = 3,
+        embedding_backend: Optional[str] = None,
+        embedder: Optional[Embedder] = None,
+        word_vectors: Optional[str] = None
     ):
         """
         Initialize semantic vocabulary with pre-computed embeddings.
@@ -491,19 +493,26 @@ class SemanticVocabulary:
             similarity_threshold: Minimum cosine similarity for matches (0.0-1.0)
                                  Higher = more precise, lower = more recall.
                                  Default 0.78 to avoid false positives from short words.
-            embedding_model: Sentence-transformers model name
+            embedding_model: Model name, ONNX directory or static table, depending
+                             on the backend (default: all-MiniLM-L6-v2)
             verbose: Print initialization progress
             min_token_length: Minimum token length to consider (default 3)
                              Prevents short words like "en" from matching.
+            embedding_backend: "sentence-transformers", "onnx" or "static"
+                               (default: HEADACHE_EMBEDDING_BACKEND env var)
+            embedder: Existing Embedder to reuse (overrides backend and model)
+            word_vectors: Precomputed word-vector table directory (see word_vectors.py);
+                          single words are looked up, n-grams go through the model.
+                          Default: HEADACHE_WORD_VECTORS env var, none if unset.
 
         Raises:
-            ImportError: If sentence-transformers not available
+            ImportError: If the embedding backend dependencies are not available
         """
         self.min_token_length = min_token_length
-        if not EMBEDDING_AVAILABLE:
+        if embedder is None and not embedder_available(embedding_backend):
             raise ImportError(
-                "sentence-transformers required for SemanticVocabulary. "
-                "Install with: pip install sentence-transformers"
+                "Embedding backend unavailable for SemanticVocabulary. "
+                "Install with: pip install sentence-transformers (or onnxruntime tokenizers)"
             )
 
         self.vocabulary = SEMANTIC_VOCABULARY
@@ -511,9 +520,11 @@ class SemanticVocabulary:
         self.verbose = verbose
 
         # Initialize embedder
-        if verbose:
+        if embedder is None and verbose:
             print(f"[SemanticVocabulary] Loading model '{embedding_model}'...")
-        self.embedder = SentenceTransformer(embedding_model)
+        if embedder is None:
+            embedder = wrap_with_word_vectors(create_embedder(embedding_backend, embedding_model), word_vectors)
+        self.embedder = embedder
 
         # Pre-compute vocabulary embeddings
         self.term_list = list(self.vocabulary.keys())
@@ -529,7 +540,7 @@ class SemanticVocabulary:
         if verbose:
             print(f"[SemanticVocabulary] Ready. Shape: {self.term_embeddings.shape}")
 
-    def match_text(self, text: str) -> List[SemanticMatch]:
+    def match_text(self, text: str, similarity_threshold: Optional[float] = None) -> List[SemanticMatch]:
         """
         Find semantic matches between input text and vocabulary.
 
@@ -541,6 +552,9 @@ class SemanticVocabulary:
 
         Args:
             text: Input text to analyze
+            similarity_threshold: Threshold for this call (default: the
+                                  vocabulary's similarity_threshold). Lets
+                                  several configurations share one vocabulary.
 
         Returns:
             List of SemanticMatch objects, sorted by final_confidence descending
@@ -552,6 +566,8 @@ class SemanticVocabulary:
         """
         if not text or not text.strip():
             return []
+        if similarity_threshold is None:
+            similarity_threshold = self.similarity_threshold
 
         # Normalize text
         text_normalized = normalize_text(text, preserve_accents=False)
@@ -579,7 +595,7 @@ class SemanticVocabulary:
             similarities = np.dot(self.term_embeddings, token_embedding)
 
             # Find terms above threshold
-            above_threshold = np.where(similarities >= self.similarity_threshold)[0]
+            above_threshold = np.where(similarities >= similarity_threshold)[0]
 
             for idx in above_threshold:
                 term = self.term_list[idx]
@@ -703,8 +719,8 @@ def create_semantic_vocabulary(
     Returns:
         SemanticVocabulary instance or None if embedding unavailable
     """
-    if not EMBEDDING_AVAILABLE:
-        warnings.warn("SemanticVocabulary unavailable - sentence-transformers not installed")
+    if not embedder_available():
+        warnings.warn("SemanticVocabulary unavailable - embedding backend not installed")
         return None
 
     try:
@@ -0,0 +1,246 @@
+"""Table de vecteurs de mots pré-calculée pour les jetons d'un seul mot.
+
+La plupart des jetons encodés par SemanticVocabulary.match_text sont des mots
+isolés : passer chacun dans un transformeur est coûteux pour un résultat
+fixe. La table stocke, pour un lexique médical français (vocabulaire
+sémantique, mots-clés, n-grams, corpus d'exemples, banque de phrases
+synthétiques, lexiques externes), le vecteur calculé une fois par
+l'encodeur de référence :
+
+    <table>/tokens.npy    mots triés (tableau Unicode, recherche par np.searchsorted)
+    <table>/vectors.npy   vecteurs normalisés float16 (n, d), chargés en mémoire mappée
+    <table>/meta.json     modèle source, dimension, taille, empreinte du lexique
+
+WordVectorEmbedder sert les mots présents dans la table par simple lecture
+et n'envoie au transformeur que les n-grams et les mots inconnus, en un
+seul lot. La table est activée par le paramètre word_vectors de
+SemanticVocabulary / HybridNLU ou par HEADACHE_WORD_VECTORS.
+
+Construction (une fois, avec l'encodeur de référence):
+    python -m headache_assistants.word_vectors build --output models/word_vectors \\
+        --lexicon lexique_medical.txt
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import re
+import sys
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Sequence, Union
+
+import numpy as np
+
+from .embedders import DEFAULT_MODEL, MODEL_ENV_VAR, Embedder, create_embedder
+
+
+# Variable d'environnement désignant la table à utiliser
+WORD_VECTORS_ENV_VAR = "HEADACHE_WORD_VECTORS"
+
+# Version du format de table
+FORMAT_VERSION = 1
+
+# Longueur minimale d'un mot du lexique (aligné sur SemanticVocabulary.min_token_length)
+MIN_WORD_LENGTH = 2
+
+_WORD_RE = re.compile(r"\b[\w-]+\b")
+
+
+# ==============================================================================
+# Table
+# ==============================================================================
+
+class WordVectorTable:
+    """Table de vecteurs de mots (lecture seule, mémoire mappée).
+
+    Args:
+        path: Répertoire de la table
+        mmap: Mappe les vecteurs en mémoire (sinon chargement complet)
+
+    Raises:
+        ValueError: Format de table non supporté
+    """
+
+    def __init__(self, path: Union[str, Path], mmap: bool = True):
+        self.path = Path(path)
+        self.meta = json.loads((self.path / "meta.json").read_text(encoding="utf-8"))
+        if self.meta.get("format_version") != FORMAT_VERSION:
+            raise ValueError(f"Format de table {self.meta.get('format_version')} non supporté")
+        mode = "r" if mmap else None
+        self.tokens = np.load(self.path / "tokens.npy", mmap_mode=mode)
+        self.vectors = np.load(self.path / "vectors.npy", mmap_mode=mode)
+        self.dimension = self.vectors.shape[1]
+
+    def __len__(self) -> int:
+        return len(self.tokens)
+
+    def __contains__(self, word: str) -> bool:
+        return bool(self.lookup([word])[0] >= 0)
+
+    def lookup(self, words: Sequence[str]) -> np.ndarray:
+        """Ligne de chaque mot dans la table, -1 si absent."""
+        if not len(words) or not len(self.tokens):
+            return np.full(len(words), -1, dtype=np.int64)
+        keys = np.asarray(words, dtype=str)
+        rows = np.minimum(np.searchsorted(self.tokens, keys), len(self.tokens) - 1)
+        return np.where(self.tokens[rows] == keys, rows, -1)
+
+    def vectors_for(self, rows: np.ndarray) -> np.ndarray:
+        """Vecteurs float32 des lignes données."""
+        return np.asarray(self.vectors[rows], dtype=np.float32)
+
+
+def build_word_vector_table(
+    embedder: Embedder,
+    words: Iterable[str],
+    output_dir: Union[str, Path],
+    model: Optional[str] = None,
+    batch_size: int = 256
+) -> WordVectorTable:
+    """Encode un lexique et écrit la table.
+
+    Args:
+        embedder: Encodeur de référence
+        words: Mots du lexique (mis en minuscules, dédoublonnés)
+        output_dir: Répertoire de sortie
+        model: Nom du modèle source (métadonnées)
+        batch_size: Taille des lots d'encodage
+
+    Returns:
+        Table écrite
+    """
+    tokens = sorted({word.strip().lower() for word in words if word.strip()})
+    vectors = embedder.encode(tokens, convert_to_numpy=True, batch_size=batch_size)
+    vectors = np.asarray(vectors, dtype=np.float32).reshape(len(tokens), -1)
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    vectors = vectors / np.where(norms == 0, 1, norms)
+
+    output_dir = Path(output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    np.save(output_dir / "tokens.npy", np.array(tokens, dtype=str))
+    np.save(output_dir / "vectors.npy", vectors.astype(np.float16))
+    meta = {
+        "format_version": FORMAT_VERSION,
+        "model": model,
+        "backend": embedder.backend,
+        "dimension": int(vectors.shape[1]) if len(tokens) else 0,
+        "size": len(tokens),
+        "lexicon_sha256": hashlib.sha256("\n".join(tokens).encode("utf-8")).hexdigest(),
+    }
+    (output_dir / "meta.json").write_text(json.dumps(meta, indent=2, ensure_ascii=False), encoding="utf-8")
+    return WordVectorTable(output_dir)
+
+
+# ==============================================================================
+# Encodeur mixte table / transformeur
+# ==============================================================================
+
+class WordVectorEmbedder(Embedder):
+    """Sert les mots isolés depuis la table, le reste via l'encodeur de repli.
+
+    Args:
+        table: Table de vecteurs de mots
+        fallback: Encodeur des n-grams et mots hors table (même modèle que la table)
+
+    Attributes:
+        hits: Nombre de textes servis par la table
+        misses: Nombre de textes envoyés à l'encodeur de repli
+    """
+
+    def __init__(self, table: WordVectorTable, fallback: Embedder):
+        self.table = table
+        self.fallback = fallback
+        self.backend = f"{fallback.backend}+word_vectors"
+        self.dimension = table.dimension
+        self.hits = 0
+        self.misses = 0
+
+    def encode(self, texts, convert_to_numpy=True, show_progress_bar=False, batch_size=32):
+        single = isinstance(texts, str)
+        batch = [texts] if single else list(texts)
+        keys = [text.strip().lower() for text in batch]
+        rows = self.table.lookup([key if " " not in key else "" for key in keys])
+
+        result = np.zeros((len(batch), self.dimension), dtype=np.float32)
+        found = rows >= 0
+        if found.any():
+            result[found] = self.table.vectors_for(rows[found])
+        missing = np.flatnonzero(~found)
+        if len(missing):
+            result[missing] = self.fallback.encode(
+                [batch[i] for i in missing], convert_to_numpy=True, batch_size=batch_size
+            )
+        self.hits += int(found.sum())
+        self.misses += len(missing)
+        return result[0] if single else result
+
+
+def wrap_with_word_vectors(embedder: Embedder, word_vectors: Optional[Union[str, Path]] = None) -> Embedder:
+    """Ajoute la table de mots à un encodeur si elle est configurée.
+
+    Args:
+        embedder: Encodeur de repli
+        word_vectors: Répertoire de la table (défaut: HEADACHE_WORD_VECTORS; aucun -> inchangé)
+    """
+    word_vectors = word_vectors or os.environ.get(WORD_VECTORS_ENV_VAR)
+    if not word_vectors:
+        return embedder
+    return WordVectorEmbedder(WordVectorTable(word_vectors), embedder)
+
+
+# ==============================================================================
+# Lexique
+# ==============================================================================
+
+def lexicon_words(texts: Iterable[str]) -> List[str]:
+    """Mots (forme accentuée et sans accents) extraits de textes."""
+    from .vocabulary.base import normalize_text
+
+    words: Dict[str, None] = {}
+    for text in texts:
+        for form in (text.lower(), normalize_text(text, preserve_accents=False)):
+            for word in _WORD_RE.findall(form):
+                if len(word) >= MIN_WORD_LENGTH and not word.isdigit():
+                    words[word] = None
+    return list(words)
+
+
+def collect_lexicon(extra_files: Sequence[Union[str, Path]] = ()) -> List[str]:
+    """Lexique médical du dépôt, complété par des fichiers externes (un terme par ligne)."""
+    from .medical_examples_corpus import MEDICAL_EXAMPLES
+    from .nlu_hybrid import CRITICAL_MEDICAL_TERMS, KEYWORD_INDEX, NGRAM_PATTERNS, SYMPTOM_TO_FIELD
+    from .synthetic_corpus import build_phrase_bank
+    from .vocabulary.semantic_vocabulary import SEMANTIC_VOCABULARY
+
+    texts: List[str] = []
+    texts += list(SEMANTIC_VOCABULARY)
+    texts += list(KEYWORD_INDEX) + list(NGRAM_PATTERNS) + list(SYMPTOM_TO_FIELD) + CRITICAL_MEDICAL_TERMS
+    texts += [example["text"] for example in MEDICAL_EXAMPLES]
+    texts += [term for terms in build_phrase_bank().values() for term in terms]
+    for path in extra_files:
+        texts += Path(path).read_text(encoding="utf-8").splitlines()
+    return lexicon_words(texts)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Construit une table de vecteurs de mots."""
+    parser = argparse.ArgumentParser(prog="python -m headache_assistants.word_vectors")
+    commands = parser.add_subparsers(dest="command", required=True)
+    build = commands.add_parser("build", help="encode le lexique et écrit la table")
+    build.add_argument("--output", type=Path, required=True, help="répertoire de la table")
+    build.add_argument("--lexicon", type=Path, action="append", default=[],
+                       help="lexique externe, un terme par ligne (répétable)")
+    build.add_argument("--backend", help="backend de l'encodeur de référence (défaut: sentence-transformers)")
+    build.add_argument("--model", help="modèle de l'encodeur de référence")
+    args = parser.parse_args(argv)
+
+    model = args.model or os.environ.get(MODEL_ENV_VAR) or DEFAULT_MODEL
+    words = collect_lexicon(args.lexicon)
+    table = build_word_vector_table(create_embedder(args.backend, model), words, args.output, model=model)
+    print(f"{len(table)} mots, dimension {table.dimension} -> {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,108 @@
+"""Tests des endpoints de l'API FastAPI (api.py) via TestClient.
+
+Vérifie les codes de retour des endpoints qui reçoivent des données du
+client : import d'instantanés de session, messages du WebSocket, ETag
+des ordonnances.
+"""
+
+import json
+import sys
+from pathlib import Path
+
+import pytest
+
+# api.py utilise des imports relatifs : importé comme module du paquet arbre_ia
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+
+from fastapi.testclient import TestClient
+
+from arbre_ia.api import app
+from arbre_ia.headache_assistants.dialogue import get_nlu_registry
+from arbre_ia.headache_assistants.nlu_registry import SiteConfig
+from arbre_ia.headache_assistants.rules_registry import DEFAULT_RULES_PATH, get_rules_registry
+
+
+@pytest.fixture(scope="module")
+def client():
+    return TestClient(app)
+
+
+class TestSessionImport:
+    """POST /session/import."""
+
+    def test_corrupted_snapshot_is_400(self, client):
+        """Instantané corrompu ou tronqué : 400, jamais 500."""
+        response = client.post("/chat", json={"session_id": "test-api-import", "message": "Homme 40 ans, mal de tête"})
+        assert response.status_code == 200
+        snapshot = client.get("/session/test-api-import/export").content
+
+        corrupted = bytearray(snapshot)
+        corrupted[len(corrupted) // 2] ^= 0xFF
+        for body in (bytes(corrupted), snapshot[:10], b"\xff" * 40, b""):
+            response = client.post("/session/import", content=body)
+            assert response.status_code == 400, body
+
+        response = client.post("/session/import", content=snapshot, params={"session_id": "test-api-copy"})
+        assert response.status_code == 200
+        assert response.json() == {"session_id": "test-api-copy"}
+
+
+class TestChatWebSocket:
+    """WebSocket /chat/ws."""
+
+    def test_invalid_json_keeps_connection(self, client):
+        """JSON invalide : trame d'erreur, la connexion reste utilisable."""
+        with client.websocket_connect("/chat/ws") as websocket:
+            websocket.send_text("{pas du json")
+            error = websocket.receive_json()
+            assert error["event"] == "error"
+
+            websocket.send_json({"message": "Homme 40 ans, mal de tête depuis 2 jours"})
+            events = []
+            while not events or events[-1]["event"] != "result":
+                events.append(websocket.receive_json())
+            assert events[0]["event"] == "provisional"
+
+
+class TestPrescriptionETag:
+    """POST /prescription et If-None-Match."""
+
+    def test_not_modified_until_inputs_change(self, client, tmp_path):
+        """200 puis 304 avec l'ETag; 200 quand le cas, le médecin ou les règles changent; "*" ignoré."""
+        rules = json.loads(DEFAULT_RULES_PATH.read_text(encoding="utf-8"))
+        rules_path = tmp_path / "rules.json"
+        rules_path.write_text(json.dumps(rules, ensure_ascii=False), encoding="utf-8")
+        get_nlu_registry().register_site(SiteConfig("test-api-etag", rules_path=rules_path))
+        session = {"session_id": "test-api-etag", "site": "test-api-etag"}
+        client.post("/chat", json={**session, "message": "Homme 40 ans, mal de tête depuis 2 jours"})
+
+        def prescribe(etag=None, doctor="Dr A"):
+            headers = {"If-None-Match": etag} if etag else {}
+            return client.post(
+                "/prescription", json={"session_id": "test-api-etag", "doctor_name": doctor}, headers=headers
+            )
+
+        first = prescribe()
+        assert first.status_code == 200
+        etag = first.headers["ETag"]
+        not_modified = prescribe(etag)
+        assert not_modified.status_code == 304 and not_modified.headers["ETag"] == etag
+        assert prescribe("*").status_code == 200
+
+        # Autre médecin
+        other_doctor = prescribe(etag, doctor="Dr B")
+        assert other_doctor.status_code == 200 and other_doctor.headers["ETag"] != etag
+
+        # Cas complété par un nouveau message
+        client.post("/chat", json={**session, "message": "il a aussi de la fièvre depuis hier soir"})
+        changed_case = prescribe(etag)
+        assert changed_case.status_code == 200
+        etag = changed_case.headers["ETag"]
+        assert prescribe(etag).status_code == 304
+
+        # Nouvelle version des règles
+        rules.setdefault("metadata", {})["version"] = "test-api-etag"
+        rules_path.write_text(json.dumps(rules, ensure_ascii=False), encoding="utf-8")
+        assert get_rules_registry(rules_path).reload()
+        changed_rules = prescribe(etag)
+        assert changed_rules.status_code == 200 and changed_rules.headers["ETag"] != etag
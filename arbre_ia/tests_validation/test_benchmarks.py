@@ -0,0 +1,64 @@
+"""Tests du harnais de benchmarks.
+
+Vérifie la mesure, la comparaison de deux exécutions (porte de régression)
+et le chargement du corpus d'entrée.
+"""
+
+from benchmarks.corpus import load_example_texts, load_real_cases, make_long_notes
+from benchmarks.harness import Benchmark, compare_results, run_benchmark, run_suite
+
+
+def document(**medians):
+    return {"benchmarks": {name: {"median_us": value} for name, value in medians.items()}}
+
+
+class TestHarness:
+    """Mesure et comparaison."""
+
+    def test_run_benchmark_statistics(self):
+        """Les statistiques sont cohérentes et le minimum de rondes est respecté."""
+        bench = Benchmark("sum", lambda n: sum(range(n)), lambda: [10, 100, 1000])
+        stats = run_benchmark(bench, min_time=0.0, min_rounds=5)
+        assert stats["inputs"] == 3
+        assert stats["rounds"] == 5
+        assert 0 < stats["min_us"] <= stats["median_us"] <= stats["p95_us"]
+
+    def test_skipped_benchmark(self):
+        """Un benchmark sans dépendance est ignoré sans être exécuté."""
+        bench = Benchmark("absent", lambda _: 1 / 0, lambda: [1], skip_reason=lambda: "absent")
+        assert run_benchmark(bench) == {"skipped": "absent"}
+
+    def test_run_suite_filter(self):
+        """Le filtre par nom restreint les benchmarks exécutés."""
+        benches = [Benchmark(name, len, lambda: ["abc"]) for name in ("a.len", "b.len")]
+        result = run_suite(benches, min_time=0.0, min_rounds=1, name_filter="a.", verbose=False)
+        assert list(result["benchmarks"]) == ["a.len"]
+        assert result["meta"]["min_rounds"] == 1
+
+    def test_compare_detects_regression(self):
+        """Un ralentissement au-delà du seuil est signalé comme régression."""
+        rows = compare_results(document(a=100.0, b=100.0, c=100.0),
+                               document(a=130.0, b=105.0, c=50.0, d=1.0), threshold=0.10)
+        status = {row["name"]: row["status"] for row in rows}
+        assert status == {"a": "regression", "b": "ok", "c": "improvement"}
+
+    def test_compare_skipped(self):
+        """Un benchmark ignoré d'un côté n'est jamais une régression."""
+        rows = compare_results({"benchmarks": {"a": {"skipped": "x"}}}, document(a=1.0))
+        assert rows == [{"name": "a", "status": "skipped"}]
+
+
+class TestCorpus:
+    """Corpus d'entrée."""
+
+    def test_sources_non_empty(self):
+        """Les cas réels et les exemples sont chargés, sans lignes de titre."""
+        real = load_real_cases()
+        assert real and not any(line.startswith("#") for line in real)
+        assert load_example_texts()
+
+    def test_long_notes_deterministic(self):
+        """Les notes longues sont reproductibles et atteignent la longueur visée."""
+        notes = make_long_notes(count=3, target_chars=500, seed=1)
+        assert notes == make_long_notes(count=3, target_chars=500, seed=1)
+        assert all(len(note) >= 500 for note in notes)
@@ -0,0 +1,105 @@
+"""Tests de la représentation en colonnes CaseBatch.
+
+Vérifie la conversion sans perte, l'équivalence des prédicats vectorisés
+avec les méthodes de HeadacheCase et la persistance .npz / mémoire mappée.
+"""
+
+import random
+
+import numpy as np
+import pytest
+
+from headache_assistants.case_batch import CRITICAL_FIELDS, SCHEMA, CaseBatch
+from headache_assistants.models import HeadacheCase
+from headache_assistants.synthetic_corpus import generate_notes
+
+
+def _random_cases(count: int, seed: int = 0):
+    """Cas aléatoires couvrant toutes les valeurs possibles de chaque champ."""
+    rng = random.Random(seed)
+    cases = []
+    for _ in range(count):
+        values = {}
+        for spec in SCHEMA:
+            if spec.kind == "tribool":
+                values[spec.name] = rng.choice([None, True, False])
+            elif spec.kind == "category":
+                values[spec.name] = rng.choice(spec.choices + ((None,) if spec.optional else ()))
+            elif spec.name == "pregnancy_trimester":
+                values[spec.name] = rng.choice([None, 1, 2, 3])
+            elif spec.kind == "int":
+                values[spec.name] = rng.choice([None, 0, rng.randint(1, 10)])
+            elif spec.kind == "float":
+                values[spec.name] = rng.choice([None, 0.0, rng.uniform(0, 5000)])
+            elif spec.kind == "string":
+                values[spec.name] = rng.choice([None, "frontale", "occipitale", "en casque"])
+            else:
+                values[spec.name] = rng.sample(["grossesse", "trauma", "cancer", "VIH"], rng.randint(0, 3))
+        values["age"] = rng.choice([None, 18, 45, 51, 80])
+        cases.append(HeadacheCase(**values))
+    return cases
+
+
+class TestCaseBatch:
+    """Conversion et prédicats vectorisés."""
+
+    def test_lossless_round_trip(self):
+        """to_cases(from_cases(cases)) redonne exactement les cas d'origine."""
+        cases = _random_cases(300) + [note.case for note in generate_notes(50, seed=3)]
+        batch = CaseBatch.from_cases(cases)
+        assert len(batch) == len(cases)
+        assert [case.model_dump() for case in batch.to_cases()] == [case.model_dump() for case in cases]
+        assert batch.case(17).model_dump() == cases[17].model_dump()
+        assert batch.case(-1).model_dump() == cases[-1].model_dump()
+        for index in (len(cases), -len(cases) - 1):
+            with pytest.raises(IndexError):
+                batch.case(index)
+
+    def test_compact_dtypes(self):
+        """Tri-états et catégories sur un octet."""
+        batch = CaseBatch.from_cases(_random_cases(10))
+        assert batch.columns["fever"].dtype == np.int8
+        assert batch.columns["onset"].dtype == np.int8
+        assert batch.columns["duration_current_episode_hours"].dtype == np.float64
+
+    def test_vectorized_predicates_match_model(self):
+        """has_red_flags, is_emergency et champs critiques identiques aux méthodes du modèle."""
+        cases = _random_cases(500, seed=1) + [HeadacheCase()]
+        batch = CaseBatch.from_cases(cases)
+        assert batch.has_red_flags().tolist() == [case.has_red_flags() for case in cases]
+        assert batch.is_emergency().tolist() == [case.is_emergency() for case in cases]
+        assert batch.get_missing_critical_fields() == [case.get_missing_critical_fields() for case in cases]
+        assert batch.missing_critical_mask().shape == (len(cases), len(CRITICAL_FIELDS))
+
+    def test_selection_and_counts(self):
+        """Sous-lots par masque et effectifs par valeur."""
+        cases = _random_cases(200, seed=2)
+        batch = CaseBatch.from_cases(cases)
+        urgent = batch[batch.is_emergency()]
+        assert [case.model_dump() for case in urgent.to_cases()] == [
+            case.model_dump() for case in cases if case.is_emergency()
+        ]
+        counts = batch.value_counts("fever")
+        assert counts == {value: sum(case.fever is value for case in cases) for value in counts}
+        assert sum(counts.values()) == len(cases)
+
+
+class TestCaseBatchStorage:
+    """Sauvegarde et rechargement."""
+
+    def test_npz_round_trip(self, tmp_path):
+        """Archive .npz compressée rechargée à l'identique."""
+        cases = _random_cases(100)
+        path = CaseBatch.from_cases(cases).save(tmp_path / "lot.npz", compressed=True)
+        loaded = CaseBatch.load(path)
+        assert [case.model_dump() for case in loaded.to_cases()] == [case.model_dump() for case in cases]
+
+    def test_memory_mapped_directory(self, tmp_path):
+        """Répertoire de colonnes chargé en mémoire mappée."""
+        cases = _random_cases(100)
+        batch = CaseBatch.from_cases(cases)
+        batch.save(tmp_path / "lot")
+        loaded = CaseBatch.load(tmp_path / "lot", mmap=True)
+        assert isinstance(loaded.columns["fever"], np.memmap)
+        assert loaded.is_emergency().tolist() == batch.is_emergency().tolist()
+        assert loaded[10:20].to_cases()[0].model_dump() == cases[10].model_dump()
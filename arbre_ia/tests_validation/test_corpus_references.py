@@ -0,0 +1,105 @@
+"""Tests des références aux exemples du corpus dans les métadonnées.
+
+Vérifie que l'enrichissement embedding ne copie plus le texte des exemples,
+que les patterns spéciaux sont dédupliqués par session et que les
+résolveurs restituent texte et annotations pour l'affichage.
+"""
+
+from headache_assistants.dialogue import _accumulate_special_patterns, _build_final_response_message
+from headache_assistants.medical_examples_corpus import (
+    EXAMPLES_BY_ID,
+    MEDICAL_EXAMPLES,
+    example_id,
+    get_example,
+)
+from headache_assistants.models import HeadacheCase
+from headache_assistants.nlu_hybrid import (
+    HybridNLU,
+    resolve_enhancement_details,
+    resolve_special_pattern,
+)
+from headache_assistants.rules_engine import decide_imaging
+
+
+def _example(source_fragment):
+    return next(ex for ex in MEDICAL_EXAMPLES if source_fragment in ex.get("annotations", {}).get("source", ""))
+
+
+class TestExampleIds:
+    """Identifiants stables des exemples."""
+
+    def test_unique_and_resolvable(self):
+        """Un identifiant par exemple, résolu vers l'exemple."""
+        assert len(EXAMPLES_BY_ID) == len(MEDICAL_EXAMPLES)
+        example = MEDICAL_EXAMPLES[0]
+        assert get_example(example_id(example)) is example
+        assert get_example("ex-inconnu") is None
+
+    def test_independent_of_position(self):
+        """L'identifiant dépend du texte, pas de l'ordre du corpus."""
+        example = MEDICAL_EXAMPLES[5]
+        assert example_id(dict(example)) == example_id(example)
+        assert example_id({"text": example["text"]}) == example_id(example)
+
+
+class TestEnhancementReferences:
+    """Métadonnées d'enrichissement embedding."""
+
+    def test_details_reference_examples(self):
+        """Top matches et patterns spéciaux ne gardent qu'identifiant et similarité."""
+        nlu = HybridNLU(use_embedding=False)
+        neuralgia = _example("Névralgie du trijumeau")
+        nlu.find_similar_examples = lambda texts, top_k=5: [[(neuralgia, 0.9), (MEDICAL_EXAMPLES[0], 0.5)]]
+        _, details = nlu._enhance_with_embedding("décharge électrique joue", HeadacheCase(), {})
+
+        assert details["top_matches"][0] == {"example_id": example_id(neuralgia), "similarity": 0.9}
+        assert details["special_patterns_detected"] == [
+            {"type": "neuralgia", "example_id": example_id(neuralgia), "similarity": 0.9}
+        ]
+        assert neuralgia["text"] not in repr(details)
+
+        resolved = resolve_enhancement_details(details)
+        assert resolved["top_matches"][1]["text"] == MEDICAL_EXAMPLES[0]["text"]
+        assert resolved["special_patterns_detected"][0]["matched_text"] == neuralgia["text"]
+        assert "text" not in details["top_matches"][0]
+
+    def test_resolve_special_pattern(self):
+        """Description, imagerie et note restituées depuis les annotations."""
+        ccq = _example("CCQ")
+        resolved = resolve_special_pattern(
+            {"type": "chronic_daily_headache", "example_id": example_id(ccq), "similarity": 0.7}
+        )
+        assert resolved["description"] == ccq["annotations"]["source"]
+        assert resolved["imaging_recommendation"] == "irm_cerebrale"
+        assert resolved["note"] == ccq["annotations"].get("note", "")
+        assert resolve_special_pattern({"type": "neuralgia", "example_id": "ex-inconnu"}) == {
+            "type": "neuralgia", "example_id": "ex-inconnu"
+        }
+
+
+class TestSessionPatterns:
+    """Patterns spéciaux accumulés par la session."""
+
+    def test_deduplicated_across_turns(self):
+        """Un pattern redétecté à chaque tour n'est gardé qu'une fois (meilleure similarité)."""
+        neuralgia = example_id(_example("Névralgie du trijumeau"))
+        session = {"accumulated_special_patterns": []}
+        for similarity in (0.7, 0.9, 0.8) * 10:
+            metadata = {"enhancement_details": {"special_patterns_detected": [
+                {"type": "neuralgia", "example_id": neuralgia, "similarity": similarity}
+            ]}}
+            _accumulate_special_patterns(session, metadata)
+        _accumulate_special_patterns(session, {"enhancement_details": None})
+        assert session["accumulated_special_patterns"] == [
+            {"type": "neuralgia", "example_id": neuralgia, "similarity": 0.9}
+        ]
+
+    def test_final_message_resolves_description(self):
+        """Le message final affiche la description de l'exemple référencé."""
+        example = _example("Névralgie du trijumeau")
+        case = HeadacheCase(age=50)
+        message = _build_final_response_message(
+            case, decide_imaging(case), "complete",
+            [{"type": "neuralgia", "example_id": example_id(example), "similarity": 0.8}]
+        )
+        assert example["annotations"]["source"] in message
@@ -0,0 +1,106 @@
+"""Tests de l'oracle d'invariance de la décision.
+
+Compare l'oracle à l'énumération exhaustive des complétions d'un cas
+partiel (decide_imaging sur chaque complétion) : règles atteignables,
+invariance de l'ImagingRecommendation et champs décisifs.
+"""
+
+from itertools import product
+
+import pytest
+
+from headache_assistants.decision_oracle import get_decision_oracle, open_fields
+from headache_assistants.dialogue import get_or_create_session, handle_user_message, reset_session
+from headache_assistants.models import ChatMessage, HeadacheCase
+from headache_assistants.rules_engine import decide_imaging
+
+
+# Valeurs possibles d'une réponse, par champ
+ANSWERS = {
+    "onset": ["thunderclap", "progressive", "chronic", "unknown"],
+    "intensity": [None, 3, 7, 9],
+    "profile": ["acute", "subacute", "chronic", "unknown"],
+}
+
+BASES = [
+    HeadacheCase(age=30, profile="chronic", onset="chronic"),
+    HeadacheCase(age=60, trauma=True),
+    HeadacheCase(fever=True, profile="acute", onset="progressive"),
+    HeadacheCase(age=28, sex="F", pregnancy_postpartum=True, profile="acute"),
+    HeadacheCase(),
+]
+
+FIELD_SETS = [
+    ["fever", "meningeal_signs"],
+    ["htic_pattern", "neuro_deficit", "seizure"],
+    ["onset", "intensity"],
+]
+
+
+def _completions(case, fields):
+    """(valeurs des champs inconnus, recommandation) pour chaque complétion du cas."""
+    fields = sorted(fields)
+    for combination in product(*(ANSWERS.get(field, [True, False, None]) for field in fields)):
+        completed = case.model_copy(update=dict(zip(fields, combination)))
+        yield dict(zip(fields, combination)), decide_imaging(completed).model_dump()
+
+
+class TestOracleAgainstEnumeration:
+    """Oracle comparé à l'énumération exhaustive."""
+
+    @pytest.mark.parametrize("base", BASES)
+    @pytest.mark.parametrize("fields", FIELD_SETS)
+    def test_matches_enumeration(self, base, fields):
+        """Règles atteignables exactes, invariance correcte, champs non décisifs sans effet."""
+        report = get_decision_oracle().check(base, fields)
+        unknown = open_fields(base, fields)
+        completions = list(_completions(base, unknown))
+
+        reached = {
+            "FALLBACK" if recommendation["applied_rule_id"].startswith("FALLBACK") else recommendation["applied_rule_id"]
+            for _, recommendation in completions
+        }
+        assert reached == set(report.reachable_rules)
+
+        distinct = {repr(recommendation) for _, recommendation in completions}
+        if report.invariant:
+            assert len(distinct) == 1
+
+        for field in unknown - set(report.relevant_fields):
+            groups = {}
+            for values, recommendation in completions:
+                others = tuple(value for name, value in values.items() if name != field)
+                groups.setdefault(others, set()).add(repr(recommendation))
+            assert all(len(group) == 1 for group in groups.values()), field
+
+
+class TestOracleReport:
+    """Contenu du rapport."""
+
+    def test_thunderclap(self):
+        """Coup de tonnerre aigu : HSA acquise, aucun champ décisif."""
+        report = get_decision_oracle().check(HeadacheCase(onset="thunderclap", profile="acute"), ["fever", "seizure"])
+        assert report.invariant
+        assert report.reachable_rules == ("HSA_001",)
+        assert report.relevant_fields == ()
+
+    def test_adaptation_field_unknown(self):
+        """Grossesse inconnue : l'adaptation contextuelle peut changer la recommandation."""
+        report = get_decision_oracle().check(HeadacheCase(onset="thunderclap", profile="acute"), ["pregnancy_postpartum"])
+        assert not report.invariant
+        assert report.relevant_fields == ("pregnancy_postpartum",)
+
+    def test_profile_follows_onset(self):
+        """Profil inconnu : ouvert tant que le début est inconnu."""
+        report = get_decision_oracle().check(HeadacheCase(), ["onset"])
+        assert "profile" in report.relevant_fields
+
+    def test_dialogue_records_relevant_fields(self):
+        """Le dialogue conserve les champs encore décisifs dans la session."""
+        session_id = "test-decision-oracle"
+        try:
+            handle_user_message([], ChatMessage(role="user", content="Homme 40 ans, mal de tête"), session_id)
+            _, session = get_or_create_session(session_id)
+            assert session["last_asked_field"] in session["decision_relevant_fields"]
+        finally:
+            reset_session(session_id)
@@ -0,0 +1,108 @@
+"""Tests du dialogue en flux (stream_user_message, endpoints SSE / WebSocket).
+
+Vérifie l'ordre des événements, l'envoi des urgences et de la question
+avant le pipeline complet, l'absence d'entrée d'audit pour la décision
+provisoire et l'absence d'effet de la lecture provisoire sur la session.
+"""
+
+from headache_assistants import rules_engine
+from headache_assistants.dialogue import (
+    get_or_create_session,
+    handle_user_message,
+    reset_session,
+    set_emergency_screen,
+    stream_user_message,
+)
+from headache_assistants.models import ChatMessage
+
+
+def _events(text, session_id):
+    return list(stream_user_message([], ChatMessage(role="user", content=text), session_id))
+
+
+class TestStreamEvents:
+    """Événements produits pour un tour de dialogue."""
+
+    def test_emergency_before_result(self):
+        """Coup de tonnerre : lecture provisoire puis urgence, avant le résultat."""
+        session_id = "test-stream-thunderclap"
+        try:
+            events = _events("Femme 35 ans, céphalée brutale en coup de tonnerre", session_id)
+        finally:
+            reset_session(session_id)
+        names = [name for name, _ in events]
+        assert names == ["provisional", "emergency", "result"]
+        emergency = events[1][1]
+        assert emergency["reason"] == "emergency_thunderclap"
+        assert emergency["imaging_recommendation"]["urgency"] == "immediate"
+        assert events[-1][1]["dialogue_complete"] is True
+
+    def test_question_then_result(self):
+        """Cas incomplet : la question précède le résultat et lui est identique."""
+        session_id = "test-stream-question"
+        try:
+            events = _events("Homme 40 ans, mal de tête depuis 2 jours", session_id)
+        finally:
+            reset_session(session_id)
+        names = [name for name, _ in events]
+        assert names == ["provisional", "question", "result"]
+        assert events[1][1]["question"] == events[2][1]["next_question"]
+        assert all(data.get("session_id") == session_id for _, data in events)
+
+    def test_question_before_pipeline(self):
+        """La question part avant le tour complet : la session n'est pas encore mise à jour."""
+        session_id = "test-stream-early-question"
+        try:
+            events = stream_user_message([], ChatMessage(role="user", content="Homme 40 ans, mal de tête depuis 2 jours"), session_id)
+            assert next(events)[0] == "provisional"
+            name, data = next(events)
+            assert name == "question" and data["provisional"] is True
+            assert get_or_create_session(session_id)[1]["message_count"] == 0
+            assert [name for name, _ in events] == ["result"]
+        finally:
+            reset_session(session_id)
+
+    def test_provisional_emergency_not_audited(self, monkeypatch):
+        """La recommandation provisoire n'écrit pas dans le log d'audit; le tour complet, une fois."""
+        decisions = []
+        monkeypatch.setattr(rules_engine, "log_medical_decision", lambda **kwargs: decisions.append(kwargs))
+        previous = set_emergency_screen(False)
+        session_id = "test-stream-audit"
+        try:
+            events = _events("Femme 35 ans, céphalée brutale en coup de tonnerre", session_id)
+        finally:
+            set_emergency_screen(previous)
+            reset_session(session_id)
+        assert [name for name, _ in events] == ["provisional", "emergency", "result"]
+        assert len(decisions) == 1
+
+    def test_followup_answer_emergency(self):
+        """Réponse courte à une question : l'urgence est repérée dès la lecture provisoire."""
+        session_id = "test-stream-followup"
+        try:
+            handle_user_message([], ChatMessage(role="user", content="Homme 40 ans, mal de tête"), session_id)
+            _, session = get_or_create_session(session_id)
+            session["current_case"] = session["current_case"].model_copy(update={"meningeal_signs": True})
+            session["last_asked_field"] = "fever"
+            events = _events("oui", session_id)
+        finally:
+            reset_session(session_id)
+        provisional = events[0][1]
+        assert provisional["detected_fields"] == ["fever"]
+        assert events[1][0] == "emergency"
+        assert events[1][1]["reason"] == "emergency_meningitis"
+
+    def test_provisional_leaves_session_unchanged(self):
+        """Le flux met la session à jour comme handle_user_message, une seule fois."""
+        text = "Femme 50 ans, céphalée progressive depuis 3 jours, fièvre"
+        try:
+            _events(text, "test-stream-session")
+            handle_user_message([], ChatMessage(role="user", content=text), "test-stream-reference")
+            _, streamed = get_or_create_session("test-stream-session")
+            _, reference = get_or_create_session("test-stream-reference")
+            assert streamed["message_count"] == 1
+            assert streamed["current_case"] == reference["current_case"]
+            assert streamed["asked_fields"] == reference["asked_fields"]
+        finally:
+            reset_session("test-stream-session")
+            reset_session("test-stream-reference")
@@ -0,0 +1,79 @@
+"""Tests des backends d'embedding interchangeables.
+
+Le backend statique (NumPy) est testé directement; les backends
+sentence-transformers et ONNX dépendent de paquets optionnels.
+"""
+
+import numpy as np
+import pytest
+
+from headache_assistants.embedders import (
+    BACKEND_ENV_VAR,
+    StaticEmbedder,
+    create_embedder,
+    embedder_available,
+    resolve_backend,
+)
+from headache_assistants.nlu_hybrid import HybridNLU
+from headache_assistants.vocabulary.semantic_vocabulary import SEMANTIC_VOCABULARY, SemanticVocabulary
+
+
+@pytest.fixture
+def static_table(tmp_path):
+    """Table statique aléatoire couvrant le vocabulaire sémantique."""
+    tokens = list(SEMANTIC_VOCABULARY)
+    vectors = np.random.default_rng(0).standard_normal((len(tokens), 32))
+    return StaticEmbedder(tokens, vectors).save(tmp_path / "static.npz")
+
+
+class TestStaticEmbedder:
+    """Backend NumPy."""
+
+    def test_lookup_and_word_average(self):
+        """Texte connu -> son vecteur; expression -> moyenne de ses mots; inconnu -> nul."""
+        embedder = StaticEmbedder(["fièvre", "nuque"], np.array([[1.0, 0.0], [0.0, 2.0]]))
+        vectors = embedder.encode(["Fièvre", "fièvre nuque", "inconnu"])
+        assert np.allclose(vectors[0], [1.0, 0.0])
+        assert np.allclose(vectors[1], [np.sqrt(0.5), np.sqrt(0.5)])
+        assert np.allclose(vectors[2], 0.0)
+        assert embedder.encode("nuque").shape == (2,)
+
+    def test_save_load(self, static_table):
+        """La table rechargée encode à l'identique."""
+        embedder = create_embedder("static", str(static_table))
+        assert embedder.backend == "static"
+        assert np.allclose(embedder.encode(["brutale"]), StaticEmbedder.load(static_table).encode(["brutale"]))
+
+
+class TestBackendSelection:
+    """Choix du backend par paramètre ou variable d'environnement."""
+
+    def test_env_var(self, monkeypatch):
+        """La variable d'environnement s'applique sans argument explicite."""
+        monkeypatch.setenv(BACKEND_ENV_VAR, "static")
+        assert resolve_backend() == "static"
+        assert resolve_backend("onnx") == "onnx"
+        assert embedder_available()
+
+    def test_unknown_backend(self):
+        """Backend inconnu -> ValueError."""
+        with pytest.raises(ValueError):
+            resolve_backend("gpu")
+
+
+class TestStaticBackendIntegration:
+    """SemanticVocabulary et HybridNLU sur le backend statique."""
+
+    def test_semantic_vocabulary(self, static_table):
+        """Un terme du vocabulaire correspond à lui-même."""
+        vocab = SemanticVocabulary(embedding_backend="static", embedding_model=str(static_table))
+        fields = {(match.field, match.value) for match in vocab.match_text("douleur brutale")}
+        assert ("onset", "thunderclap") in fields
+
+    def test_hybrid_nlu(self, static_table):
+        """HybridNLU active l'embedding et l'index d'exemples avec le backend choisi."""
+        nlu = HybridNLU(embedding_backend="static", embedding_model=str(static_table), verbose=False)
+        assert nlu.use_embedding and nlu.use_semantic
+        assert nlu.embedder is nlu.semantic_vocab.embedder
+        assert len(nlu.find_similar_examples(["céphalée brutale"], top_k=3)[0]) == 3
+        assert nlu.parse_hybrid("céphalée brutale").case.onset == "thunderclap"
@@ -0,0 +1,197 @@
+"""Tests du pré-tri des urgences (emergency_screen) et de son chemin dans le dialogue.
+
+Vérifie les négations et abstentions du pré-tri, l'accord de sa décision
+avec le pipeline complet sur les corpus, et l'analyse d'audit en
+arrière-plan.
+"""
+
+from benchmarks.corpus import load_example_texts, load_real_cases
+from headache_assistants import dialogue, rules_engine
+from headache_assistants.dialogue import (
+    _infer_profile_from_onset,
+    get_emergency_stats,
+    get_or_create_session,
+    handle_user_message,
+    reset_session,
+    set_emergency_screen,
+    wait_for_emergency_audit,
+)
+from headache_assistants.emergency_screen import emergency_reason, get_emergency_screener
+from headache_assistants.models import ChatMessage, HeadacheCase
+from headache_assistants.nlu_hybrid import HybridNLU
+from headache_assistants.rules_engine import decide_imaging
+from headache_assistants.synthetic_corpus import generate_notes
+
+
+class TestScreener:
+    """Termes retenus par le pré-tri."""
+
+    def test_thunderclap(self):
+        """Coup de tonnerre affirmé : onset thunderclap."""
+        result = get_emergency_screener().screen("Femme 35 ans, céphalée en coup de tonnerre")
+        assert result.fields == {"onset": "thunderclap"}
+        assert result.hits[0].term == "coup de tonnerre"
+
+    def test_negated_terms(self):
+        """Termes niés ou examen normal : aucun champ retenu."""
+        screener = get_emergency_screener()
+        assert screener.screen("Pas de coup de tonnerre, céphalée progressive") is None
+        assert screener.screen("Céphalée fébrile, nuque souple").fields == {"fever": True}
+        assert screener.screen("Raideur de nuque, apyrétique").fields == {"meningeal_signs": True}
+
+    def test_abstains(self):
+        """Antécédent, délai passé ou grossesse : le pipeline complet décide."""
+        screener = get_emergency_screener()
+        assert screener.screen("Antécédent de méningite, fièvre ce jour") is None
+        assert screener.screen("Patiente enceinte, céphalée en coup de tonnerre") is None
+        assert screener.screen("Céphalée brutale il y a 10 jours, depuis céphalées quotidiennes") is None
+        assert screener.screen("Céphalée en coup de tonnerre il y a 2 semaines") is None
+        assert screener.screen("Céphalée en coup de tonnerre il y a 1 heure").fields == {"onset": "thunderclap"}
+
+    def test_abstains_on_negation_cue(self):
+        """Négation par le verbe ou postposée : abstention, pas d'urgence immédiate."""
+        screener = get_emergency_screener()
+        for text in (
+            "Le patient nie toute fièvre et toute raideur de nuque",
+            "Fièvre absente, raideur de nuque absente",
+        ):
+            assert screener.screen(text) is None, text
+            session_id = "test-emergency-screen-negation"
+            try:
+                response = handle_user_message([], ChatMessage(role="user", content=text), session_id)
+                assert response.imaging_recommendation is None or response.imaging_recommendation.urgency != "immediate", text
+            finally:
+                reset_session(session_id)
+        # Négation dans une autre phrase : le coup de tonnerre reste pré-trié
+        assert screener.screen("Pas de fièvre. Céphalée en coup de tonnerre.").fields == {"onset": "thunderclap"}
+
+    def test_emergency_reason_matches_is_emergency(self):
+        """Un motif pour chaque critère de HeadacheCase.is_emergency, None sinon."""
+        cases = {
+            "emergency_thunderclap": HeadacheCase(onset="thunderclap"),
+            "emergency_meningitis": HeadacheCase(fever=True, meningeal_signs=True),
+            "emergency_htic": HeadacheCase(htic_pattern=True, seizure=True),
+            "emergency_neuro_deficit": HeadacheCase(neuro_deficit=True, profile="acute"),
+            "emergency_seizure": HeadacheCase(seizure=True, profile="acute"),
+            None: HeadacheCase(seizure=True, profile="chronic"),
+        }
+        for reason, case in cases.items():
+            assert emergency_reason(case) == reason
+            assert case.is_emergency() is (reason is not None)
+
+    def test_agrees_with_full_pipeline(self):
+        """Quand le pré-tri conclut à l'urgence, le pipeline complet aussi."""
+        nlu = HybridNLU(use_embedding=False)
+        texts = load_real_cases() + load_example_texts() + [note.text for note in generate_notes(300)]
+        fired = 0
+        for text in texts:
+            result = get_emergency_screener().screen(text)
+            if result is None:
+                continue
+            screened = result.apply(None)
+            if emergency_reason(screened) is None or not decide_imaging(screened).is_emergency():
+                continue
+            fired += 1
+            case, _ = nlu.parse_free_text_to_case(text)
+            if case.onset and case.profile == "unknown":
+                case = _infer_profile_from_onset(case)
+            assert emergency_reason(case) is not None, text
+            assert decide_imaging(case).is_emergency(), text
+        assert fired > 20
+
+
+class TestDialogueScreen:
+    """Chemin rapide du dialogue."""
+
+    def test_screened_emergency_and_audit(self):
+        """Réponse immédiate, puis cas complet et verdict d'audit dans la session."""
+        session_id = "test-emergency-screen"
+        before = get_emergency_stats()["screen"]["count"]
+        try:
+            response = handle_user_message(
+                [], ChatMessage(role="user", content="Homme 45 ans, fièvre et raideur de nuque"), session_id
+            )
+            assert response.dialogue_complete
+            assert response.imaging_recommendation.urgency == "immediate"
+            assert get_emergency_stats()["screen"]["count"] == before + 1
+
+            assert wait_for_emergency_audit(session_id, timeout=30)
+            _, session = get_or_create_session(session_id)
+            assert session["emergency_screen"]["reason"] == "emergency_meningitis"
+            assert session["emergency_screen"]["audit"]["confirmed"] is True
+            assert session["emergency_unconfirmed"] is False
+            assert session["current_case"].age == 45
+        finally:
+            reset_session(session_id)
+
+    def test_unconfirmed_audit_keeps_full_case(self, monkeypatch):
+        """Urgence non confirmée : cas de l'analyse complète conservé, session marquée."""
+        session_id = "test-emergency-unconfirmed"
+        full_case = HeadacheCase(age=45, fever=False, meningeal_signs=False)
+        monkeypatch.setattr(
+            dialogue._parse_cache, "parse_free_text_to_case",
+            lambda nlu, text, fields=None: (full_case, {"detected_fields": ["age"]})
+        )
+        try:
+            response = handle_user_message(
+                [], ChatMessage(role="user", content="Homme 45 ans, fièvre et raideur de nuque"), session_id
+            )
+            assert response.imaging_recommendation.urgency == "immediate"
+            assert wait_for_emergency_audit(session_id, timeout=30)
+            _, session = get_or_create_session(session_id)
+            assert session["emergency_screen"]["audit"]["confirmed"] is False
+            assert session["emergency_unconfirmed"] is True
+            assert session["current_case"].fever is False and session["current_case"].meningeal_signs is False
+        finally:
+            reset_session(session_id)
+
+    def test_audit_with_other_rule_is_unconfirmed(self, monkeypatch):
+        """Urgence retenue par une autre règle (autre imagerie) : non confirmée, signalée."""
+        session_id = "test-emergency-other-rule"
+        full_case = HeadacheCase(age=45, fever=True, meningeal_signs=True, htic_pattern=True, neuro_deficit=True)
+        monkeypatch.setattr(
+            dialogue._parse_cache, "parse_free_text_to_case",
+            lambda nlu, text, fields=None: (full_case, {"detected_fields": ["age", "htic_pattern"]})
+        )
+        try:
+            response = handle_user_message(
+                [], ChatMessage(role="user", content="Homme 45 ans, fièvre et raideur de nuque"), session_id
+            )
+            assert response.imaging_recommendation.applied_rule_id == "MENINGITE_001"
+            assert wait_for_emergency_audit(session_id, timeout=30)
+            _, session = get_or_create_session(session_id)
+            audit = session["emergency_screen"]["audit"]
+            assert audit["urgency"] == "immediate" and audit["applied_rule_id"] != "MENINGITE_001"
+            assert audit["confirmed"] is False
+            assert session["emergency_unconfirmed"] is True
+        finally:
+            reset_session(session_id)
+
+    def test_one_audit_entry_per_decision(self, monkeypatch):
+        """Décision pré-triée puis analyse d'audit : une seule entrée dans le log d'audit."""
+        decisions = []
+        monkeypatch.setattr(rules_engine, "log_medical_decision", lambda **kwargs: decisions.append(kwargs))
+        session_id = "test-emergency-audit-log"
+        try:
+            handle_user_message([], ChatMessage(role="user", content="Homme 45 ans, fièvre et raideur de nuque"), session_id)
+            assert wait_for_emergency_audit(session_id, timeout=30)
+        finally:
+            reset_session(session_id)
+        assert [decision["rule_matched"] for decision in decisions] == ["MENINGITE_001"]
+
+    def test_disabled_screen_uses_pipeline(self):
+        """Pré-tri désactivé : l'urgence est décidée (et mesurée) par le pipeline complet."""
+        session_id = "test-emergency-pipeline"
+        previous = set_emergency_screen(False)
+        before = get_emergency_stats()["pipeline"]["count"]
+        try:
+            response = handle_user_message(
+                [], ChatMessage(role="user", content="Céphalée brutale en coup de tonnerre"), session_id
+            )
+            assert response.imaging_recommendation.urgency == "immediate"
+            assert get_emergency_stats()["pipeline"]["count"] == before + 1
+            _, session = get_or_create_session(session_id)
+            assert "emergency_screen" not in session
+        finally:
+            set_emergency_screen(previous)
+            reset_session(session_id)
@@ -0,0 +1,86 @@
+"""Tests du lexique compilé des détecteurs hybrides.
+
+Vérifie la version de l'artefact, la compilation des tables sources,
+l'immuabilité et l'équivalence de la correction orthographique bornée.
+"""
+
+from dataclasses import FrozenInstanceError
+
+import pytest
+
+from headache_assistants.lexicon import LEXICON_FORMAT_VERSION, compile_lexicon, lexicon_summary
+from headache_assistants.nlu_hybrid import (
+    CRITICAL_MEDICAL_TERMS,
+    KEYWORD_INDEX,
+    LEXICON,
+    NGRAM_PATTERNS,
+    SYMPTOM_TO_FIELD,
+    HybridNLU,
+    _best_fuzzy_match,
+    similarity_ratio,
+)
+
+
+def _compile(symptom_to_field=None, critical_terms=None):
+    return compile_lexicon(
+        symptom_to_field or {"fièvre": "fever", "céphalée": None},
+        [(r"nuque\s+souple", "meningeal_signs")],
+        {"coup de tonnerre": {"fields": {"onset": "thunderclap"}, "confidence": 0.95}},
+        {"brutal": [{"field": "onset", "value": "thunderclap", "weight": 0.9}]},
+        critical_terms or ["brutale", "fièvre"],
+    )
+
+
+class TestCompiledLexicon:
+    """Compilation des tables."""
+
+    def test_version_tracks_tables(self):
+        """La version change avec le contenu des tables, pas d'une compilation à l'autre."""
+        assert LEXICON.version == f"{LEXICON_FORMAT_VERSION}+{LEXICON.sha256[:12]}"
+        assert _compile().version == _compile().version
+        assert _compile(critical_terms=["brutale"]).version != _compile().version
+
+    def test_tables_compiled(self):
+        """Termes sans champ écartés, valeurs par défaut des n-grams, mots connus."""
+        lexicon = _compile()
+        assert lexicon.negation_terms == ("fièvre",)
+        assert lexicon.negation_scanner.search("Nuque souple").group("exam0")
+        assert lexicon.ngrams[0].category == "unknown"
+        assert lexicon.keyword_patterns["brutal"].search("début brutal").start() == 6
+        assert lexicon.known_words == {"brutal", "brutale", "fièvre"}
+        assert lexicon_summary(lexicon)["keywords"] == 1
+
+    def test_immutable(self):
+        """L'artefact partagé ne peut pas être modifié."""
+        with pytest.raises(FrozenInstanceError):
+            LEXICON.version = "x"
+        with pytest.raises(TypeError):
+            LEXICON.keyword_index["brutal"] = ()
+
+    def test_module_lexicon_covers_sources(self):
+        """Le lexique du module reprend les tables de nlu_hybrid."""
+        assert len(LEXICON.ngrams) == len(NGRAM_PATTERNS)
+        assert set(LEXICON.keyword_index) == set(KEYWORD_INDEX)
+        assert set(LEXICON.symptom_to_field) <= set(SYMPTOM_TO_FIELD)
+
+
+class TestFuzzyCandidates:
+    """Correction orthographique sur le lexique compilé."""
+
+    @pytest.mark.parametrize("word", ["fievre", "cephalee", "brutall", "vomisements", "paralisie", "xyzw"])
+    @pytest.mark.parametrize("min_similarity", [0.6, 0.75, 0.9])
+    def test_matches_exhaustive_search(self, word, min_similarity):
+        """Même terme et même score que le parcours complet des termes de référence."""
+        best, best_similarity = None, 0.0
+        for term in CRITICAL_MEDICAL_TERMS:
+            if abs(len(word) - len(term)) > 3:
+                continue
+            sim = similarity_ratio(word, term)
+            if sim >= min_similarity and sim > best_similarity:
+                best, best_similarity = term, sim
+        assert _best_fuzzy_match(word, min_similarity) == (best, best_similarity)
+
+    def test_lexicon_version_in_metadata(self):
+        """La version du lexique est reportée dans les métadonnées d'analyse."""
+        result = HybridNLU(use_embedding=False, verbose=False).parse_hybrid("céphalée brutale avec fievre")
+        assert result.metadata["lexicon_version"] == LEXICON.version
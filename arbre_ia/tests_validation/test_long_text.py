@@ -0,0 +1,105 @@
+"""Tests du mode segmenté de NLUv2 pour les notes très longues.
+
+Vérifie le découpage (couverture, recouvrement), la règle de fusion
+temporelle et l'égalité des résultats avec le parse séquentiel.
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+
+from benchmarks.corpus import load_real_cases
+from headache_assistants.long_text import detect_long_text, split_chunks
+from headache_assistants.medical_vocabulary import MedicalVocabulary
+from headache_assistants.nlu_v2 import NLUv2
+
+
+FILLER = "Patient vu en consultation, examen clinique sans particularité. "
+
+
+class TestSplitChunks:
+    """Découpage aux frontières de phrases."""
+
+    def test_coverage_and_overlap(self):
+        """Les segments couvrent le texte, se chevauchent et commencent par une phrase."""
+        text = MedicalVocabulary().normalize_text(FILLER * 200)
+        chunks = split_chunks(text, max_chars=500)
+        assert len(chunks) > 1
+        assert all(len(chunk) <= 500 for _, chunk in chunks)
+        assert all(text[offset:offset + len(chunk)] == chunk for offset, chunk in chunks)
+        assert chunks[0][0] == 0 and chunks[-1][0] + len(chunks[-1][1]) == len(text)
+        for (offset, chunk), (next_offset, _) in zip(chunks, chunks[1:]):
+            assert next_offset < offset + len(chunk)
+            assert text[next_offset - 2:next_offset] == ". "
+
+    def test_sentence_without_punctuation(self):
+        """Une phrase plus longue qu'un segment est coupée aux espaces."""
+        chunks = split_chunks("mot " * 1000, max_chars=300)
+        assert all(len(chunk) <= 300 and not chunk.startswith(" ") for _, chunk in chunks)
+
+
+class TestMerge:
+    """Fusion des détections des segments."""
+
+    def test_most_recent_mention_wins(self):
+        """La mention la plus récente (marqueur temporel, puis position) l'emporte."""
+        vocab = MedicalVocabulary()
+        text = (
+            "Il y a 10 ans céphalée progressive. " + FILLER * 80
+            + "Actuellement céphalée brutale en coup de tonnerre. " + FILLER * 80
+        )
+        detections = detect_long_text(vocab, text, ["detect_onset", "detect_fever"], max_chars=1000)
+        assert detections.chunk_count > 2
+        assert detections.detect_onset(text).value == "thunderclap"
+        assert detections.detect_fever(text).detected is False
+
+
+class TestChunkedParse:
+    """Parse en mode segmenté."""
+
+    def test_below_threshold_unchanged(self):
+        """Sous le seuil, le mode segmenté n'intervient pas."""
+        nlu = NLUv2(long_text_pool="thread", long_text_threshold=10_000)
+        _, metadata = nlu.parse("Femme 35 ans, céphalée brutale avec fièvre")
+        assert "long_text_chunks" not in metadata
+        nlu.close()
+
+    def test_no_threshold_stays_sequential(self):
+        """Sans seuil calibré (défaut), un pool ne suffit pas à activer le mode segmenté."""
+        nlu = NLUv2(long_text_pool="thread")
+        _, metadata = nlu.parse("Femme 35 ans, céphalée brutale avec fièvre. " + FILLER * 400)
+        assert "long_text_chunks" not in metadata
+        assert nlu._long_text_executor is None
+
+    def test_matches_sequential_parse(self):
+        """Sur les cas réels, le mode segmenté donne les mêmes cas que le parse séquentiel."""
+        sequential = NLUv2()
+        with ThreadPoolExecutor(max_workers=2) as pool:
+            chunked = NLUv2(long_text_pool=pool, long_text_threshold=0)
+            for text in load_real_cases()[:30]:
+                case, metadata = chunked.parse(text)
+                assert metadata["long_text_chunks"] >= 1
+                assert case == sequential.parse(text)[0], text
+
+    def test_multi_chunk_matches_sequential_parse(self):
+        """Note de plusieurs segments, une mention par champ : même cas que le parse séquentiel."""
+        text = (
+            "Femme 42 ans. Il y a 10 ans céphalée progressive. " + FILLER * 150
+            + "Actuellement céphalée brutale en coup de tonnerre. " + FILLER * 150
+            + "Fièvre à 39°C. " + FILLER * 150 + "Raideur de nuque franche."
+        )
+        with ThreadPoolExecutor(max_workers=2) as pool:
+            chunked = NLUv2(long_text_pool=pool, long_text_threshold=0, long_text_workers=2)
+            case, metadata = chunked.parse(text)
+        assert metadata["long_text_chunks"] > 2
+        assert case == NLUv2().parse(text)[0]
+        assert case.onset == "thunderclap" and case.fever is True and case.meningeal_signs is True
+
+    def test_long_note_process_pool(self):
+        """Note longue analysée par un pool de processus : signes repérés dans tous les segments."""
+        text = "Femme 42 ans. " + FILLER * 400 + "Fièvre à 39°C. " + FILLER * 400 + "Raideur de nuque franche."
+        nlu = NLUv2(long_text_pool="process", long_text_threshold=20_000, long_text_workers=2)
+        try:
+            case, metadata = nlu.parse(text)
+        finally:
+            nlu.close()
+        assert metadata["long_text_chunks"] > 1
+        assert case.age == 42 and case.fever is True and case.meningeal_signs is True
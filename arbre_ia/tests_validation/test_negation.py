@@ -0,0 +1,104 @@
+"""Tests de l'annotateur de portées de négation partagé.
+
+Vérifie les portées (indices, fenêtre, terminaisons), les requêtes par
+position et la cohérence des trois couches qui l'utilisent.
+"""
+
+from headache_assistants.medical_vocabulary import MedicalVocabulary
+from headache_assistants.negation import MAX_SCOPE_TOKENS, annotate_negations
+from headache_assistants.nlu_base import FEVER_PATTERNS, detect_pattern
+from headache_assistants.nlu_hybrid import HybridNLU, detect_negations
+
+
+def negated_words(text):
+    scopes = annotate_negations(text)
+    words = []
+    position = 0
+    for word in text.split():
+        position = text.index(word, position)
+        if scopes.is_negated(position):
+            words.append(word.strip(",."))
+        position += len(word)
+    return words
+
+
+class TestNegationScopes:
+    """Portées de négation."""
+
+    def test_cues_and_terminators(self):
+        """Virgule, conjonction et marqueur d'exception ferment la portée."""
+        assert negated_words("pas de fièvre, raideur de nuque") == ["fièvre"]
+        assert negated_words("sans fièvre ni déficit et vomissements") == ["fièvre", "ni", "déficit"]
+        assert negated_words("sans déficit mais hémiparésie") == ["déficit"]
+        text = "pas d'épilepsie"
+        assert annotate_negations(text).is_negated(text.index("épilepsie"))
+
+    def test_window_and_word_boundaries(self):
+        """La portée est bornée en mots; les indices sont des mots entiers."""
+        text = "pas de notion de " + " ".join(f"m{i}" for i in range(10))
+        assert len(negated_words(text)) == MAX_SCOPE_TOKENS
+        assert negated_words("uniquement fièvre, sansonnet") == []
+
+    def test_scope_ends_at_next_concept(self):
+        """Sans ponctuation, la portée s'arrête au second concept ou au verbe."""
+        assert negated_words("sans antécédent fièvre 39°C raideur nuque") == ["antécédent"]
+        assert negated_words("sans traitement habituel présente un déficit moteur") == ["traitement", "habituel"]
+        assert negated_words("aucune raideur de la nuque") == ["raideur", "de", "la", "nuque"]
+        assert negated_words("sans syndrome méningé") == ["syndrome", "méningé"]
+
+    def test_non_negates_next_word_only(self):
+        """'non' ne nie que le mot suivant, et rien devant une habitude de vie."""
+        assert negated_words("patiente non fébrile raideur de nuque") == ["fébrile"]
+        assert negated_words("patient non fumeur présente une raideur de nuque") == []
+        assert negated_words("non il n'a rien") == []
+
+    def test_accent_free_text(self):
+        """Le texte normalisé sans accents est annoté de la même façon."""
+        assert negated_words("absence de deficit, excepte une paresie") == ["deficit"]
+
+    def test_queries(self):
+        """scope_at, first_affirmed et exception_follows."""
+        text = "sans fièvre hier, fièvre ce matin"
+        scopes = annotate_negations(text)
+        assert scopes.scope_at(5).cue == "sans"
+        assert scopes.scope_at(18) is None
+        assert scopes.first_affirmed("fièvre") == 18
+        assert not scopes.has_exception_marker
+        assert annotate_negations("sans déficit, mais parésie").exception_follows(12)
+
+    def test_cached_per_text(self):
+        """Une seule annotation par texte."""
+        assert annotate_negations("sans fièvre") is annotate_negations("sans fièvre")
+
+
+class TestSharedNegationLayer:
+    """Les trois couches de détection s'accordent sur la même portée."""
+
+    def test_negated_beyond_adjacency(self):
+        """'aucune notion de X' nie X dans les trois couches."""
+        text = "céphalée, aucune notion de fièvre"
+        assert MedicalVocabulary().detect_fever(text).value is not True
+        assert detect_pattern(text, FEVER_PATTERNS) is not True
+        negations, cleaned = detect_negations(text)
+        assert [n.field for n in negations] == ["fever"]
+        assert cleaned == "céphalée,"
+
+    def test_exception_marker(self):
+        """'sans déficit, mais hémiparésie' : la négation est levée."""
+        vocab = MedicalVocabulary()
+        assert vocab.has_exception_marker("Sans déficit neurologique, mais hémiparésie", "sans déficit")
+        assert not vocab.has_exception_marker("Sans déficit neurologique", "sans déficit")
+
+
+class TestUnpunctuatedRedFlags:
+    """Notes sans ponctuation : un red flag présent n'est pas nié."""
+
+    def test_red_flags_kept(self):
+        """Fièvre, signes méningés et déficit détectés malgré une négation voisine."""
+        nlu = HybridNLU(use_embedding=False)
+        case, _ = nlu.parse_free_text_to_case("sans antécédent fièvre 39°C raideur nuque")
+        assert case.fever is True and case.meningeal_signs is True
+        case, _ = nlu.parse_free_text_to_case("Patient non fumeur présente une raideur de nuque et fièvre à 39")
+        assert case.meningeal_signs is True and case.fever is True
+        case, _ = nlu.parse_free_text_to_case("sans traitement habituel présente un déficit moteur brutal")
+        assert case.neuro_deficit is True
@@ -5,7 +5,7 @@ tout en conservant les performances des règles.
 """
 
 import pytest
-from headache_assistants.nlu_hybrid import HybridNLU, parse_free_text_to_case_hybrid
+from headache_assistants.nlu_hybrid import HybridNLU, detect_negations, parse_free_text_to_case_hybrid
 from headache_assistants.nlu_v2 import NLUv2
 
 
@@ -203,5 +203,39 @@ class TestDisableEmbedding:
         assert metadata["embedding_used"] is False
 
 
+class TestDetectNegations:
+    """Tests de l'automate de négation."""
+
+    def test_fields_in_priority_order(self):
+        """Les champs niés sont rapportés dans l'ordre de SYMPTOM_TO_FIELD."""
+        negations, cleaned = detect_negations("Céphalée sans déficit ni fièvre")
+        assert [n.field for n in negations] == ["fever", "neuro_deficit"]
+        assert cleaned == "Céphalée"
+
+    def test_longest_scope_removed(self):
+        """La portée la plus longue est retirée du texte nettoyé."""
+        negations, cleaned = detect_negations("Pas de déficit moteur, céphalée pulsatile")
+        assert [n.field for n in negations] == ["neuro_deficit"]
+        assert negations[0].matched_text == "pas de déficit"
+        assert cleaned == ", céphalée pulsatile"
+
+    def test_cue_and_quantifier_removed(self):
+        """"sans aucun" : l'indice et le quantificateur sont retirés ensemble."""
+        negations, cleaned = detect_negations("Céphalée sans aucun déficit, fièvre")
+        assert [n.field for n in negations] == ["neuro_deficit"]
+        assert negations[0].matched_text == "sans aucun déficit"
+        assert cleaned == "Céphalée , fièvre"
+
+    def test_case_insensitive_and_exam(self):
+        """Majuscules et formulations d'examen normal sont reconnues."""
+        negations, _ = detect_negations("PAS DE FIÈVRE, nuque souple, examen neurologique normal")
+        fields = {n.field: n.confidence for n in negations}
+        assert fields == {"fever": 0.9, "meningeal_signs": 0.95, "neuro_deficit": 0.95}
+
+    def test_no_negation(self):
+        """Sans indice de négation, rien n'est retiré."""
+        assert detect_negations("Céphalée avec fièvre") == ([], "Céphalée avec fièvre")
+
+
 if __name__ == "__main__":
     pytest.main([__file__, "-v"])
@@ -0,0 +1,126 @@
+"""Tests du registre des NLU par site (nlu_registry) et de son usage dans le dialogue.
+
+Vérifie que les vues de site partagent les ressources de l'instance de
+base, que leurs seuils s'appliquent sans modifier la base, la lecture du
+fichier des sites et le choix des règles du site par le dialogue.
+"""
+
+import json
+
+import numpy as np
+import pytest
+
+from headache_assistants.core.exceptions import ValidationError
+from headache_assistants.dialogue import (
+    get_nlu_registry,
+    get_or_create_session,
+    handle_user_message,
+    reset_session,
+)
+from headache_assistants.embedders import StaticEmbedder
+from headache_assistants.models import ChatMessage
+from headache_assistants.nlu_hybrid import HybridNLU
+from headache_assistants.nlu_registry import DEFAULT_SITE, NLURegistry, SiteConfig, load_site_configs
+from headache_assistants.parse_cache import nlu_config_version
+from headache_assistants.rules_registry import DEFAULT_RULES_PATH, get_rules_registry
+from headache_assistants.vocabulary.semantic_vocabulary import SEMANTIC_VOCABULARY
+
+
+@pytest.fixture(scope="module")
+def static_nlu(tmp_path_factory):
+    """HybridNLU avec embeddings (backend statique sur une table aléatoire)."""
+    tokens = list(SEMANTIC_VOCABULARY)
+    vectors = np.random.default_rng(0).standard_normal((len(tokens), 32))
+    table = StaticEmbedder(tokens, vectors).save(tmp_path_factory.mktemp("static") / "static.npz")
+    return HybridNLU(embedding_backend="static", embedding_model=str(table), verbose=False)
+
+
+class TestSiteViews:
+    """Vues par configuration sur l'instance de base."""
+
+    def test_views_share_resources(self, static_nlu):
+        """Une seule instance de base; moteur, embedder, embeddings et vocabulaire partagés."""
+        created = []
+        registry = NLURegistry(lambda: created.append(1) or static_nlu, [
+            SiteConfig("chu-nord", confidence_threshold=0.6, similarity_threshold=0.9),
+            SiteConfig("ch-sud", confidence_threshold=0.6, similarity_threshold=0.9),
+            SiteConfig("ch-est", confidence_threshold=0.5),
+        ])
+        view = registry.nlu("chu-nord")
+        for name in ("rule_nlu", "embedder", "semantic_vocab", "example_embeddings", "example_index"):
+            assert getattr(view, name) is getattr(static_nlu, name), name
+        assert registry.nlu("ch-sud") is view
+        assert registry.nlu("ch-est") is not view
+        assert registry.nlu() is static_nlu and registry.nlu(DEFAULT_SITE) is static_nlu
+        assert len(created) == 1
+        assert registry.stats() == {"sites": ["ch-est", "ch-sud", "chu-nord", "default"], "views": 2, "base_loaded": True}
+
+    def test_view_thresholds(self, static_nlu):
+        """Seuils propres à la vue; la base et son vocabulaire sont inchangés."""
+        strict = static_nlu.with_settings(confidence_threshold=0.4, similarity_threshold=1.01)
+        assert static_nlu.confidence_threshold == 0.7 and static_nlu.similarity_threshold is None
+        assert static_nlu.semantic_vocab.match_text("douleur brutale")
+        assert strict.semantic_vocab.match_text("douleur brutale", strict.similarity_threshold) == []
+        assert nlu_config_version(strict) != nlu_config_version(static_nlu)
+
+    def test_unknown_site(self):
+        """Site inconnu : ValidationError."""
+        with pytest.raises(ValidationError):
+            NLURegistry().nlu("inconnu")
+
+
+class TestSiteConfigs:
+    """Fichier des sites."""
+
+    def test_load(self, tmp_path):
+        """Réglages lus, chemin de règles relatif au fichier."""
+        (tmp_path / "rules.json").write_text(DEFAULT_RULES_PATH.read_text(encoding="utf-8"), encoding="utf-8")
+        sites_file = tmp_path / "sites.json"
+        sites_file.write_text(json.dumps({"sites": {
+            "chu-nord": {"confidence_threshold": 0.6},
+            "ch-sud": {"rules_path": "rules.json"},
+        }}), encoding="utf-8")
+        configs = {config.name: config for config in load_site_configs(sites_file)}
+        assert configs["chu-nord"] == SiteConfig("chu-nord", confidence_threshold=0.6)
+        assert configs["ch-sud"].rules_path == (tmp_path / "rules.json").resolve()
+
+    def test_invalid(self, tmp_path):
+        """Réglage inconnu, seuil hors bornes ou fichier de règles absent : ValidationError."""
+        sites_file = tmp_path / "sites.json"
+        sites_file.write_text(json.dumps({"sites": {"chu-nord": {"threshold": 0.6}}}), encoding="utf-8")
+        with pytest.raises(ValidationError):
+            load_site_configs(sites_file)
+        registry = NLURegistry()
+        with pytest.raises(ValidationError):
+            registry.register_site(SiteConfig("chu-nord", confidence_threshold=1.5))
+        with pytest.raises(ValidationError):
+            registry.register_site(SiteConfig("chu-nord", rules_path=tmp_path / "absent.json"))
+
+
+class TestDialogueSites:
+    """Site d'une session de dialogue."""
+
+    def test_session_uses_site_rules(self, tmp_path):
+        """La session garde son site; la recommandation vient du fichier de règles du site."""
+        rules = json.loads(DEFAULT_RULES_PATH.read_text(encoding="utf-8"))
+        rules.setdefault("metadata", {})["version"] = "site-test"
+        rules_path = tmp_path / "site_rules.json"
+        rules_path.write_text(json.dumps(rules, ensure_ascii=False), encoding="utf-8")
+        get_nlu_registry().register_site(SiteConfig("test-site", rules_path=rules_path))
+
+        session_id = "test-nlu-registry-site"
+        try:
+            response = handle_user_message(
+                [], ChatMessage(role="user", content="Femme 35 ans, céphalée en coup de tonnerre"),
+                session_id, site="test-site"
+            )
+            assert get_or_create_session(session_id)[1]["site"] == "test-site"
+            assert response.imaging_recommendation.rules_version == get_rules_registry(rules_path, watch=False).version
+        finally:
+            reset_session(session_id)
+
+    def test_unknown_site_rejected(self):
+        """Site inconnu : ValidationError, aucune session créée."""
+        with pytest.raises(ValidationError):
+            handle_user_message([], ChatMessage(role="user", content="Homme 40 ans"), "test-nlu-registry-unknown", site="inconnu")
+        assert reset_session("test-nlu-registry-unknown") is False
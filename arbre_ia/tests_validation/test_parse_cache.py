@@ -0,0 +1,149 @@
+"""Tests du cache des analyses HybridNLU.
+
+Vérifie la forme canonique, l'immuabilité des résultats partagés, la
+version de configuration dans la clé, l'éviction LRU et l'accès concurrent.
+"""
+
+import copy
+import pickle
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from pydantic import ValidationError
+
+from headache_assistants.models import HeadacheCase
+from headache_assistants.nlu_hybrid import HybridNLU
+from headache_assistants.parse_cache import (
+    FrozenDict,
+    FrozenHeadacheCase,
+    FrozenList,
+    ParseCache,
+    canonical_text,
+    freeze,
+    nlu_config_version,
+)
+
+
+NOTE = "Femme 35 ans, céphalée brutale depuis 1h avec fièvre"
+
+
+class TestCanonicalText:
+    """Forme canonique des messages."""
+
+    def test_near_identical_messages(self):
+        """Casse, espaces et composition Unicode n'entrent pas dans la clé."""
+        assert canonical_text("  Pas de\tFIÈVRE \n") == "pas de fièvre"
+        assert canonical_text("fie\u0300vre") == canonical_text("fièvre")
+
+    def test_hit_for_near_identical(self, hybrid_nlu):
+        """Un message quasi identique est servi par le cache, avec le même résultat."""
+        cache = ParseCache(maxsize=8)
+        first = cache.parse_hybrid(hybrid_nlu, NOTE)
+        second = cache.parse_hybrid(hybrid_nlu, "  " + NOTE.upper())
+        assert second.case is first.case
+        assert cache.stats()["hits"] == 1 and cache.stats()["misses"] == 1
+        assert first.case == hybrid_nlu.parse_hybrid(NOTE).case
+
+
+class TestImmutability:
+    """Les résultats partagés ne peuvent pas être corrompus."""
+
+    def test_case_frozen(self, hybrid_nlu):
+        """Affectation interdite; model_copy dérive un nouveau cas."""
+        case, _ = ParseCache().parse_free_text_to_case(hybrid_nlu, NOTE)
+        assert isinstance(case, FrozenHeadacheCase)
+        with pytest.raises(ValidationError):
+            case.fever = False
+        with pytest.raises(TypeError):
+            case.red_flag_context.append("x")
+        assert case.model_copy(update={"fever": False}).fever is False
+        assert case == HeadacheCase(**case.model_dump())
+
+    def test_metadata_frozen(self, hybrid_nlu):
+        """Métadonnées en lecture seule à tous les niveaux; copy() est modifiable."""
+        _, metadata = ParseCache().parse_free_text_to_case(hybrid_nlu, NOTE)
+        with pytest.raises(TypeError):
+            metadata["overall_confidence"] = 1.0
+        with pytest.raises(TypeError):
+            metadata["detected_fields"].append("age")
+        with pytest.raises(TypeError):
+            metadata["confidence_scores"].update(age=0.0)
+        fields = metadata["detected_fields"].copy()
+        fields.append("marker")
+        assert type(fields) is list and "marker" not in metadata["detected_fields"]
+
+    def test_wrapper_not_shared(self, hybrid_nlu):
+        """Réaffecter un attribut du HybridResult renvoyé ne touche pas le cache."""
+        cache = ParseCache()
+        cache.parse_hybrid(hybrid_nlu, NOTE).case = None
+        assert cache.parse_hybrid(hybrid_nlu, NOTE).case is not None
+
+    def test_copy_and_pickle(self):
+        """Les valeurs figées se copient et se sérialisent."""
+        value = freeze({"a": [1, {"b": [2]}]})
+        assert isinstance(value["a"], FrozenList) and isinstance(value["a"][1], FrozenDict)
+        assert copy.deepcopy(value) == value
+        assert pickle.loads(pickle.dumps(value)) == {"a": [1, {"b": [2]}]}
+
+
+class TestCacheKey:
+    """Composition de la clé."""
+
+    def test_configuration_in_key(self):
+        """Deux configurations NLU différentes ne partagent pas leurs résultats."""
+        strict = HybridNLU(use_embedding=False, confidence_threshold=0.9)
+        loose = HybridNLU(use_embedding=False, confidence_threshold=0.5)
+        assert nlu_config_version(strict) != nlu_config_version(loose)
+        assert nlu_config_version(strict) == nlu_config_version(HybridNLU(use_embedding=False, confidence_threshold=0.9))
+        cache = ParseCache()
+        cache.parse_hybrid(strict, NOTE)
+        cache.parse_hybrid(loose, NOTE)
+        assert cache.stats()["misses"] == 2
+
+    def test_fields_in_key(self, hybrid_nlu):
+        """Un parse ciblé et un parse complet sont des entrées distinctes."""
+        cache = ParseCache()
+        targeted = cache.parse_hybrid(hybrid_nlu, NOTE, fields=["fever"])
+        full = cache.parse_hybrid(hybrid_nlu, NOTE)
+        assert targeted.metadata["parse_plan"] == ["fever"]
+        assert "parse_plan" not in full.metadata
+        assert len(cache) == 2
+
+    def test_use_embedding_in_key(self, hybrid_nlu):
+        """Une analyse sans embedding (réponse courte) n'est pas servie à la place d'une analyse complète."""
+        cache = ParseCache()
+        cache.parse_hybrid(hybrid_nlu, NOTE, use_embedding=False)
+        cache.parse_hybrid(hybrid_nlu, NOTE)
+        cache.parse_hybrid(hybrid_nlu, NOTE, use_embedding=False)
+        assert len(cache) == 2 and cache.stats()["hits"] == 1
+
+
+class TestBounds:
+    """Taille bornée et concurrence."""
+
+    def test_lru_eviction(self, hybrid_nlu):
+        """L'entrée la moins récemment utilisée est évincée."""
+        cache = ParseCache(maxsize=2)
+        for text in ("non", "oui", "non", "pas de fièvre"):
+            cache.parse_hybrid(hybrid_nlu, text)
+        stats = cache.stats()
+        assert (stats["size"], stats["evictions"], stats["hits"]) == (2, 1, 1)
+        cache.parse_hybrid(hybrid_nlu, "non")
+        assert cache.stats()["hits"] == 2
+
+    def test_disabled(self, hybrid_nlu):
+        """maxsize=0 : résultats figés mais rien n'est conservé."""
+        cache = ParseCache(maxsize=0)
+        cache.parse_hybrid(hybrid_nlu, NOTE)
+        assert len(cache) == 0 and cache.stats()["misses"] == 1
+
+    def test_concurrent_access(self, hybrid_nlu):
+        """Accès concurrents : compteurs cohérents, un seul résultat publié par clé."""
+        cache = ParseCache(maxsize=16)
+        texts = ["non", "oui", NOTE, "pas de fièvre"] * 25
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            cases = list(pool.map(lambda text: cache.parse_hybrid(hybrid_nlu, text).case, texts))
+        stats = cache.stats()
+        assert stats["hits"] + stats["misses"] == len(texts)
+        assert stats["size"] == 4
+        assert all(case == cases[i % 4] for i, case in enumerate(cases))
@@ -0,0 +1,98 @@
+"""Tests du parse ciblé de NLUv2 (plan de détecteurs par champ).
+
+Vérifie le calcul du plan (dépendances, champs sans détecteur), l'égalité
+des champs ciblés avec le parse complet et l'usage dans le dialogue.
+"""
+
+import pytest
+
+from benchmarks.corpus import load_real_cases
+from headache_assistants.dialogue import get_or_create_session, handle_user_message, reset_session
+from headache_assistants.models import ChatMessage
+from headache_assistants.nlu_hybrid import HybridNLU
+from headache_assistants.nlu_v2 import DETECTORS, SAFETY_DETECTORS, NLUv2, plan_detectors
+
+
+class TestPlanDetectors:
+    """Calcul du plan."""
+
+    def test_full_plan(self):
+        """Sans champs demandés, tous les détecteurs tournent."""
+        assert plan_detectors() == frozenset(DETECTORS)
+
+    def test_dependencies(self):
+        """Le trimestre requiert la grossesse; le profil, le début et la durée."""
+        assert plan_detectors(["pregnancy_trimester"]) == {"pregnancy_trimester", "pregnancy_postpartum"}
+        assert plan_detectors("profile") == {"profile", "onset", "duration_current_episode_hours"}
+        assert plan_detectors(["fever", "seizure"]) == {"fever", "seizure"}
+
+    def test_fields_without_detector(self):
+        """Un champ du modèle sans détecteur donne un plan vide; un nom inconnu est refusé."""
+        assert plan_detectors(["first_episode"]) == frozenset()
+        with pytest.raises(ValueError):
+            plan_detectors(["fievre"])
+
+
+class TestTargetedParse:
+    """Parse restreint aux champs demandés."""
+
+    def test_targeted_fields_match_full_parse(self):
+        """Chaque champ ciblé a la même valeur que dans le parse complet."""
+        nlu = NLUv2()
+        for text in load_real_cases()[:20]:
+            full, _ = nlu.parse(text)
+            for field in DETECTORS:
+                case, _ = nlu.parse(text, fields=[field])
+                assert getattr(case, field) == getattr(full, field), (field, text)
+
+    def test_other_fields_untouched(self):
+        """Les champs hors plan gardent leur valeur par défaut."""
+        case, metadata = NLUv2().parse("Homme 45 ans, fièvre, céphalée brutale", fields=["fever"])
+        assert case.fever is True
+        assert case.age is None and case.onset == "unknown"
+        assert metadata["detected_fields"] == ["fever"]
+        assert metadata["parse_plan"] == ["fever"]
+
+    def test_hybrid_forwards_fields(self):
+        """HybridNLU transmet les champs à la couche règles."""
+        nlu = HybridNLU(use_embedding=False, verbose=False)
+        case, metadata = nlu.parse_free_text_to_case("elle est enceinte de 5 mois", fields=["pregnancy_trimester"])
+        assert case.pregnancy_postpartum is True and case.pregnancy_trimester == 2
+        assert metadata["parse_plan"] == ["pregnancy_postpartum", "pregnancy_trimester"]
+
+
+class TestDialogueFollowUp:
+    """Réponses libres aux questions de suivi."""
+
+    def test_follow_up_uses_targeted_parse(self):
+        """Une réponse longue non oui/non : champ demandé et détecteurs de sécurité."""
+        session_id = "test-parse-plan"
+        try:
+            handle_user_message([], ChatMessage(role="user", content="Femme 35 ans, mal de tête"), session_id)
+            _, session = get_or_create_session(session_id)
+            asked = session["last_asked_field"]
+            assert asked is not None
+            handle_user_message([], ChatMessage(
+                role="user", content="c'est difficile à dire, je n'y ai pas fait attention ces derniers jours"
+            ), session_id)
+            assert session["extraction_metadata"]["parse_plan"] == sorted(plan_detectors([asked, *SAFETY_DETECTORS]))
+        finally:
+            reset_session(session_id)
+
+    def test_follow_up_keeps_safety_fields(self):
+        """Question sur le début : antécédent, âge et durée mentionnés dans la réponse sont gardés."""
+        replies = {
+            "je ne sais plus trop comment ça a commencé, mais elle a un cancer du sein": ("cancer_history", True),
+            "il a 72 ans et je ne me souviens pas du tout comment ça a commencé": ("age", 72),
+            "ça dure depuis 3 semaines, je ne sais pas comment ça a commencé exactement": ("profile", "subacute"),
+        }
+        for reply, (field, value) in replies.items():
+            session_id = "test-parse-plan-safety"
+            try:
+                handle_user_message([], ChatMessage(role="user", content="Patient avec mal de tête"), session_id)
+                _, session = get_or_create_session(session_id)
+                session["last_asked_field"] = "onset"
+                handle_user_message([], ChatMessage(role="user", content=reply), session_id)
+                assert getattr(session["current_case"], field) == value, reply
+            finally:
+                reset_session(session_id)
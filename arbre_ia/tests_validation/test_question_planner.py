@@ -0,0 +1,71 @@
+"""Tests du planificateur de questions par gain d'information.
+
+Vérifie la décision acquise, l'ordre des questions et l'effet sur le
+nombre de tours du dialogue.
+"""
+
+import pytest
+
+from benchmarks.corpus import load_real_cases
+from benchmarks.suite import _simulate_session
+from headache_assistants.dialogue import set_question_strategy
+from headache_assistants.models import HeadacheCase
+from headache_assistants.question_planner import get_question_planner
+from headache_assistants.rules_registry import get_rules_registry
+
+
+class TestSettledDecision:
+    """Décision acquise."""
+
+    def test_thunderclap_settled(self):
+        """Coup de tonnerre aigu : HSA quelles que soient les autres réponses."""
+        case = HeadacheCase(onset="thunderclap", profile="acute")
+        assert get_question_planner().is_settled(case, ["fever", "meningeal_signs", "neuro_deficit"])
+
+    def test_empty_case_not_settled(self):
+        """Cas vide : plusieurs recommandations restent atteignables."""
+        planner = get_question_planner()
+        assert not planner.is_settled(HeadacheCase(), ["onset", "fever", "meningeal_signs", "htic_pattern"])
+
+
+class TestQuestionOrder:
+    """Ordre des questions."""
+
+    def test_unread_field_has_no_gain(self):
+        """Un champ qu'aucune règle ne lit n'apporte aucune information."""
+        case = HeadacheCase(meningeal_signs=True)
+        gains = get_question_planner().information_gains(case, ["recent_pl_or_peridural", "fever"])
+        assert gains["recent_pl_or_peridural"] == 0.0 and gains["fever"] > 0.0
+
+    def test_ties_keep_priority_order(self):
+        """À gain égal, l'ordre fourni (table fixe) est conservé."""
+        planner = get_question_planner()
+        case = HeadacheCase(onset="thunderclap", profile="acute")
+        assert planner.order_questions(case, ["seizure", "fever", "recent_pl_or_peridural"]) == [
+            "seizure", "fever", "recent_pl_or_peridural"
+        ]
+
+    def test_planner_per_rule_set(self):
+        """Un planificateur (et sa mémoïsation) par jeu de règles compilé."""
+        compiled = get_rules_registry().snapshot().compiled
+        assert get_question_planner(compiled) is get_question_planner()
+
+
+class TestDialogueTurns:
+    """Effet sur le dialogue."""
+
+    def test_fewer_turns_same_recommendation(self):
+        """Sur les cas réels : même recommandation finale, jamais plus de questions."""
+        planned, fixed = 0, 0
+        for text in load_real_cases()[:20]:
+            turns, recommendation = _simulate_session((text, {}), "information_gain")
+            reference_turns, reference = _simulate_session((text, {}), "priority")
+            assert recommendation == reference, text
+            assert turns <= reference_turns, text
+            planned, fixed = planned + turns, fixed + reference_turns
+        assert planned < fixed
+
+    def test_unknown_strategy(self):
+        """Une stratégie inconnue est refusée."""
+        with pytest.raises(ValueError):
+            set_question_strategy("random")
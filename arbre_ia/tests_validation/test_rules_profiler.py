@@ -0,0 +1,149 @@
+"""Tests du profilage de couverture, de l'analyse statique et de la compilation des règles.
+
+Vérifie que le mode profilage ne change aucune décision, que les compteurs
+sont cohérents, que le réordonnancement par fréquence est sûr et que le DAG
+de décision compilé retient toujours la même règle que le parcours séquentiel.
+"""
+
+import random
+
+import pytest
+from headache_assistants.models import HeadacheCase
+from headache_assistants.rules_engine import RulesEngine, load_rules, match_rule
+from headache_assistants.rules_analysis import RuleSetAnalysis
+from headache_assistants.rules_profiler import profile_rules
+from headache_assistants.rules_compiler import compile_rules
+
+
+BOOL_FIELDS = [
+    "fever", "meningeal_signs", "neuro_deficit", "seizure", "htic_pattern",
+    "pregnancy_postpartum", "trauma", "immunosuppression", "recent_pattern_change",
+    "cancer_history", "horton_criteria",
+]
+
+
+def random_cases(count: int, seed: int = 42):
+    """Génère des cas aléatoires reproductibles couvrant les seuils des règles."""
+    rng = random.Random(seed)
+    cases = []
+    for _ in range(count):
+        data = {
+            "age": rng.choice([None, 20, 49, 50, 75]),
+            "sex": rng.choice(["M", "F"]),
+            "profile": rng.choice(["acute", "chronic", "subacute", "unknown"]),
+            "onset": rng.choice(["thunderclap", "progressive", "chronic", "unknown"]),
+            "intensity": rng.choice([None, 3, 7, 8, 10]),
+            "duration_current_episode_hours": rng.choice([None, 1.0, 3.0, 48.0]),
+            "headache_profile": rng.choice(["migraine_like", "tension_like", "unknown"]),
+        }
+        for name in BOOL_FIELDS:
+            data[name] = rng.choice([None, True, False, False])
+        if data["pregnancy_postpartum"]:
+            data["pregnancy_trimester"] = rng.choice([None, 1, 2, 3])
+        cases.append(HeadacheCase(**data))
+    return cases
+
+
+@pytest.fixture(scope="module")
+def cases():
+    return random_cases(400)
+
+
+class TestRuleSetAnalysis:
+    """Analyse statique des règles."""
+
+    def test_unknown_fields_are_dead(self):
+        """Les conditions sur des champs absents de HeadacheCase sont signalées."""
+        analysis = RuleSetAnalysis(load_rules()["rules"])
+        dead = {(d["rule_id"], d["condition"]): d["reason"] for d in analysis.dead_conditions()}
+        assert dead[("POSTURAL_001", "postural")] == "unknown_field"
+        assert dead[("TENSION_CHRONIC_001", "headache_profile")] == "never_true"
+        assert "POSTURAL_001" in analysis.unsatisfiable_rules()
+        assert "HSA_001" not in analysis.unsatisfiable_rules()
+
+    def test_mutual_exclusion(self):
+        """Profils différents = exclusion prouvée; champs libres = chevauchement."""
+        analysis = RuleSetAnalysis(load_rules()["rules"])
+        assert analysis.mutually_exclusive("HSA_001", "HTIC_003")
+        assert analysis.can_overlap("HSA_001", "MENINGITE_001")
+        assert analysis.can_overlap("PREGNANCY_T1_BENIGN", "PREGNANCY_001")
+
+    def test_static_overlap_agrees_with_engine(self, cases):
+        """Deux règles qui matchent un même cas ne sont jamais déclarées exclusives."""
+        rules = load_rules()["rules"]
+        analysis = RuleSetAnalysis(rules)
+        for case in cases:
+            matching = [r["id"] for r in rules if match_rule(case, r)]
+            for i, a in enumerate(matching):
+                assert analysis.is_satisfiable(a)
+                for b in matching[i + 1:]:
+                    assert analysis.can_overlap(a, b), (a, b)
+
+
+class TestRuleProfiler:
+    """Mode profilage du RulesEngine."""
+
+    def test_profiling_does_not_change_decisions(self, cases):
+        plain = RulesEngine()
+        profiled = RulesEngine(profile=True)
+        for case in cases:
+            assert plain.decide_imaging(case) == profiled.decide_imaging(case)
+
+    def test_report_counters(self, cases):
+        report = profile_rules(cases)
+        assert report["decisions"] == len(cases)
+        hits = sum(rule["hits"] for rule in report["rules"])
+        assert hits + report["fallback"]["count"] == len(cases)
+        assert sum(report["matched_position_histogram"].values()) == hits
+        assert sum(report["fallback"]["by_id"].values()) == report["fallback"]["count"]
+        assert "POSTURAL_001" in report["never_matched_rules"]
+        assert report["expected_rules_evaluated"]["safe_order"] <= \
+            report["expected_rules_evaluated"]["current_order"]
+
+    def test_condition_counters(self, cases):
+        report = profile_rules(cases)
+        hsa = next(rule for rule in report["rules"] if rule["rule_id"] == "HSA_001")
+        # HSA_001 est la première règle : évaluée pour chaque cas
+        assert hsa["evaluations"] == len(cases)
+        assert hsa["conditions"]["onset"]["evaluations"] == len(cases)
+
+    def test_report_requires_profile_mode(self):
+        with pytest.raises(RuntimeError):
+            RulesEngine().get_profile_report()
+
+    def test_optimized_order_preserves_decisions(self, cases):
+        engine = RulesEngine(profile=True)
+        before = engine.decide_imaging_bulk(cases)
+        order = engine.optimize_rule_order()
+        assert sorted(order) == sorted(r["id"] for r in load_rules()["rules"])
+        # Vérifié sur d'autres cas que ceux ayant servi à réordonner
+        reference = RulesEngine()
+        for case in random_cases(400, seed=7):
+            assert engine.decide_imaging(case) == reference.decide_imaging(case)
+        assert engine.decide_imaging_bulk(cases) == before
+
+
+class TestRulesCompiler:
+    """DAG de décision compilé (rules_compiler)."""
+
+    def test_lookup_matches_sequential_engine(self, cases):
+        rules = load_rules()["rules"]
+        compiled = compile_rules(rules)
+        for case in cases + random_cases(400, seed=7):
+            expected = next((r for r in rules if match_rule(case, r)), None)
+            assert compiled.lookup(case) is expected
+
+    def test_compiled_engine_decisions(self, cases):
+        plain = RulesEngine()
+        compiled = RulesEngine(compiled=True)
+        assert compiled.decide_imaging_bulk(cases) == plain.decide_imaging_bulk(cases)
+
+    def test_report_covers_domain(self):
+        compiled = compile_rules(load_rules()["rules"])
+        report = compiled.report()
+        assert sum(report["wins"].values()) == report["domain_size"]
+        shadowed = {item["rule_id"]: item["shadowed_by"] for item in report["shadowed_rules"]}
+        # Traumatisme aigu : toujours capté par TRAUMA_001, placé avant
+        assert "TRAUMA_001" in shadowed["DISSECTION_001"]
+        assert "POSTURAL_001" in report["unreachable_rules"]
+        assert "HSA_001" in report["wins"]
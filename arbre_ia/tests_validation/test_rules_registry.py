@@ -0,0 +1,154 @@
+"""Tests du registre de règles avec rechargement à chaud.
+
+Vérifie la publication atomique de snapshots versionnés, le rejet des
+fichiers invalides et la propagation de la version dans les recommandations.
+"""
+
+import json
+import os
+import shutil
+import time
+from pathlib import Path
+
+import pytest
+from headache_assistants.core.exceptions import ValidationError
+from headache_assistants.models import HeadacheCase
+from headache_assistants.rules_engine import RulesEngine, decide_imaging
+from headache_assistants.rules_registry import (
+    RulesRegistry,
+    build_snapshot,
+    get_rules_registry,
+    start_rules_watch,
+    stop_rules_watch,
+)
+
+
+RULES_PATH = Path(__file__).parent.parent / "rules" / "headache_rules.json"
+
+
+@pytest.fixture
+def rules_file(tmp_path):
+    path = tmp_path / "headache_rules.json"
+    shutil.copy(RULES_PATH, path)
+    return path
+
+
+def rewrite(path: Path, data) -> None:
+    """Réécrit le fichier et force un mtime différent."""
+    text = data if isinstance(data, str) else json.dumps(data, ensure_ascii=False)
+    path.write_text(text, encoding="utf-8")
+    stat = path.stat()
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+
+def thunderclap_case() -> HeadacheCase:
+    return HeadacheCase(age=40, profile="acute", onset="thunderclap")
+
+
+class TestRulesRegistry:
+
+    def test_version_is_content_hash(self, rules_file):
+        first = build_snapshot(rules_file)
+        assert first.version.startswith("1.0+")
+        assert build_snapshot(rules_file).version == first.version
+
+    def test_snapshot_is_deeply_frozen(self, rules_file):
+        snapshot = build_snapshot(rules_file)
+        rule = snapshot.rules[0]
+        with pytest.raises(TypeError):
+            rule["recommendation"]["comment"] = "modifié"
+        with pytest.raises(AttributeError):
+            rule["recommendation"]["imaging"].append("irm")
+        assert snapshot.rules_data["rules"] is snapshot.rules
+        assert snapshot.compiled.lookup(thunderclap_case()) is rule
+
+    def test_hot_reload_swaps_snapshot(self, rules_file):
+        registry = RulesRegistry(rules_file)
+        in_flight = registry.snapshot()
+        assert not registry.check_for_changes()
+
+        data = json.loads(rules_file.read_text(encoding="utf-8"))
+        data["rules"][0]["recommendation"]["comment"] = "Commentaire modifié"
+        rewrite(rules_file, data)
+
+        assert registry.check_for_changes()
+        assert registry.version != in_flight.version
+        assert registry.history == [in_flight.version, registry.version]
+        # Le snapshot lu avant le rechargement reste intact
+        assert in_flight.rules[0]["recommendation"]["comment"] != "Commentaire modifié"
+        assert registry.snapshot().compiled.lookup(thunderclap_case())["recommendation"]["comment"] \
+            == "Commentaire modifié"
+
+    def test_invalid_file_keeps_previous_snapshot(self, rules_file):
+        registry = RulesRegistry(rules_file)
+        version = registry.version
+
+        rewrite(rules_file, '{"rules": [')
+        assert not registry.check_for_changes()
+        assert registry.version == version
+        assert "JSONDecodeError" in registry.last_error
+
+        data = json.loads(RULES_PATH.read_text(encoding="utf-8"))
+        data["rules"].append(dict(data["rules"][0]))
+        rewrite(rules_file, data)
+        assert not registry.check_for_changes()
+        assert registry.version == version
+        assert "ValidationError" in registry.last_error
+
+    def test_invalid_recommendation_of_live_rule_rejected(self, rules_file):
+        data = json.loads(rules_file.read_text(encoding="utf-8"))
+        data["rules"][0]["recommendation"]["imaging"] = ["examen_inconnu"]
+        rewrite(rules_file, data)
+        with pytest.raises(ValidationError):
+            build_snapshot(rules_file)
+
+    def test_watcher_thread(self, rules_file):
+        registry = RulesRegistry(rules_file, poll_interval=0.05)
+        registry.start()
+        try:
+            version = registry.version
+            data = json.loads(rules_file.read_text(encoding="utf-8"))
+            data["metadata"]["version"] = "2.0"
+            rewrite(rules_file, data)
+            for _ in range(100):
+                if registry.version != version:
+                    break
+                time.sleep(0.05)
+            assert registry.version.startswith("2.0+")
+        finally:
+            registry.stop()
+
+
+    def test_shared_registry_watch_is_opt_in(self, rules_file):
+        assert get_rules_registry(rules_file)._thread is None
+        start_rules_watch()
+        try:
+            assert get_rules_registry(rules_file)._thread.is_alive()
+            other = rules_file.with_name("other_rules.json")
+            shutil.copy(rules_file, other)
+            assert get_rules_registry(other)._thread.is_alive()
+        finally:
+            stop_rules_watch()
+        assert get_rules_registry(rules_file)._thread is None
+
+
+class TestRulesVersionPropagation:
+
+    def test_decide_imaging_reports_version(self, rules_file):
+        recommendation = decide_imaging(thunderclap_case(), rules_path=rules_file)
+        assert recommendation.applied_rule_id == "HSA_001"
+        assert recommendation.rules_version == build_snapshot(rules_file).version
+
+    def test_fallback_reports_version(self):
+        recommendation = decide_imaging(HeadacheCase(age=30))
+        assert recommendation.applied_rule_id.startswith("FALLBACK")
+        assert recommendation.rules_version is not None
+
+    def test_rules_engine_reload_is_validated(self, rules_file):
+        engine = RulesEngine(rules_file)
+        version = engine.rules_version
+        rewrite(rules_file, "pas du json")
+        with pytest.raises(json.JSONDecodeError):
+            engine.reload_rules()
+        assert engine.rules_version == version
+        assert engine.decide_imaging(thunderclap_case()).rules_version == version
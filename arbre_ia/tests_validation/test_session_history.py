@@ -0,0 +1,124 @@
+"""Tests de la reconstruction de session depuis l'historique et du mode sans état.
+
+Vérifie que rejouer les messages utilisateur reproduit la session
+(cas, questions posées, dernier champ demandé) sans journaliser les tours
+rejoués, et qu'un worker sans session conservée mène le dialogue au même
+résultat.
+"""
+
+from headache_assistants import dialogue, rules_engine
+from headache_assistants.dialogue import (
+    get_or_create_session,
+    get_session_info,
+    handle_user_message,
+    rebuild_session,
+    reset_session,
+    session_needs_history,
+    set_stateless_sessions,
+    stream_user_message,
+)
+from headache_assistants.models import ChatMessage
+
+
+DIALOGUE = ["Homme 60 ans, céphalées progressives depuis 3 semaines", "non", "oui", "non", "non"]
+
+
+def _play(messages, session_id, history=None):
+    """Joue un dialogue; retourne (réponses, historique complet)."""
+    history = [] if history is None else history
+    responses = []
+    for text in messages:
+        message = ChatMessage(role="user", content=text)
+        response = handle_user_message(list(history), message, session_id)
+        responses.append(response)
+        history += [message, ChatMessage(role="assistant", content=response.message)]
+        if response.dialogue_complete:
+            break
+    return responses, history
+
+
+class TestRebuildSession:
+    """Reconstruction depuis l'historique."""
+
+    def test_replay_matches_original(self):
+        """Cas, questions posées et dernier champ demandé identiques à la session d'origine."""
+        try:
+            _, history = _play(DIALOGUE[:3], "test-history-original")
+            _, original = get_or_create_session("test-history-original")
+            _, rebuilt = rebuild_session(history, "test-history-rebuilt")
+            for key in ("current_case", "asked_fields", "last_asked_field", "message_count"):
+                assert rebuilt[key] == original[key], key
+        finally:
+            reset_session("test-history-original")
+            reset_session("test-history-rebuilt")
+
+    def test_unknown_session_is_rebuilt(self):
+        """Session perdue par le worker : l'historique la reconstruit et le dialogue continue."""
+        try:
+            reference, _ = _play(DIALOGUE, "test-history-reference")
+            _, history = _play(DIALOGUE[:2], "test-history-lost")
+            reset_session("test-history-lost")
+            assert session_needs_history("test-history-lost")
+
+            resumed, _ = _play(DIALOGUE[2:], "test-history-lost", history)
+            assert resumed[-1].message == reference[-1].message
+            assert resumed[-1].headache_case == reference[-1].headache_case
+        finally:
+            reset_session("test-history-reference")
+            reset_session("test-history-lost")
+
+    def test_known_session_ignores_history(self):
+        """Session connue : l'historique n'est pas rejoué."""
+        try:
+            _play(DIALOGUE[:1], "test-history-known")
+            assert not session_needs_history("test-history-known")
+            history = [ChatMessage(role="user", content="Femme 30 ans, fièvre")]
+            handle_user_message(history, ChatMessage(role="user", content="non"), "test-history-known")
+            assert get_session_info("test-history-known")["message_count"] == 2
+        finally:
+            reset_session("test-history-known")
+
+
+class TestReplayLogging:
+    """Journalisation pendant le rejeu."""
+
+    def test_replay_is_not_logged(self, monkeypatch):
+        """Tours rejoués : ni analyse NLU ni décision journalisées; seul le nouveau tour l'est."""
+        try:
+            _, history = _play(DIALOGUE, "test-history-logged")
+        finally:
+            reset_session("test-history-logged")
+        parses, decisions = [], []
+        monkeypatch.setattr(dialogue, "log_nlu_parsing", lambda **kwargs: parses.append(kwargs["text"]))
+        monkeypatch.setattr(rules_engine, "log_medical_decision", lambda **kwargs: decisions.append(kwargs))
+        try:
+            rebuild_session(history, "test-history-replayed")
+            assert parses == [] and decisions == []
+
+            new_message = ChatMessage(role="user", content="il a aussi de la fièvre depuis hier soir")
+            handle_user_message(history[:2], new_message, "test-history-resumed")
+            assert parses == [new_message.content]
+        finally:
+            reset_session("test-history-replayed")
+            reset_session("test-history-resumed")
+
+
+class TestStatelessMode:
+    """Mode sans état : aucune session conservée."""
+
+    def test_same_result_without_stored_session(self):
+        """Même réponse finale qu'en mode avec état; aucune session gardée entre les tours."""
+        previous = set_stateless_sessions(True)
+        try:
+            stateless, _ = _play(DIALOGUE, "test-stateless")
+            assert get_session_info("test-stateless") is None
+            events = list(stream_user_message([], ChatMessage(role="user", content="Femme 30 ans"), "test-stateless"))
+            assert events[-1][0] == "result"
+            assert get_session_info("test-stateless") is None
+        finally:
+            set_stateless_sessions(previous)
+        try:
+            stateful, _ = _play(DIALOGUE, "test-stateful")
+        finally:
+            reset_session("test-stateful")
+        assert [r.message for r in stateless] == [r.message for r in stateful]
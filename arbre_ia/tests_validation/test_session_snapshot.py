@@ -0,0 +1,167 @@
+"""Tests des instantanés binaires de session (session_snapshot, export/import).
+
+Vérifie l'aller-retour des cas et des sessions, le stockage par référence
+des métadonnées et motifs spéciaux, et le rejet des instantanés invalides
+ou corrompus.
+"""
+
+import random
+import zlib
+from datetime import datetime
+
+import pytest
+
+from headache_assistants.core.exceptions import SessionNotFoundError, ValidationError
+from headache_assistants.dialogue import (
+    export_session,
+    get_or_create_session,
+    handle_user_message,
+    import_session,
+    reset_session,
+)
+from headache_assistants.medical_examples_corpus import MEDICAL_EXAMPLES, example_id
+from headache_assistants.models import ChatMessage, HeadacheCase
+from headache_assistants.session_snapshot import (
+    SNAPSHOT_MAGIC,
+    pack_case,
+    pack_session,
+    unpack_case,
+    unpack_session,
+)
+
+
+def _session(**overrides):
+    session = {
+        "created_at": datetime(2024, 3, 1, 14, 30, 15, 250000),
+        "message_count": 2,
+        "current_case": HeadacheCase(age=45, sex="M", fever=True, onset="thunderclap"),
+        "asked_fields": ["fever", "onset"],
+        "last_asked_field": "onset",
+        "extraction_metadata": {"overall_confidence": 0.8},
+        "extraction_source": None,
+        "accumulated_special_patterns": [],
+    }
+    session.update(overrides)
+    return session
+
+
+def _with_crc(payload):
+    """Instantané au CRC32 valide (contenu altéré après l'en-tête)."""
+    return bytes(payload) + zlib.crc32(payload).to_bytes(4, "little")
+
+
+class TestCaseRoundtrip:
+    """Encodage bit-packé des cas."""
+
+    def test_value_types(self):
+        """Booléens, énumérations, entiers, flottants et listes sont restitués."""
+        case = HeadacheCase(
+            age=72, sex="F", profile="chronic", onset="progressive", fever=False,
+            meningeal_signs=None, pregnancy_postpartum=True, headache_profile="migraine_like",
+            intensity=8, duration_current_episode_hours=0.5,
+        )
+        assert unpack_case(pack_case(case)) == case
+
+    def test_empty_case_is_small(self):
+        """Un cas vide tient en quelques octets."""
+        packed = pack_case(HeadacheCase())
+        assert unpack_case(packed) == HeadacheCase()
+        assert len(packed) < 24
+
+
+class TestSessionRoundtrip:
+    """Aller-retour d'une session."""
+
+    def test_inline_metadata(self):
+        """Sans message source, les métadonnées sont stockées en ligne."""
+        session = _session()
+        assert unpack_session(pack_session("s1", session)) == ("s1", session)
+
+    def test_special_patterns(self):
+        """Patterns spéciaux (référence à un exemple du corpus) restitués à l'identique."""
+        patterns = [{"type": "neuralgia", "example_id": example_id(MEDICAL_EXAMPLES[0]), "similarity": 0.9}]
+        session = _session(accumulated_special_patterns=patterns)
+        assert unpack_session(pack_session("s1", session))[1]["accumulated_special_patterns"] == patterns
+
+    def test_metadata_by_reference(self):
+        """Avec un message source, les métadonnées ne sont pas dans l'instantané."""
+        source = {"text": "Homme 40 ans, mal de tête", "fields": None}
+        session = _session(extraction_source=source)
+        _, restored = unpack_session(pack_session("s1", session))
+        assert restored["extraction_metadata"] is None
+        assert restored["extraction_source"] == source
+
+
+class TestInvalidSnapshots:
+    """Instantanés rejetés."""
+
+    def test_rejects_bad_header_and_truncation(self):
+        """Signature, version, schéma ou contenu tronqué : ValidationError."""
+        snapshot = pack_session("s1", _session())
+        for broken in (
+            b"XXX" + snapshot[3:],
+            snapshot[:3] + bytes([snapshot[3] + 1]) + snapshot[4:],
+            snapshot[:4] + bytes(4) + snapshot[8:],
+            snapshot[: len(snapshot) // 2],
+        ):
+            with pytest.raises(ValidationError):
+                unpack_session(broken)
+        assert snapshot.startswith(SNAPSHOT_MAGIC)
+
+    def test_rejects_corruption(self):
+        """Octet modifié : refusé par le CRC32 avant décodage."""
+        snapshot = bytearray(pack_session("s1", _session()))
+        snapshot[len(snapshot) // 2] ^= 0xFF
+        with pytest.raises(ValidationError, match="CRC32"):
+            unpack_session(bytes(snapshot))
+
+    def test_fuzz(self):
+        """Contenu aléatoire ou muté (CRC recalculé) : ValidationError ou session, jamais une autre erreur."""
+        rng = random.Random(0)
+        snapshot = pack_session("s1", _session(extraction_metadata={"overall_confidence": 0.8, "trace": "é"}))
+        payload = snapshot[:-4]
+        for _ in range(3000):
+            mutated = bytearray(payload)
+            for _ in range(rng.randint(1, 4)):
+                position = rng.randrange(5, len(mutated))
+                if rng.random() < 0.2:
+                    del mutated[position:position + rng.randint(1, 8)]
+                else:
+                    mutated[position] = rng.randrange(256)
+            try:
+                unpack_session(_with_crc(mutated))
+            except ValidationError:
+                pass
+        for size in range(len(payload)):
+            with pytest.raises(ValidationError):
+                unpack_session(_with_crc(payload[:size]))
+        with pytest.raises(ValidationError):
+            unpack_session(bytes(rng.randrange(256) for _ in range(64)))
+
+
+class TestDialogueExportImport:
+    """export_session / import_session du dialogue."""
+
+    def test_export_unknown_session(self):
+        """Session inconnue : SessionNotFoundError."""
+        with pytest.raises(SessionNotFoundError):
+            export_session("test-snapshot-unknown")
+
+    def test_import_restores_and_continues(self):
+        """Session restaurée sous un autre ID : métadonnées recalculées, dialogue poursuivi."""
+        try:
+            handle_user_message(
+                [], ChatMessage(role="user", content="Femme 50 ans, céphalée progressive depuis 3 jours"),
+                "test-snapshot-source",
+            )
+            _, original = get_or_create_session("test-snapshot-source")
+            assert import_session(export_session("test-snapshot-source"), "test-snapshot-copy") == "test-snapshot-copy"
+            _, restored = get_or_create_session("test-snapshot-copy")
+            assert restored == original
+
+            response = handle_user_message([], ChatMessage(role="user", content="non"), "test-snapshot-copy")
+            assert response.session_id == "test-snapshot-copy"
+            assert restored["message_count"] == 2
+        finally:
+            reset_session("test-snapshot-source")
+            reset_session("test-snapshot-copy")
@@ -0,0 +1,155 @@
+"""Tests de l'interpréteur de réponses courtes (short_answers) et de son usage dans le dialogue.
+
+Vérifie polarité, nuances, réponses incertaines et échelles numériques, et
+que les réponses courtes aux questions de suivi évitent le pipeline complet.
+"""
+
+from headache_assistants.dialogue import (
+    get_follow_up_stats,
+    get_parse_cache_stats,
+    get_or_create_session,
+    handle_user_message,
+    reset_session,
+)
+from headache_assistants.models import ChatMessage
+from headache_assistants.short_answers import (
+    BOOLEAN_FIELDS,
+    interpret_short_answer,
+    is_bare_answer,
+    is_short_answer,
+)
+
+
+class TestPolarity:
+    """Réponses oui / non aux questions sur un champ booléen."""
+
+    def test_variants(self):
+        """Variantes courantes, négation prioritaire."""
+        expected = {
+            "jamais": False, "pas du tout": False, "non jamais": False, "absolument pas": False,
+            "ouais": True, "bien sûr": True, "un peu": True, "parfois": True,
+            "jamais eu de convulsions": False, "aucune faiblesse dans les bras": False,
+        }
+        for text, value in expected.items():
+            assert interpret_short_answer(text, "seizure").value is value, text
+
+    def test_hedges(self):
+        """Nuances : polarité retenue et marquée."""
+        answer = interpret_short_answer("je crois que oui", "fever")
+        assert answer.value is True and answer.hedged
+        answer = interpret_short_answer("pas vraiment", "fever")
+        assert answer.value is False and answer.hedged
+        assert not interpret_short_answer("oui", "fever").hedged
+
+    def test_uncertain(self):
+        """Réponse incertaine : champ laissé inconnu."""
+        for text in ("je ne sais pas", "aucune idée", "peut-être", "pas sûr"):
+            answer = interpret_short_answer(text, "fever")
+            assert answer.uncertain, text
+
+    def test_long_answer_needs_leading_polarity(self):
+        """Réponse longue : interprétée seulement si elle commence par oui / non."""
+        assert interpret_short_answer("non il n'y a eu aucune fièvre depuis le début de la semaine", "fever").value is False
+        assert interpret_short_answer("il a eu de la fièvre hier soir mais ça va mieux depuis ce matin", "fever") is None
+
+    def test_sole_tokens(self):
+        """"n", "o", "toujours", "souvent" ne comptent que seuls."""
+        assert interpret_short_answer("n", "fever").value is False
+        assert interpret_short_answer("O.", "fever").value is True
+        assert interpret_short_answer("toujours", "recent_pattern_change").value is True
+        assert interpret_short_answer("toujours mal à la tête", "fever") is None
+        assert interpret_short_answer("il n a rien dit", "fever").value is False
+
+    def test_bare_answers(self):
+        """Réponse nue : rien d'autre que la réponse."""
+        for text in ("oui", "je crois que non", "pas du tout", "7/10", "45 ans", "n"):
+            assert is_bare_answer(text), text
+        for text in ("non, mais il a convulsé", "pas de fièvre", "aucune idée, il a convulsé ce matin"):
+            assert not is_bare_answer(text), text
+
+    def test_all_boolean_fields(self):
+        """Tous les champs booléens du cas sont couverts."""
+        assert {"fever", "recent_pattern_change", "cancer_history"} <= BOOLEAN_FIELDS
+        assert interpret_short_answer("oui", "onset") is None
+
+
+class TestNumericScales:
+    """Intensité et âge."""
+
+    def test_intensity(self):
+        """Échelle sur 10 ou ramenée sur 10, nombres en lettres."""
+        expected = {"7/10": 7, "8 sur 10": 8, "3 sur 5": 6, "huit": 8, "10/10": 10, "je dirais 6": 6}
+        for text, value in expected.items():
+            assert interpret_short_answer(text, "intensity").value == value, text
+        assert interpret_short_answer("15", "intensity") is None
+
+    def test_age(self):
+        """Âge en chiffres, borné."""
+        assert interpret_short_answer("45 ans", "age").value == 45
+        assert interpret_short_answer("200", "age") is None
+
+
+class TestDialogueFollowUp:
+    """Réponses aux questions de suivi dans le dialogue."""
+
+    def test_short_replies_avoid_full_parse(self):
+        """Réponse interprétée ou analysée par la couche règles : pas de pipeline complet."""
+        session_id = "test-short-answers"
+        before = get_follow_up_stats()
+        try:
+            handle_user_message([], ChatMessage(role="user", content="Homme 40 ans, mal de tête depuis 2 jours"), session_id)
+            _, session = get_or_create_session(session_id)
+            session["last_asked_field"] = "seizure"
+            handle_user_message([], ChatMessage(role="user", content="jamais"), session_id)
+            assert session["current_case"].seizure is False
+
+            session["last_asked_field"] = "onset"
+            handle_user_message([], ChatMessage(role="user", content="progressif"), session_id)
+            assert session["current_case"].onset == "progressive"
+        finally:
+            reset_session(session_id)
+        after = get_follow_up_stats()
+        assert after["interpreted"] == before["interpreted"] + 1
+        assert after["rules"] == before["rules"] + 1
+        assert after["full"] == before["full"]
+
+    def test_short_reply_uses_parse_cache(self):
+        """Réponse courte analysée : même cache que le pipeline complet, sans embedding."""
+        session_id = "test-short-answers-cache"
+        try:
+            handle_user_message([], ChatMessage(role="user", content="Homme 40 ans, mal de tête depuis 2 jours"), session_id)
+            _, session = get_or_create_session(session_id)
+            counts = []
+            for _ in range(2):
+                session["last_asked_field"] = "onset"
+                before = get_parse_cache_stats()
+                handle_user_message([], ChatMessage(role="user", content="progressif selon lui"), session_id)
+                after = get_parse_cache_stats()
+                counts.append((after["hits"] - before["hits"], after["misses"] - before["misses"]))
+            assert counts == [(0, 1), (1, 0)]
+            assert session["current_case"].onset == "progressive"
+            assert session["extraction_metadata"]["embedding_used"] is False
+            assert session["extraction_metadata"]["parse_plan"]
+        finally:
+            reset_session(session_id)
+
+    def test_reply_keeps_other_fields(self):
+        """Une réponse qui mentionne d'autres champs les garde; l'interprétation tranche le champ demandé."""
+        session_id = "test-short-answers-other-fields"
+        try:
+            handle_user_message([], ChatMessage(role="user", content="Homme 40 ans, mal de tête depuis 2 jours"), session_id)
+            _, session = get_or_create_session(session_id)
+            session["last_asked_field"] = "onset"
+            handle_user_message([], ChatMessage(role="user", content="aucune idée, il a convulsé ce matin"), session_id)
+            assert session["current_case"].seizure is True
+
+            session["last_asked_field"] = "fever"
+            handle_user_message([], ChatMessage(role="user", content="non, mais il a vomi"), session_id)
+            assert session["current_case"].fever is False
+        finally:
+            reset_session(session_id)
+
+    def test_short_answer_threshold(self):
+        """Seuil en nombre de mots."""
+        assert is_short_answer("la nuque est un peu raide")
+        assert not is_short_answer("il a eu de la fièvre hier soir mais ça va mieux depuis ce matin")
@@ -0,0 +1,140 @@
+"""Tests du regroupement des appels concurrents (single_flight) et du cache des ordonnances.
+
+Vérifie qu'un double envoi ne lance qu'un calcul (analyse NLU, tour de
+dialogue, rendu d'ordonnance) et que l'ETag des ordonnances suit le cas,
+les règles, le prescripteur et la date.
+"""
+
+import threading
+import time
+
+import pytest
+
+from headache_assistants import dialogue
+from headache_assistants.dialogue import get_or_create_session, handle_user_message, reset_session
+from headache_assistants.models import ChatMessage, HeadacheCase
+from headache_assistants.nlu_hybrid import HybridNLU
+from headache_assistants.parse_cache import ParseCache
+from headache_assistants.prescription import PrescriptionCache, etag_matches, prescription_etag
+from headache_assistants.single_flight import SingleFlight
+
+
+def _concurrently(func, count=4):
+    """Lance func dans count threads démarrés ensemble; retourne les résultats."""
+    barrier = threading.Barrier(count)
+    results = [None] * count
+
+    def run(index):
+        barrier.wait()
+        results[index] = func()
+
+    threads = [threading.Thread(target=run, args=(index,)) for index in range(count)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return results
+
+
+def _slow(func, delay=0.2):
+    """func retardée : les appels concurrents se chevauchent."""
+    def wrapper(*args, **kwargs):
+        time.sleep(delay)
+        return func(*args, **kwargs)
+    return wrapper
+
+
+class TestSingleFlight:
+    """Regroupement par clé."""
+
+    def test_concurrent_calls_share_one_execution(self):
+        """Même clé en parallèle : un calcul, un résultat partagé."""
+        flights, calls = SingleFlight(), []
+        compute = _slow(lambda: calls.append(1) or object())
+        results = _concurrently(lambda: flights.do("key", compute))
+        assert len(calls) == 1
+        assert len({id(result) for result, _ in results}) == 1
+        assert sorted(shared for _, shared in results) == [False, True, True, True]
+        assert flights.stats() == {"executions": 1, "shared": 3, "in_flight": 0}
+
+    def test_exception_propagates_and_key_released(self):
+        """L'exception atteint tous les appelants; la clé est libérée ensuite."""
+        flights = SingleFlight()
+
+        def fail():
+            raise ValueError("échec")
+
+        with pytest.raises(ValueError):
+            flights.do("key", fail)
+        assert flights.do("key", lambda: 1) == (1, False)
+
+
+class TestParseCacheCoalescing:
+    """Analyses concurrentes d'un même message."""
+
+    def test_single_parse(self):
+        """Un seul parse_hybrid pour des requêtes identiques simultanées."""
+        nlu = HybridNLU(use_embedding=False)
+        calls = []
+        parse = nlu.parse_hybrid
+        nlu.parse_hybrid = _slow(
+            lambda text, fields=None, use_embedding=True:
+            calls.append(text) or parse(text, fields=fields, use_embedding=use_embedding)
+        )
+        cache = ParseCache(maxsize=0)
+        results = _concurrently(lambda: cache.parse_free_text_to_case(nlu, "Homme 40 ans, pas de fièvre"))
+        assert len(calls) == 1
+        assert all(case == results[0][0] for case, _ in results)
+        assert cache.stats()["coalesced"] == 3
+
+
+class TestDuplicateMessages:
+    """Double envoi d'un message dans le dialogue."""
+
+    def test_double_submit_is_one_turn(self, monkeypatch):
+        """Même message, même session, en parallèle : un seul tour, même réponse."""
+        session_id = "test-single-flight"
+        monkeypatch.setattr(dialogue, "_handle_turn", _slow(dialogue._handle_turn))
+        try:
+            responses = _concurrently(lambda: handle_user_message(
+                [], ChatMessage(role="user", content="Homme 40 ans, céphalée progressive depuis 3 jours"), session_id
+            ))
+            assert len({response.message for response in responses}) == 1
+            assert get_or_create_session(session_id)[1]["message_count"] == 1
+        finally:
+            reset_session(session_id)
+
+
+class TestPrescriptionCache:
+    """Ordonnances rendues et ETag."""
+
+    def test_etag_inputs(self):
+        """L'ETag change avec le cas, la version des règles, le médecin et la date."""
+        case = HeadacheCase(age=50)
+        etag = prescription_etag("s1", case, "1.0+abc", "Dr A", "01/03/2024")
+        assert etag.startswith('"') and etag == prescription_etag("s1", case, "1.0+abc", "Dr A", "01/03/2024")
+        for other in (
+            prescription_etag("s1", HeadacheCase(age=51), "1.0+abc", "Dr A", "01/03/2024"),
+            prescription_etag("s1", case, "1.0+def", "Dr A", "01/03/2024"),
+            prescription_etag("s1", case, "1.0+abc", "Dr B", "01/03/2024"),
+            prescription_etag("s1", case, "1.0+abc", "Dr A", "02/03/2024"),
+        ):
+            assert other != etag
+
+    def test_etag_matches(self):
+        """If-None-Match : ETag exact, liste ou préfixe faible; "*" ignoré."""
+        assert etag_matches('"a", "b"', '"b"')
+        assert etag_matches('W/"b"', '"b"')
+        assert not etag_matches("*", '"b"')
+        assert not etag_matches(None, '"b"') and not etag_matches('"a"', '"b"')
+
+    def test_render_once_per_etag(self):
+        """Rendus concurrents regroupés; même ETag servi depuis le cache, nouvel ETag rendu."""
+        cache, renders = PrescriptionCache(), []
+        render = _slow(lambda: renders.append(1) or f"ordonnance {len(renders)}")
+        results = _concurrently(lambda: cache.render("s1", '"v1"', render))
+        assert results == ["ordonnance 1"] * 4
+        assert cache.render("s1", '"v1"', render) == "ordonnance 1"
+        assert cache.render("s1", '"v2"', render) == "ordonnance 2"
+        stats = cache.stats()
+        assert (stats["renders"], stats["coalesced"], stats["hits"]) == (2, 3, 1)
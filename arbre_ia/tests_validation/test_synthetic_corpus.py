@@ -0,0 +1,84 @@
+"""Tests du générateur de notes cliniques synthétiques.
+
+Vérifie le déterminisme (y compris par tranches), la cohérence des
+étiquettes de vérité terrain et le calcul d'exactitude.
+"""
+
+import random
+
+from headache_assistants.models import HeadacheCase
+from headache_assistants.synthetic_corpus import (
+    SyntheticCorpusGenerator,
+    build_phrase_bank,
+    field_accuracy,
+    generate_notes,
+    make_typo,
+)
+
+
+class TestSyntheticCorpus:
+    """Génération et étiquetage."""
+
+    def test_deterministic_and_sliceable(self):
+        """Même graine -> mêmes notes; une tranche reproduit la génération complète."""
+        full = generate_notes(20, seed=7, typo_rate=0.1)
+        assert full == generate_notes(20, seed=7, typo_rate=0.1)
+        assert generate_notes(5, seed=7, start=10, typo_rate=0.1) == full[10:15]
+        assert full != generate_notes(20, seed=8, typo_rate=0.1)
+
+    def test_phrase_bank_uses_model_values(self):
+        """La banque ne contient que des (champ, valeur) valides pour HeadacheCase."""
+        bank = build_phrase_bank()
+        assert ("onset", "thunderclap") in bank and ("fever", True) in bank
+        for field, _value in bank:
+            assert field in HeadacheCase.model_fields
+        assert not any(term.startswith("depuis ") for terms in bank.values() for term in terms)
+
+    def test_labels_consistent(self):
+        """Les étiquettes respectent les contraintes cliniques du générateur."""
+        for note in generate_notes(300, seed=1):
+            case = note.case
+            assert {"age", "sex"} <= set(note.labelled_fields)
+            if case.pregnancy_postpartum:
+                assert case.sex == "F" and case.age <= 45
+            if case.onset == "thunderclap":
+                assert case.profile == "acute"
+            if "duration_current_episode_hours" in note.labelled_fields:
+                assert "profile" in note.labelled_fields
+
+    def test_field_rates_and_negation(self):
+        """Taux de mention et de négation contrôlent la distribution des champs."""
+        generator = SyntheticCorpusGenerator(seed=3, field_rates={"fever": 1.0}, negation_rate=1.0)
+        notes = list(generator.generate(50))
+        assert all(note.case.fever is False for note in notes)
+
+        generator = SyntheticCorpusGenerator(seed=3, field_rates={"fever": 0.0})
+        assert all("fever" not in note.labelled_fields for note in generator.generate(50))
+
+    def test_target_length(self):
+        """Les notes longues atteignent la longueur visée."""
+        notes = generate_notes(5, seed=2, target_chars=1500)
+        assert all(len(note.text) >= 1500 for note in notes)
+
+    def test_typo(self):
+        """Une faute de frappe modifie le mot sans le rendre méconnaissable."""
+        rng = random.Random(0)
+        for _ in range(50):
+            typo = make_typo(rng, "méningite")
+            assert typo != "méningite" and abs(len(typo) - len("méningite")) <= 1
+
+
+class TestFieldAccuracy:
+    """Exactitude par champ."""
+
+    def test_perfect_and_partial(self):
+        """Vérité terrain -> 100 %; un champ faux est compté sur son seul champ."""
+        notes = generate_notes(30, seed=4)
+        perfect = field_accuracy(notes, [note.case for note in notes])
+        assert perfect["overall"] == 1.0 and perfect["exact_notes"] == 1.0
+
+        wrong = [note.case.model_copy(update={"age": (note.case.age or 0) + 1}) for note in notes]
+        partial = field_accuracy(notes, wrong)
+        assert partial["fields"]["age"] == 0.0
+        assert partial["exact_notes"] == 0.0
+        assert all(value == 1.0 for field, value in partial["fields"].items() if field != "age")
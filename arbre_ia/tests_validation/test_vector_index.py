@@ -0,0 +1,108 @@
+"""Tests de l'index de similarité du corpus d'exemples.
+
+Vérifie la sélection top-k par argpartition, la normalisation, les requêtes
+groupées, la quantification int8 et le rappel de l'index IVF approché.
+"""
+
+import numpy as np
+
+from benchmarks.corpus import make_embedding_corpus
+from headache_assistants.nlu_hybrid import HybridNLU
+from headache_assistants.vector_index import (
+    ExactIndex,
+    IVFIndex,
+    build_index,
+    normalize_rows,
+    recall_at_k,
+    top_k,
+)
+
+
+class TestTopK:
+    """Sélection des k meilleurs scores."""
+
+    def test_matches_full_sort(self):
+        """Même résultat que le tri complet (ancienne implémentation)."""
+        scores = np.random.default_rng(0).standard_normal((4, 1000)).astype(np.float32)
+        indices, values = top_k(scores, 5)
+        for row, expected in zip(range(4), np.argsort(scores, axis=1)[:, -5:][:, ::-1]):
+            assert indices[row].tolist() == expected.tolist()
+            assert values[row].tolist() == scores[row, expected].tolist()
+
+    def test_k_larger_than_corpus(self):
+        """k borné par la taille du corpus."""
+        indices, _ = top_k(np.array([0.1, 0.9, 0.5]), 10)
+        assert indices.tolist() == [1, 2, 0]
+
+
+class TestExactIndex:
+    """Recherche exacte."""
+
+    def test_normalizes_corpus_and_queries(self):
+        """Cosinus indépendant de la norme des vecteurs."""
+        corpus = np.array([[10.0, 0.0], [0.0, 0.1], [1.0, 1.0]])
+        indices, scores = ExactIndex(corpus).search(np.array([0.0, 5.0]), k=3)
+        assert indices.tolist() == [1, 2, 0]
+        assert np.allclose(scores, [1.0, np.sqrt(0.5), 0.0], atol=1e-6)
+
+    def test_batched_equals_single(self):
+        """Une requête groupée donne les mêmes voisins que des requêtes unitaires."""
+        corpus, queries = make_embedding_corpus(2000, queries=20)
+        index = ExactIndex(corpus)
+        batch_indices, _ = index.search(queries, k=5)
+        assert batch_indices.shape == (20, 5)
+        for query, expected in zip(queries, batch_indices):
+            assert index.search(query, k=5)[0].tolist() == expected.tolist()
+
+    def test_quantized_recall(self):
+        """La matrice int8 occupe 4x moins de mémoire et garde le rappel@5."""
+        corpus, queries = make_embedding_corpus(2000, queries=50)
+        exact = ExactIndex(corpus)
+        quantized = ExactIndex(corpus, quantize=True)
+        assert quantized.matrix.dtype == np.int8
+        assert quantized.nbytes < exact.nbytes / 3
+        assert recall_at_k(quantized.search(queries)[0], exact.search(queries)[0]) >= 0.95
+
+
+class TestIVFIndex:
+    """Index approché."""
+
+    def test_recall_and_full_probe(self):
+        """Bon rappel avec peu de listes parcourues; exact si toutes le sont."""
+        corpus, queries = make_embedding_corpus(5000, queries=50, clusters=50)
+        expected = ExactIndex(corpus).search(queries)[0]
+        index = IVFIndex(corpus, n_probe=8)
+        assert recall_at_k(index.search(queries)[0], expected) >= 0.8
+        assert recall_at_k(index.search(queries, n_probe=index.n_lists)[0], expected) == 1.0
+
+    def test_build_index_threshold(self):
+        """build_index choisit l'index exact pour un petit corpus."""
+        corpus = normalize_rows(np.eye(3))
+        assert isinstance(build_index(corpus), ExactIndex)
+        assert isinstance(build_index(corpus, approximate=True), IVFIndex)
+
+
+class _BagOfWordsEncoder:
+    """Encodeur minimal (sac de mots haché) pour tester HybridNLU sans modèle."""
+
+    def encode(self, texts, convert_to_numpy=True, show_progress_bar=False):
+        vectors = np.zeros((len(texts), 64), dtype=np.float32)
+        for row, text in enumerate(texts):
+            for word in text.lower().split():
+                vectors[row, sum(map(ord, word)) % 64] += 1
+        return vectors
+
+
+class TestHybridExampleSearch:
+    """Recherche d'exemples dans HybridNLU."""
+
+    def test_find_similar_examples(self):
+        """Un exemple du corpus est son propre plus proche voisin."""
+        nlu = HybridNLU(use_embedding=False, verbose=False)
+        nlu.embedder = _BagOfWordsEncoder()
+        nlu.example_index = build_index(nlu.embedder.encode([ex["text"] for ex in nlu.examples]))
+        texts = [nlu.examples[3]["text"], nlu.examples[10]["text"]]
+        matches = nlu.find_similar_examples(texts, top_k=3)
+        assert [len(row) for row in matches] == [3, 3]
+        assert matches[0][0][1] >= matches[0][1][1] >= matches[0][2][1]
+        assert matches[0][0][1] > 0.99
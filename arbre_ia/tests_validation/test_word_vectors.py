@@ -0,0 +1,79 @@
+"""Tests de la table de vecteurs de mots (mots isolés servis sans transformeur)."""
+
+import numpy as np
+
+from headache_assistants.embedders import StaticEmbedder
+from headache_assistants.vocabulary.semantic_vocabulary import SEMANTIC_VOCABULARY, SemanticVocabulary
+from headache_assistants.word_vectors import (
+    WordVectorEmbedder,
+    WordVectorTable,
+    build_word_vector_table,
+    collect_lexicon,
+    lexicon_words,
+)
+
+
+class _CountingEmbedder(StaticEmbedder):
+    """Encodeur de référence qui compte les textes reçus."""
+
+    def __init__(self, tokens, vectors):
+        super().__init__(tokens, vectors)
+        self.calls = []
+
+    def encode(self, texts, convert_to_numpy=True, show_progress_bar=False, batch_size=32):
+        self.calls.append(list(texts))
+        return super().encode(texts, batch_size=batch_size)
+
+
+def _reference():
+    tokens = list(SEMANTIC_VOCABULARY)
+    vectors = np.random.default_rng(0).standard_normal((len(tokens), 32))
+    return _CountingEmbedder(tokens, vectors)
+
+
+class TestWordVectorTable:
+    """Format et recherche."""
+
+    def test_build_and_lookup(self, tmp_path):
+        """Table triée, float16 mappée, recherche exacte (pas de préfixe)."""
+        table = build_word_vector_table(_reference(), ["Fièvre", "fébrile", "fièvre", "brutale"], tmp_path / "t")
+        assert table.tokens.tolist() == ["brutale", "fièvre", "fébrile"]
+        assert isinstance(table.vectors, np.memmap) and table.vectors.dtype == np.float16
+        assert table.lookup(["fébrile", "fièvres", "fiè", "zzz"]).tolist() == [2, -1, -1, -1]
+        assert "brutale" in table and table.meta["size"] == 3
+        assert np.allclose(np.linalg.norm(table.vectors_for(np.arange(3)), axis=1), 1.0, atol=1e-3)
+
+    def test_lexicon(self):
+        """Lexique du dépôt : formes accentuées et sans accents, sans nombres."""
+        words = set(lexicon_words(["Céphalée à 39 brutale"]))
+        assert {"céphalée", "cephalee", "brutale"} <= words and "39" not in words
+        lexicon = set(collect_lexicon())
+        assert {"brutale", "fièvre", "fievre", "raideur"} <= lexicon
+
+
+class TestWordVectorEmbedder:
+    """Encodeur mixte table / transformeur."""
+
+    def test_routes_single_words_to_table(self, tmp_path):
+        """Mots connus lus dans la table; n-grams et inconnus en un seul lot de repli."""
+        reference = _reference()
+        table = build_word_vector_table(reference, ["brutale", "fièvre", "photophobie"], tmp_path / "t")
+        embedder = WordVectorEmbedder(table, reference)
+        reference.calls.clear()
+
+        vectors = embedder.encode(["brutale", "raideur nuque", "Fièvre", "fébrile"])
+        assert reference.calls == [["raideur nuque", "fébrile"]]
+        assert (embedder.hits, embedder.misses) == (2, 2)
+        expected = reference.encode(["brutale", "raideur nuque", "fièvre", "fébrile"])
+        assert np.allclose(vectors, expected, atol=1e-3)
+
+    def test_semantic_vocabulary_agreement(self, tmp_path):
+        """Mêmes correspondances sémantiques avec et sans table."""
+        reference = _reference()
+        table_dir = tmp_path / "t"
+        build_word_vector_table(reference, collect_lexicon(), table_dir)
+        plain = SemanticVocabulary(embedder=reference)
+        with_table = SemanticVocabulary(embedder=WordVectorEmbedder(WordVectorTable(table_dir), reference))
+        for text in ["céphalée brutale avec fièvre", "raideur de nuque et photophobie", "vomissements en jet"]:
+            assert ({(m.field, m.value) for m in plain.match_text(text)}
+                    == {(m.field, m.value) for m in with_table.match_text(text)})